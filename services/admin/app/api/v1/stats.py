@@ -3,9 +3,9 @@ Endpoints de statistiques pour le tableau de bord Admin
 """
 from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-import httpx
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 from app.infrastructure.internal_auth import verify_internal_token
 
 # Import pour l'authentification interne
@@ -63,7 +63,7 @@ async def get_dashboard_stats(
     
     # 1. Récupérer les stats des profils par statut
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=10.0) as client:
             response = await client.get(
                 f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/stats",
                 headers=headers
@@ -77,7 +77,7 @@ async def get_dashboard_stats(
     
     # 2. Récupérer les revenus mensuels
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.PAYMENT_SERVICE_URL, timeout=10.0) as client:
             response = await client.get(
                 f"{settings.PAYMENT_SERVICE_URL}/api/v1/payments/stats/revenue/monthly?months=12",
                 headers=headers
@@ -105,7 +105,7 @@ async def get_dashboard_stats(
     
     # 4. Récupérer le top 10 des compétences
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.SEARCH_SERVICE_URL, timeout=10.0) as client:
             response = await client.get(
                 f"{settings.SEARCH_SERVICE_URL}/api/v1/search/stats/skills/top?limit=10",
                 headers=headers
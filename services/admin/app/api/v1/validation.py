@@ -12,7 +12,12 @@ from app.infrastructure.auth import require_admin_role
 from app.infrastructure.candidate_client import get_candidate_profile, update_candidate_status, update_candidate_evaluation, update_candidate_hrflow_key, delete_candidate_profile
 from app.infrastructure.hrflow_parse_client import parse_cv_and_get_key
 from app.infrastructure.hrflow_asking_client import ask_profile, HrFlowAskingError
-from app.infrastructure.search_client import index_candidate_in_search, remove_candidate_from_search
+from app.infrastructure.search_client import (
+    evaluation_fields,
+    index_candidate_in_search,
+    remove_candidate_from_search,
+    update_candidate_in_search,
+)
 from app.infrastructure.notification_client import send_profile_validated_notification
 from app.infrastructure.audit_client import log_incident
 from app.core.exceptions import CandidateNotFoundError
@@ -419,18 +424,21 @@ async def update_evaluation(
     """
     Met à jour l'évaluation d'un candidat (admin_report, admin_score) sans changer le statut.
     Utile pour modifier l'évaluation d'un profil déjà validé avec ses nouvelles informations.
-    Réindexe le candidat dans la CVthèque avec les données mises à jour.
+    Seuls le score et le rapport du document de la CVthèque sont mis à jour.
     """
     try:
         report_data = _build_report_data(report)
-        await update_candidate_evaluation(candidate_id=candidate_id, report_data=report_data)
-
-        # Réindexer avec les données à jour (profil inclut déjà admin_report mis à jour)
-        profile_data_updated = await get_candidate_profile(candidate_id)
-        try:
-            await index_candidate_in_search(candidate_id, profile_data_updated)
-        except Exception as index_err:
-            logger.warning("Indexation après mise à jour évaluation échouée pour %s: %s", candidate_id, index_err)
+        updated_profile = await update_candidate_evaluation(candidate_id=candidate_id, report_data=report_data)
+
+        # Mise à jour partielle du document indexé (profil validé uniquement)
+        if updated_profile.get("status") == "VALIDATED":
+            try:
+                updated = await update_candidate_in_search(candidate_id, evaluation_fields(updated_profile))
+                if not updated:
+                    # Pas encore dans la CVthèque : indexation complète
+                    await index_candidate_in_search(candidate_id, await get_candidate_profile(candidate_id))
+            except Exception as index_err:
+                logger.warning("Indexation après mise à jour évaluation échouée pour %s: %s", candidate_id, index_err)
 
         return {
             "message": "Evaluation updated successfully",
@@ -524,9 +532,12 @@ async def unarchive_candidate(
             status="VALIDATED",
         )
 
-        # Réindexer dans l'index de recherche (synchrone pour cohérence)
+        # Réindexer dans l'index de recherche (synchrone pour cohérence) : changement de
+        # statut seul si le document y est encore, sinon indexation complète
         try:
-            await index_candidate_in_search(candidate_id, profile_data)
+            updated = await update_candidate_in_search(candidate_id, {"status": "VALIDATED"})
+            if not updated:
+                await index_candidate_in_search(candidate_id, profile_data)
             indexation_status = "completed"
         except Exception as index_err:
             logger.warning("Indexation synchrone échouée pour déarchivage %s: %s", candidate_id, index_err)
@@ -33,6 +33,11 @@ class Settings(BaseSettings):
     AUDIT_SERVICE_URL: str = Field(default="http://audit:8000", description="Audit service URL")
     FRONTEND_URL: str = Field(default="http://localhost:3000", description="Frontend URL for profile links")
 
+    # Indexation par événements (Redis Stream consommé par le Search Service)
+    REDIS_URL: str = Field(default="", description="Redis URL (required for indexing events)")
+    INDEXING_EVENTS_ENABLED: bool = Field(default=False, description="Publish profile-changed events instead of HTTP index calls")
+    INDEXING_STREAM_NAME: str = Field(default="search:indexing-events", description="Redis stream of profile-changed events")
+
     # HrFlow.ai - Profile Asking API (CvGPT)
     HRFLOW_API_KEY: str = Field(default="", description="HrFlow API key for Profile Asking")
     HRFLOW_SOURCE_KEY: str = Field(default="", description="HrFlow source key where profiles are indexed")
@@ -29,6 +29,7 @@ else:
     from shared.internal_auth import get_service_token_header
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 
 async def log_incident(
@@ -77,7 +78,7 @@ async def log_incident(
         }
         
         # Appeler le service Audit
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.AUDIT_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.AUDIT_SERVICE_URL}/api/v1/audit",
                 json=incident_data,
@@ -115,7 +116,7 @@ async def get_deleted_profiles(
             params["start_date"] = start_date.isoformat()
         if end_date:
             params["end_date"] = end_date.isoformat()
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with service_client(settings.AUDIT_SERVICE_URL, timeout=15.0) as client:
             response = await client.get(
                 f"{settings.AUDIT_SERVICE_URL}/api/v1/audit/deleted-profiles",
                 headers=headers,
@@ -28,6 +28,7 @@ else:
     from shared.internal_auth import get_service_token_header
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 from app.core.exceptions import CandidateNotFoundError
 
 
@@ -48,7 +49,7 @@ async def get_candidate_profile(candidate_id: int) -> Dict[str, Any]:
         # Générer les headers avec le token de service
         headers = get_service_token_header("admin-service")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=30.0) as client:
             response = await client.get(
                 f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}",
                 headers=headers
@@ -146,7 +147,7 @@ async def update_candidate_status(candidate_id: int, status: str, report_data: O
     
     try:
         headers = get_service_token_header("admin-service")
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=30.0) as client:
             response = await client.put(
                 f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}",
                 json=update_data,
@@ -226,7 +227,7 @@ async def update_candidate_evaluation(candidate_id: int, report_data: Dict[str,
 
     try:
         headers = get_service_token_header("admin-service")
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=30.0) as client:
             response = await client.put(
                 f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}",
                 json=update_data,
@@ -268,7 +269,7 @@ async def delete_candidate_profile(candidate_id: int) -> Dict[str, Any]:
     """
     try:
         headers = get_service_token_header("admin-service")
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=30.0) as client:
             response = await client.delete(
                 f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}",
                 headers=headers,
@@ -296,7 +297,7 @@ async def update_candidate_hrflow_key(candidate_id: int, hrflow_profile_key: str
     """
     try:
         headers = get_service_token_header("admin-service")
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=30.0) as client:
             response = await client.put(
                 f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}",
                 json={"hrflow_profile_key": hrflow_profile_key},
@@ -0,0 +1,64 @@
+"""
+Publication des profils modifiés vers l'indexation du Search Service (Redis Stream)
+
+Sans INDEXING_EVENTS_ENABLED (ou sans REDIS_URL), ou si Redis est indisponible,
+publish_profile_changed retourne False : search_client garde l'appel HTTP.
+"""
+import importlib.util
+import os
+import sys
+
+from app.core.config import settings
+
+# Module shared monté dans /shared via docker-compose (même approche que search_client.py)
+shared_path = "/shared"
+if os.path.exists(shared_path) and shared_path not in sys.path:
+    sys.path.insert(0, shared_path)
+
+indexing_events_path = os.path.join(shared_path, "indexing_events.py")
+if os.path.exists(indexing_events_path):
+    spec = importlib.util.spec_from_file_location("shared.indexing_events", indexing_events_path)
+    if spec and spec.loader:
+        indexing_events_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(indexing_events_module)
+        _publish = indexing_events_module.publish_profile_changed
+    else:
+        from shared.indexing_events import publish_profile_changed as _publish
+else:
+    from shared.indexing_events import publish_profile_changed as _publish
+
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis.asyncio as redis
+
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def publish_profile_changed(candidate_id: int, reason: str = "updated") -> bool:
+    """
+    Demande la (ré)indexation d'un profil, ou son retrait s'il n'est plus validé
+
+    Returns:
+        bool: True si l'événement est publié
+    """
+    if not settings.INDEXING_EVENTS_ENABLED or not settings.REDIS_URL:
+        return False
+    try:
+        client = _get_redis()
+    except Exception as e:
+        print(f"⚠️ Redis indisponible pour les événements d'indexation: {str(e)}")
+        return False
+    return await _publish(client, candidate_id, "admin-service", reason, stream=settings.INDEXING_STREAM_NAME)
+
+
+async def close_indexing_events() -> None:
+    """Ferme la connexion Redis (arrêt du service)"""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
@@ -28,6 +28,7 @@ else:
     from shared.internal_auth import get_service_token_header
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 
 async def send_profile_validated_notification(
@@ -61,7 +62,7 @@ async def send_profile_validated_notification(
             template_data["profile_url"] = profile_url
         
         # Appeler le service de notification
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=30.0) as client:
             # L'endpoint attend les paramètres dans le body directement
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/notifications/send/profile-validated",
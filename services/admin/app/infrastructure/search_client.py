@@ -28,6 +28,8 @@ else:
     from shared.internal_auth import get_service_token_header
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
+from app.infrastructure.indexing_events import publish_profile_changed
 
 
 async def index_candidate_in_search(candidate_id: int, profile_data: Dict[str, Any]) -> bool:
@@ -44,6 +46,9 @@ async def index_candidate_in_search(candidate_id: int, profile_data: Dict[str, A
     Raises:
         Exception: Si l'indexation échoue (pour transaction distribuée)
     """
+    # Indexation par événements : le Search Service relit le profil validé
+    if await publish_profile_changed(candidate_id, "validated"):
+        return True
     try:
         # Le profil récupéré du Candidate Service est au format ProfileDetailResponse
         # Extraire les données nécessaires
@@ -143,7 +148,7 @@ async def index_candidate_in_search(candidate_id: int, profile_data: Dict[str, A
         headers = get_service_token_header("admin-service")
         
         # Appel synchrone au service de recherche (bloquant pour la transaction)
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.SEARCH_SERVICE_URL, timeout=30.0) as client:
             response = await client.post(
                 f"{settings.SEARCH_SERVICE_URL}/api/v1/candidates/index",
                 json=candidate_document,
@@ -166,6 +171,59 @@ async def index_candidate_in_search(candidate_id: int, profile_data: Dict[str, A
         raise Exception(error_msg) from e
 
 
+def evaluation_fields(profile_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs d'évaluation du document indexé (même règle de score que index_candidate_in_search)"""
+    admin_report = profile_data.get("admin_report")
+    admin_score = profile_data.get("admin_score")
+    if admin_score is None and isinstance(admin_report, dict):
+        admin_score = admin_report.get("overall_score")
+    return {"admin_score": admin_score, "admin_report": admin_report}
+
+
+async def update_candidate_in_search(candidate_id: int, fields: Dict[str, Any]) -> bool:
+    """
+    Met à jour quelques champs d'un candidat déjà indexé (mise à jour partielle)
+    
+    Évite de relire le profil complet et de renvoyer tout le document pour un
+    changement de score ou de statut.
+    
+    Args:
+        candidate_id: ID du candidat
+        fields: Champs à modifier (admin_score, admin_report, status...)
+    
+    Returns:
+        bool: True si le document a été mis à jour, False s'il n'est pas indexé
+    
+    Raises:
+        Exception: Si la mise à jour échoue
+    """
+    # Avec les événements, le consommateur réindexe le profil courant (ou le retire)
+    if await publish_profile_changed(candidate_id, "updated"):
+        return True
+    try:
+        headers = get_service_token_header("admin-service")
+        
+        async with service_client(settings.SEARCH_SERVICE_URL, timeout=30.0) as client:
+            response = await client.patch(
+                f"{settings.SEARCH_SERVICE_URL}/api/v1/candidates/index/{candidate_id}",
+                json=fields,
+                headers=headers
+            )
+            if response.status_code == 404:
+                return False
+            response.raise_for_status()
+        
+        return True
+    except httpx.HTTPStatusError as e:
+        error_msg = f"Erreur HTTP lors de la mise à jour de l'index: {e.response.status_code} - {e.response.text}"
+        print(f"❌ {error_msg}")
+        raise Exception(error_msg) from e
+    except httpx.HTTPError as e:
+        error_msg = f"Erreur réseau lors de la mise à jour de l'index: {str(e)}"
+        print(f"❌ {error_msg}")
+        raise Exception(error_msg) from e
+
+
 async def remove_candidate_from_search(candidate_id: int) -> bool:
     """
     Supprime un candidat de l'index de recherche de manière asynchrone
@@ -176,11 +234,14 @@ async def remove_candidate_from_search(candidate_id: int) -> bool:
     Returns:
         bool: True si la suppression a réussi
     """
+    # Le consommateur retire le profil s'il n'est plus validé
+    if await publish_profile_changed(candidate_id, "removed"):
+        return True
     try:
         # Générer les headers avec le token de service
         headers = get_service_token_header("admin-service")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with service_client(settings.SEARCH_SERVICE_URL, timeout=30.0) as client:
             response = await client.delete(
                 f"{settings.SEARCH_SERVICE_URL}/api/v1/candidates/index/{candidate_id}",
                 headers=headers
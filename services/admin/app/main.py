@@ -8,6 +8,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import validation, stats, deleted_profiles
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
+from app.infrastructure.http_client import close_http_clients, http_client_metrics
+from app.infrastructure.indexing_events import close_indexing_events
 
 app = FastAPI(
     title="Admin Service",
@@ -35,6 +37,13 @@ app.include_router(stats.router, prefix="/api/v1/admin", tags=["Admin"])
 app.include_router(deleted_profiles.router, prefix="/api/v1/admin", tags=["Admin"])
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre : fermeture des pools HTTP inter-services et de Redis"""
+    await close_http_clients()
+    await close_indexing_events()
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
@@ -45,6 +54,12 @@ async def health_check():
     }
 
 
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
 @app.get("/", tags=["Root"], include_in_schema=False)
 async def root():
     """Root endpoint - Redirige vers la documentation"""
@@ -5,10 +5,11 @@ from typing import Optional
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, Query, status, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
 
 from app.domain.schemas import (
     AccessLogCreate,
+    AccessLogBatchCreate,
+    AccessLogBatchResponse,
     AccessLogResponse,
     AccessLogListResponse,
     AccessLogStatsResponse,
@@ -17,8 +18,9 @@ from app.domain.schemas import (
 )
 from app.domain.models import AccessLog
 from app.infrastructure.database import get_session
-from app.infrastructure.repositories import AccessLogRepository
-from app.infrastructure.auth import require_candidate_access, TokenData, get_current_user
+from app.core.config import settings
+from app.infrastructure.repositories import AccessLogRepository, access_log_values
+from app.infrastructure.auth import require_candidate_log_access, TokenData, get_current_user
 from app.infrastructure.internal_auth import verify_internal_token
 
 router = APIRouter()
@@ -51,21 +53,7 @@ async def create_access_log(
     user_agent = request.headers.get("user-agent")
     
     # Créer le log
-    access_log = AccessLog(
-        recruiter_id=log_data.recruiter_id,
-        recruiter_email=log_data.recruiter_email,
-        recruiter_name=log_data.recruiter_name,
-        company_id=log_data.company_id,
-        company_name=log_data.company_name,
-        candidate_id=log_data.candidate_id,
-        candidate_email=log_data.candidate_email,
-        candidate_name=log_data.candidate_name,
-        access_type=log_data.access_type,
-        action_type=log_data.action_type,
-        ip_address=ip_address or log_data.ip_address,
-        user_agent=user_agent or log_data.user_agent,
-        extra_metadata=json.dumps(log_data.metadata) if log_data.metadata else None,
-    )
+    access_log = AccessLog(**access_log_values(log_data, ip_address, user_agent))
     
     access_log = await repo.create(access_log)
     return AccessLogResponse.model_validate(access_log)
@@ -106,26 +94,43 @@ async def log_access(
     user_agent = request.headers.get("user-agent")
     
     # Créer le log
-    access_log = AccessLog(
-        recruiter_id=log_data.recruiter_id,
-        recruiter_email=log_data.recruiter_email,
-        recruiter_name=log_data.recruiter_name,
-        company_id=log_data.company_id,
-        company_name=log_data.company_name,
-        candidate_id=log_data.candidate_id,
-        candidate_email=log_data.candidate_email,
-        candidate_name=log_data.candidate_name,
-        access_type=log_data.access_type,
-        action_type=log_data.action_type,
-        ip_address=ip_address or log_data.ip_address,
-        user_agent=user_agent or log_data.user_agent,
-        extra_metadata=json.dumps(log_data.metadata) if log_data.metadata else None,
-    )
+    access_log = AccessLog(**access_log_values(log_data, ip_address, user_agent))
     
     access_log = await repo.create(access_log)
     return AccessLogResponse.model_validate(access_log)
 
 
+@router.post("/batch", response_model=AccessLogBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_access_logs_batch(
+    batch: AccessLogBatchCreate,
+    session: AsyncSession = Depends(get_session),
+    service_info: Optional[dict] = Depends(verify_internal_token)
+):
+    """
+    Enregistre un lot de logs d'accès en une seule transaction
+    
+    Destiné aux services qui bufferisent leurs logs d'accès et les envoient
+    périodiquement. L'IP et le User-Agent sont ceux portés par chaque événement
+    (ceux de la requête sont ceux du service appelant).
+    
+    **Protection** : Requiert un token de service interne (X-Service-Token)
+    """
+    if not service_info:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="This endpoint requires a service token"
+        )
+    if len(batch.items) > settings.AUDIT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large (max {settings.AUDIT_BATCH_MAX_ITEMS} items)"
+        )
+
+    repo = AccessLogRepository(session)
+    inserted = await repo.create_many([access_log_values(item) for item in batch.items])
+    return AccessLogBatchResponse(inserted=inserted)
+
+
 @router.get("/{log_id}", response_model=AccessLogResponse)
 async def get_access_log(
     log_id: int,
@@ -192,7 +197,7 @@ async def get_candidate_access_logs(
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
     session: AsyncSession = Depends(get_session),
-    current_user: TokenData = Depends(require_candidate_access(candidate_id))
+    current_user: TokenData = Depends(require_candidate_log_access)
 ):
     """
     Récupère tous les logs d'accès pour un candidat (RGPD - Droit à l'information)
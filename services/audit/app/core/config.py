@@ -27,6 +27,18 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = Field(default="HS256", description="JWT algorithm")
     AUTH_SERVICE_URL: str = Field(default="http://localhost:8001", description="Auth service URL")
     
+    # Ingestion des logs d'accès par lots (Redis Streams, désactivée si REDIS_URL est vide)
+    REDIS_URL: str = Field(default="", description="Redis URL (empty = stream ingestion disabled)")
+    AUDIT_STREAM_NAME: str = Field(default="audit:access-logs", description="Redis stream receiving access log events")
+    AUDIT_CONSUMER_GROUP: str = Field(default="audit-ingestion", description="Consumer group of the ingestion workers")
+    AUDIT_CONSUMER_NAME: str = Field(default="", description="Consumer name in the group (empty = hostname)")
+    AUDIT_INGESTION_BATCH_SIZE: int = Field(default=500, description="Max events inserted per batch")
+    AUDIT_INGESTION_BLOCK_MS: int = Field(default=1000, description="Max wait for new events before flushing a partial batch")
+    AUDIT_INGESTION_CLAIM_IDLE_MS: int = Field(default=60000, description="Idle time after which pending events of a dead consumer are reclaimed")
+    AUDIT_INGESTION_MAX_DELIVERIES: int = Field(default=5, description="Deliveries before an event that cannot be stored goes to the dead-letter stream")
+    AUDIT_DLQ_STREAM_NAME: str = Field(default="audit:access-logs:dlq", description="Redis stream of access log events that kept failing")
+    AUDIT_BATCH_MAX_ITEMS: int = Field(default=1000, description="Max events accepted by POST /api/v1/audit/batch")
+
     # CORS (string comma-separated depuis .env/docker-compose, converti en liste)
     CORS_ORIGINS: str = Field(
         default="http://localhost:3000,http://localhost:8000",
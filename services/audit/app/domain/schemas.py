@@ -21,6 +21,17 @@ class AccessLogCreate(BaseModel):
     ip_address: Optional[str] = Field(default=None, description="Adresse IP")
     user_agent: Optional[str] = Field(default=None, description="User Agent")
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="Métadonnées supplémentaires")
+    accessed_at: Optional[datetime] = Field(default=None, description="Date d'accès (défaut: date d'enregistrement)")
+
+
+class AccessLogBatchCreate(BaseModel):
+    """Schéma pour enregistrer un lot de logs d'accès"""
+    items: List[AccessLogCreate] = Field(min_length=1, description="Logs d'accès à enregistrer")
+
+
+class AccessLogBatchResponse(BaseModel):
+    """Schéma de réponse pour un lot de logs d'accès"""
+    inserted: int
 
 
 class AccessLogResponse(BaseModel):
@@ -0,0 +1,316 @@
+"""
+Ingestion des logs d'accès par lots depuis un Redis Stream
+
+Les services producteurs (Search, ...) publient chaque accès à un profil dans le
+stream AUDIT_STREAM_NAME (XADD, champ "event" = AccessLogCreate en JSON) au lieu
+d'appeler POST /api/v1/audit sur le chemin de la requête. Le consommateur lit le
+stream par lots via un consumer group, insère chaque lot en un seul INSERT
+multi-lignes et une transaction, puis acquitte les messages (XACK).
+
+Garanties :
+- un message n'est acquitté qu'après le commit : au pire il est réinséré après
+  un crash (au moins une fois) ;
+- les messages restés en attente chez un consommateur arrêté sont repris après
+  AUDIT_INGESTION_CLAIM_IDLE_MS (XAUTOCLAIM) ;
+- si l'INSERT du lot échoue, les logs sont insérés un par un : une ligne refusée
+  par la base ne bloque pas les autres. Elle reste en attente, puis part dans le
+  stream de lettres mortes AUDIT_DLQ_STREAM_NAME après
+  AUDIT_INGESTION_MAX_DELIVERIES livraisons ;
+- un message illisible est acquitté et compté (rejected) pour ne pas bloquer le
+  stream.
+
+Sans REDIS_URL, le consommateur ne démarre pas : les producteurs restent sur
+POST /api/v1/audit ou POST /api/v1/audit/batch.
+"""
+import asyncio
+import json
+import logging
+import socket
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.domain.schemas import AccessLogCreate
+from app.infrastructure.repositories import AccessLogRepository, access_log_values
+
+logger = logging.getLogger(__name__)
+
+# Pause après une erreur (Redis ou base indisponible) avant de réessayer
+RETRY_DELAY_SECONDS = 2.0
+
+
+def parse_stream_events(
+    messages: List[Tuple[str, Dict[str, str]]]
+) -> Tuple[List[str], List[AccessLogCreate], List[str]]:
+    """
+    Décode les messages lus dans le stream
+
+    Returns:
+        (IDs des messages valides, événements décodés, IDs des messages illisibles)
+    """
+    ids, events, rejected = [], [], []
+    for message_id, fields in messages:
+        try:
+            events.append(AccessLogCreate.model_validate(json.loads(fields["event"])))
+            ids.append(message_id)
+        except (KeyError, TypeError, ValueError, ValidationError) as e:
+            logger.warning(f"Rejected audit event {message_id}: {str(e)}")
+            rejected.append(message_id)
+    return ids, events, rejected
+
+
+class AuditStreamConsumer:
+    """Consommateur du stream des logs d'accès (un par process du service Audit)"""
+
+    def __init__(
+        self,
+        redis_url: str,
+        stream: str,
+        group: str,
+        consumer: str = "",
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        claim_idle_ms: int = 60000,
+        max_deliveries: int = 5,
+        dlq_stream: str = "",
+    ):
+        self.redis_url = redis_url
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or socket.gethostname()
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max(max_deliveries, 1)
+        self.dlq_stream = dlq_stream or f"{stream}:dlq"
+        self._client = None
+        self._task: Optional[asyncio.Task] = None
+        # Métriques
+        self.batches = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+        self.last_flush_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.redis_url)
+
+    def _get_redis(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self.redis_url, decode_responses=True)
+        return self._client
+
+    async def ensure_group(self) -> None:
+        """Crée le consumer group (et le stream) s'il n'existe pas"""
+        from redis.exceptions import ResponseError
+
+        try:
+            await self._get_redis().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _ack(self, message_ids: List[str]) -> None:
+        if not message_ids:
+            return
+        async with self._get_redis().pipeline(transaction=False) as pipe:
+            pipe.xack(self.stream, self.group, *message_ids)
+            # Les messages acquittés ne servent plus : le stream ne garde que l'attente
+            pipe.xdel(self.stream, *message_ids)
+            await pipe.execute()
+
+    async def _insert_one_by_one(
+        self,
+        session_factory,
+        ids: List[str],
+        events: List[AccessLogCreate]
+    ) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Insère les logs un par un (après l'échec de l'INSERT du lot)
+
+        Returns:
+            (IDs des messages insérés, {ID du message refusé: erreur})
+        """
+        inserted, failures = [], {}
+        for message_id, event in zip(ids, events):
+            try:
+                async with session_factory() as session:
+                    await AccessLogRepository(session).create_many([access_log_values(event)])
+                inserted.append(message_id)
+            except Exception as e:
+                failures[message_id] = str(e)
+        return inserted, failures
+
+    async def _dead_letter_exhausted(self, messages: Dict[str, Dict[str, str]], failures: Dict[str, str]) -> None:
+        """Lettres mortes pour les messages refusés livrés max_deliveries fois ; les autres restent en attente"""
+        client = self._get_redis()
+        dead = []
+        for message_id, error in failures.items():
+            pending = await client.xpending_range(self.stream, self.group, min=message_id, max=message_id, count=1)
+            if pending and pending[0]["times_delivered"] >= self.max_deliveries:
+                await client.xadd(self.dlq_stream, {
+                    "message_id": message_id,
+                    "event": messages[message_id].get("event", ""),
+                    "error": error[:1000],
+                    "failed_at": datetime.utcnow().isoformat(),
+                })
+                dead.append(message_id)
+            else:
+                logger.warning(f"Audit event {message_id} not stored, will be retried: {error[:200]}")
+        await self._ack(dead)
+        self.dead_lettered += len(dead)
+
+    async def process_batch(self, session_factory, messages: List[Tuple[str, Dict[str, str]]]) -> int:
+        """
+        Insère un lot de messages en une transaction puis les acquitte
+
+        Si l'INSERT du lot échoue, les logs sont insérés un par un ; les messages
+        refusés restent en attente (repris par XAUTOCLAIM) jusqu'aux lettres mortes.
+
+        Returns:
+            int: Nombre de logs insérés
+        """
+        if not messages:
+            return 0
+
+        ids, events, rejected = parse_stream_events(messages)
+        started = time.perf_counter()
+        failures: Dict[str, str] = {}
+        if events:
+            try:
+                async with session_factory() as session:
+                    await AccessLogRepository(session).create_many([access_log_values(event) for event in events])
+            except Exception as e:
+                logger.warning(f"Audit batch insert failed, inserting one by one: {str(e)}")
+                ids, failures = await self._insert_one_by_one(session_factory, ids, events)
+
+        await self._ack(ids + rejected)
+        if failures:
+            await self._dead_letter_exhausted(dict(messages), failures)
+
+        self.batches += 1
+        self.inserted += len(ids)
+        self.rejected += len(rejected)
+        self.failed += len(failures)
+        self.last_batch_size = len(ids)
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.last_flush_at = time.time()
+        return len(ids)
+
+    async def _read_batch(self) -> List[Tuple[str, Dict[str, str]]]:
+        """Messages abandonnés par un consommateur arrêté en priorité, puis les nouveaux"""
+        client = self._get_redis()
+        claimed = await client.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size,
+        )
+        # redis-py retourne [next_id, messages] (+ IDs supprimés depuis Redis 7)
+        if claimed[1]:
+            return [message for message in claimed[1] if message[1]]
+
+        response = await client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=self.batch_size, block=self.block_ms,
+        )
+        if not response:
+            return []
+        return response[0][1]
+
+    async def run_once(self, session_factory) -> int:
+        """Lit et traite un lot (attend au plus block_ms s'il n'y a rien)"""
+        return await self.process_batch(session_factory, await self._read_batch())
+
+    async def start(self, session_factory) -> None:
+        """Démarre la consommation en tâche de fond (sans effet sans Redis)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        """Arrête la consommation (les messages non acquittés seront relus)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _run(self, session_factory) -> None:
+        group_ready = False
+        while True:
+            try:
+                if not group_ready:
+                    await self.ensure_group()
+                    group_ready = True
+                await self.run_once(session_factory)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                group_ready = False
+                logger.warning(f"Audit stream ingestion failed: {str(e)}")
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Débit, dernier lot et retard du consumer group (lag, messages en attente)"""
+        metrics: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "stream": self.stream,
+            "group": self.group,
+            "consumer": self.consumer,
+            "batches": self.batches,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered,
+            "errors": self.errors,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": self.last_batch_ms,
+            "seconds_since_last_flush": (
+                round(time.time() - self.last_flush_at, 1) if self.last_flush_at else None
+            ),
+        }
+        if not self.enabled:
+            return metrics
+
+        try:
+            client = self._get_redis()
+            metrics["stream_length"] = await client.xlen(self.stream)
+            metrics["dlq_length"] = await client.xlen(self.dlq_stream)
+            for group in await client.xinfo_groups(self.stream):
+                if group.get("name") == self.group:
+                    # lag : messages pas encore lus par le groupe (Redis >= 7)
+                    metrics["lag"] = group.get("lag")
+                    metrics["pending"] = group.get("pending")
+                    break
+        except Exception as e:
+            metrics["redis_error"] = str(e)
+        return metrics
+
+
+# Instance globale
+audit_stream_consumer = AuditStreamConsumer(
+    redis_url=settings.REDIS_URL,
+    stream=settings.AUDIT_STREAM_NAME,
+    group=settings.AUDIT_CONSUMER_GROUP,
+    consumer=settings.AUDIT_CONSUMER_NAME,
+    batch_size=settings.AUDIT_INGESTION_BATCH_SIZE,
+    block_ms=settings.AUDIT_INGESTION_BLOCK_MS,
+    claim_idle_ms=settings.AUDIT_INGESTION_CLAIM_IDLE_MS,
+    max_deliveries=settings.AUDIT_INGESTION_MAX_DELIVERIES,
+    dlq_stream=settings.AUDIT_DLQ_STREAM_NAME,
+)
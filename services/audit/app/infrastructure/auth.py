@@ -8,6 +8,7 @@ from jose import JWTError, jwt
 import httpx
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
@@ -33,7 +34,7 @@ async def get_current_user(
     
     try:
         # Tenter de valider le token via le Auth Service
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with service_client(settings.AUTH_SERVICE_URL, timeout=5.0) as client:
             response = await client.get(
                 f"{settings.AUTH_SERVICE_URL}/api/v1/users/me",
                 headers={"Authorization": f"Bearer {token}"}
@@ -119,3 +120,15 @@ def require_candidate_access(candidate_id: int):
     
     return _check_access
 
+
+async def require_candidate_log_access(
+    candidate_id: int,
+    current_user: Optional[TokenData] = Depends(get_current_user)
+) -> TokenData:
+    """
+    Dépendance pour les routes /candidate/{candidate_id} : le candidat concerné ou un admin
+
+    candidate_id est lu dans le chemin de la route (require_candidate_access en
+    a besoin à la déclaration de la route, où il n'est pas encore connu).
+    """
+    return await require_candidate_access(candidate_id)(current_user)
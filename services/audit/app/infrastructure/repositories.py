@@ -1,13 +1,48 @@
 """
 Repositories pour l'accès aux données
 """
-from typing import Optional, List, Dict
-from datetime import datetime, timedelta
+import json
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, and_
+from sqlalchemy import select, func, desc, and_, insert
 from sqlalchemy.sql import text
 
 from app.domain.models import AccessLog, DeletedProfileAudit
+from app.domain.schemas import AccessLogCreate
+
+
+def access_log_values(
+    log_data: AccessLogCreate,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Colonnes d'un log d'accès à partir du schéma de création
+
+    ip_address / user_agent, s'ils sont fournis, remplacent ceux de l'événement.
+    """
+    now = datetime.utcnow()
+    accessed_at = log_data.accessed_at or now
+    if accessed_at.tzinfo is not None:
+        accessed_at = accessed_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "recruiter_id": log_data.recruiter_id,
+        "recruiter_email": log_data.recruiter_email,
+        "recruiter_name": log_data.recruiter_name,
+        "company_id": log_data.company_id,
+        "company_name": log_data.company_name,
+        "candidate_id": log_data.candidate_id,
+        "candidate_email": log_data.candidate_email,
+        "candidate_name": log_data.candidate_name,
+        "accessed_at": accessed_at,
+        "access_type": log_data.access_type,
+        "action_type": log_data.action_type,
+        "ip_address": ip_address or log_data.ip_address,
+        "user_agent": user_agent or log_data.user_agent,
+        "extra_metadata": json.dumps(log_data.metadata) if log_data.metadata else None,
+        "created_at": now,
+    }
 
 
 class AccessLogRepository:
@@ -22,6 +57,22 @@ class AccessLogRepository:
         await self.session.commit()
         await self.session.refresh(access_log)
         return access_log
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insère un lot de logs d'accès en un seul INSERT multi-lignes et une transaction
+
+        Args:
+            rows: Colonnes de chaque log (voir access_log_values)
+
+        Returns:
+            int: Nombre de logs insérés
+        """
+        if not rows:
+            return 0
+        await self.session.execute(insert(AccessLog).values(rows))
+        await self.session.commit()
+        return len(rows)
     
     async def get_by_id(self, log_id: int) -> Optional[AccessLog]:
         """Récupère un log par ID"""
@@ -7,7 +7,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import access_logs, health, deleted_profiles
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
-from app.infrastructure.database import init_db
+from app.infrastructure.http_client import close_http_clients, http_client_metrics
+from app.infrastructure.database import init_db, AsyncSessionLocal
+from app.infrastructure.audit_ingestion import audit_stream_consumer
 
 app = FastAPI(
     title="Audit Service",
@@ -39,6 +41,27 @@ app.include_router(deleted_profiles.router, prefix="/api/v1/audit/deleted-profil
 async def startup_event():
     """Initialisation au démarrage"""
     await init_db()
+    # Ingestion par lots des logs publiés dans le stream Redis (si REDIS_URL)
+    await audit_stream_consumer.start(AsyncSessionLocal)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre : consommateur du stream d'audit et pools HTTP inter-services"""
+    await audit_stream_consumer.stop()
+    await close_http_clients()
+
+
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
+@app.get("/health/audit-ingestion", tags=["Health"])
+async def audit_ingestion_metrics():
+    """Métriques de l'ingestion par lots (lots, lignes insérées, retard du consumer group)"""
+    return await audit_stream_consumer.metrics()
 
 
 @app.get("/", tags=["Root"])
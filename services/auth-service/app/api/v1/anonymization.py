@@ -6,14 +6,15 @@ import string
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-import httpx
 
 from app.domain.models import User
 from app.domain.schemas import TokenData
 from app.infrastructure.database import get_session
 from app.infrastructure.security import get_current_user
 from app.infrastructure.repositories import UserRepository, RefreshTokenRepository
+from app.infrastructure.token_revocation import revoke_user_tokens
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 # Import pour l'authentification interne
 import sys
@@ -95,7 +96,7 @@ async def anonymize_account(
         if settings.DOCUMENT_SERVICE_URL and settings.INTERNAL_SERVICE_TOKEN_SECRET:
             try:
                 headers = get_service_token_header("auth-service")
-                async with httpx.AsyncClient(timeout=10.0) as client:
+                async with service_client(settings.DOCUMENT_SERVICE_URL, timeout=10.0) as client:
                     # Récupérer le candidate_id depuis le profil (si c'est un candidat)
                     # Pour l'instant, on suppose que l'utilisateur a un profil candidat
                     # Dans un vrai système, il faudrait vérifier le rôle et récupérer le candidate_id
@@ -123,6 +124,7 @@ async def anonymize_account(
         
         # 3. Révoquer tous les tokens de l'utilisateur
         await token_repo.revoke_user_tokens(user.id)
+        await revoke_user_tokens(user.id)
         
         # 4. Sauvegarder les modifications
         user = await user_repo.update(user)
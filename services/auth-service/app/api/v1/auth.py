@@ -27,7 +27,10 @@ from app.infrastructure.security import (
     create_refresh_token,
     get_token_data,
     get_current_user,
+    decode_token,
+    oauth2_scheme,
 )
+from app.infrastructure.token_revocation import revoke_token, revoke_user_tokens
 from app.infrastructure.repositories import (
     UserRepository,
     RoleRepository,
@@ -260,12 +263,12 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(
     current_user = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session)
 ):
-    """Déconnexion (révoque le refresh token)"""
-    refresh_token_repo = RefreshTokenRepository(session)
-    # Note: Dans une implémentation complète, on devrait révoquer le token spécifique
-    # Pour l'instant, on retourne juste un succès
+    """Déconnexion (révoque l'access token courant auprès des services qui le vérifient localement)"""
+    payload = decode_token(token)
+    await revoke_token(payload.get("jti"), current_user.user_id, payload.get("exp"))
     return {"message": "Logged out successfully"}
 
 
@@ -334,6 +337,7 @@ async def password_reset_confirm(
     user.password_reset_expires = None
     user.updated_at = datetime.utcnow()
     await user_repo.update(user)
+    await revoke_user_tokens(user.id)
     
     return {"message": "Password reset successfully"}
 
@@ -365,6 +369,7 @@ async def change_password(
     # L'utilisateur garde les deux moyens de connexion : mot de passe ET Google/LinkedIn
     user.hashed_password = hash_password(request.new_password)
     await user_repo.update(user)
+    await revoke_user_tokens(user.id)
 
     return {"message": "Password changed successfully"}
 
@@ -66,6 +66,10 @@ class Settings(BaseSettings):
     RABBITMQ_VHOST: str = Field(default="/", description="RabbitMQ virtual host")
     RABBITMQ_URL: str = Field(default="", description="Full RabbitMQ URL")
 
+    # Redis (publication des révocations de tokens)
+    REDIS_URL: str = Field(default="", description="Redis URL for token revocation (empty = disabled)")
+    REDIS_REVOCATION_CHANNEL: str = Field(default="auth:revocations", description="Redis pub/sub channel for token revocations")
+
     @model_validator(mode="before")
     @classmethod
     def build_urls(cls, data: dict) -> dict:
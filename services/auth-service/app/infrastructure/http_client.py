@@ -0,0 +1,38 @@
+"""
+Client HTTP mutualisé pour les appels inter-services (voir shared/http_client.py)
+
+Le module shared est chargé une seule fois par process et enregistré sous
+"shared.http_client" : tous les modules du service partagent ainsi les mêmes pools.
+"""
+import importlib.util
+import os
+import sys
+
+# En Docker : /shared (ou /app/shared). En local : services/shared (relatif à ce fichier)
+_this_dir = os.path.dirname(os.path.abspath(__file__))
+_candidates = [
+    "/shared/http_client.py",
+    "/app/shared/http_client.py",
+    os.path.abspath(os.path.join(_this_dir, "..", "..", "..", "shared", "http_client.py")),
+]
+
+_module = sys.modules.get("shared.http_client")
+if _module is None:
+    for _path in _candidates:
+        if not os.path.exists(_path):
+            continue
+        _spec = importlib.util.spec_from_file_location("shared.http_client", _path)
+        if _spec and _spec.loader:
+            _module = importlib.util.module_from_spec(_spec)
+            sys.modules["shared.http_client"] = _module
+            _spec.loader.exec_module(_module)
+            break
+
+if _module is None:
+    raise ImportError(f"Shared module http_client.py not found in {_candidates}")
+
+service_client = _module.service_client
+get_http_client = _module.get_http_client
+configure_upstream = _module.configure_upstream
+close_http_clients = _module.close_http_clients
+http_client_metrics = _module.http_client_metrics
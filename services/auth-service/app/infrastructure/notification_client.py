@@ -32,10 +32,10 @@ for _path, _parent in _candidates:
     except ImportError:
         continue
 
-import httpx
 from typing import Optional
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +77,7 @@ async def send_candidate_registration_notification(
 
         logger.info(f"Sending candidate registration notification to {candidate_email}")
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_candidate_registration",
                 json=payload,
@@ -132,7 +132,7 @@ async def send_company_registration_notification(
 
         logger.info("Sending company registration notification to %s", recipient_email)
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_company_registration",
                 json=payload,
@@ -191,7 +191,7 @@ async def send_password_reset_notification(
 
         logger.info("Sending password reset notification to %s", recipient_email)
 
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=5.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_password_reset",
                 json=payload,
@@ -0,0 +1,90 @@
+"""
+Publication des révocations de tokens JWT
+
+Les services qui vérifient les tokens localement (ex: search-service) gardent
+en cache les claims des tokens déjà validés. L'auth-service leur signale les
+révocations via Redis :
+- une clé par JTI révoqué (logout), expirant avec le token lui-même ;
+- une clé "not before" par utilisateur (changement de mot de passe, de rôles,
+  anonymisation) : tout token émis avant cet instant est refusé ;
+- un message pub/sub sur REDIS_REVOCATION_CHANNEL pour purger les caches.
+
+Si Redis n'est pas configuré ou indisponible, les révocations sont ignorées
+(les caches expirent d'eux-mêmes après leur TTL).
+"""
+import json
+import logging
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REVOKED_JTI_KEY_PREFIX = "auth:revoked:jti:"
+REVOKED_USER_KEY_PREFIX = "auth:revoked:user:"
+
+_redis = None
+
+
+def _get_redis():
+    """Retourne le client Redis (créé à la première utilisation), ou None si non configuré"""
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        import redis.asyncio as redis
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def revoke_token(jti: Optional[str], user_id: int, expires_at: Optional[int]) -> None:
+    """
+    Révoque un access token précis (logout)
+
+    Args:
+        jti: Identifiant unique du token (claim "jti")
+        user_id: ID de l'utilisateur propriétaire du token
+        expires_at: Timestamp d'expiration du token (claim "exp")
+    """
+    client = _get_redis()
+    if client is None or not jti:
+        return
+
+    ttl = int(expires_at - time.time()) if expires_at else settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    if ttl <= 0:
+        return
+
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(f"{REVOKED_JTI_KEY_PREFIX}{jti}", str(user_id), ex=ttl)
+            pipe.publish(
+                settings.REDIS_REVOCATION_CHANNEL,
+                json.dumps({"type": "jti", "jti": jti, "user_id": user_id}),
+            )
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to publish token revocation for user %s: %s", user_id, e)
+
+
+async def revoke_user_tokens(user_id: int) -> None:
+    """
+    Révoque tous les access tokens émis jusqu'ici pour un utilisateur
+
+    À appeler lors d'un changement de mot de passe, de rôles ou d'une désactivation.
+    """
+    client = _get_redis()
+    if client is None:
+        return
+
+    not_before = int(time.time())
+    ttl = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(f"{REVOKED_USER_KEY_PREFIX}{user_id}", str(not_before), ex=ttl)
+            pipe.publish(
+                settings.REDIS_REVOCATION_CHANNEL,
+                json.dumps({"type": "user", "user_id": user_id, "not_before": not_before}),
+            )
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to publish user token revocation for user %s: %s", user_id, e)
@@ -8,6 +8,7 @@ from contextlib import asynccontextmanager
 from app.api.v1 import auth, users, anonymization, admin_invitations, oauth
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
+from app.infrastructure.http_client import close_http_clients, http_client_metrics
 from app.infrastructure.database import init_db
 from app.infrastructure.seed import seed_admin_user
 
@@ -32,7 +33,7 @@ async def lifespan(app: FastAPI):
         print(f"⚠️  Erreur lors de la création de l'utilisateur administrateur: {e}")
     yield
     # Shutdown
-    pass
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -75,6 +76,12 @@ async def health_check():
     }
 
 
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
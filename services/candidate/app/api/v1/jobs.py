@@ -16,6 +16,7 @@ from app.core.config import settings
 from app.infrastructure.database import get_session
 from app.infrastructure.auth import get_current_user, require_current_user, require_admin_role_dep, TokenData
 from app.infrastructure.repositories import ProfileRepository, JobOfferRepository, ApplicationRepository
+from app.infrastructure.job_counters import job_counters, VIEW_COUNT, REGISTER_CLICK_COUNT
 from app.domain.models import Profile, JobOffer, JobStatus, ProfileStatus
 from app.domain.schemas import JobOfferCreate, JobOfferUpdate, JobOfferResponse, ApplicationCreate, JobApplicationResponse
 from app.core.completion import check_cv_exists, calculate_completion_percentage
@@ -88,10 +89,11 @@ async def get_job(
         exp = job.expires_at.replace(tzinfo=None) if job.expires_at.tzinfo else job.expires_at
         if exp <= now:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Offre non trouvée")
-    # Incrémenter le compteur de vues (métrique d'acquisition)
-    await JobOfferRepository.increment_view_count(session, job_id)
-    job = await JobOfferRepository.get_by_id(session, job_id)
-    return JobOfferResponse.model_validate(job)
+    # Incrémenter le compteur de vues (métrique d'acquisition) : tamponné, appliqué en lot
+    pending_views = await job_counters.increment(job_id, VIEW_COUNT)
+    response = JobOfferResponse.model_validate(job)
+    response.view_count = (job.view_count or 0) + pending_views
+    return response
 
 
 @router.post("/jobs/{job_id}/register-click")
@@ -103,8 +105,11 @@ async def track_register_click(
     Enregistre un clic sur "Créer mon compte" depuis la modal affichée après avoir cliqué sur Postuler
     sur la page /offres/{id}. Appelé par le frontend sans authentification.
     """
-    ok = await JobOfferRepository.increment_register_click_count(session, job_id)
-    return {"ok": ok}
+    job = await JobOfferRepository.get_by_id(session, job_id)
+    if not job or job.status != JobStatus.PUBLISHED:
+        return {"ok": False}
+    await job_counters.increment(job_id, REGISTER_CLICK_COUNT)
+    return {"ok": True}
 
 
 @router.get("/jobs/{job_id}/application-status")
@@ -154,8 +159,9 @@ async def apply_to_job(
     if settings.REQUIRE_FULL_PROFILE_FOR_APPLY:
         threshold = settings.PROFILE_COMPLETION_THRESHOLD
         completion = profile.completion_percentage or 0
-        has_cv = await check_cv_exists(profile.id)
         if completion < threshold:
+            # Drapeau CV stocké ; le Document Service n'est interrogé que s'il est inconnu
+            has_cv = profile.has_cv if profile.has_cv is not None else await check_cv_exists(profile.id)
             recalc = calculate_completion_percentage(profile, has_cv)
             if recalc < threshold:
                 pct = int(recalc)
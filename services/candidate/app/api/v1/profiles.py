@@ -4,7 +4,7 @@ Endpoints API pour la gestion des profils candidats
 from typing import List, Optional
 from datetime import datetime
 import logging
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status as http_status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status as http_status
 from starlette.requests import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
@@ -18,7 +18,7 @@ from app.infrastructure.repositories import (
 )
 from app.domain.models import ProfileStatus
 from app.domain.schemas import (
-    ProfileResponse, ProfileDetailResponse, PaginatedProfilesResponse,
+    ProfileResponse, ProfileDetailResponse, PaginatedProfilesResponse, ValidatedProfilesPage,
     ProfileCreate, ProfileUpdate,
     ExperienceCreate, ExperienceResponse,
     EducationCreate, EducationResponse,
@@ -34,6 +34,7 @@ from app.core.exceptions import (
     InvalidProfileStatusError, ProfileNotCompleteError
 )
 from app.core.completion import can_submit_profile
+from app.infrastructure.indexing_events import publish_profile_changed
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 logger = logging.getLogger(__name__)
@@ -205,6 +206,9 @@ async def create_profile_from_cv(
             except Exception as ex:
                 logger.warning("Skip skill create: %s", ex)
 
+        # Complétion : un seul recalcul pour les expériences et formations importées
+        await ProfileRepository.update(session, profile.id, {}, sections=("experiences", "educations"))
+
 
     profile = await ProfileRepository.get_by_user_id_with_relations(session, current_user.user_id)
     if not profile:
@@ -430,7 +434,7 @@ async def delete_my_account(
 
     try:
         from app.core.config import settings
-        import httpx
+        from app.infrastructure.http_client import service_client
         import sys
         import os
         import importlib.util
@@ -460,7 +464,7 @@ async def delete_my_account(
         # 0. Désindexer le profil (Search Service)
         if settings.SEARCH_SERVICE_URL and service_headers:
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
+                async with service_client(settings.SEARCH_SERVICE_URL, timeout=10.0) as client:
                     response = await client.delete(
                         f"{settings.SEARCH_SERVICE_URL}/api/v1/candidates/index/{profile_id}",
                         headers=service_headers,
@@ -473,7 +477,7 @@ async def delete_my_account(
         # 0b. Enregistrer la trace dans l'Audit (avant suppression des données)
         if settings.AUDIT_SERVICE_URL and service_headers:
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
+                async with service_client(settings.AUDIT_SERVICE_URL, timeout=10.0) as client:
                     response = await client.post(
                         f"{settings.AUDIT_SERVICE_URL}/api/v1/audit/deleted-profiles",
                         json=audit_data,
@@ -487,7 +491,7 @@ async def delete_my_account(
         # 1. Supprimer les documents via Document Service (candidate_id = profile.id)
         if settings.DOCUMENT_SERVICE_URL and service_headers:
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
+                async with service_client(settings.DOCUMENT_SERVICE_URL, timeout=10.0) as client:
                     response = await client.delete(
                         f"{settings.DOCUMENT_SERVICE_URL}/api/v1/admin/candidate/{profile_id}",
                         headers=service_headers,
@@ -522,6 +526,8 @@ async def delete_my_account(
         # 4. Soft delete du profil
         await ProfileRepository.delete(session, profile_id)
         await session.commit()
+        # Filet de sécurité si la désindexation HTTP a échoué : le consommateur retire le profil supprimé
+        await publish_profile_changed(profile_id, "deleted")
 
         # Invalider le cache des stats pour que la page validation affiche les bons comptages
         try:
@@ -622,15 +628,21 @@ async def admin_get_validation_requests(
 @router.get("", response_model=PaginatedProfilesResponse)
 async def list_profiles(
     status: Optional[str] = None,
-    page: int = 1,
-    size: int = 20,
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=200),
     q: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente (pagination keyset)"),
     session: AsyncSession = Depends(get_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
     Liste les profils (réservé aux administrateurs).
     Retourne une réponse paginée (items + total) pour afficher la pagination côté admin.
+
+    Pagination : passer le next_cursor de la page précédente en cursor (coût constant
+    quelle que soit la profondeur) ; sans curseur, page reste appliquée en OFFSET.
+    Le total n'est calculé que sans curseur et est estimé au-delà de
+    PROFILE_LIST_EXACT_COUNT_LIMIT (total_is_estimate).
     """
     # 401 si pas de token ou token invalide
     if not current_user:
@@ -651,46 +663,33 @@ async def list_profiles(
             detail="Réservé aux administrateurs"
         )
     
-    from sqlalchemy import select, func, or_
-    from app.domain.models import Profile
+    from app.infrastructure.profile_listing import count_profiles, list_profiles_page, listing_filter
 
-    # Exclure impérativement les profils supprimés (soft delete)
-    base_filter = Profile.deleted_at.is_(None)
-    if q and q.strip():
-        search_term = f"%{q.strip()}%"
-        search_filter = or_(
-            Profile.first_name.ilike(search_term),
-            Profile.last_name.ilike(search_term),
-            Profile.email.ilike(search_term),
-            Profile.profile_title.ilike(search_term),
-        )
-        base_filter = base_filter & search_filter
+    status_enum = None
     if status:
         try:
             status_enum = ProfileStatus(status.upper())
-            base_filter = base_filter & (Profile.status == status_enum)
         except ValueError:
             raise HTTPException(
                 status_code=http_status.HTTP_400_BAD_REQUEST,
                 detail=f"Statut invalide : {status}. Valeurs : DRAFT, SUBMITTED, IN_REVIEW, VALIDATED, REJECTED, ARCHIVED"
             )
-    
-    # Total pour la pagination
-    count_q = select(func.count()).select_from(Profile).where(base_filter)
-    total_result = await session.execute(count_q)
-    total = total_result.scalar() or 0
-    
-    # Page d'éléments
-    offset = (page - 1) * size
-    query = select(Profile).where(base_filter).order_by(
-        Profile.submitted_at.desc().nullsfirst(), Profile.created_at.desc()
-    ).offset(offset).limit(size)
-    result = await session.execute(query)
-    profiles = result.scalars().all()
+    search = q.strip() if q and q.strip() else None
+
+    profiles, next_cursor = await list_profiles_page(
+        session, status_enum, search, size=size, cursor=cursor, page=page
+    )
+
+    # Total pour la pagination (première page du mode curseur ou mode page/size)
+    total, total_is_estimate = None, False
+    if not cursor:
+        total, total_is_estimate = await count_profiles(session, listing_filter(status_enum, search))
     
     return PaginatedProfilesResponse(
         items=[ProfileResponse.model_validate(p) for p in profiles],
-        total=total
+        total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
     )
 
 
@@ -717,10 +716,7 @@ async def partial_update_my_profile(
     - step7: Préférences de recherche d'emploi
     - last_step_completed: Dernière étape complétée (0-8)
     """
-    from app.infrastructure.repositories import (
-        ExperienceRepository, EducationRepository, CertificationRepository,
-        SkillRepository, JobPreferenceRepository
-    )
+    from app.infrastructure.repositories import JobPreferenceRepository
     
     # Vérifier que current_user existe
     current_user = require_current_user(current_user)
@@ -755,76 +751,39 @@ async def partial_update_my_profile(
         if step1_dict:
             profile_update_data.update(step1_dict)
     
+    # Étapes 2 à 5 : listes complètes, alignées sur l'existant par clé naturelle
+    # (insertions, modifications et suppressions ensemble, validées avec le profil)
+    collections = {}
+    
     # Étape 2 : Expériences Professionnelles
     if update_data.step2:
-        # Supprimer toutes les expériences existantes et les recréer
-        existing_experiences = await ExperienceRepository.get_by_profile_id(session, profile.id)
-        for exp in existing_experiences:
-            await ExperienceRepository.delete(session, exp.id)
-        
-        # Créer les nouvelles expériences
-        for exp_data in update_data.step2.experiences:
-            exp_dict = exp_data.model_dump(exclude_unset=True)
-            exp_dict["profile_id"] = profile.id
-            await ExperienceRepository.create(session, exp_dict)
+        collections["experiences"] = [exp.model_dump() for exp in update_data.step2.experiences]
     
     # Étape 3 : Formations & Diplômes
     if update_data.step3:
-        # Supprimer toutes les formations existantes et les recréer
-        existing_educations = await EducationRepository.get_by_profile_id(session, profile.id)
-        for edu in existing_educations:
-            await EducationRepository.delete(session, edu.id)
-        
-        # Créer les nouvelles formations
-        for edu_data in update_data.step3.educations:
-            edu_dict = edu_data.model_dump(exclude_unset=True)
-            edu_dict["profile_id"] = profile.id
-            await EducationRepository.create(session, edu_dict)
+        collections["educations"] = [edu.model_dump() for edu in update_data.step3.educations]
     
     # Étape 4 : Certifications & Attestations
     if update_data.step4:
-        # Supprimer toutes les certifications existantes et les recréer
-        existing_certifications = await CertificationRepository.get_by_profile_id(session, profile.id)
-        for cert in existing_certifications:
-            await CertificationRepository.delete(session, cert.id)
-        
-        # Créer les nouvelles certifications
-        for cert_data in update_data.step4.certifications:
-            cert_dict = cert_data.model_dump(exclude_unset=True)
-            cert_dict["profile_id"] = profile.id
-            await CertificationRepository.create(session, cert_dict)
+        collections["certifications"] = [cert.model_dump() for cert in update_data.step4.certifications]
     
     # Étape 5 : Compétences
     if update_data.step5:
-        # Supprimer toutes les compétences existantes et les recréer
-        existing_skills = await SkillRepository.get_by_profile_id(session, profile.id)
-        for skill in existing_skills:
-            await SkillRepository.delete(session, skill.id)
-        
-        # Créer les compétences techniques
-        for tech_skill in update_data.step5.technical_skills:
-            skill_dict = tech_skill.model_dump(exclude_unset=True)
-            skill_dict["profile_id"] = profile.id
-            skill_dict["skill_type"] = "TECHNICAL"  # Utiliser la valeur de l'enum en majuscules
-            await SkillRepository.create(session, skill_dict)
-        
-        # Créer les compétences comportementales (soft skills)
-        for soft_skill_name in update_data.step5.soft_skills:
-            skill_dict = {
-                "profile_id": profile.id,
-                "skill_type": "SOFT",  # Utiliser la valeur de l'enum en majuscules
-                "name": soft_skill_name,
-                "level": None,  # Les soft skills n'ont pas de niveau
-                "years_of_practice": None  # Les soft skills n'ont pas d'années de pratique
-            }
-            await SkillRepository.create(session, skill_dict)
-        
-        # Créer les outils/logiciels
-        for tool in update_data.step5.tools:
-            skill_dict = tool.model_dump(exclude_unset=True)
-            skill_dict["profile_id"] = profile.id
-            skill_dict["skill_type"] = "TOOL"  # Utiliser la valeur de l'enum en majuscules
-            await SkillRepository.create(session, skill_dict)
+        skills = [
+            {**tech_skill.model_dump(), "skill_type": "TECHNICAL"}  # Valeur de l'enum en majuscules
+            for tech_skill in update_data.step5.technical_skills
+        ]
+        # Compétences comportementales (soft skills) : ni niveau ni années de pratique
+        skills += [
+            {"skill_type": "SOFT", "name": soft_skill_name, "level": None, "years_of_practice": None}
+            for soft_skill_name in update_data.step5.soft_skills
+        ]
+        # Outils/logiciels
+        skills += [{**tool.model_dump(), "skill_type": "TOOL"} for tool in update_data.step5.tools]
+        collections["skills"] = skills
+    
+    if collections:
+        await ProfileRepository.sync_collections(session, profile.id, collections)
     
     # Étape 6 : Documents (métadonnées uniquement, l'upload est géré via Document Service)
     # Cette étape ne nécessite pas de mise à jour dans le profil, le CV est vérifié via Document Service
@@ -832,37 +791,132 @@ async def partial_update_my_profile(
     # Étape 7 : Préférences de recherche d'emploi
     if update_data.step7:
         pref_dict = update_data.step7.model_dump(exclude_unset=True)
-        await JobPreferenceRepository.create_or_update(session, profile.id, pref_dict)
+        await JobPreferenceRepository.create_or_update(session, profile.id, pref_dict, commit=False)
     
     # Mettre à jour last_step_completed si fourni
     if update_data.last_step_completed is not None:
         profile_update_data["last_step_completed"] = update_data.last_step_completed
     
-    # Mettre à jour le profil principal si nécessaire
-    if profile_update_data:
-        updated_profile = await ProfileRepository.update(
-            session,
-            profile.id,
-            profile_update_data
-        )
-    else:
-        # Recharger le profil avec les relations pour recalculer le completion_percentage
-        updated_profile = await ProfileRepository.get_with_relations(session, profile.id)
-        if updated_profile:
-            from app.core.completion import check_cv_exists, calculate_completion_percentage
-            has_cv = await check_cv_exists(profile.id)
-            updated_profile.completion_percentage = calculate_completion_percentage(updated_profile, has_cv=has_cv)
-            from datetime import datetime
-            updated_profile.updated_at = datetime.utcnow()
-            await session.commit()
-            await session.refresh(updated_profile)
+    # Sections de complétion touchées par la requête (identité : déduite des champs du profil)
+    changed_sections = set()
+    if "experiences" in collections:
+        changed_sections.add("experiences")
+    if "educations" in collections:
+        changed_sections.add("educations")
+    if update_data.step6 is not None:
+        # Étape documents : revérifier la présence du CV
+        changed_sections.add("cv")
+    if update_data.step7:
+        changed_sections.add("preferences")
+    
+    # Mettre à jour le profil principal et recalculer la complétion une seule fois
+    updated_profile = await ProfileRepository.update(
+        session,
+        profile.id,
+        profile_update_data,
+        sections=changed_sections
+    )
     
     if not updated_profile:
         raise ProfileNotFoundError(str(profile.id))
     
+    # Profil visible dans la recherche : réindexer les étapes modifiées
+    if updated_profile.status == ProfileStatus.VALIDATED:
+        await publish_profile_changed(updated_profile.id, "updated")
+    
     return ProfileResponse.model_validate(updated_profile)
 
 
+def _build_profile_detail(profile) -> dict:
+    """Réponse détaillée d'un profil chargé avec ses relations (format ProfileDetailResponse)"""
+    # Construire la réponse avec les relations - convertir les objets SQLModel en dictionnaires
+    response_data = ProfileResponse.model_validate(profile).model_dump()
+    
+    # Ajouter les relations en convertissant les objets SQLModel en dictionnaires
+    response_data["experiences"] = [ExperienceResponse.model_validate(exp).model_dump() for exp in profile.experiences]
+    response_data["educations"] = [EducationResponse.model_validate(edu).model_dump() for edu in profile.educations]
+    response_data["certifications"] = [CertificationResponse.model_validate(cert).model_dump() for cert in profile.certifications]
+    response_data["skills"] = [SkillResponse.model_validate(skill).model_dump() for skill in profile.skills]
+    
+    # Traiter job_preferences
+    if profile.job_preferences:
+        try:
+            job_pref_dict = JobPreferenceResponse.model_validate(profile.job_preferences).model_dump()
+            response_data["job_preferences"] = job_pref_dict
+        except Exception as job_pref_error:
+            logger.error(f"Error validating job_preferences for profile {profile.id}: {str(job_pref_error)}", exc_info=True)
+            # Si la validation échoue, construire manuellement
+            response_data["job_preferences"] = {
+                "id": profile.job_preferences.id,
+                "profile_id": profile.job_preferences.profile_id,
+                "desired_positions": profile.job_preferences.desired_positions or [],
+                "contract_type": profile.job_preferences.contract_type,
+                "target_sectors": profile.job_preferences.target_sectors or [],
+                "desired_location": profile.job_preferences.desired_location,
+                "mobility": profile.job_preferences.mobility,
+                "availability": profile.job_preferences.availability,
+                "salary_min": getattr(profile.job_preferences, 'salary_min', None),
+                "salary_max": getattr(profile.job_preferences, 'salary_max', None),
+                "salary_expectations": getattr(profile.job_preferences, 'salary_expectations', None),
+                "created_at": profile.job_preferences.created_at.isoformat() if profile.job_preferences.created_at else None,
+            }
+    else:
+        response_data["job_preferences"] = None
+    
+    # Ajouter les champs supplémentaires pour ProfileDetailResponse (tracking des dates en ISO)
+    response_data.update({
+        "hrflow_profile_key": getattr(profile, "hrflow_profile_key", None),
+        "date_of_birth": profile.date_of_birth.isoformat() if profile.date_of_birth else None,
+        "nationality": profile.nationality,
+        "phone": profile.phone,
+        "address": profile.address,
+        "city": profile.city,
+        "country": profile.country,
+        "sector": profile.sector,
+        "main_job": profile.main_job,
+        "total_experience": profile.total_experience,
+        "admin_report": profile.admin_report,
+        "created_at": profile.created_at.isoformat() if profile.created_at else None,
+        "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
+        "submitted_at": profile.submitted_at.isoformat() if profile.submitted_at else None,
+        "validated_at": profile.validated_at.isoformat() if profile.validated_at else None,
+        "rejected_at": profile.rejected_at.isoformat() if profile.rejected_at else None,
+        "accept_cgu": profile.accept_cgu,
+        "accept_rgpd": profile.accept_rgpd,
+        "accept_verification": profile.accept_verification,
+    })
+    return response_data
+
+
+@router.get("/internal/validated", response_model=ValidatedProfilesPage)
+async def list_validated_profiles(
+    after_id: int = Query(default=0, ge=0),
+    limit: int = Query(default=200, ge=1, le=1000),
+    ids: Optional[List[int]] = Query(default=None, description="Restreindre aux profils de ces IDs"),
+    session: AsyncSession = Depends(get_session),
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Profils validés avec leurs relations, par ID croissant (réindexation du Search Service)
+
+    Pagination keyset : passer le next_after_id de la page précédente en after_id ;
+    next_after_id vaut null sur la dernière page. Avec ids (indexation par
+    événements), seuls ceux de ces profils encore validés sont renvoyés.
+
+    **Protection** : Requiert un token de service interne (X-Service-Token)
+    """
+    if not service_info:
+        raise HTTPException(
+            status_code=http_status.HTTP_401_UNAUTHORIZED,
+            detail="This endpoint requires a service token"
+        )
+    profiles = await ProfileRepository.list_validated_after(session, after_id, limit, ids=ids)
+    return ValidatedProfilesPage(
+        items=[_build_profile_detail(profile) for profile in profiles],
+        next_after_id=profiles[-1].id if len(profiles) == limit else None,
+    )
+
+
 @router.get("/{profile_id}", response_model=ProfileDetailResponse)
 async def get_profile(
     profile_id: int,
@@ -911,64 +965,7 @@ async def get_profile(
                     detail="Not authorized to access this profile"
                 )
         
-        # Construire la réponse avec les relations - convertir les objets SQLModel en dictionnaires
-        response_data = ProfileResponse.model_validate(profile).model_dump()
-        
-        # Ajouter les relations en convertissant les objets SQLModel en dictionnaires
-        response_data["experiences"] = [ExperienceResponse.model_validate(exp).model_dump() for exp in profile.experiences]
-        response_data["educations"] = [EducationResponse.model_validate(edu).model_dump() for edu in profile.educations]
-        response_data["certifications"] = [CertificationResponse.model_validate(cert).model_dump() for cert in profile.certifications]
-        response_data["skills"] = [SkillResponse.model_validate(skill).model_dump() for skill in profile.skills]
-        
-        # Traiter job_preferences
-        if profile.job_preferences:
-            try:
-                job_pref_dict = JobPreferenceResponse.model_validate(profile.job_preferences).model_dump()
-                response_data["job_preferences"] = job_pref_dict
-            except Exception as job_pref_error:
-                logger.error(f"Error validating job_preferences for profile {profile.id}: {str(job_pref_error)}", exc_info=True)
-                # Si la validation échoue, construire manuellement
-                response_data["job_preferences"] = {
-                    "id": profile.job_preferences.id,
-                    "profile_id": profile.job_preferences.profile_id,
-                    "desired_positions": profile.job_preferences.desired_positions or [],
-                    "contract_type": profile.job_preferences.contract_type,
-                    "target_sectors": profile.job_preferences.target_sectors or [],
-                    "desired_location": profile.job_preferences.desired_location,
-                    "mobility": profile.job_preferences.mobility,
-                    "availability": profile.job_preferences.availability,
-                    "salary_min": getattr(profile.job_preferences, 'salary_min', None),
-                    "salary_max": getattr(profile.job_preferences, 'salary_max', None),
-                    "salary_expectations": getattr(profile.job_preferences, 'salary_expectations', None),
-                    "created_at": profile.job_preferences.created_at.isoformat() if profile.job_preferences.created_at else None,
-                }
-        else:
-            response_data["job_preferences"] = None
-        
-        # Ajouter les champs supplémentaires pour ProfileDetailResponse (tracking des dates en ISO)
-        response_data.update({
-            "hrflow_profile_key": getattr(profile, "hrflow_profile_key", None),
-            "date_of_birth": profile.date_of_birth.isoformat() if profile.date_of_birth else None,
-            "nationality": profile.nationality,
-            "phone": profile.phone,
-            "address": profile.address,
-            "city": profile.city,
-            "country": profile.country,
-            "sector": profile.sector,
-            "main_job": profile.main_job,
-            "total_experience": profile.total_experience,
-            "admin_report": profile.admin_report,
-            "created_at": profile.created_at.isoformat() if profile.created_at else None,
-            "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
-            "submitted_at": profile.submitted_at.isoformat() if profile.submitted_at else None,
-            "validated_at": profile.validated_at.isoformat() if profile.validated_at else None,
-            "rejected_at": profile.rejected_at.isoformat() if profile.rejected_at else None,
-            "accept_cgu": profile.accept_cgu,
-            "accept_rgpd": profile.accept_rgpd,
-            "accept_verification": profile.accept_verification,
-        })
-        
-        return response_data
+        return _build_profile_detail(profile)
     except (ProfileNotFoundError, HTTPException):
         raise
     except Exception as e:
@@ -1013,6 +1010,7 @@ async def update_profile(
             )
     
     # Vérifier le statut - permettre la mise à jour du statut uniquement pour les services internes
+    was_status = profile.status
     update_dict = update_data.model_dump(exclude_unset=True)
     is_internal_service = service_info is not None
     
@@ -1047,6 +1045,11 @@ async def update_profile(
     if not updated_profile:
         raise ProfileNotFoundError(str(profile_id))
     
+    # Entrée, sortie ou modification d'un profil indexé (validation, rejet, archivage...)
+    if ProfileStatus.VALIDATED in (was_status, updated_profile.status):
+        reason = "updated" if was_status == updated_profile.status else ProfileStatus(updated_profile.status).value.lower()
+        await publish_profile_changed(profile_id, reason)
+    
     return ProfileResponse.model_validate(updated_profile)
 
 
@@ -1071,6 +1074,7 @@ async def delete_profile(
     success = await ProfileRepository.delete(session, profile_id)
     if not success:
         raise ProfileNotFoundError(str(profile_id))
+    await publish_profile_changed(profile_id, "deleted")
     return {"message": "Profile deleted successfully", "profile_id": profile_id}
 
 
@@ -1177,7 +1181,7 @@ async def create_experience(
         experience = await ExperienceRepository.create(session, experience_dict)
         
         # Recalculer le pourcentage de complétion
-        await ProfileRepository.update(session, profile_id, {})
+        await ProfileRepository.update(session, profile_id, {}, sections=("experiences",))
         
         return ExperienceResponse.model_validate(experience)
     except HTTPException:
@@ -1242,7 +1246,7 @@ async def delete_experience(
     await ExperienceRepository.delete(session, experience_id)
     
     # Recalculer le pourcentage de complétion
-    await ProfileRepository.update(session, profile_id, {})
+    await ProfileRepository.update(session, profile_id, {}, sections=("experiences",))
 
 
 # ============================================
@@ -1269,7 +1273,7 @@ async def create_education(
     education = await EducationRepository.create(session, education_dict)
     
     # Recalculer le pourcentage de complétion
-    await ProfileRepository.update(session, profile_id, {})
+    await ProfileRepository.update(session, profile_id, {}, sections=("educations",))
     
     return EducationResponse.model_validate(education)
 
@@ -1310,7 +1314,7 @@ async def delete_education(
     await EducationRepository.delete(session, education_id)
     
     # Recalculer le pourcentage de complétion
-    await ProfileRepository.update(session, profile_id, {})
+    await ProfileRepository.update(session, profile_id, {}, sections=("educations",))
 
 
 # ============================================
@@ -1336,7 +1340,7 @@ async def create_certification(
     certification_dict["profile_id"] = profile_id
     certification = await CertificationRepository.create(session, certification_dict)
     
-    # Recalculer le pourcentage de complétion
+    # Les certifications ne comptent pas dans la complétion : date de modification seulement
     await ProfileRepository.update(session, profile_id, {})
     
     return CertificationResponse.model_validate(certification)
@@ -1377,7 +1381,7 @@ async def delete_certification(
     
     await CertificationRepository.delete(session, certification_id)
     
-    # Recalculer le pourcentage de complétion
+    # Les certifications ne comptent pas dans la complétion : date de modification seulement
     await ProfileRepository.update(session, profile_id, {})
 
 
@@ -1404,7 +1408,7 @@ async def create_skill(
     skill_dict["profile_id"] = profile_id
     skill = await SkillRepository.create(session, skill_dict)
     
-    # Recalculer le pourcentage de complétion
+    # Les compétences ne comptent pas dans la complétion : date de modification seulement
     await ProfileRepository.update(session, profile_id, {})
     
     return SkillResponse.model_validate(skill)
@@ -1445,7 +1449,7 @@ async def delete_skill(
     
     await SkillRepository.delete(session, skill_id)
     
-    # Recalculer le pourcentage de complétion
+    # Les compétences ne comptent pas dans la complétion : date de modification seulement
     await ProfileRepository.update(session, profile_id, {})
 
 
@@ -1476,7 +1480,7 @@ async def update_job_preferences(
     )
     
     # Recalculer le pourcentage de complétion
-    await ProfileRepository.update(session, profile_id, {})
+    await ProfileRepository.update(session, profile_id, {}, sections=("preferences",))
     
     return JobPreferenceResponse.model_validate(preference)
 
@@ -1,38 +1,46 @@
 """
 Logique de calcul du pourcentage de complétion du profil
 Algorithme pondéré : les sections obligatoires (Identité, CV, Expériences) pèsent plus lourd
+
+Chaque section a son propre sous-score (déjà pondéré). Les sous-scores sont mis en
+cache sur le profil (completion_scores) : une écriture ne recalcule que les sections
+qu'elle modifie, le total est la somme des sous-scores (voir
+ProfileRepository.refresh_completion).
 """
-from typing import Optional
+import logging
+from typing import Any, Dict, Iterable, Optional
 from app.domain.models import Profile, Experience, Education, Certification, Skill, JobPreference
 
+logger = logging.getLogger(__name__)
 
-def calculate_completion_percentage(profile: Profile, has_cv: bool = False) -> float:
+# Poids de chaque section dans le total (ordre de sommation du pourcentage)
+SECTION_WEIGHTS: Dict[str, float] = {
+    "identity": 20.0,
+    "experiences": 30.0,
+    "educations": 15.0,
+    "cv": 25.0,
+    "preferences": 10.0,
+}
+COMPLETION_SECTIONS = tuple(SECTION_WEIGHTS)
+
+# Champs du profil évalués par la section identité (les autres ne changent pas le score)
+IDENTITY_FIELDS = frozenset({
+    "first_name", "last_name", "email", "date_of_birth", "nationality", "phone",
+    "address", "city", "country", "profile_title", "professional_summary", "sector",
+    "main_job", "total_experience", "accept_cgu", "accept_rgpd", "accept_verification",
+})
+
+
+def identity_score(profile: Any) -> float:
     """
-    Calcule le pourcentage de complétion du profil candidat avec algorithme pondéré
-    
-    Algorithme complexe de complétion :
-    - Identité : 20%
-    - Expériences : 30%
-    - Formations : 15%
-    - CV PDF : 25%
-    - Préférences : 10%
-    
-    Total: 100%
+    Section identité : 20%
     
     Args:
-        profile: Le profil à évaluer
-        has_cv: True si un CV PDF a été uploadé (vérifié via service Document)
+        profile: Le profil (seuls les champs de IDENTITY_FIELDS sont lus)
     
     Returns:
-        float: Pourcentage de complétion (0-100)
+        float: Sous-score de la section (0-20)
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    total_percentage = 0.0
-    
-    # ============================================
-    # 1. IDENTITÉ : 20%
-    # ============================================
     identity_points = 0
     identity_max = 0
     
@@ -112,173 +120,246 @@ def calculate_completion_percentage(profile: Profile, has_cv: bool = False) -> f
         identity_points += 0.5
     identity_max += 0.5
     
-    # Calcul du pourcentage pour l'identité
-    if identity_max > 0:
-        identity_percentage = (identity_points / identity_max) * 20.0
-        total_percentage += identity_percentage
-        logger.debug(f"Identité: {identity_points}/{identity_max} = {identity_percentage:.2f}%")
-    
-    # ============================================
-    # 2. EXPÉRIENCES : 30% (minimum 1 avec document)
-    # ============================================
-    exp_score = 0.0  # Initialiser pour le logging
-    if profile.experiences and len(profile.experiences) > 0:
-        complete_experiences = 0
-        experiences_with_doc = 0
-        
-        for exp in profile.experiences:
-            # Une expérience est complète si elle a au minimum :
-            # - Nom de l'entreprise
-            # - Poste
-            # - Date de début
-            # - Date de fin OU is_current = True
-            is_complete = (
-                exp.company_name and
-                exp.position and
-                exp.start_date and
-                (exp.end_date or exp.is_current)
-            )
-            
-            if is_complete:
-                complete_experiences += 1
-                # Compter les expériences avec document justificatif
-                if exp.has_document or exp.document_id:
-                    experiences_with_doc += 1
-        
-        if complete_experiences > 0:
-            # Score basé sur le nombre d'expériences complètes
-            # - 1+ expérience(s) complète(s) = 100% de la section (30% du total)
-            exp_score = 1.0
-            
-            # Bonus si au moins 1 expérience a un document justificatif
-            if experiences_with_doc >= 1:
-                # Bonus de 10% si au moins 1 expérience a un document
-                exp_score = min(exp_score + 0.1, 1.0)
-            
-            # Bonus pour expériences avec description détaillée
-            detailed_experiences = sum(
-                1 for exp in profile.experiences
-                if exp.description and len(exp.description) >= 100
-            )
-            if detailed_experiences > 0 and complete_experiences >= 2:
-                # Bonus de 5% si au moins 2 expériences ont une description détaillée
-                exp_score = min(exp_score + 0.05, 1.0)
-            
-            total_percentage += exp_score * 30.0
-            logger.debug(f"Expériences: {complete_experiences} complètes, {experiences_with_doc} avec doc, score={exp_score} = {exp_score * 30.0:.2f}%")
-    # Si pas d'expériences, 0% pour cette section
-    
-    # ============================================
-    # 3. FORMATIONS : 15%
-    # ============================================
-    edu_score = 0.0  # Initialiser pour le logging
-    if profile.educations and len(profile.educations) > 0:
-        complete_educations = 0
-        total_educations = len(profile.educations)
-        
-        for edu in profile.educations:
-            # Une formation est complète si elle a :
-            # - Diplôme
-            # - Institution
-            # - Année d'obtention
-            # - Niveau
-            is_complete = (
-                edu.diploma and
-                edu.institution and
-                edu.graduation_year and
-                edu.level
-            )
-            
-            if is_complete:
-                complete_educations += 1
-        
-        if complete_educations > 0:
-            # Score basé sur le nombre de formations complètes
-            # - 1+ formation(s) complète(s) = 100% de la section (15% du total)
-            edu_score = 1.0
-            
-            total_percentage += edu_score * 15.0
-            logger.debug(f"Formations: {complete_educations} complètes, score={edu_score} = {edu_score * 15.0:.2f}%")
-    # Si pas de formations, 0% pour cette section
-    
-    # ============================================
-    # 4. CV PDF : 25%
-    # ============================================
-    if has_cv:
-        # Si un CV PDF existe, la section est complète à 100%
-        total_percentage += 25.0
-        logger.debug(f"CV PDF: présent = 25.0%")
-    else:
-        logger.debug(f"CV PDF: absent = 0.0%")
-    # Si pas de CV, 0% pour cette section
-    
-    # ============================================
-    # 5. PRÉFÉRENCES : 10%
-    # ============================================
-    pref_percentage = 0.0  # Initialiser pour le logging
-    if profile.job_preferences:
-        pref_points = 0
-        pref_max = 0
-        
-        # Champs obligatoires (contract_type legacy ou contract_types liste)
-        has_contract = bool(profile.job_preferences.contract_type) or (
-            profile.job_preferences.contract_types and len(profile.job_preferences.contract_types) > 0
+    identity_percentage = (identity_points / identity_max) * SECTION_WEIGHTS["identity"]
+    logger.debug(f"Identité: {identity_points}/{identity_max} = {identity_percentage:.2f}%")
+    return identity_percentage
+
+
+def experiences_score(experiences: Optional[Iterable[Any]]) -> float:
+    """
+    Section expériences : 30% (minimum 1 expérience complète)
+    
+    Args:
+        experiences: Les expériences du profil (entités ou lignes)
+    
+    Returns:
+        float: Sous-score de la section (0-30)
+    """
+    experiences = list(experiences or [])
+    if not experiences:
+        # Si pas d'expériences, 0% pour cette section
+        return 0.0
+    
+    complete_experiences = 0
+    experiences_with_doc = 0
+    
+    for exp in experiences:
+        # Une expérience est complète si elle a au minimum :
+        # - Nom de l'entreprise
+        # - Poste
+        # - Date de début
+        # - Date de fin OU is_current = True
+        is_complete = (
+            exp.company_name and
+            exp.position and
+            exp.start_date and
+            (exp.end_date or exp.is_current)
         )
-        if has_contract:
-            pref_points += 2
-        pref_max += 2
         
-        # desired_location ou preferred_locations (aligné dashboard / onboarding)
-        has_location = bool(profile.job_preferences.desired_location) or bool(profile.job_preferences.preferred_locations)
-        if has_location:
-            pref_points += 2
+        if is_complete:
+            complete_experiences += 1
+            # Compter les expériences avec document justificatif
+            if exp.has_document or exp.document_id:
+                experiences_with_doc += 1
+    
+    if complete_experiences == 0:
+        return 0.0
+    
+    # Score basé sur le nombre d'expériences complètes
+    # - 1+ expérience(s) complète(s) = 100% de la section (30% du total)
+    exp_score = 1.0
+    
+    # Bonus si au moins 1 expérience a un document justificatif
+    if experiences_with_doc >= 1:
+        # Bonus de 10% si au moins 1 expérience a un document
+        exp_score = min(exp_score + 0.1, 1.0)
+    
+    # Bonus pour expériences avec description détaillée
+    detailed_experiences = sum(
+        1 for exp in experiences
+        if exp.description and len(exp.description) >= 100
+    )
+    if detailed_experiences > 0 and complete_experiences >= 2:
+        # Bonus de 5% si au moins 2 expériences ont une description détaillée
+        exp_score = min(exp_score + 0.05, 1.0)
+    
+    logger.debug(f"Expériences: {complete_experiences} complètes, {experiences_with_doc} avec doc, score={exp_score} = {exp_score * 30.0:.2f}%")
+    return exp_score * SECTION_WEIGHTS["experiences"]
+
+
+def educations_score(educations: Optional[Iterable[Any]]) -> float:
+    """
+    Section formations : 15% (minimum 1 formation complète)
+    
+    Args:
+        educations: Les formations du profil (entités ou lignes)
+    
+    Returns:
+        float: Sous-score de la section (0-15)
+    """
+    complete_educations = 0
+    for edu in educations or []:
+        # Une formation est complète si elle a :
+        # - Diplôme
+        # - Institution
+        # - Année d'obtention
+        # - Niveau
+        if edu.diploma and edu.institution and edu.graduation_year and edu.level:
+            complete_educations += 1
+    
+    if complete_educations == 0:
+        # Si pas de formations complètes, 0% pour cette section
+        return 0.0
+    
+    # 1+ formation(s) complète(s) = 100% de la section (15% du total)
+    edu_score = 1.0
+    logger.debug(f"Formations: {complete_educations} complètes, score={edu_score} = {edu_score * 15.0:.2f}%")
+    return edu_score * SECTION_WEIGHTS["educations"]
+
+
+def cv_score(has_cv: bool) -> float:
+    """
+    Section CV PDF : 25% si un CV existe, 0% sinon
+    
+    Returns:
+        float: Sous-score de la section (0 ou 25)
+    """
+    if has_cv:
+        logger.debug("CV PDF: présent = 25.0%")
+        return SECTION_WEIGHTS["cv"]
+    logger.debug("CV PDF: absent = 0.0%")
+    return 0.0
+
+
+def preferences_score(job_preferences: Optional[Any]) -> float:
+    """
+    Section préférences : 10%
+    
+    Args:
+        job_preferences: Les préférences d'emploi du profil (entité ou ligne), ou None
+    
+    Returns:
+        float: Sous-score de la section (0-10)
+    """
+    if not job_preferences:
+        # Si pas de préférences, 0% pour cette section
+        return 0.0
+    
+    pref_points = 0
+    pref_max = 0
+    
+    # Champs obligatoires (contract_type legacy ou contract_types liste)
+    has_contract = bool(job_preferences.contract_type) or (
+        job_preferences.contract_types and len(job_preferences.contract_types) > 0
+    )
+    if has_contract:
+        pref_points += 2
+    pref_max += 2
+    
+    # desired_location ou preferred_locations (aligné dashboard / onboarding)
+    has_location = bool(job_preferences.desired_location) or bool(job_preferences.preferred_locations)
+    if has_location:
+        pref_points += 2
+    pref_max += 2
+    
+    if job_preferences.availability:
+        pref_points += 2
+    pref_max += 2
+    
+    # Accepter salary_expectations (ancien format) ou salary_min/salary_max (nouveau format)
+    if job_preferences.salary_expectations is not None:
+        pref_points += 2
         pref_max += 2
-        
-        if profile.job_preferences.availability:
-            pref_points += 2
+    elif (job_preferences.salary_min is not None or 
+          job_preferences.salary_max is not None):
+        # Si salary_min ou salary_max est défini, considérer comme complété
+        pref_points += 2
         pref_max += 2
-        
-        # Accepter salary_expectations (ancien format) ou salary_min/salary_max (nouveau format)
-        if profile.job_preferences.salary_expectations is not None:
-            pref_points += 2
-            pref_max += 2
-        elif (profile.job_preferences.salary_min is not None or 
-              profile.job_preferences.salary_max is not None):
-            # Si salary_min ou salary_max est défini, considérer comme complété
-            pref_points += 2
-            pref_max += 2
-        
-        # Champs optionnels (bonus)
-        if profile.job_preferences.desired_positions and len(profile.job_preferences.desired_positions) > 0:
-            pref_points += 1
-        pref_max += 1
-        
-        if profile.job_preferences.target_sectors and len(profile.job_preferences.target_sectors) > 0:
-            pref_points += 1
-        pref_max += 1
-        
-        if profile.job_preferences.mobility:
-            pref_points += 0.5
-        pref_max += 0.5
-        
-        # Calcul du pourcentage pour les préférences
-        if pref_max > 0:
-            pref_percentage = (pref_points / pref_max) * 10.0
-            total_percentage += pref_percentage
-            logger.debug(f"Préférences: {pref_points}/{pref_max} = {pref_percentage:.2f}%")
-    # Si pas de préférences, 0% pour cette section
-    
-    # Retourner le pourcentage total (max 100%)
-    final_percentage = min(round(total_percentage, 2), 100.0)
-    
-    # Calculer les pourcentages pour le logging (même si les sections sont à 0)
-    identity_pct = (identity_points / identity_max) * 20.0 if identity_max > 0 else 0.0
-    exp_pct = exp_score * 30.0
-    edu_pct = edu_score * 15.0
-    cv_pct = 25.0 if has_cv else 0.0
-    pref_pct = pref_percentage
-    
-    logger.info(f"Completion total calculé: {final_percentage}% (Identité: {identity_pct:.1f}%, Exp: {exp_pct:.1f}%, Form: {edu_pct:.1f}%, CV: {cv_pct:.1f}%, Préf: {pref_pct:.1f}%)")
+    
+    # Champs optionnels (bonus)
+    if job_preferences.desired_positions and len(job_preferences.desired_positions) > 0:
+        pref_points += 1
+    pref_max += 1
+    
+    if job_preferences.target_sectors and len(job_preferences.target_sectors) > 0:
+        pref_points += 1
+    pref_max += 1
+    
+    if job_preferences.mobility:
+        pref_points += 0.5
+    pref_max += 0.5
+    
+    pref_percentage = (pref_points / pref_max) * SECTION_WEIGHTS["preferences"]
+    logger.debug(f"Préférences: {pref_points}/{pref_max} = {pref_percentage:.2f}%")
+    return pref_percentage
+
+
+def calculate_section_scores(
+    profile: Profile,
+    has_cv: bool = False,
+    sections: Iterable[str] = COMPLETION_SECTIONS
+) -> Dict[str, float]:
+    """
+    Calcule les sous-scores des sections demandées
+    
+    Args:
+        profile: Le profil, avec les relations des sections demandées chargées
+        has_cv: True si un CV PDF a été uploadé
+        sections: Sections à évaluer (défaut : toutes)
+    
+    Returns:
+        Dict section -> sous-score pondéré
+    """
+    scorers = {
+        "identity": lambda: identity_score(profile),
+        "experiences": lambda: experiences_score(profile.experiences),
+        "educations": lambda: educations_score(profile.educations),
+        "cv": lambda: cv_score(has_cv),
+        "preferences": lambda: preferences_score(profile.job_preferences),
+    }
+    return {section: scorers[section]() for section in sections}
+
+
+def total_completion(scores: Dict[str, float]) -> float:
+    """
+    Pourcentage total à partir des sous-scores (section absente = 0)
+    
+    Returns:
+        float: Pourcentage de complétion (0-100)
+    """
+    total_percentage = 0.0
+    for section in COMPLETION_SECTIONS:
+        total_percentage += scores.get(section) or 0.0
+    return min(round(total_percentage, 2), 100.0)
+
+
+def calculate_completion_percentage(profile: Profile, has_cv: bool = False) -> float:
+    """
+    Calcule le pourcentage de complétion du profil candidat avec algorithme pondéré
+    
+    Algorithme complexe de complétion :
+    - Identité : 20%
+    - Expériences : 30%
+    - Formations : 15%
+    - CV PDF : 25%
+    - Préférences : 10%
+    
+    Total: 100%
+    
+    Args:
+        profile: Le profil à évaluer (avec ses relations chargées)
+        has_cv: True si un CV PDF a été uploadé (vérifié via service Document)
+    
+    Returns:
+        float: Pourcentage de complétion (0-100)
+    """
+    scores = calculate_section_scores(profile, has_cv)
+    final_percentage = total_completion(scores)
+    logger.info(
+        f"Completion total calculé: {final_percentage}% (Identité: {scores['identity']:.1f}%, "
+        f"Exp: {scores['experiences']:.1f}%, Form: {scores['educations']:.1f}%, "
+        f"CV: {scores['cv']:.1f}%, Préf: {scores['preferences']:.1f}%)"
+    )
     return final_percentage
 
 
@@ -306,67 +387,33 @@ async def check_cv_exists(profile_id: int) -> bool:
         profile_id: ID du profil
     
     Returns:
-        True si un CV PDF existe, False sinon
+        True si un CV PDF existe, False sinon (ou si le service ne répond pas)
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    try:
-        import httpx
-        import sys
-        import os
-        
-        # Ajouter le chemin du module shared au PYTHONPATH
-        shared_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-            "shared"
-        )
-        if shared_path not in sys.path:
-            sys.path.insert(0, shared_path)
-        
-        # Importer depuis /shared
-        import sys
-        import os
-        import importlib.util
-        shared_path = "/shared"
-        if shared_path not in sys.path:
-            sys.path.insert(0, shared_path)
-        internal_auth_path = os.path.join(shared_path, "internal_auth.py")
-        if os.path.exists(internal_auth_path):
-            spec = importlib.util.spec_from_file_location("shared.internal_auth", internal_auth_path)
-            if spec and spec.loader:
-                internal_auth_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(internal_auth_module)
-                get_service_token_header = internal_auth_module.get_service_token_header
-            else:
-                from shared.internal_auth import get_service_token_header
-        else:
-            from shared.internal_auth import get_service_token_header
-        from app.core.config import settings
-        
-        # Générer les headers avec le token de service
-        headers = get_service_token_header("candidate-service")
-        
-        # Appeler le service Document pour vérifier la présence d'un CV
-        document_url = f"{settings.DOCUMENT_SERVICE_URL}/api/v1/documents/candidate/{profile_id}"
-        logger.debug(f"Vérification CV pour profil {profile_id}: GET {document_url}")
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(document_url, headers=headers)
-            
-            if response.status_code == 200:
-                documents = response.json()
-                cv_documents = [doc for doc in documents if doc.get("document_type") == "CV"]
-                has_cv = len(cv_documents) > 0
-                logger.info(f"Vérification CV pour profil {profile_id}: {len(cv_documents)} CV trouvé(s), has_cv={has_cv}")
-                return has_cv
-            else:
-                logger.warning(f"Erreur lors de la vérification du CV pour profil {profile_id}: status_code={response.status_code}")
-                return False
-    except Exception as e:
-        # En cas d'erreur, on considère qu'il n'y a pas de CV
-        logger.warning(f"Erreur lors de la vérification du CV pour profil {profile_id}: {str(e)}", exc_info=True)
-        return False
-    
-    return False
+    return bool(await fetch_cv_presence(profile_id))
+
+
+async def fetch_cv_presence(profile_id: int) -> Optional[bool]:
+    """
+    Interroge le service Document sur la présence d'un CV PDF
+    
+    Repli du drapeau has_cv stocké sur le profil (tenu à jour par les événements
+    du Document Service) : à n'utiliser que si ce drapeau est inconnu.
+    
+    Args:
+        profile_id: ID du profil
+    
+    Returns:
+        True / False selon la réponse, None si le service n'a pas pu répondre
+        (le drapeau has_cv stocké ne doit pas être écrasé dans ce cas)
+    """
+    from app.infrastructure.document_client import fetch_document_stats
+    
+    stats = await fetch_document_stats([profile_id])
+    if stats is None:
+        return None
+    cv_count = (stats.get(profile_id) or {}).get("cv_count") or 0
+    logger.info(f"Vérification CV pour profil {profile_id}: {cv_count} CV trouvé(s), has_cv={cv_count > 0}")
+    return cv_count > 0
 
 
 def can_submit_profile(profile: Profile, has_cv: bool = False, min_completion: float = 80.0) -> tuple:
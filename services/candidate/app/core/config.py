@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     # Offres d'emploi : exiger profil complet pour postuler (effet Leurre). Seuil en % (ex: 80).
     REQUIRE_FULL_PROFILE_FOR_APPLY: bool = True
     PROFILE_COMPLETION_THRESHOLD: int = 80
+    # Liste admin des profils : total exact jusqu'à ce seuil, estimé au-delà (0 = toujours exact)
+    PROFILE_LIST_EXACT_COUNT_LIMIT: int = 10000
 
     # Database
     DB_HOST: str = "localhost"
@@ -53,6 +55,25 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
     REDIS_URL: str = ""
+    # Indexation par événements (Redis Stream consommé par le Search Service)
+    INDEXING_EVENTS_ENABLED: bool = False
+    INDEXING_STREAM_NAME: str = "search:indexing-events"
+    # Drapeau CV / nombre de documents tenus à jour par les événements du Document Service
+    DOCUMENT_EVENTS_ENABLED: bool = False
+    DOCUMENT_EVENTS_STREAM_NAME: str = "documents:events"
+    DOCUMENT_EVENTS_GROUP: str = "candidate-service"
+    DOCUMENT_EVENTS_BATCH_SIZE: int = 200
+    # Messages non acquittés repris (XAUTOCLAIM) par un process au bout de ce délai
+    DOCUMENT_EVENTS_CLAIM_IDLE_MS: int = 30000
+    # Réconciliation périodique avec le Document Service, par un seul process à la
+    # fois (verrou Redis) (0 : désactivée)
+    DOCUMENT_RECONCILE_INTERVAL_SECONDS: int = 3600
+    # Compteurs vues / clics des offres : tampon vidé en lot (redis : partagé entre
+    # process et conservé en cas de crash ; memory : par process, un crash perd au
+    # plus JOB_COUNTERS_FLUSH_INTERVAL_SECONDS d'incréments)
+    JOB_COUNTERS_BACKEND: str = "redis"
+    JOB_COUNTERS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    JOB_COUNTERS_REDIS_KEY: str = "job-counters:pending"
     
     # CORS
     CORS_ORIGINS: List[str] = Field(
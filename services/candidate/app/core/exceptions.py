@@ -43,3 +43,9 @@ class ProfileNotCompleteError(CandidateError):
     def __init__(self, message: str = "Le profil n'est pas assez complet pour être soumis."):
         super().__init__(message, status_code=status.HTTP_400_BAD_REQUEST)
 
+
+
+class InvalidCursorError(CandidateError):
+    """Curseur de pagination invalide"""
+    def __init__(self, message: str = "Curseur de pagination invalide"):
+        super().__init__(message, status_code=status.HTTP_400_BAD_REQUEST)
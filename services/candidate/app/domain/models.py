@@ -75,7 +75,12 @@ class Profile(SQLModel, table=True):
     # Statut et validation
     status: ProfileStatus = Field(default=ProfileStatus.DRAFT, index=True, description="Statut du profil")
     completion_percentage: Optional[float] = Field(default=0.0, ge=0, le=100, description="Pourcentage de complétion")
-    
+    completion_scores: Optional[dict] = Field(default=None, sa_column=Column(JSONType), description="Sous-scores de complétion par section (cache)")
+    has_cv: Optional[bool] = Field(default=None, description="Un CV PDF est présent dans le Document Service (None : inconnu)")
+    document_count: Optional[int] = Field(default=None, description="Nombre de documents dans le Document Service (None : inconnu)")
+    latest_cv_id: Optional[int] = Field(default=None, description="ID du dernier CV dans le Document Service")
+    documents_synced_at: Optional[datetime] = Field(default=None, description="Date de l'état des documents appliqué (événement ou réconciliation)")
+
     # Données admin (après validation)
     admin_score: Optional[float] = Field(default=None, ge=0, le=5, description="Score admin /5")
     admin_report: Optional[dict] = Field(default=None, sa_column=Column(JSONType), description="Rapport admin")
@@ -86,7 +86,12 @@ class ProfileResponse(ProfileBase):
 class PaginatedProfilesResponse(BaseModel):
     """Réponse paginée pour la liste des profils (admin)"""
     items: List[ProfileResponse]
-    total: int
+    # None en mode curseur (total donné par la première page)
+    total: Optional[int] = None
+    # Total estimé par le planificateur au-delà de PROFILE_LIST_EXACT_COUNT_LIMIT
+    total_is_estimate: bool = False
+    # Curseur de la page suivante (None sur la dernière page)
+    next_cursor: Optional[str] = None
 
 
 class ProfileDetailResponse(ProfileResponse):
@@ -110,6 +115,12 @@ class ProfileDetailResponse(ProfileResponse):
     job_preferences: Optional[Dict[str, Any]] = None
 
 
+class ValidatedProfilesPage(BaseModel):
+    """Page de profils validés pour la réindexation (pagination keyset sur l'ID)"""
+    items: List[ProfileDetailResponse]
+    next_after_id: Optional[int] = None
+
+
 # ============================================
 # Experience Schemas
 # ============================================
@@ -0,0 +1,104 @@
+"""
+Synchronisation des sous-collections d'un profil (PATCH /profiles/me)
+
+Chaque étape de l'onboarding renvoie la liste complète d'une collection
+(expériences, formations, certifications, compétences). Au lieu de tout
+supprimer puis tout recréer ligne par ligne (un commit par ligne), la liste
+reçue est comparée aux lignes existantes par clé naturelle :
+- clé absente en base : INSERT (un seul INSERT multi-lignes par collection) ;
+- clé présente, valeurs différentes : UPDATE par clé primaire (executemany) ;
+- clé présente, valeurs identiques : rien ;
+- ligne existante absente de la liste : DELETE ... WHERE id IN (...).
+
+Aucun commit ici : l'appelant valide toutes les collections en une transaction.
+"""
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from app.domain.models import Certification, Education, Experience, Skill
+
+# Collection -> (modèle, champs de la clé naturelle)
+COLLECTIONS: Dict[str, Tuple[Type[SQLModel], Tuple[str, ...]]] = {
+    "experiences": (Experience, ("company_name", "position", "start_date")),
+    "educations": (Education, ("diploma", "institution", "graduation_year")),
+    "certifications": (Certification, ("title", "issuer", "year")),
+    "skills": (Skill, ("skill_type", "name")),
+}
+
+# Colonnes gérées par la synchronisation, jamais comparées
+_MANAGED_COLUMNS = {"id", "profile_id", "created_at", "updated_at"}
+
+
+def _normalize(value: Any) -> Any:
+    """Valeur comparable : enum -> valeur, datetime -> UTC naïf, texte sans casse ni espaces"""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        value = value.strip()
+    return value
+
+
+def natural_key(item: Dict[str, Any], key_fields: Iterable[str]) -> Tuple[Any, ...]:
+    """Clé naturelle d'un élément (insensible à la casse pour le texte)"""
+    key = []
+    for field in key_fields:
+        value = _normalize(item.get(field))
+        key.append(value.lower() if isinstance(value, str) else value)
+    return tuple(key)
+
+
+async def sync_collection(
+    session: AsyncSession,
+    collection: str,
+    profile_id: int,
+    items: List[Dict[str, Any]],
+) -> Dict[str, int]:
+    """
+    Aligne les lignes d'une collection du profil sur items (sans commit)
+
+    Returns:
+        Nombre de lignes insérées, mises à jour, supprimées et inchangées
+    """
+    model, key_fields = COLLECTIONS[collection]
+    table = model.__table__
+    columns = [column.name for column in table.columns if column.name not in _MANAGED_COLUMNS]
+
+    # Lecture en colonnes (pas d'entités) : rien de périmé dans l'identity map après les écritures
+    rows = (await session.execute(select(table).where(table.c.profile_id == profile_id))).mappings().all()
+    existing: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        existing.setdefault(natural_key(row, key_fields), []).append(dict(row))
+
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    unchanged = 0
+    for item in items:
+        values = {column: item.get(column) for column in columns}
+        matches = existing.get(natural_key(values, key_fields))
+        if not matches:
+            inserts.append({**values, "profile_id": profile_id, "created_at": now, "updated_at": None})
+            continue
+        row = matches.pop(0)
+        if any(_normalize(row[column]) != _normalize(values[column]) for column in columns):
+            updates.append({**values, "id": row["id"], "updated_at": now})
+        else:
+            unchanged += 1
+    # Lignes sans correspondance (y compris doublons en base) : supprimées
+    deleted_ids = [row["id"] for matches in existing.values() for row in matches]
+
+    if deleted_ids:
+        await session.execute(
+            delete(model).where(model.id.in_(deleted_ids)).execution_options(synchronize_session=False)
+        )
+    if updates:
+        await session.execute(update(model), updates)
+    if inserts:
+        await session.execute(insert(model), inserts)
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deleted_ids), "unchanged": unchanged}
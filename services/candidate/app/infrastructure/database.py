@@ -77,6 +77,50 @@ async def migrate_add_validation_requested_at(conn):
     await conn.run_sync(check_and_add)
 
 
+async def migrate_add_profile_completion_cache(conn):
+    """Migration: Ajoute completion_scores et has_cv à profiles si elles n'existent pas"""
+    from sqlalchemy import inspect
+
+    def check_and_add(sync_conn):
+        inspector = inspect(sync_conn)
+        try:
+            columns = [col['name'] for col in inspector.get_columns('profiles')]
+            if 'completion_scores' not in columns:
+                sync_conn.execute(text("ALTER TABLE profiles ADD COLUMN completion_scores JSON"))
+                print("✅ Migration: Colonne completion_scores ajoutée à profiles")
+            if 'has_cv' not in columns:
+                sync_conn.execute(text("ALTER TABLE profiles ADD COLUMN has_cv BOOLEAN"))
+                print("✅ Migration: Colonne has_cv ajoutée à profiles")
+        except Exception as e:
+            if "does not exist" not in str(e).lower() and "duplicate column" not in str(e).lower():
+                print(f"⚠️  Migration profiles completion cache: {e}")
+
+    await conn.run_sync(check_and_add)
+
+
+async def migrate_add_profile_document_stats(conn):
+    """Migration: Ajoute document_count, latest_cv_id et documents_synced_at à profiles"""
+    from sqlalchemy import inspect
+
+    def check_and_add(sync_conn):
+        inspector = inspect(sync_conn)
+        try:
+            columns = [col['name'] for col in inspector.get_columns('profiles')]
+            for name, sql_type in (
+                ("document_count", "INTEGER"),
+                ("latest_cv_id", "INTEGER"),
+                ("documents_synced_at", "TIMESTAMP"),
+            ):
+                if name not in columns:
+                    sync_conn.execute(text(f"ALTER TABLE profiles ADD COLUMN {name} {sql_type}"))
+                    print(f"✅ Migration: Colonne {name} ajoutée à profiles")
+        except Exception as e:
+            if "does not exist" not in str(e).lower() and "duplicate column" not in str(e).lower():
+                print(f"⚠️  Migration profiles document stats: {e}")
+
+    await conn.run_sync(check_and_add)
+
+
 async def init_db():
     """Initialise la base de données (création des tables)"""
     async with engine.begin() as conn:
@@ -87,3 +131,5 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
         await migrate_add_job_offer_company_id(conn)
         await migrate_add_validation_requested_at(conn)
+        await migrate_add_profile_completion_cache(conn)
+        await migrate_add_profile_document_stats(conn)
@@ -0,0 +1,58 @@
+"""
+Client pour lire l'état des documents des candidats dans le Service Document
+
+Repli de l'état dénormalisé sur Profile (has_cv, document_count, latest_cv_id),
+normalement tenu à jour par les événements du Document Service : utilisé quand
+cet état est inconnu et par la réconciliation périodique.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.infrastructure.http_client import service_client
+from app.infrastructure.internal_auth import get_service_token_header
+
+logger = logging.getLogger(__name__)
+
+# Limite de l'endpoint document-stats du Document Service
+MAX_IDS_PER_REQUEST = 500
+
+
+async def fetch_document_stats(candidate_ids: Iterable[int]) -> Optional[Dict[int, Dict[str, Any]]]:
+    """
+    Nombre de documents, nombre de CV et dernier CV de chaque candidat
+
+    Args:
+        candidate_ids: IDs des profils (au plus MAX_IDS_PER_REQUEST)
+
+    Returns:
+        {candidate_id: {"document_count", "cv_count", "latest_cv_id", "observed_at"}},
+        ou None si le Service Document n'a pas pu répondre. observed_at : instant de
+        lecture sur l'horloge du Service Document (None s'il ne le fournit pas)
+    """
+    ids = sorted(set(candidate_ids))
+    if not ids:
+        return {}
+    url = f"{settings.DOCUMENT_SERVICE_URL}/api/v1/admin/candidates/document-stats"
+    try:
+        async with service_client(settings.DOCUMENT_SERVICE_URL, timeout=5.0) as client:
+            response = await client.get(
+                url,
+                params={"candidate_ids": ",".join(str(candidate_id) for candidate_id in ids)},
+                headers=get_service_token_header("candidate-service"),
+            )
+        if response.status_code != 200:
+            logger.warning(f"Document stats unavailable for {len(ids)} profile(s): status_code={response.status_code}")
+            return None
+        result = {}
+        for candidate_id, stats in response.json().items():
+            observed_at = stats.get("observed_at")
+            result[int(candidate_id)] = {
+                **stats,
+                "observed_at": datetime.fromisoformat(observed_at) if observed_at else None,
+            }
+        return result
+    except Exception as e:
+        logger.warning(f"Document stats unavailable for {len(ids)} profile(s): {str(e)}")
+        return None
@@ -0,0 +1,339 @@
+"""
+État des documents des candidats tenu à jour par les événements du Document Service
+
+Le Document Service publie, après chaque upload ou suppression, l'état des
+documents du candidat dans DOCUMENT_EVENTS_STREAM_NAME (voir
+shared/document_events.py). Ce consommateur (consumer group, un consommateur par
+process) l'applique sur Profile : has_cv, document_count, latest_cv_id, puis la
+section CV de la complétion si le drapeau change.
+
+- un lot = une transaction : les événements d'un même candidat sont réduits au
+  plus récent (occurred_at), un état plus ancien que celui déjà appliqué est
+  ignoré (dates de l'horloge du Document Service uniquement) ;
+- un lot en échec n'est pas acquitté : il est repris (XAUTOCLAIM) après
+  DOCUMENT_EVENTS_CLAIM_IDLE_MS par n'importe quel consommateur du groupe, même
+  si le sien a disparu (redéploiement), puis appliqué candidat par candidat ;
+- un message illisible, ou un candidat toujours en échec, est acquitté et
+  journalisé : la réconciliation périodique corrige l'écart.
+
+Réconciliation : toutes les DOCUMENT_RECONCILE_INTERVAL_SECONDS, un seul process
+(verrou Redis expirant avec l'intervalle) parcourt les profils par pages
+(pagination keyset) et les compare à l'endpoint document-stats du Document
+Service (une requête par page) ; seuls les profils divergents sont modifiés.
+Aussi lançable à la main : scripts/reconcile_documents.py.
+
+Sans DOCUMENT_EVENTS_ENABLED, rien ne démarre : has_cv est relu en HTTP.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.document_client import MAX_IDS_PER_REQUEST, fetch_document_stats
+from app.infrastructure.repositories import ProfileRepository
+
+logger = logging.getLogger(__name__)
+
+# Même résolution du module shared que internal_auth.py
+_this_dir = os.path.dirname(os.path.abspath(__file__))
+_services_dir = os.path.abspath(os.path.join(_this_dir, "..", "..", ".."))
+shared_path = "/shared" if os.path.exists("/shared") else os.path.join(_services_dir, "shared")
+document_events_path = os.path.join(shared_path, "document_events.py")
+if os.path.exists(document_events_path):
+    spec = importlib.util.spec_from_file_location("shared.document_events", document_events_path)
+    document_events_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(document_events_module)
+    parse_documents_changed = document_events_module.parse_documents_changed
+else:
+    from shared.document_events import parse_documents_changed
+
+# Pause après une erreur (Redis ou base indisponible)
+RETRY_DELAY_SECONDS = 2.0
+
+
+async def reconcile_document_stats(page_size: int = 200) -> Dict[str, int]:
+    """
+    Aligne has_cv, document_count et latest_cv_id de tous les profils sur le Document Service
+
+    Returns:
+        Profils vérifiés, corrigés, et pages non vérifiées (Document Service indisponible)
+    """
+    page_size = min(page_size, MAX_IDS_PER_REQUEST)
+    report = {"checked": 0, "fixed": 0, "failed_pages": 0}
+    after_id = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = await ProfileRepository.list_document_stats_after(session, after_id, page_size)
+            if not rows:
+                break
+            after_id = rows[-1].id
+            stats = await fetch_document_stats([row.id for row in rows])
+            if stats is None:
+                report["failed_pages"] += 1
+                continue
+            for row in rows:
+                expected = stats.get(row.id) or {}
+                current = (row.has_cv, row.document_count, row.latest_cv_id)
+                wanted = (
+                    (expected.get("cv_count") or 0) > 0,
+                    expected.get("document_count") or 0,
+                    expected.get("latest_cv_id"),
+                )
+                report["checked"] += 1
+                if current != wanted:
+                    # Date de lecture du Document Service : un événement plus récent déjà appliqué l'emporte
+                    await ProfileRepository.apply_document_stats(session, row.id, expected, expected.get("observed_at"))
+                    report["fixed"] += 1
+            await session.commit()
+    if report["fixed"]:
+        logger.info(f"Document stats reconciliation: {report}")
+    return report
+
+
+class DocumentEventsConsumer:
+    """Consommateur du stream des documents modifiés (un par process du Candidate Service)"""
+
+    def __init__(
+        self,
+        stream: str,
+        group: str,
+        consumer: str = "",
+        batch_size: int = 200,
+        block_ms: int = 1000,
+        claim_idle_ms: int = 30000,
+        reconcile_interval_seconds: int = 3600,
+    ):
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or socket.gethostname()
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        # Verrou partagé par les process : une réconciliation par intervalle
+        self.reconcile_lock_key = f"{stream}:{group}:reconcile-lock"
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+        self._group_ready = False
+        self._next_reconcile_at: Optional[float] = None
+        # Métriques
+        self.batches = 0
+        self.events = 0
+        self.applied = 0
+        self.rejected = 0
+        self.failed = 0
+        self.errors = 0
+        self.last_event_delay_ms: Optional[float] = None
+        self.last_reconcile: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.DOCUMENT_EVENTS_ENABLED and bool(settings.REDIS_URL)
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    async def ensure_group(self) -> None:
+        """Crée le consumer group (et le stream) s'il n'existe pas"""
+        from redis.exceptions import ResponseError
+
+        try:
+            await self._get_redis().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _read_batch(self) -> Tuple[List[Tuple[str, Dict[str, str]]], bool]:
+        """
+        Messages en attente depuis claim_idle_ms (lot en échec, consommateur arrêté
+        ou renommé) en priorité, puis les nouveaux
+
+        Returns:
+            (messages, True s'il s'agit de messages repris)
+        """
+        client = self._get_redis()
+        claimed = await client.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size,
+        )
+        # redis-py retourne [next_id, messages] (+ IDs supprimés depuis Redis 7)
+        if claimed[1]:
+            return [message for message in claimed[1] if message[1]], True
+        response = await client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=self.batch_size, block=self.block_ms,
+        )
+        return (response[0][1] if response else []), False
+
+    async def _ack(self, message_ids: List[str]) -> None:
+        if not message_ids:
+            return
+        async with self._get_redis().pipeline(transaction=False) as pipe:
+            pipe.xack(self.stream, self.group, *message_ids)
+            # Les messages acquittés ne servent plus : le stream ne garde que l'attente
+            pipe.xdel(self.stream, *message_ids)
+            await pipe.execute()
+
+    async def _apply(self, events: List[Dict[str, Any]]) -> None:
+        """Applique les états en une transaction"""
+        async with AsyncSessionLocal() as session:
+            for event in events:
+                await ProfileRepository.apply_document_stats(
+                    session, event["candidate_id"], event, event["occurred_at"]
+                )
+            await session.commit()
+
+    async def process_batch(self, messages: List[Tuple[str, Dict[str, str]]], retried: bool = False) -> int:
+        """
+        Applique un lot de messages
+
+        Returns:
+            Nombre de candidats mis à jour
+        """
+        if not messages:
+            return 0
+        self.batches += 1
+        self.events += len(messages)
+
+        latest: Dict[int, Dict[str, Any]] = {}
+        for message_id, fields in messages:
+            try:
+                event = parse_documents_changed(fields)
+            except (KeyError, TypeError, ValueError) as e:
+                self.rejected += 1
+                logger.warning(f"Rejected document event {message_id}: {str(e)}")
+                continue
+            current = latest.get(event["candidate_id"])
+            if current is None or event["occurred_at"] >= current["occurred_at"]:
+                latest[event["candidate_id"]] = event
+        events = list(latest.values())
+
+        if not retried:
+            # En échec : non acquitté, repris après claim_idle_ms candidat par candidat
+            await self._apply(events)
+        else:
+            for event in events:
+                try:
+                    await self._apply([event])
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Document event for profile {event['candidate_id']} dropped: {str(e)}")
+
+        await self._ack([message_id for message_id, _ in messages])
+        self.applied += len(events)
+        if events:
+            oldest = min(event["occurred_at"] for event in events)
+            self.last_event_delay_ms = round((datetime.utcnow() - oldest).total_seconds() * 1000, 1)
+        return len(events)
+
+    async def run_once(self) -> int:
+        """Lit et applique un lot (attend au plus block_ms s'il n'y a rien)"""
+        if not self._group_ready:
+            await self.ensure_group()
+            self._group_ready = True
+        messages, retried = await self._read_batch()
+        return await self.process_batch(messages, retried)
+
+    async def reconcile_if_due(self) -> None:
+        if self.reconcile_interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        if self._next_reconcile_at is None:
+            # Première réconciliation après un intervalle : pas de rafale au démarrage
+            self._next_reconcile_at = now + self.reconcile_interval_seconds
+        if now < self._next_reconcile_at:
+            return
+        self._next_reconcile_at = now + self.reconcile_interval_seconds
+        # Verrou non libéré : il expire avec l'intervalle, les autres process passent leur tour
+        acquired = await self._get_redis().set(
+            self.reconcile_lock_key, self.consumer, nx=True, ex=self.reconcile_interval_seconds
+        )
+        if not acquired:
+            return
+        report = await reconcile_document_stats(self.batch_size)
+        self.last_reconcile = {**report, "at": datetime.utcnow().isoformat()}
+
+    async def start(self) -> None:
+        """Démarre la consommation en tâche de fond (sans effet si désactivée)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la consommation (les messages non acquittés seront relus)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+                await self.reconcile_if_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self._group_ready = False
+                logger.warning(f"Document events consumption failed: {str(e)}")
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Débit, échecs, retard du consumer group et dernière réconciliation"""
+        metrics: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "stream": self.stream,
+            "group": self.group,
+            "consumer": self.consumer,
+            "batches": self.batches,
+            "events": self.events,
+            "applied": self.applied,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "errors": self.errors,
+            # Délai entre la publication de l'événement et son application
+            "last_event_delay_ms": self.last_event_delay_ms,
+            "last_reconcile": self.last_reconcile,
+        }
+        if not self.enabled:
+            return metrics
+
+        try:
+            client = self._get_redis()
+            metrics["stream_length"] = await client.xlen(self.stream)
+            for group in await client.xinfo_groups(self.stream):
+                if group.get("name") == self.group:
+                    # lag : messages pas encore lus par le groupe (Redis >= 7)
+                    metrics["lag"] = group.get("lag")
+                    metrics["pending"] = group.get("pending")
+                    break
+        except Exception as e:
+            metrics["redis_error"] = str(e)
+        return metrics
+
+
+# Instance globale
+document_events_consumer = DocumentEventsConsumer(
+    stream=settings.DOCUMENT_EVENTS_STREAM_NAME,
+    group=settings.DOCUMENT_EVENTS_GROUP,
+    batch_size=settings.DOCUMENT_EVENTS_BATCH_SIZE,
+    claim_idle_ms=settings.DOCUMENT_EVENTS_CLAIM_IDLE_MS,
+    reconcile_interval_seconds=settings.DOCUMENT_RECONCILE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,64 @@
+"""
+Publication des profils modifiés vers l'indexation du Search Service (Redis Stream)
+
+Sans INDEXING_EVENTS_ENABLED, ou si Redis est indisponible, publish_profile_changed
+retourne False : l'appelant garde l'appel HTTP au Search Service.
+"""
+import importlib.util
+import logging
+import os
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Même résolution du module shared que internal_auth.py
+_this_dir = os.path.dirname(os.path.abspath(__file__))
+_services_dir = os.path.abspath(os.path.join(_this_dir, "..", "..", ".."))
+shared_path = "/shared" if os.path.exists("/shared") else os.path.join(_services_dir, "shared")
+indexing_events_path = os.path.join(shared_path, "indexing_events.py")
+if os.path.exists(indexing_events_path):
+    spec = importlib.util.spec_from_file_location("shared.indexing_events", indexing_events_path)
+    indexing_events_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(indexing_events_module)
+    _publish = indexing_events_module.publish_profile_changed
+else:
+    from shared.indexing_events import publish_profile_changed as _publish
+
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis.asyncio as redis
+
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def publish_profile_changed(candidate_id: int, reason: str = "updated") -> bool:
+    """
+    Demande la (ré)indexation d'un profil, ou son retrait s'il n'est plus validé
+
+    Returns:
+        bool: True si l'événement est publié
+    """
+    if not settings.INDEXING_EVENTS_ENABLED:
+        return False
+    try:
+        client = _get_redis()
+    except Exception as e:
+        logger.warning("Redis unavailable for indexing events: %s", e)
+        return False
+    return await _publish(
+        client, candidate_id, "candidate-service", reason, stream=settings.INDEXING_STREAM_NAME
+    )
+
+
+async def close_indexing_events() -> None:
+    """Ferme la connexion Redis (arrêt du service)"""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
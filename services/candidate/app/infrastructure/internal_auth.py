@@ -26,10 +26,11 @@ if os.path.exists(internal_auth_path):
         internal_auth_module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(internal_auth_module)
         verify_service_token = internal_auth_module.verify_service_token
+        get_service_token_header = internal_auth_module.get_service_token_header
     else:
-        from shared.internal_auth import verify_service_token
+        from shared.internal_auth import verify_service_token, get_service_token_header
 else:
-    from shared.internal_auth import verify_service_token
+    from shared.internal_auth import verify_service_token, get_service_token_header
 
 
 async def verify_internal_token(
@@ -0,0 +1,261 @@
+"""
+Compteurs de vues et de clics des offres, tamponnés puis appliqués en lot
+
+Chaque consultation publique d'une offre faisait un UPDATE + commit sur la ligne
+de l'offre : les offres populaires devenaient une ligne chaude de job_offers.
+Les incréments sont désormais accumulés puis appliqués toutes les
+JOB_COUNTERS_FLUSH_INTERVAL_SECONDS par un seul UPDATE groupé (une transaction) :
+
+- JOB_COUNTERS_BACKEND=redis (défaut, REDIS_URL étant toujours résolue) :
+  HINCRBY dans un hash partagé par les process ; le vidage renomme le hash
+  (RENAME atomique) sous un verrou, l'applique puis le supprime. Un vidage
+  interrompu (crash, base indisponible) est repris tel quel au suivant. Si Redis
+  ne répond pas, l'incrément est gardé en mémoire (voir ci-dessous) ;
+- JOB_COUNTERS_BACKEND=memory : tampon du process, vidé aussi à l'arrêt.
+
+Fenêtre de perte du tampon mémoire (backend memory, ou repli Redis) : un arrêt
+propre ne perd rien (vidage final), un crash ou un arrêt forcé perd au plus les
+incréments d'un intervalle ; un vidage en échec les garde pour le suivant.
+
+Un crash entre le commit et la suppression du hash renommé peut appliquer un lot
+deux fois : acceptable pour des métriques d'audience.
+Les totaux affichés (stats admin / entreprise) ont au plus un intervalle de retard.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.repositories import JobOfferRepository
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNT = "view_count"
+REGISTER_CLICK_COUNT = "register_click_count"
+COUNTERS = (VIEW_COUNT, REGISTER_CLICK_COUNT)
+
+# Durée du verrou de vidage (Redis) : un vidage plus long peut être doublé
+FLUSH_LOCK_TTL_MS = 30000
+
+# Script de libération du verrou : seulement s'il est encore le nôtre
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def _field(job_id: int, counter: str) -> str:
+    return f"{job_id}:{counter}"
+
+
+def _parse_field(field: str) -> Tuple[int, str]:
+    job_id, counter = field.split(":", 1)
+    if counter not in COUNTERS:
+        raise ValueError(f"Unknown counter {counter}")
+    return int(job_id), counter
+
+
+def _merge(increments: Dict[int, Dict[str, int]], job_id: int, counter: str, value: int) -> None:
+    counts = increments.setdefault(job_id, {})
+    counts[counter] = counts.get(counter, 0) + value
+
+
+class JobCounterBuffer:
+    """Tampon des compteurs d'offres (une instance par process)"""
+
+    def __init__(self, backend: str = "redis", redis_key: str = "job-counters:pending", flush_interval_seconds: float = 5.0):
+        self.backend = backend
+        self.redis_key = redis_key
+        self.flushing_key = f"{redis_key}:flushing"
+        self.lock_key = f"{redis_key}:lock"
+        self.flush_interval_seconds = flush_interval_seconds
+        # {(job_id, counter): n} : backend memory, ou repli si Redis ne répond pas
+        self._pending: Dict[Tuple[int, str], int] = {}
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+        # Métriques
+        self.increments = 0
+        self.redis_fallbacks = 0
+        self.flushes = 0
+        self.flushed_jobs = 0
+        self.flushed_increments = 0
+        self.errors = 0
+        self.last_flush_at: Optional[str] = None
+        self.last_flush_ms: Optional[float] = None
+
+    @property
+    def uses_redis(self) -> bool:
+        return self.backend == "redis" and bool(settings.REDIS_URL)
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    async def increment(self, job_id: int, counter: str) -> int:
+        """
+        Ajoute 1 au compteur d'une offre
+
+        Returns:
+            Incréments de ce compteur en attente (pas encore appliqués en base)
+        """
+        self.increments += 1
+        if self.uses_redis:
+            try:
+                return int(await self._get_redis().hincrby(self.redis_key, _field(job_id, counter), 1))
+            except Exception as e:
+                self.redis_fallbacks += 1
+                logger.warning(f"Job counter kept in memory (Redis unavailable): {str(e)}")
+        key = (job_id, counter)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        return self._pending[key]
+
+    async def _apply(self, increments: Dict[int, Dict[str, int]]) -> None:
+        async with AsyncSessionLocal() as session:
+            await JobOfferRepository.apply_counter_increments(session, increments)
+            await session.commit()
+
+    async def _flush_memory(self) -> Dict[int, Dict[str, int]]:
+        if not self._pending:
+            return {}
+        pending, self._pending = self._pending, {}
+        increments: Dict[int, Dict[str, int]] = {}
+        for (job_id, counter), value in pending.items():
+            _merge(increments, job_id, counter, value)
+        try:
+            await self._apply(increments)
+        except Exception:
+            # Remis dans le tampon (avec les incréments arrivés entre-temps)
+            for key, value in pending.items():
+                self._pending[key] = self._pending.get(key, 0) + value
+            raise
+        return increments
+
+    async def _flush_redis(self) -> Dict[int, Dict[str, int]]:
+        from redis.exceptions import ResponseError
+
+        client = self._get_redis()
+        token = uuid.uuid4().hex
+        if not await client.set(self.lock_key, token, nx=True, px=FLUSH_LOCK_TTL_MS):
+            # Un autre process vide le tampon
+            return {}
+        try:
+            # Un hash renommé encore présent est un vidage interrompu : le reprendre d'abord
+            if not await client.exists(self.flushing_key):
+                try:
+                    await client.rename(self.redis_key, self.flushing_key)
+                except ResponseError:
+                    # Hash absent : rien en attente
+                    return {}
+            increments: Dict[int, Dict[str, int]] = {}
+            for field, value in (await client.hgetall(self.flushing_key)).items():
+                try:
+                    job_id, counter = _parse_field(field)
+                    _merge(increments, job_id, counter, int(value))
+                except ValueError:
+                    logger.warning(f"Ignored job counter field {field}")
+            await self._apply(increments)
+            await client.delete(self.flushing_key)
+            return increments
+        finally:
+            await client.eval(_RELEASE_LOCK_SCRIPT, 1, self.lock_key, token)
+
+    async def flush(self) -> int:
+        """
+        Applique les incréments en attente
+
+        Returns:
+            Nombre d'offres mises à jour
+        """
+        started = time.perf_counter()
+        # Le tampon mémoire (repli) d'abord : il ne dépend pas de Redis
+        applied = await self._flush_memory()
+        if self.uses_redis:
+            for job_id, counts in (await self._flush_redis()).items():
+                for counter, value in counts.items():
+                    _merge(applied, job_id, counter, value)
+        if applied:
+            self.flushes += 1
+            self.flushed_jobs += len(applied)
+            self.flushed_increments += sum(sum(counts.values()) for counts in applied.values())
+            self.last_flush_at = datetime.utcnow().isoformat()
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 1)
+        return len(applied)
+
+    async def start(self) -> None:
+        """Démarre le vidage périodique en tâche de fond"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête le vidage périodique puis vide le tampon une dernière fois"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Final job counters flush failed: {str(e)}")
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Job counters flush failed: {str(e)}")
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Incréments en attente (backlog), débit et durée des vidages"""
+        metrics: Dict[str, Any] = {
+            "backend": "redis" if self.uses_redis else "memory",
+            "running": self._task is not None and not self._task.done(),
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "increments": self.increments,
+            "redis_fallbacks": self.redis_fallbacks,
+            "flushes": self.flushes,
+            "flushed_jobs": self.flushed_jobs,
+            "flushed_increments": self.flushed_increments,
+            "errors": self.errors,
+            "last_flush_at": self.last_flush_at,
+            "last_flush_ms": self.last_flush_ms,
+            "pending_memory_increments": sum(self._pending.values()),
+        }
+        if not self.uses_redis:
+            return metrics
+
+        try:
+            client = self._get_redis()
+            metrics["pending_redis_fields"] = await client.hlen(self.redis_key)
+            metrics["pending_redis_increments"] = sum(int(v) for v in await client.hvals(self.redis_key))
+            # Vidage en cours ou interrompu (repris au prochain tour)
+            metrics["flushing_redis_increments"] = sum(int(v) for v in await client.hvals(self.flushing_key))
+        except Exception as e:
+            metrics["redis_error"] = str(e)
+        return metrics
+
+
+# Instance globale
+job_counters = JobCounterBuffer(
+    backend=settings.JOB_COUNTERS_BACKEND,
+    redis_key=settings.JOB_COUNTERS_REDIS_KEY,
+    flush_interval_seconds=settings.JOB_COUNTERS_FLUSH_INTERVAL_SECONDS,
+)
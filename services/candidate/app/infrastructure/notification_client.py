@@ -1,7 +1,6 @@
 """
 Client pour appeler le Service Notification
 """
-import httpx
 from typing import Optional
 import sys
 import os
@@ -44,6 +43,7 @@ if get_service_token_header is None:
     )
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -68,7 +68,7 @@ async def send_candidate_profile_created_notification(
             "dashboard_url": dashboard_url
         }
         logger.info(f"Sending profile created notification to candidate {candidate_email}")
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_candidate_profile_created",
                 json=payload,
@@ -102,7 +102,7 @@ async def send_admin_validation_request_notification(
             "profile_url": profile_url
         }
         logger.info(f"Sending admin validation request notification for candidate {candidate_email}")
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_admin_validation_request",
                 json=payload,
@@ -146,7 +146,7 @@ async def send_candidate_welcome_notification(
         
         logger.info(f"Sending welcome notification to candidate {candidate_email}")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_candidate_welcome",
                 json=payload,
@@ -0,0 +1,203 @@
+"""
+Liste admin des profils : pagination keyset, recherche indexée, total estimé
+
+`count(*)` + OFFSET/LIMIT + `ilike '%q%'` sur quatre colonnes parcourt toute la
+table à chaque page. Ici :
+- tri stable (submitted_at DESC NULLS FIRST, created_at DESC NULLS FIRST, id DESC),
+  servi par les index partiels ix_profiles_listing / ix_profiles_status_listing ;
+- la page suivante reprend après le dernier profil (curseur opaque) ; le mode
+  page/size (OFFSET) reste disponible tant qu'aucun curseur n'est passé ;
+- q porte sur une seule expression (prénom, nom, email, titre) indexée en GIN
+  pg_trgm (ix_profiles_search_trgm) : SEARCH_DOCUMENT_SQL doit rester identique à
+  l'expression de l'index pour que le planificateur l'utilise ;
+- le total est exact jusqu'à PROFILE_LIST_EXACT_COUNT_LIMIT, puis estimé par le
+  planificateur (PostgreSQL) : total_is_estimate l'indique.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, literal_column, or_, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCursorError
+from app.domain.models import Profile, ProfileStatus
+
+# Expression indexée (migration Alembic add_profile_listing_indexes, index créés en CONCURRENTLY)
+SEARCH_DOCUMENT_SQL = (
+    "(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(profile_title, ''))"
+)
+
+# Colonnes du tri, toutes DESC NULLS FIRST ; id départage
+SORT_COLUMNS = (Profile.submitted_at, Profile.created_at)
+
+
+# Caractère d'échappement de LIKE : "/" s'écrit à l'identique dans tous les dialectes
+# (un antislash dépend de standard_conforming_strings en PostgreSQL)
+LIKE_ESCAPE = "/"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def search_filter(q: str):
+    """Sous-chaîne de q dans prénom, nom, email ou titre (insensible à la casse)"""
+    # Paramètre nommé : le nom dérivé de l'expression n'est pas un identifiant (voir explain_statement)
+    pattern = bindparam("search_pattern", f"%{_escape_like(q)}%")
+    return literal_column(SEARCH_DOCUMENT_SQL).ilike(pattern, escape=LIKE_ESCAPE)
+
+
+def _filters_fingerprint(status: Optional[ProfileStatus], q: Optional[str]) -> str:
+    payload = json.dumps([status.value if status else None, q or None])
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def encode_cursor(profile: Profile, status: Optional[ProfileStatus], q: Optional[str]) -> str:
+    """Curseur opaque : valeurs de tri du dernier profil de la page et empreinte des filtres"""
+    payload = {
+        "after": [
+            profile.submitted_at.isoformat() if profile.submitted_at else None,
+            profile.created_at.isoformat() if profile.created_at else None,
+            profile.id,
+        ],
+        "filters": _filters_fingerprint(status, q),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, status: Optional[ProfileStatus], q: Optional[str]) -> Tuple[Any, ...]:
+    """
+    Décode un curseur reçu du client
+
+    Raises:
+        InvalidCursorError: Curseur illisible ou émis pour d'autres filtres
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        submitted_at, created_at, profile_id = payload["after"]
+        after = (
+            datetime.fromisoformat(submitted_at) if submitted_at else None,
+            datetime.fromisoformat(created_at) if created_at else None,
+            int(profile_id),
+        )
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError()
+    if payload.get("filters") != _filters_fingerprint(status, q):
+        raise InvalidCursorError("Le curseur ne correspond pas aux filtres de la liste")
+    return after
+
+
+def _after(values: Tuple[Any, ...], columns=SORT_COLUMNS):
+    """Profils situés après values dans l'ordre DESC NULLS FIRST (colonnes puis id)"""
+    if not columns:
+        return Profile.id < values[0]
+    column, value = columns[0], values[0]
+    if value is None:
+        strictly_after, tie = column.isnot(None), column.is_(None)
+    else:
+        # Une valeur NULL est avant toute valeur non NULL : exclue par la comparaison
+        strictly_after, tie = column < value, column == value
+    return or_(strictly_after, and_(tie, _after(values[1:], columns[1:])))
+
+
+def keyset_filter(after: Tuple[Any, ...]):
+    """Condition de reprise après un curseur, bornée sur la première colonne pour l'index"""
+    condition = _after(after)
+    if after[0] is not None:
+        condition = and_(Profile.submitted_at <= after[0], condition)
+    return condition
+
+
+def explain_statement(query):
+    """
+    EXPLAIN (FORMAT JSON) de query, valeurs passées en paramètres (jamais dans le SQL)
+
+    Compilé en paramètres nommés (:name) pour que text() les relie, avec le type de
+    chaque paramètre (ex. enum du statut).
+    """
+    compiled = query.compile(dialect=postgresql.dialect(paramstyle="named"))
+    return text(f"EXPLAIN (FORMAT JSON) {compiled}").bindparams(
+        *(bindparam(name, value, type_=compiled.binds[name].type) for name, value in compiled.params.items())
+    )
+
+
+def listing_filter(status: Optional[ProfileStatus], q: Optional[str]):
+    # Exclure impérativement les profils supprimés (soft delete) : prédicat des index partiels
+    condition = Profile.deleted_at.is_(None)
+    if status is not None:
+        condition = condition & (Profile.status == status)
+    if q:
+        condition = condition & search_filter(q)
+    return condition
+
+
+async def count_profiles(session: AsyncSession, condition) -> Tuple[int, bool]:
+    """
+    Total des profils filtrés
+
+    Returns:
+        (total, True si estimé) : exact jusqu'à PROFILE_LIST_EXACT_COUNT_LIMIT, estimé
+        par le planificateur au-delà (PostgreSQL uniquement)
+    """
+    limit = settings.PROFILE_LIST_EXACT_COUNT_LIMIT
+    if limit <= 0:
+        total = (await session.execute(select(func.count()).select_from(Profile).where(condition))).scalar()
+        return total or 0, False
+
+    # Compter au plus limit + 1 lignes (parcours d'index borné)
+    capped = select(Profile.id).where(condition).limit(limit + 1).subquery()
+    total = (await session.execute(select(func.count()).select_from(capped))).scalar() or 0
+    if total <= limit or session.bind.dialect.name != "postgresql":
+        if total > limit:
+            total = (await session.execute(select(func.count()).select_from(Profile).where(condition))).scalar() or 0
+        return total, False
+
+    # Estimation du planificateur (statistiques de la table, sans parcours)
+    plan = (await session.execute(explain_statement(select(Profile.id).where(condition)))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    return max(estimate, limit + 1), True
+
+
+async def list_profiles_page(
+    session: AsyncSession,
+    status: Optional[ProfileStatus] = None,
+    q: Optional[str] = None,
+    size: int = 20,
+    cursor: Optional[str] = None,
+    page: int = 1,
+) -> Tuple[List[Profile], Optional[str]]:
+    """
+    Une page de la liste admin
+
+    Args:
+        cursor: next_cursor de la page précédente ; sans curseur, page est appliquée
+            en OFFSET (compatibilité)
+
+    Returns:
+        (profils, next_cursor) ; next_cursor vaut None sur la dernière page
+
+    Raises:
+        InvalidCursorError: Curseur illisible ou émis pour d'autres filtres
+    """
+    condition = listing_filter(status, q)
+    query = select(Profile).where(condition)
+    if cursor:
+        query = query.where(keyset_filter(decode_cursor(cursor, status, q)))
+    elif page > 1:
+        query = query.offset((page - 1) * size)
+    query = query.order_by(
+        *(column.desc().nullsfirst() for column in SORT_COLUMNS), Profile.id.desc()
+    ).limit(size + 1)
+    profiles = list((await session.execute(query)).scalars().all())
+    if len(profiles) <= size:
+        return profiles, None
+    profiles = profiles[:size]
+    return profiles, encode_cursor(profiles[-1], status, q)
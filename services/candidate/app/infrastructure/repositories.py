@@ -3,7 +3,7 @@ Repositories pour les opérations de base de données
 """
 import logging
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, update
 from sqlalchemy.orm import selectinload
@@ -13,8 +13,13 @@ from app.domain.models import (
     Profile, Experience, Education, Certification, Skill, JobPreference, ProfileStatus,
     JobOffer, Application, JobStatus,
 )
+from app.core.config import settings
 from app.core.exceptions import ProfileNotFoundError, ProfileAlreadyExistsError
-from app.core.completion import calculate_completion_percentage
+from app.core.completion import (
+    COMPLETION_SECTIONS, IDENTITY_FIELDS, calculate_section_scores,
+    cv_score, educations_score, experiences_score, identity_score, preferences_score,
+    total_completion,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -95,13 +100,57 @@ class ProfileRepository:
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    async def list_validated_after(
+        session: AsyncSession,
+        after_id: int = 0,
+        limit: int = 200,
+        ids: Optional[List[int]] = None
+    ) -> List[Profile]:
+        """
+        Page de profils validés avec leurs relations, par ID croissant (pagination keyset)
+
+        WHERE id > after_id ORDER BY id LIMIT n : coût constant quelle que soit la
+        position dans la table, contrairement à OFFSET. ids restreint la page à ces
+        profils (indexation par événements : les IDs absents ne sont plus validés).
+        """
+        conditions = [
+            Profile.id > after_id,
+            Profile.status == ProfileStatus.VALIDATED,
+            Profile.deleted_at.is_(None),
+        ]
+        if ids:
+            conditions.append(Profile.id.in_(ids))
+        result = await session.execute(
+            select(Profile)
+            .where(and_(*conditions))
+            .order_by(Profile.id)
+            .limit(limit)
+            .options(
+                selectinload(Profile.experiences),
+                selectinload(Profile.educations),
+                selectinload(Profile.certifications),
+                selectinload(Profile.skills),
+                selectinload(Profile.job_preferences)
+            )
+        )
+        return list(result.scalars().all())
+    
     @staticmethod
     async def update(
         session: AsyncSession,
         profile_id: int,
-        update_data: dict
+        update_data: dict,
+        sections: Iterable[str] = ()
     ) -> Optional[Profile]:
-        """Met à jour un profil"""
+        """
+        Met à jour un profil
+
+        Seules les sections de complétion touchées sont recalculées : identité si
+        update_data contient un champ d'identité, plus les sections indiquées par
+        l'appelant (ex. ("experiences",) après l'ajout d'une expérience). Un
+        changement de statut ou d'évaluation admin ne recalcule rien.
+        """
         profile = await ProfileRepository.get_by_id(session, profile_id)
         if not profile:
             return None
@@ -128,41 +177,181 @@ class ProfileRepository:
                         pass
             setattr(profile, key, value)
         
-        # Recalculer le pourcentage de complétion
-        # Recharger le profil avec les relations pour le calcul
+        # Recalculer le pourcentage de complétion (sections modifiées uniquement)
+        changed_sections = set(sections)
+        if IDENTITY_FIELDS.intersection(update_data):
+            changed_sections.add("identity")
         try:
-            profile_with_relations = await ProfileRepository.get_with_relations(session, profile_id)
-            if profile_with_relations:
-                from app.core.completion import check_cv_exists
-                # Gérer les erreurs de check_cv_exists (timeout, réseau, etc.)
-                has_cv = False
-                try:
-                    has_cv = await check_cv_exists(profile_id)
-                except Exception as cv_error:
-                    # Si on ne peut pas vérifier le CV (timeout, réseau, etc.), supposer False
-                    # Logger l'erreur mais ne pas bloquer la mise à jour
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.warning(f"Erreur lors de la vérification du CV pour le profil {profile_id}: {str(cv_error)}")
-                    has_cv = False
-                
-                profile.completion_percentage = calculate_completion_percentage(profile_with_relations, has_cv=has_cv)
+            await ProfileRepository.refresh_completion(session, profile, changed_sections)
         except Exception as completion_error:
             # Si le calcul de complétion échoue, logger l'erreur mais ne pas bloquer la mise à jour
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Erreur lors du calcul du pourcentage de complétion pour le profil {profile_id}: {str(completion_error)}", exc_info=True)
             # Garder le pourcentage de complétion actuel ou 0 si non défini
-            if not hasattr(profile, 'completion_percentage') or profile.completion_percentage is None:
+            if profile.completion_percentage is None:
                 profile.completion_percentage = 0.0
         
-        from datetime import datetime
         profile.updated_at = datetime.utcnow()
         
         await session.commit()
         await session.refresh(profile)
         return profile
     
+    @staticmethod
+    async def refresh_completion(
+        session: AsyncSession,
+        profile: Profile,
+        sections: Iterable[str],
+        has_cv: Optional[bool] = None
+    ) -> Profile:
+        """
+        Recalcule les sous-scores des sections modifiées et le pourcentage total (sans commit)
+
+        Seules les lignes des sections demandées sont relues, en colonnes (pas
+        d'entités : rien de périmé après une synchronisation ensembliste). Les autres
+        sous-scores viennent du cache completion_scores ; une section absente du
+        cache (profil antérieur) est calculée une fois. has_cv, s'il est fourni,
+        remplace le drapeau stocké. Sinon le drapeau vient des événements du Document
+        Service ; celui-ci n'est interrogé qu'en repli : drapeau inconnu, ou section
+        "cv" demandée alors que les événements sont désactivés.
+        """
+        requested = set(sections)
+        if has_cv is not None:
+            profile.has_cv = has_cv
+            requested.add("cv")
+        if not requested:
+            return profile
+        
+        scores = dict(profile.completion_scores or {})
+        to_compute = requested | {section for section in COMPLETION_SECTIONS if section not in scores}
+        
+        if "identity" in to_compute:
+            scores["identity"] = identity_score(profile)
+        if "experiences" in to_compute:
+            table = Experience.__table__
+            rows = (await session.execute(select(table).where(table.c.profile_id == profile.id))).all()
+            scores["experiences"] = experiences_score(rows)
+        if "educations" in to_compute:
+            table = Education.__table__
+            rows = (await session.execute(select(table).where(table.c.profile_id == profile.id))).all()
+            scores["educations"] = educations_score(rows)
+        if "preferences" in to_compute:
+            table = JobPreference.__table__
+            row = (await session.execute(select(table).where(table.c.profile_id == profile.id))).first()
+            scores["preferences"] = preferences_score(row)
+        if "cv" in to_compute:
+            stale = profile.has_cv is None or ("cv" in requested and not settings.DOCUMENT_EVENTS_ENABLED)
+            if has_cv is None and stale:
+                await ProfileRepository.fetch_document_stats(profile)
+            scores["cv"] = cv_score(bool(profile.has_cv))
+        
+        # Nouveau dict : la colonne JSON n'est pas suivie en mutation
+        profile.completion_scores = scores
+        profile.completion_percentage = total_completion(scores)
+        logger.debug(f"Complétion du profil {profile.id}: sections recalculées {sorted(to_compute)}, total={profile.completion_percentage}%")
+        return profile
+    
+    @staticmethod
+    def set_document_stats(profile: Profile, stats: dict, observed_at: Optional[datetime]) -> bool:
+        """
+        Applique l'état des documents du Document Service (sans recalcul ni commit)
+
+        observed_at vient de l'horloge du Document Service (occurred_at d'un
+        événement, observed_at de l'endpoint document-stats) : un état plus ancien
+        que celui déjà appliqué est ignoré (événements réordonnés ou rejoués). Sans
+        date (Document Service qui ne la fournit pas), l'état lu est appliqué sans
+        avancer documents_synced_at : l'horloge du Candidate Service n'est jamais
+        comparée à celle des événements.
+
+        Returns:
+            bool: True si le drapeau CV a changé
+        """
+        synced_at = profile.documents_synced_at
+        if observed_at is not None and synced_at and observed_at < synced_at:
+            return False
+        had_cv = profile.has_cv
+        profile.has_cv = (stats.get("cv_count") or 0) > 0
+        profile.document_count = stats.get("document_count") or 0
+        profile.latest_cv_id = stats.get("latest_cv_id")
+        if observed_at is not None:
+            profile.documents_synced_at = observed_at
+        return profile.has_cv != had_cv
+    
+    @staticmethod
+    async def fetch_document_stats(profile: Profile) -> bool:
+        """
+        Repli : lit l'état des documents du profil dans le Document Service (HTTP)
+
+        Returns:
+            bool: True si l'état a pu être lu (appliqué sauf si un événement plus
+            récent l'a déjà été)
+        """
+        from app.infrastructure.document_client import fetch_document_stats
+
+        stats = await fetch_document_stats([profile.id])
+        if stats is None:
+            return False
+        current = stats.get(profile.id) or {}
+        ProfileRepository.set_document_stats(profile, current, current.get("observed_at"))
+        return True
+    
+    @staticmethod
+    async def apply_document_stats(
+        session: AsyncSession,
+        profile_id: int,
+        stats: dict,
+        observed_at: Optional[datetime]
+    ) -> Optional[Profile]:
+        """
+        Applique un état des documents (événement ou réconciliation) et recalcule la
+        section CV si le drapeau change (sans commit ; observed_at : voir set_document_stats)
+
+        Returns:
+            Le profil, ou None s'il n'existe pas (ou plus)
+        """
+        profile = await ProfileRepository.get_by_id(session, profile_id)
+        if not profile:
+            return None
+        cv_changed = ProfileRepository.set_document_stats(profile, stats, observed_at)
+        if cv_changed or "cv" not in (profile.completion_scores or {}):
+            await ProfileRepository.refresh_completion(session, profile, (), has_cv=profile.has_cv)
+        return profile
+    
+    @staticmethod
+    async def list_document_stats_after(
+        session: AsyncSession,
+        after_id: int = 0,
+        limit: int = 200
+    ) -> List[tuple]:
+        """
+        Page (id, has_cv, document_count, latest_cv_id) des profils actifs, par ID
+        croissant (pagination keyset, pour la réconciliation)
+        """
+        result = await session.execute(
+            select(Profile.id, Profile.has_cv, Profile.document_count, Profile.latest_cv_id)
+            .where(and_(Profile.id > after_id, Profile.deleted_at.is_(None)))
+            .order_by(Profile.id)
+            .limit(limit)
+        )
+        return list(result.all())
+    
+    @staticmethod
+    async def sync_collections(
+        session: AsyncSession,
+        profile_id: int,
+        collections: Dict[str, List[dict]]
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Aligne les sous-collections du profil sur les listes reçues (voir collection_sync.py)
+
+        Sans commit : l'appelant valide l'ensemble en une seule transaction.
+        """
+        from app.infrastructure.collection_sync import sync_collection
+
+        return {
+            name: await sync_collection(session, name, profile_id, items)
+            for name, items in collections.items()
+        }
+    
     @staticmethod
     async def submit_for_validation(
         session: AsyncSession,
@@ -179,17 +368,22 @@ class ProfileRepository:
             raise ValueError(f"Cannot submit profile with status {profile.status}")
         
         from datetime import datetime
-        from app.core.completion import can_submit_profile, check_cv_exists, calculate_completion_percentage
+        from app.core.completion import can_submit_profile
         
-        # Vérifier la présence du CV via le service Document
-        has_cv = await check_cv_exists(profile_id)
+        # Présence du CV : drapeau tenu à jour par les événements du Document Service,
+        # relu en HTTP s'il est inconnu ou si les événements sont désactivés
+        if profile.has_cv is None or not settings.DOCUMENT_EVENTS_ENABLED:
+            await ProfileRepository.fetch_document_stats(profile)
+        has_cv = bool(profile.has_cv)
         logger.info(f"Soumission du profil {profile_id}: has_cv={has_cv}, expériences={len(profile.experiences) if profile.experiences else 0}, formations={len(profile.educations) if profile.educations else 0}")
         
         # Recalculer explicitement le completion_percentage juste avant la vérification
         # pour s'assurer qu'il est à jour avec toutes les données
         try:
-            calculated_completion = calculate_completion_percentage(profile, has_cv=has_cv)
+            scores = calculate_section_scores(profile, has_cv=has_cv)
+            calculated_completion = total_completion(scores)
             logger.info(f"Calcul du completion_percentage pour le profil {profile_id}: {calculated_completion}%")
+            profile.completion_scores = scores
             profile.completion_percentage = calculated_completion
             profile.updated_at = datetime.utcnow()
             await session.commit()
@@ -428,9 +622,10 @@ class JobPreferenceRepository:
     async def create_or_update(
         session: AsyncSession,
         profile_id: int,
-        preference_data: dict
+        preference_data: dict,
+        commit: bool = True
     ) -> JobPreference:
-        """Crée ou met à jour les préférences d'emploi"""
+        """Crée ou met à jour les préférences d'emploi (commit=False : dans la transaction de l'appelant)"""
         result = await session.execute(
             select(JobPreference).where(JobPreference.profile_id == profile_id)
         )
@@ -445,6 +640,9 @@ class JobPreferenceRepository:
             preference = JobPreference(profile_id=profile_id, **preference_data)
             session.add(preference)
         
+        if not commit:
+            await session.flush()
+            return preference
         await session.commit()
         await session.refresh(preference)
         return preference
@@ -469,32 +667,38 @@ class JobOfferRepository:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def increment_view_count(session: AsyncSession, job_id: int) -> bool:
-        """Incrémente le compteur de vues pour une offre publiée."""
-        from sqlalchemy import update
-        job = await JobOfferRepository.get_by_id(session, job_id)
-        if not job or job.status != JobStatus.PUBLISHED:
-            return False
-        stmt = update(JobOffer).where(JobOffer.id == job_id).values(
-            view_count=JobOffer.view_count + 1
-        )
-        await session.execute(stmt)
-        await session.commit()
-        return True
+    async def apply_counter_increments(
+        session: AsyncSession,
+        increments: Dict[int, Dict[str, int]]
+    ) -> int:
+        """
+        Ajoute en lot des incréments de view_count / register_click_count (sans commit)
 
-    @staticmethod
-    async def increment_register_click_count(session: AsyncSession, job_id: int) -> bool:
-        """Incrémente le compteur de clics sur Créer mon compte (depuis modal Postuler)."""
-        from sqlalchemy import update
-        job = await JobOfferRepository.get_by_id(session, job_id)
-        if not job or job.status != JobStatus.PUBLISHED:
-            return False
-        stmt = update(JobOffer).where(JobOffer.id == job_id).values(
-            register_click_count=JobOffer.register_click_count + 1
+        Args:
+            increments: {job_id: {"view_count": n, "register_click_count": m}}
+
+        Returns:
+            Nombre d'offres mises à jour
+        """
+        from sqlalchemy import bindparam
+        if not increments:
+            return 0
+        table = JobOffer.__table__
+        stmt = update(table).where(table.c.id == bindparam("b_id")).values(
+            view_count=table.c.view_count + bindparam("b_views"),
+            register_click_count=table.c.register_click_count + bindparam("b_clicks"),
         )
-        await session.execute(stmt)
-        await session.commit()
-        return True
+        # Ordre des IDs fixe : pas d'interblocage entre deux vidages concurrents
+        params = [
+            {
+                "b_id": job_id,
+                "b_views": counts.get("view_count", 0),
+                "b_clicks": counts.get("register_click_count", 0),
+            }
+            for job_id, counts in sorted(increments.items())
+        ]
+        await session.execute(stmt, params)
+        return len(params)
 
     @staticmethod
     async def list_published(
@@ -11,6 +11,10 @@ import logging
 
 from app.core.config import settings
 from app.core.exceptions import CandidateError
+from app.infrastructure.http_client import close_http_clients, http_client_metrics
+from app.infrastructure.indexing_events import close_indexing_events
+from app.infrastructure.document_events import document_events_consumer
+from app.infrastructure.job_counters import job_counters
 from app.api.v1 import profiles, stats, jobs, company_jobs
 from app.infrastructure.database import init_db
 
@@ -21,10 +25,16 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Démarrage : init_db (création des tables + migrations)."""
+    """Démarrage : init_db (création des tables + migrations), événements du Document Service, compteurs d'offres."""
     await init_db()
+    await document_events_consumer.start()
+    await job_counters.start()
     yield
-    # shutdown si besoin
+    # Vide le tampon des compteurs avant de fermer
+    await job_counters.stop()
+    await document_events_consumer.stop()
+    await close_http_clients()
+    await close_indexing_events()
 
 
 app = FastAPI(
@@ -171,6 +181,24 @@ async def health_check():
     }
 
 
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
+@app.get("/health/document-events", tags=["Health"])
+async def document_events_metrics():
+    """Consommation des événements du Document Service (retard, échecs, réconciliation)"""
+    return await document_events_consumer.metrics()
+
+
+@app.get("/health/job-counters", tags=["Health"])
+async def job_counters_metrics():
+    """Compteurs vues / clics des offres : incréments en attente et vidages"""
+    return await job_counters.metrics()
+
+
 @app.get("/health/ready", tags=["Health"])
 async def readiness_check():
     """Readiness : vérifie que le service et la base de données sont joignables."""
@@ -0,0 +1,35 @@
+"""Add completion_scores and has_cv to profiles
+
+Revision ID: add_completion_cache
+Revises: add_validation_req_at
+Create Date: 2026-10-17
+
+Cache des sous-scores de complétion par section et présence du CV
+(NULL : inconnu, recalculé à la prochaine écriture du profil).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_completion_cache"
+down_revision: Union[str, None] = "add_validation_req_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "profiles",
+        sa.Column("completion_scores", sa.JSON(), nullable=True),
+    )
+    op.add_column(
+        "profiles",
+        sa.Column("has_cv", sa.Boolean(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("profiles", "has_cv")
+    op.drop_column("profiles", "completion_scores")
@@ -0,0 +1,30 @@
+"""Add document_count, latest_cv_id and documents_synced_at to profiles
+
+Revision ID: add_document_stats
+Revises: add_completion_cache
+Create Date: 2026-10-17
+
+État des documents dénormalisé depuis les événements du Document Service.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_document_stats"
+down_revision: Union[str, None] = "add_completion_cache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("profiles", sa.Column("document_count", sa.Integer(), nullable=True))
+    op.add_column("profiles", sa.Column("latest_cv_id", sa.Integer(), nullable=True))
+    op.add_column("profiles", sa.Column("documents_synced_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("profiles", "documents_synced_at")
+    op.drop_column("profiles", "latest_cv_id")
+    op.drop_column("profiles", "document_count")
@@ -0,0 +1,54 @@
+"""Add keyset and trigram search indexes for the admin profile listing
+
+Revision ID: add_profile_listing_idx
+Revises: add_document_stats
+Create Date: 2026-10-17
+
+GET /profiles (admin) : index partiels (deleted_at IS NULL) dans l'ordre du tri
+keyset, avec et sans statut, et index GIN pg_trgm sur l'expression de recherche q
+(identique à SEARCH_DOCUMENT_SQL de app/infrastructure/profile_listing.py).
+Créés en CONCURRENTLY pour ne pas bloquer les écritures sur profiles.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "add_profile_listing_idx"
+down_revision: Union[str, None] = "add_document_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_DOCUMENT_SQL = (
+    "(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(profile_title, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        # Tri de la liste sans filtre de statut
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_profiles_listing ON profiles "
+            "(submitted_at DESC NULLS FIRST, created_at DESC NULLS FIRST, id DESC) "
+            "WHERE deleted_at IS NULL"
+        )
+        # Filtre de statut + tri ; couvre aussi le comptage par statut (index-only scan)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_profiles_status_listing ON profiles "
+            "(status, submitted_at DESC NULLS FIRST, created_at DESC NULLS FIRST, id DESC) "
+            "WHERE deleted_at IS NULL"
+        )
+        # Recherche q (ILIKE '%...%') sur prénom, nom, email et titre
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_profiles_search_trgm ON profiles "
+            f"USING gin ({SEARCH_DOCUMENT_SQL} gin_trgm_ops) WHERE deleted_at IS NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_profiles_search_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_profiles_status_listing")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_profiles_listing")
@@ -0,0 +1,35 @@
+"""
+Réconciliation de l'état des documents des profils avec le Document Service
+
+Aligne has_cv, document_count et latest_cv_id (normalement tenus à jour par les
+événements du Document Service) sur l'endpoint document-stats, et recalcule la
+section CV de la complétion des profils corrigés. Le consommateur d'événements
+fait la même chose toutes les DOCUMENT_RECONCILE_INTERVAL_SECONDS.
+
+Usage (depuis services/candidate) :
+    python scripts/reconcile_documents.py
+    python scripts/reconcile_documents.py --page-size 500
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.infrastructure.document_events import reconcile_document_stats  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--page-size", type=int, default=200, help="Profils par requête au Document Service (max 500)")
+    args = parser.parse_args()
+
+    report = asyncio.run(reconcile_document_stats(args.page_size))
+    print(f"{report['checked']} profils vérifiés, {report['fixed']} corrigés, {report['failed_pages']} pages non vérifiées")
+    sys.exit(1 if report["failed_pages"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ from app.infrastructure.auth import get_current_user, TokenData
 from app.infrastructure.permissions import require_company_admin, require_company_master
 from app.infrastructure.repositories import CompanyRepository, TeamMemberRepository
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -341,7 +342,6 @@ async def get_company_team_members(
     - L'admin de l'entreprise
     - Les super admins
     """
-    import httpx
     
     # Vérifier que l'utilisateur est admin de l'entreprise
     await require_company_admin(company_id, current_user, session)
@@ -379,7 +379,7 @@ async def get_company_team_members(
             
             headers = get_service_token_header("company-service")
             
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with service_client(settings.AUTH_SERVICE_URL, timeout=5.0) as client:
                 response = await client.get(
                     f"{settings.AUTH_SERVICE_URL}/api/v1/users/internal/{tm.user_id}",
                     headers=headers
@@ -24,6 +24,7 @@ from app.infrastructure.invitation import (
 )
 from app.infrastructure.notification_client import send_invitation_notification
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 import httpx
 import logging
 
@@ -90,7 +91,7 @@ async def invite_recruiter(
     user_id = None
     password_reset_token = None
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    async with service_client(settings.AUTH_SERVICE_URL, timeout=10.0) as client:
         try:
             # Créer l'utilisateur dans auth-service
             logger.info(f"Creating user account for: {invitation_data.email}")
@@ -563,7 +564,7 @@ async def accept_invitation(
         
         # Vérifier ou créer l'utilisateur dans auth-service
         user_id = None
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.AUTH_SERVICE_URL, timeout=10.0) as client:
             try:
                 # Essayer de créer l'utilisateur directement
                 # Si l'utilisateur existe déjà (409), on utilisera le login pour obtenir l'ID
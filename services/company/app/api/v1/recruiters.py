@@ -12,7 +12,7 @@ from app.infrastructure.database import get_session
 from app.infrastructure.auth import get_current_user, TokenData
 from app.infrastructure.permissions import require_company_admin, require_recruiter_access, can_view_validated_candidates
 from app.infrastructure.repositories import RecruiterRepository, CompanyRepository
-import httpx
+from app.infrastructure.http_client import service_client
 
 router = APIRouter()
 
@@ -148,7 +148,7 @@ async def search_candidates(
         params["skills"] = ",".join(search_request.skills)
     
     # Appel au service de recherche
-    async with httpx.AsyncClient() as client:
+    async with service_client(settings.SEARCH_SERVICE_URL) as client:
         response = await client.get(search_url, params=params)
         response.raise_for_status()
         return response.json()
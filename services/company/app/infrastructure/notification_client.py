@@ -46,6 +46,7 @@ if get_service_token_header is None:
     )
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 from app.core.exceptions import InvitationError
 
 
@@ -94,7 +95,7 @@ async def send_invitation_notification(
         logger.info(f"Sending invitation notification to {recipient_email} with temporary_password={'present' if temporary_password else 'none'}")
         logger.debug(f"Payload keys: {list(payload.keys())}")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_invitation",
                 json=payload,
@@ -156,7 +157,7 @@ async def send_company_welcome_notification(
         
         logger.info(f"Sending welcome notification to company {company_name} ({recipient_email})")
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_company_welcome",
                 json=payload,
@@ -197,7 +198,7 @@ async def send_company_onboarding_completed_notification(
             "dashboard_url": dashboard_url,
         }
         logger.info("Sending company onboarding completed notification to %s (%s)", recipient_email, company_name)
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with service_client(settings.NOTIFICATION_SERVICE_URL, timeout=10.0) as client:
             response = await client.post(
                 f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/triggers/notify_company_onboarding_completed",
                 json=payload,
@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import companies, recruiters, invitations, invoices
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
+from app.infrastructure.http_client import close_http_clients, http_client_metrics
 from app.infrastructure.database import init_db
 
 logger = logging.getLogger(__name__)
@@ -47,6 +48,12 @@ async def startup_event():
         logger.warning("JWT_SECRET_KEY is empty or too short - auth validation may fail")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre : fermeture des pools HTTP inter-services"""
+    await close_http_clients()
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
@@ -57,6 +64,12 @@ async def health_check():
     }
 
 
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
@@ -3,7 +3,7 @@ Endpoints d'administration pour le service Document
 """
 from datetime import datetime, timedelta
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
@@ -11,6 +11,7 @@ from app.domain.models import Document, DocumentStatus
 from app.domain.schemas import DocumentResponse
 from app.infrastructure.database import get_session
 from app.infrastructure.storage import s3_storage
+from app.infrastructure.document_events import candidate_document_stats, publish_documents_changed
 from app.core.exceptions import DocumentError
 
 # Import pour l'authentification interne
@@ -79,9 +80,11 @@ async def cleanup_rejected_documents(
     
     deleted_count = 0
     errors = []
+    candidate_ids = set()
     
     for document in documents:
         try:
+            candidate_id = document.candidate_id
             # Supprimer le fichier de S3
             await s3_storage.delete_file(document.s3_key)
             
@@ -89,10 +92,14 @@ async def cleanup_rejected_documents(
             document.deleted_at = datetime.utcnow()
             await session.commit()
             deleted_count += 1
+            candidate_ids.add(candidate_id)
         except Exception as e:
             errors.append(f"Document {document.id}: {str(e)}")
             await session.rollback()
     
+    for candidate_id in candidate_ids:
+        await publish_documents_changed(session, candidate_id, "cleanup")
+    
     return {
         "deleted_count": deleted_count,
         "errors": errors,
@@ -140,6 +147,9 @@ async def delete_candidate_documents(
             errors.append(f"Document {document.id}: {str(e)}")
             await session.rollback()
     
+    if deleted_count:
+        await publish_documents_changed(session, candidate_id, "deleted")
+    
     return {
         "candidate_id": candidate_id,
         "deleted_count": deleted_count,
@@ -147,3 +157,30 @@ async def delete_candidate_documents(
         "message": f"Successfully deleted {deleted_count} documents for candidate {candidate_id}"
     }
 
+
+@router.get("/candidates/document-stats", status_code=status.HTTP_200_OK)
+async def get_candidates_document_stats(
+    candidate_ids: str = Query(..., description="IDs des candidats séparés par des virgules (max 500)"),
+    service_info: dict = Depends(verify_internal_token),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Nombre de documents, nombre de CV et dernier CV de plusieurs candidats
+
+    Utilisé par la réconciliation du Candidate Service (et en repli quand son
+    drapeau has_cv est inconnu) : une requête groupée au lieu de la liste complète
+    des documents de chaque candidat.
+    - observed_at : instant de lecture sur l'horloge de ce service, comparable à
+      l'occurred_at des événements (pris avant la requête, comme pour ceux-ci)
+    - Nécessite un token de service interne
+    """
+    try:
+        ids = [int(value) for value in candidate_ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="candidate_ids must be integers")
+    if len(ids) > 500:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At most 500 candidate_ids per request")
+    
+    observed_at = datetime.utcnow().isoformat()
+    stats = await candidate_document_stats(session, ids)
+    return {str(candidate_id): {**values, "observed_at": observed_at} for candidate_id, values in stats.items()}
@@ -24,6 +24,7 @@ from app.core.exceptions import DocumentNotFoundError, DocumentError
 from app.infrastructure.database import get_session, init_db
 from app.infrastructure.storage import s3_storage
 from app.infrastructure.file_validator import FileValidator
+from app.infrastructure.document_events import publish_documents_changed
 
 logger = logging.getLogger(__name__)
 
@@ -116,6 +117,9 @@ async def upload_document(
             detail="Erreur lors de l'enregistrement du document."
         )
     
+    # CV / nombre de documents dénormalisés dans le Candidate Service
+    await publish_documents_changed(session, candidate_id, "uploaded", document)
+    
     return DocumentUploadResponse(
         id=document.id,
         candidate_id=document.candidate_id,
@@ -674,6 +678,7 @@ async def delete_document(
         await session.refresh(document)
         
         logger.info(f"Successfully deleted document {document_id}")
+        await publish_documents_changed(session, document.candidate_id, "deleted", document)
         
         return {
             "message": "Document deleted successfully",
@@ -53,6 +53,11 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     AUTH_SERVICE_URL: str = "http://localhost:8001"
 
+    # Événements "documents modifiés" (Redis Stream consommé par le Candidate Service)
+    REDIS_URL: str = Field(default="", description="Redis URL (ex: redis://redis:6379/0)")
+    DOCUMENT_EVENTS_ENABLED: bool = Field(default=False, description="Publish upload/delete events to the Redis Stream")
+    DOCUMENT_EVENTS_STREAM_NAME: str = Field(default="documents:events", description="Redis Stream of document events")
+
     # CORS
     CORS_ORIGINS: str = Field(
         default="http://localhost:3000,http://localhost:8000,http://localhost",
@@ -0,0 +1,131 @@
+"""
+Publication des documents modifiés vers le Candidate Service (Redis Stream)
+
+Après un upload ou une suppression, l'état des documents du candidat est publié
+(voir shared/document_events.py) : le Candidate Service tient à jour has_cv,
+document_count et latest_cv_id sans interroger ce service à chaque écriture.
+
+Sans DOCUMENT_EVENTS_ENABLED, ou si Redis est indisponible, rien n'est publié :
+la réconciliation du Candidate Service (document-stats) rattrape l'écart.
+"""
+import importlib.util
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.domain.models import Document, DocumentType
+
+logger = logging.getLogger(__name__)
+
+# En Docker : /shared. En local : services/shared (relatif à ce fichier)
+_this_dir = os.path.dirname(os.path.abspath(__file__))
+_services_dir = os.path.abspath(os.path.join(_this_dir, "..", "..", ".."))
+shared_path = "/shared" if os.path.exists("/shared") else os.path.join(_services_dir, "shared")
+document_events_path = os.path.join(shared_path, "document_events.py")
+if os.path.exists(document_events_path):
+    spec = importlib.util.spec_from_file_location("shared.document_events", document_events_path)
+    document_events_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(document_events_module)
+    _publish = document_events_module.publish_documents_changed
+    empty_document_stats = document_events_module.empty_document_stats
+else:
+    from shared.document_events import publish_documents_changed as _publish, empty_document_stats
+
+# Photos et logos ne sont pas des pièces du dossier candidat
+_NOT_COUNTED = (DocumentType.PROFILE_PHOTO, DocumentType.COMPANY_LOGO)
+
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis.asyncio as redis
+
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def candidate_document_stats(
+    session: AsyncSession,
+    candidate_ids: Iterable[int]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Nombre de documents, nombre de CV et dernier CV de chaque candidat (une requête)
+
+    Returns:
+        {candidate_id: {"document_count", "cv_count", "latest_cv_id"}} ; un candidat
+        sans document a l'état vide
+    """
+    ids = sorted(set(candidate_ids))
+    stats = {candidate_id: empty_document_stats() for candidate_id in ids}
+    if not ids:
+        return stats
+    is_cv = Document.document_type == DocumentType.CV
+    result = await session.execute(
+        select(
+            Document.candidate_id,
+            func.count(Document.id),
+            func.count(Document.id).filter(is_cv),
+            func.max(Document.id).filter(is_cv),
+        )
+        .where(
+            Document.candidate_id.in_(ids),
+            Document.deleted_at.is_(None),
+            Document.document_type.not_in(_NOT_COUNTED),
+        )
+        .group_by(Document.candidate_id)
+    )
+    for candidate_id, document_count, cv_count, latest_cv_id in result.all():
+        stats[candidate_id] = {
+            "document_count": document_count,
+            "cv_count": cv_count,
+            "latest_cv_id": latest_cv_id,
+        }
+    return stats
+
+
+async def publish_documents_changed(
+    session: AsyncSession,
+    candidate_id: int,
+    action: str,
+    document: Optional[Document] = None
+) -> bool:
+    """
+    Publie l'état des documents du candidat après une modification validée
+
+    Returns:
+        bool: True si l'événement est publié
+    """
+    if not settings.DOCUMENT_EVENTS_ENABLED or not settings.REDIS_URL:
+        return False
+    occurred_at = datetime.utcnow()
+    try:
+        stats = (await candidate_document_stats(session, [candidate_id]))[candidate_id]
+        client = _get_redis()
+    except Exception as e:
+        logger.warning("Document event for candidate %s not published: %s", candidate_id, e)
+        return False
+    return await _publish(
+        client,
+        candidate_id,
+        action,
+        stats,
+        document_id=document.id if document is not None else None,
+        document_type=document.document_type.value if document is not None else None,
+        stream=settings.DOCUMENT_EVENTS_STREAM_NAME,
+        occurred_at=occurred_at,
+    )
+
+
+async def close_document_events() -> None:
+    """Ferme la connexion Redis (arrêt du service)"""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
@@ -12,6 +12,7 @@ from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
 from app.infrastructure.storage import init_storage
 from app.infrastructure.database import init_db
+from app.infrastructure.document_events import close_document_events
 
 # Configuration du logging
 logging.basicConfig(
@@ -85,6 +86,12 @@ async def startup_event():
         logger.warning(f"Storage (MinIO) init failed - uploads will fail until MinIO is available: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Fermeture des connexions à l'arrêt"""
+    await close_document_events()
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
@@ -4,14 +4,20 @@ Endpoints de gestion des quotas
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.schemas import QuotaCheckRequest, QuotaCheckResponse, QuotaUsageRequest, QuotaCheckAndUseResponse
+from app.domain.schemas import (
+    QuotaCheckRequest,
+    QuotaCheckResponse,
+    QuotaUsageRequest,
+    QuotaCheckAndUseResponse,
+    QuotaReserveRequest,
+    QuotaReservationResponse,
+)
+from app.core.config import settings
 from app.core.exceptions import QuotaExceededError, SubscriptionNotFoundError
 from app.infrastructure.database import get_session
-from app.infrastructure.repositories import (
-    SubscriptionRepository,
-    PlanRepository,
-    QuotaRepository,
-)
+from app.infrastructure.quota_counter import quota_counter
+from app.infrastructure.repositories import QuotaRepository, current_monthly_period
+from app.infrastructure.subscription_cache import get_subscription_with_plan
 
 router = APIRouter()
 
@@ -27,16 +33,11 @@ async def check_quota(
     - **company_id**: ID de l'entreprise
     - **quota_type**: Type de quota (profile_views, etc.)
     """
-    subscription_repo = SubscriptionRepository(session)
-    subscription = await subscription_repo.get_by_company_id(request.company_id)
+    subscription, plan = await get_subscription_with_plan(session, request.company_id)
     
     if not subscription:
         raise SubscriptionNotFoundError(f"company_{request.company_id}")
     
-    # Récupérer le plan
-    plan_repo = PlanRepository(session)
-    plan = await plan_repo.get_by_id(subscription.plan_id)
-    
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,7 +54,7 @@ async def check_quota(
     else:
         limit = None  # Autres types de quotas à définir
     
-    used = quota.used if quota else 0
+    used = await quota_counter.current_used(quota) if quota else 0
     
     # Vérifier si le quota est disponible
     if limit is None:
@@ -85,46 +86,33 @@ async def use_quota(
     - **quota_type**: Type de quota
     - **amount**: Quantité à consommer (défaut: 1)
     """
-    subscription_repo = SubscriptionRepository(session)
-    subscription = await subscription_repo.get_by_company_id(request.company_id)
+    subscription, plan = await get_subscription_with_plan(session, request.company_id)
     
     if not subscription:
         raise SubscriptionNotFoundError(f"company_{request.company_id}")
     
-    # Vérifier le quota avant d'utiliser
-    quota_repo = QuotaRepository(session)
-    quota = await quota_repo.get_current_quota(subscription.id, request.quota_type)
-    
-    # Récupérer le plan pour connaître la limite
-    plan_repo = PlanRepository(session)
-    plan = await plan_repo.get_by_id(subscription.plan_id)
-    
     if request.quota_type == "profile_views":
         limit = plan.max_profile_views if plan else None
     else:
         limit = None
     
-    current_used = quota.used if quota else 0
+    # Vérifier et décrémenter le quota en une opération atomique
+    quota_repo = QuotaRepository(session)
+    allowed, used, _ = await quota_counter.consume(
+        quota_repo, subscription.id, request.quota_type, request.amount, limit
+    )
+    await session.commit()
     
-    # Vérifier si le quota est disponible
-    if limit is not None and (current_used + request.amount) > limit:
+    if not allowed:
         raise QuotaExceededError(
-            f"Quota exceeded. Limit: {limit}, Current: {current_used}, Requested: {request.amount}"
+            f"Quota exceeded. Limit: {limit}, Current: {used}, Requested: {request.amount}"
         )
     
-    # Décrémenter le quota
-    await quota_repo.create_or_update_quota(
-        subscription_id=subscription.id,
-        quota_type=request.quota_type,
-        amount=request.amount,
-        limit=limit,
-    )
-    
     return {
         "message": "Quota used successfully",
-        "used": current_used + request.amount,
+        "used": used,
         "limit": limit,
-        "remaining": limit - (current_used + request.amount) if limit else None,
+        "remaining": limit - used if limit else None,
     }
 
 
@@ -149,16 +137,11 @@ async def check_and_use_quota(
     """
     from app.domain.models import PlanType
     
-    subscription_repo = SubscriptionRepository(session)
-    subscription = await subscription_repo.get_by_company_id(request.company_id)
+    subscription, plan = await get_subscription_with_plan(session, request.company_id)
     
     if not subscription:
         raise SubscriptionNotFoundError(f"company_{request.company_id}")
     
-    # Récupérer le plan
-    plan_repo = PlanRepository(session)
-    plan = await plan_repo.get_by_id(subscription.plan_id)
-    
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -180,55 +163,29 @@ async def check_and_use_quota(
     
     # Pour FREEMIUM, vérifier et décrémenter le quota
     if plan.plan_type == PlanType.FREEMIUM:
-        quota_repo = QuotaRepository(session)
-        quota = await quota_repo.get_current_quota(subscription.id, request.quota_type)
-        
         # Déterminer la limite
         if request.quota_type == "profile_views":
             limit = plan.max_profile_views
         else:
             limit = None
         
-        # Si le quota n'existe pas encore, le créer avec used=0
-        if not quota:
-            # Créer le quota initial pour la période actuelle
-            quota = await quota_repo.create_or_update_quota(
-                subscription_id=subscription.id,
-                quota_type=request.quota_type,
-                amount=0,  # Initialiser à 0
-                limit=limit,
-            )
-        
-        current_used = quota.used
-        views_remaining = (limit - current_used) if limit else None
-        
-        # Vérifier si le quota est disponible
-        if limit is None:
-            # Illimité (ne devrait pas arriver pour FREEMIUM)
-            allowed = True
-        else:
-            allowed = views_remaining > 0
+        # Vérifier et décrémenter de 1 en une opération atomique
+        quota_repo = QuotaRepository(session)
+        allowed, new_used, _ = await quota_counter.consume(
+            quota_repo, subscription.id, request.quota_type, 1, limit
+        )
+        await session.commit()
         
         if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Quota atteint. Limite: {limit}, Utilisé: {current_used}, Restant: 0"
+                detail=f"Quota atteint. Limite: {limit}, Utilisé: {new_used}, Restant: 0"
             )
         
-        # Décrémenter le quota de 1
-        await quota_repo.create_or_update_quota(
-            subscription_id=subscription.id,
-            quota_type=request.quota_type,
-            amount=1,  # Décrémenter de 1
-            limit=limit,
-        )
-        
-        # Recalculer les valeurs après décrémentation
-        new_used = current_used + 1
-        new_remaining = limit - new_used
+        new_remaining = limit - new_used if limit is not None else None
         
         # Récupérer la date de réinitialisation (fin de période)
-        reset_date = quota.period_end
+        _, reset_date = current_monthly_period()
         
         return QuotaCheckAndUseResponse(
             allowed=True,
@@ -247,3 +204,109 @@ async def check_and_use_quota(
         detail=f"Unknown plan type: {plan.plan_type}"
     )
 
+
+@router.post("/reserve", response_model=QuotaReservationResponse, status_code=status.HTTP_200_OK)
+async def reserve_quota(
+    request: QuotaReserveRequest,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Vérifie et consomme un quota en un seul appel, et retourne un identifiant de réservation
+    
+    Remplace la séquence /check puis /use : le quota est consommé immédiatement.
+    Si l'opération protégée échoue ensuite, l'appelant annule la réservation via
+    /reservations/{reservation_id}/release (avant QUOTA_RESERVATION_TTL_SECONDS).
+    Une réservation non annulée est définitive ; /commit permet de la confirmer explicitement.
+    
+    - **company_id**: ID de l'entreprise
+    - **quota_type**: Type de quota (défaut: "profile_views")
+    - **amount**: Quantité à réserver (défaut: 1)
+    """
+    subscription, plan = await get_subscription_with_plan(session, request.company_id)
+    
+    if not subscription:
+        raise SubscriptionNotFoundError(f"company_{request.company_id}")
+    
+    if request.quota_type == "profile_views":
+        limit = plan.max_profile_views if plan else None
+    else:
+        limit = None
+    
+    quota_repo = QuotaRepository(session)
+    reservation, used = await quota_repo.reserve(
+        subscription_id=subscription.id,
+        company_id=request.company_id,
+        quota_type=request.quota_type,
+        amount=request.amount,
+        limit=limit,
+        ttl_seconds=settings.QUOTA_RESERVATION_TTL_SECONDS,
+    )
+    
+    if reservation is None:
+        raise QuotaExceededError(
+            f"Quota exceeded. Limit: {limit}, Current: {used}, Requested: {request.amount}"
+        )
+    
+    return QuotaReservationResponse(
+        allowed=True,
+        reservation_id=reservation.id,
+        status=reservation.status.value,
+        amount=reservation.amount,
+        used=used,
+        limit=limit,
+        remaining=limit - used if limit is not None else None,
+        expires_at=reservation.expires_at,
+        message="Quota reserved successfully",
+    )
+
+
+@router.post("/reservations/{reservation_id}/commit", response_model=QuotaReservationResponse)
+async def commit_quota_reservation(
+    reservation_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """Confirme une réservation de quota (elle ne peut plus être annulée)"""
+    quota_repo = QuotaRepository(session)
+    reservation = await quota_repo.get_reservation(reservation_id)
+    
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quota reservation not found"
+        )
+    
+    reservation = await quota_repo.commit_reservation(reservation)
+    return _reservation_response(reservation)
+
+
+@router.post("/reservations/{reservation_id}/release", response_model=QuotaReservationResponse)
+async def release_quota_reservation(
+    reservation_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Annule une réservation de quota et rembourse la consommation
+    
+    Idempotent : une réservation déjà annulée, confirmée ou expirée est retournée telle quelle.
+    """
+    quota_repo = QuotaRepository(session)
+    reservation = await quota_repo.release_reservation(reservation_id)
+    
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quota reservation not found"
+        )
+    
+    return _reservation_response(reservation)
+
+
+def _reservation_response(reservation) -> QuotaReservationResponse:
+    """Construit la réponse d'une réservation existante"""
+    return QuotaReservationResponse(
+        allowed=True,
+        reservation_id=reservation.id,
+        status=reservation.status.value,
+        amount=reservation.amount,
+        expires_at=reservation.expires_at,
+    )
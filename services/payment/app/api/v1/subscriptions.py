@@ -9,6 +9,7 @@ from app.domain.schemas import SubscriptionResponse, SubscriptionDetailResponse
 from app.core.exceptions import SubscriptionNotFoundError
 from app.infrastructure.database import get_session
 from app.infrastructure.repositories import SubscriptionRepository, PlanRepository, QuotaRepository
+from app.infrastructure.quota_counter import quota_counter
 
 router = APIRouter()
 
@@ -38,7 +39,7 @@ async def get_company_subscription(
     
     response = SubscriptionDetailResponse.model_validate(subscription)
     response.plan = plan
-    response.quota_used = quota.used if quota else 0
+    response.quota_used = await quota_counter.current_used(quota) if quota else 0
     response.quota_limit = quota.limit if quota else plan.max_profile_views if plan else None
     
     return response
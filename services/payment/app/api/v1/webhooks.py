@@ -6,6 +6,7 @@ from typing import Optional
 import json
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 from app.core.exceptions import StripeError
 from app.infrastructure.stripe_client import StripeClient
 from app.infrastructure.database import AsyncSessionLocal
@@ -15,9 +16,10 @@ from app.infrastructure.repositories import (
     PlanRepository,
     QuotaRepository,
 )
+from app.infrastructure.quota_counter import quota_counter
+from app.infrastructure.subscription_cache import invalidate_company_subscription
 from app.domain.models import Subscription, Payment, SubscriptionStatus, PaymentStatus, Invoice, Quota
 from datetime import datetime
-import httpx
 
 router = APIRouter()
 
@@ -151,9 +153,11 @@ async def handle_checkout_completed(session_data: dict, session):
         
         subscription_id_to_notify = subscription.id
     
+    invalidate_company_subscription(company_id)
+    
     # Notifier le service company
     try:
-        async with httpx.AsyncClient() as client:
+        async with service_client(settings.COMPANY_SERVICE_URL) as client:
             await client.post(
                 f"{settings.COMPANY_SERVICE_URL}/api/v1/companies/{company_id}/subscription-activated",
                 json={"subscription_id": subscription_id_to_notify}
@@ -236,6 +240,7 @@ async def handle_invoice_paid(invoice_data: dict, session):
         )
     
     await subscription_repo.update(subscription)
+    invalidate_company_subscription(subscription.company_id)
     
     # ============================================
     # RÉINITIALISATION DES QUOTAS MENSUELLEMENT
@@ -272,6 +277,8 @@ async def handle_invoice_paid(invoice_data: dict, session):
         existing_quota.updated_at = datetime.utcnow()
         await session.commit()
         await session.refresh(existing_quota)
+        # Le compteur Redis (s'il existe) repartira de la valeur en base
+        await quota_counter.invalidate(existing_quota.id)
     else:
         # Créer un nouveau quota pour la nouvelle période
         new_quota = Quota(
@@ -314,6 +321,7 @@ async def handle_subscription_updated(subscription_data: dict, session):
         subscription.status = status_map.get(stripe_status, SubscriptionStatus.ACTIVE)
         
         await subscription_repo.update(subscription)
+        invalidate_company_subscription(subscription.company_id)
 
 
 async def handle_subscription_deleted(subscription_data: dict, session):
@@ -327,4 +335,5 @@ async def handle_subscription_deleted(subscription_data: dict, session):
         subscription.status = SubscriptionStatus.CANCELLED
         subscription.end_date = datetime.utcnow()
         await subscription_repo.update(subscription)
+        invalidate_company_subscription(subscription.company_id)
 
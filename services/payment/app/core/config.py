@@ -35,6 +35,27 @@ class Settings(BaseSettings):
     STRIPE_CURRENCY: str = Field(default="eur", description="Currency for payments")
     TRIAL_DAYS: int = Field(default=3, description="Nombre de jours d'essai gratuit pour les abonnements")
 
+    # Quotas
+    QUOTA_RESERVATION_TTL_SECONDS: int = Field(
+        default=300,
+        description="Délai pendant lequel une réservation de quota peut être annulée (release)"
+    )
+    QUOTA_RECONCILE_INTERVAL_SECONDS: float = Field(
+        default=10.0,
+        description="Intervalle de report en base des compteurs de quota Redis"
+    )
+
+    # Caches en mémoire (plans et abonnements par entreprise)
+    PLAN_CACHE_TTL_SECONDS: int = Field(default=300, description="Durée de cache des plans")
+    SUBSCRIPTION_CACHE_TTL_SECONDS: int = Field(
+        default=30,
+        description="Durée de cache des abonnements par entreprise (invalidés par les webhooks Stripe)"
+    )
+    SUBSCRIPTION_CACHE_MAX_SIZE: int = Field(default=10000, description="Nombre max d'entreprises en cache")
+
+    # Redis (compteurs de quota ; vide = compteurs en base uniquement)
+    REDIS_URL: str = Field(default="", description="URL Redis")
+
     # Service URLs
     COMPANY_SERVICE_URL: str = Field(default="http://localhost:8005", description="Company service URL")
     FRONTEND_URL: str = Field(default="http://localhost:3000", description="Frontend URL")
@@ -4,6 +4,7 @@ Modèles du domaine métier (SQLModel)
 from datetime import datetime
 from typing import Optional
 from enum import Enum
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -23,6 +24,13 @@ class SubscriptionStatus(str, Enum):
     TRIALING = "trialing"
 
 
+class QuotaReservationStatus(str, Enum):
+    """Statut d'une réservation de quota"""
+    RESERVED = "reserved"
+    COMMITTED = "committed"
+    RELEASED = "released"
+
+
 class PaymentStatus(str, Enum):
     """Statut du paiement"""
     PENDING = "pending"
@@ -138,6 +146,10 @@ class Invoice(SQLModel, table=True):
 class Quota(SQLModel, table=True):
     """Modèle Quota - Suivi des quotas d'utilisation"""
     __tablename__ = "quotas"
+    # Une seule ligne par abonnement, type et période (création concurrente)
+    __table_args__ = (
+        UniqueConstraint("subscription_id", "quota_type", "period_start", name="uq_quotas_subscription_type_period"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     subscription_id: int = Field(foreign_key="subscriptions.id", index=True, description="ID de l'abonnement")
@@ -153,3 +165,23 @@ class Quota(SQLModel, table=True):
     # Relations
     subscription: Subscription = Relationship(back_populates="quotas")
 
+
+
+class QuotaReservation(SQLModel, table=True):
+    """
+    Modèle QuotaReservation - Consommation de quota réservée par un appelant
+
+    Le quota est consommé dès la réservation ; release la rembourse tant
+    qu'elle n'est ni confirmée ni expirée.
+    """
+    __tablename__ = "quota_reservations"
+    
+    id: str = Field(primary_key=True, max_length=64, description="Identifiant de réservation")
+    quota_id: int = Field(foreign_key="quotas.id", index=True, description="ID du quota consommé")
+    company_id: int = Field(index=True, description="ID de l'entreprise")
+    amount: int = Field(default=1, description="Quantité réservée")
+    status: QuotaReservationStatus = Field(default=QuotaReservationStatus.RESERVED, description="Statut de la réservation")
+    expires_at: datetime = Field(description="Au-delà, la réservation est considérée comme confirmée")
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default=None)
@@ -152,3 +152,23 @@ class QuotaCheckAndUseResponse(BaseModel):
     views_remaining: Optional[int] = None
     reset_date: Optional[datetime] = None
 
+
+
+class QuotaReserveRequest(BaseModel):
+    """Schéma pour réserver (vérifier et consommer) un quota en un appel"""
+    company_id: int
+    quota_type: str = Field(default="profile_views", description="Type de quota")
+    amount: int = Field(default=1, ge=1, description="Quantité à réserver")
+
+
+class QuotaReservationResponse(BaseModel):
+    """Schéma de réponse pour une réservation de quota"""
+    allowed: bool
+    reservation_id: Optional[str] = None
+    status: Optional[str] = None
+    amount: int = 1
+    used: Optional[int] = None
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    message: Optional[str] = None
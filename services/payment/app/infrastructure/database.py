@@ -1,6 +1,7 @@
 """
 Configuration de la base de données
 """
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlmodel import SQLModel
 
@@ -36,6 +37,64 @@ async def get_session() -> AsyncSession:
             await session.close()
 
 
+async def migrate_add_quotas_unique_constraint(conn):
+    """
+    Migration: Contrainte unique (subscription_id, quota_type, period_start) sur quotas
+
+    create_all ne modifie pas une table existante. Les doublons créés avant la
+    contrainte (créations concurrentes) sont d'abord fusionnés dans la ligne la
+    plus ancienne : consommations additionnées, réservations rattachées.
+    """
+    from sqlalchemy import inspect
+
+    def check_and_add(sync_conn):
+        inspector = inspect(sync_conn)
+        try:
+            constraints = [c['name'] for c in inspector.get_unique_constraints('quotas')]
+            if 'uq_quotas_subscription_type_period' in constraints:
+                return
+            # Savepoint : un échec n'annule pas init_db
+            with sync_conn.begin_nested():
+                duplicates = sync_conn.execute(text(
+                    "SELECT subscription_id, quota_type, period_start, MIN(id), SUM(used) FROM quotas "
+                    "GROUP BY subscription_id, quota_type, period_start HAVING COUNT(*) > 1"
+                )).all()
+                for subscription_id, quota_type, period_start, keep_id, used in duplicates:
+                    params = {
+                        "subscription_id": subscription_id,
+                        "quota_type": quota_type,
+                        "period_start": period_start,
+                        "keep_id": keep_id,
+                        "used": used,
+                    }
+                    others = (
+                        "SELECT id FROM quotas WHERE subscription_id = :subscription_id "
+                        "AND quota_type = :quota_type AND period_start = :period_start AND id <> :keep_id"
+                    )
+                    sync_conn.execute(text(f"UPDATE quota_reservations SET quota_id = :keep_id WHERE quota_id IN ({others})"), params)
+                    sync_conn.execute(text(f"DELETE FROM quotas WHERE id IN ({others})"), params)
+                    sync_conn.execute(text("UPDATE quotas SET used = :used WHERE id = :keep_id"), params)
+                if duplicates:
+                    print(f"✅ Migration: {len(duplicates)} doublon(s) de quotas fusionné(s)")
+                if sync_conn.dialect.name == "postgresql":
+                    sync_conn.execute(text(
+                        "ALTER TABLE quotas ADD CONSTRAINT uq_quotas_subscription_type_period "
+                        "UNIQUE (subscription_id, quota_type, period_start)"
+                    ))
+                else:
+                    # SQLite (dev) : pas d'ALTER TABLE ADD CONSTRAINT, index unique équivalent
+                    sync_conn.execute(text(
+                        "CREATE UNIQUE INDEX uq_quotas_subscription_type_period "
+                        "ON quotas (subscription_id, quota_type, period_start)"
+                    ))
+            print("✅ Migration: Contrainte uq_quotas_subscription_type_period ajoutée à quotas")
+        except Exception as e:
+            if "does not exist" not in str(e).lower() and "already exists" not in str(e).lower():
+                print(f"⚠️  Migration quotas unique constraint: {e}")
+
+    await conn.run_sync(check_and_add)
+
+
 async def init_db():
     """Initialise la base de données (création des tables)"""
     async with engine.begin() as conn:
@@ -44,4 +103,5 @@ async def init_db():
         
         # Création des tables
         await conn.run_sync(SQLModel.metadata.create_all)
+        await migrate_add_quotas_unique_constraint(conn)
 
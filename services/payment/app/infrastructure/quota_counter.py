@@ -0,0 +1,307 @@
+"""
+Compteurs de quota atomiques
+
+Deux moteurs, choisis selon la configuration :
+- base de données (défaut) : un seul UPDATE conditionnel
+  `SET used = used + :n WHERE used + :n <= limit RETURNING used`, sans
+  lecture-modification-écriture ni verrou tenu entre deux allers-retours ;
+- Redis (REDIS_URL renseignée) : un script Lua vérifie la limite et fait l'INCRBY
+  en une opération atomique. Les incréments sont cumulés dans un hash de deltas
+  et reportés périodiquement sur la table quotas (reconcile).
+
+Le compteur Redis d'un quota est initialisé depuis la base à sa première
+utilisation ; il est supprimé quand la base est réinitialisée (webhook invoice.paid)
+pour être réinitialisé au prochain appel.
+
+L'ID de la ligne de quota de la période courante est gardé en mémoire : une
+consommation coûte une requête (UPDATE ... RETURNING) en mode base, aucune en
+mode Redis.
+
+Si Redis ne répond pas, la consommation passe par la base (même UPDATE
+conditionnel) ; le compteur Redis du quota est réinitialisé depuis la base à la
+consommation suivante, pour intégrer les incréments faits pendant la panne.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Vérifie la limite et incrémente, en initialisant le compteur depuis la base si absent
+# KEYS[1] = compteur du quota, KEYS[2] = hash des deltas à reporter en base
+# ARGV = amount, limit (-1 = illimité), used en base ('' = inconnu), ttl, quota_id
+# Retourne {1, used} si accepté, {0, used} si refusé, {-1, 0} si le compteur doit être initialisé
+CONSUME_SCRIPT = """
+local used = redis.call('GET', KEYS[1])
+if not used then
+    if ARGV[3] == '' then
+        return {-1, 0}
+    end
+    used = tonumber(ARGV[3]) + tonumber(redis.call('HGET', KEYS[2], ARGV[5]) or '0')
+    redis.call('SET', KEYS[1], used, 'EX', ARGV[4])
+else
+    used = tonumber(used)
+end
+local amount = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+if limit >= 0 and used + amount > limit then
+    return {0, used}
+end
+used = redis.call('INCRBY', KEYS[1], amount)
+redis.call('HINCRBY', KEYS[2], ARGV[5], amount)
+return {1, used}
+"""
+
+# Récupère et vide les deltas en attente en une opération
+# KEYS[1] = hash des deltas
+DRAIN_DELTAS_SCRIPT = """
+local deltas = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return deltas
+"""
+
+# Durée de conservation d'un compteur au-delà de la fin de sa période
+COUNTER_GRACE_PERIOD = timedelta(days=7)
+
+
+class QuotaCounter:
+    """Moteur de compteurs de quota (Redis si configuré, sinon base de données)"""
+
+    def __init__(self, redis_url: str = "", key_prefix: str = "payment:quota:"):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.deltas_key = f"{key_prefix}pending"
+        self._client = None
+        self._consume = None
+        self._drain = None
+        self._task: Optional[asyncio.Task] = None
+        # (subscription_id, quota_type, period_start) -> quota_id
+        self._quota_ids: Dict[Tuple[int, str, datetime], int] = {}
+        # Quotas consommés en base pendant une panne Redis : compteur à réinitialiser
+        self._degraded: Set[int] = set()
+
+    @property
+    def uses_redis(self) -> bool:
+        return bool(self.redis_url)
+
+    def _get_redis(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self.redis_url, decode_responses=True)
+            self._consume = self._client.register_script(CONSUME_SCRIPT)
+            self._drain = self._client.register_script(DRAIN_DELTAS_SCRIPT)
+        return self._client
+
+    def _key(self, quota_id: int) -> str:
+        return f"{self.key_prefix}{quota_id}:used"
+
+    @staticmethod
+    def _ttl_seconds(period_end: datetime) -> int:
+        return max(int((period_end + COUNTER_GRACE_PERIOD - datetime.utcnow()).total_seconds()), 60)
+
+    async def consume(
+        self,
+        quota_repo,
+        subscription_id: int,
+        quota_type: str,
+        amount: int,
+        limit: Optional[int]
+    ) -> Tuple[bool, int, int]:
+        """
+        Consomme `amount` sur le quota de la période courante si la limite le permet
+
+        Args:
+            quota_repo: QuotaRepository de la session courante
+            subscription_id: ID de l'abonnement
+            quota_type: Type de quota
+            amount: Quantité à consommer
+            limit: Limite (None = illimité)
+
+        Returns:
+            (accepté, utilisé après l'opération ou utilisé actuel si refusé, ID du quota)
+        """
+        from app.infrastructure.repositories import current_monthly_period
+
+        period_start, period_end = current_monthly_period()
+        key = (subscription_id, quota_type, period_start)
+        quota_id = self._quota_ids.get(key)
+        db_used = None
+        if quota_id is None:
+            quota = await quota_repo.get_or_create_current_quota(subscription_id, quota_type, limit)
+            quota_id, db_used = quota.id, quota.used
+            self._remember(key, quota_id)
+
+        if self.uses_redis:
+            stale = False
+            try:
+                status, used = await self._consume_redis(quota_id, amount, limit, db_used, period_end)
+                if status == -1:
+                    quota = await quota_repo.get_current_quota(subscription_id, quota_type)
+                    if quota is None or quota.id != quota_id:
+                        stale = True
+                    else:
+                        status, used = await self._run_consume(quota_id, amount, limit, quota.used, period_end)
+                if not stale:
+                    return status == 1, int(used), quota_id
+            except Exception as e:
+                if not self._is_redis_error(e):
+                    raise
+                logger.warning(f"Quota counter {quota_id} consumed in database (Redis unavailable): {str(e)}")
+                self._degraded.add(quota_id)
+            if stale:
+                # La ligne n'existe plus : ID en mémoire périmé
+                self._quota_ids.pop(key, None)
+                return await self.consume(quota_repo, subscription_id, quota_type, amount, limit)
+
+        used = await quota_repo.increment_used(quota_id, amount, limit)
+        if used is not None:
+            return True, used, quota_id
+
+        current = await quota_repo.get_used(quota_id)
+        if current is None:
+            # La ligne n'existe plus : ID en mémoire périmé
+            self._quota_ids.pop(key, None)
+            return await self.consume(quota_repo, subscription_id, quota_type, amount, limit)
+        return False, current, quota_id
+
+    @staticmethod
+    def _is_redis_error(error: Exception) -> bool:
+        from redis.exceptions import RedisError
+
+        return isinstance(error, (RedisError, OSError, asyncio.TimeoutError))
+
+    async def _consume_redis(self, quota_id: int, amount: int, limit: Optional[int], db_used, period_end) -> Tuple[int, int]:
+        self._get_redis()
+        if quota_id in self._degraded:
+            # Des incréments ont été faits en base pendant la panne : repartir de la base
+            await self._client.delete(self._key(quota_id))
+            self._degraded.discard(quota_id)
+            db_used = None
+        return await self._run_consume(quota_id, amount, limit, db_used, period_end)
+
+    async def _run_consume(self, quota_id: int, amount: int, limit: Optional[int], db_used, period_end) -> Tuple[int, int]:
+        status, used = await self._consume(
+            keys=[self._key(quota_id), self.deltas_key],
+            args=[amount, -1 if limit is None else limit, "" if db_used is None else db_used, self._ttl_seconds(period_end), quota_id],
+        )
+        return int(status), int(used)
+
+    def _remember(self, key: Tuple[int, str, datetime], quota_id: int) -> None:
+        # Les IDs des périodes passées ne servent plus
+        period_start = key[2]
+        for stale in [k for k in self._quota_ids if k[2] != period_start]:
+            del self._quota_ids[stale]
+        self._quota_ids[key] = quota_id
+
+    async def refund(self, quota_repo, quota, amount: int) -> None:
+        """Rembourse une consommation (annulation de réservation)"""
+        if self.uses_redis:
+            try:
+                await self._consume_redis(quota.id, -amount, None, quota.used, quota.period_end)
+                return
+            except Exception as e:
+                if not self._is_redis_error(e):
+                    raise
+                logger.warning(f"Quota counter {quota.id} refunded in database (Redis unavailable): {str(e)}")
+                self._degraded.add(quota.id)
+
+        await quota_repo.decrement_used(quota.id, amount)
+
+    async def current_used(self, quota) -> int:
+        """Consommation courante d'un quota (compteur Redis s'il existe, sinon la base)"""
+        if self.uses_redis:
+            try:
+                value = await self._get_redis().get(self._key(quota.id))
+                if value is not None:
+                    return int(value)
+            except Exception as e:
+                logger.warning(f"Failed to read quota counter {quota.id} from Redis: {str(e)}")
+        return quota.used
+
+    async def invalidate(self, quota_id: int) -> None:
+        """Oublie le compteur Redis d'un quota réinitialisé en base"""
+        if not self.uses_redis:
+            return
+        client = self._get_redis()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(quota_id))
+            pipe.hdel(self.deltas_key, quota_id)
+            await pipe.execute()
+
+    async def reconcile(self, session_factory) -> int:
+        """
+        Reporte en base les incréments cumulés dans Redis
+
+        Returns:
+            int: Nombre de quotas mis à jour
+        """
+        if not self.uses_redis:
+            return 0
+
+        self._get_redis()
+        raw = await self._drain(keys=[self.deltas_key])
+        deltas = {int(raw[i]): int(raw[i + 1]) for i in range(0, len(raw), 2)}
+        deltas = {quota_id: delta for quota_id, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+
+        from app.infrastructure.repositories import QuotaRepository
+
+        try:
+            async with session_factory() as session:
+                quota_repo = QuotaRepository(session)
+                for quota_id, delta in deltas.items():
+                    await quota_repo.apply_delta(quota_id, delta)
+                await session.commit()
+        except Exception:
+            # Remettre les deltas pour le prochain passage
+            async with self._client.pipeline(transaction=True) as pipe:
+                for quota_id, delta in deltas.items():
+                    pipe.hincrby(self.deltas_key, quota_id, delta)
+                await pipe.execute()
+            raise
+
+        return len(deltas)
+
+    async def start(self, session_factory, interval_seconds: float):
+        """Démarre la réconciliation périodique (sans effet sans Redis)"""
+        if self.uses_redis and self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory, interval_seconds))
+
+    async def stop(self, session_factory=None):
+        """Arrête la réconciliation et reporte les derniers incréments"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if session_factory is not None and self.uses_redis:
+            try:
+                await self.reconcile(session_factory)
+            except Exception as e:
+                logger.warning(f"Final quota reconciliation failed: {str(e)}")
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _run(self, session_factory, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                updated = await self.reconcile(session_factory)
+                if updated:
+                    logger.info(f"Reconciled {updated} quota counters")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Quota reconciliation failed: {str(e)}")
+
+
+# Instance globale
+quota_counter = QuotaCounter(settings.REDIS_URL)
@@ -1,12 +1,33 @@
 """
 Repositories pour l'accès aux données
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
+import uuid
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, update, case, func, and_
+from sqlalchemy.exc import IntegrityError
 
-from app.domain.models import Plan, Subscription, Payment, Invoice, Quota
+from app.domain.models import (
+    Plan,
+    Subscription,
+    Payment,
+    Invoice,
+    Quota,
+    QuotaReservation,
+    QuotaReservationStatus,
+)
+
+
+def current_monthly_period() -> Tuple[datetime, datetime]:
+    """Retourne (début, fin) de la période mensuelle courante"""
+    now = datetime.utcnow()
+    period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if period_start.month == 12:
+        period_end = period_start.replace(year=period_start.year + 1, month=1)
+    else:
+        period_end = period_start.replace(month=period_start.month + 1)
+    return period_start, period_end
 
 
 class PlanRepository:
@@ -156,12 +177,7 @@ class QuotaRepository:
         """Récupère le quota actuel pour une période"""
         if not period_start or not period_end:
             # Période mensuelle par défaut
-            now = datetime.utcnow()
-            period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            if period_start.month == 12:
-                period_end = period_start.replace(year=period_start.year + 1, month=1)
-            else:
-                period_end = period_start.replace(month=period_start.month + 1)
+            period_start, period_end = current_monthly_period()
         
         statement = select(Quota).where(
             Quota.subscription_id == subscription_id,
@@ -181,20 +197,15 @@ class QuotaRepository:
         period_start: Optional[datetime] = None,
         period_end: Optional[datetime] = None
     ) -> Quota:
-        """Crée ou met à jour un quota"""
+        """Crée ou met à jour un quota (incrément atomique de `used`)"""
         quota = await self.get_current_quota(subscription_id, quota_type, period_start, period_end)
         
         if quota:
-            quota.used += amount
-            quota.updated_at = datetime.utcnow()
+            if amount:
+                await self.increment_used(quota.id, amount)
         else:
             if not period_start or not period_end:
-                now = datetime.utcnow()
-                period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                if period_start.month == 12:
-                    period_end = period_start.replace(year=period_start.year + 1, month=1)
-                else:
-                    period_end = period_start.replace(month=period_start.month + 1)
+                period_start, period_end = current_monthly_period()
             
             quota = Quota(
                 subscription_id=subscription_id,
@@ -209,6 +220,157 @@ class QuotaRepository:
         await self.session.commit()
         await self.session.refresh(quota)
         return quota
+    
+    async def get_or_create_current_quota(
+        self,
+        subscription_id: int,
+        quota_type: str,
+        limit: Optional[int] = None
+    ) -> Quota:
+        """Récupère le quota de la période courante, en le créant (used=0) si besoin"""
+        quota = await self.get_current_quota(subscription_id, quota_type)
+        if quota:
+            return quota
+        
+        period_start, period_end = current_monthly_period()
+        quota = Quota(
+            subscription_id=subscription_id,
+            quota_type=quota_type,
+            limit=limit,
+            used=0,
+            period_start=period_start,
+            period_end=period_end,
+        )
+        self.session.add(quota)
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            # Créé entre-temps par un appel concurrent
+            await self.session.rollback()
+            quota = await self.get_current_quota(subscription_id, quota_type)
+        return quota
+    
+    async def increment_used(self, quota_id: int, amount: int, limit: Optional[int] = None) -> Optional[int]:
+        """
+        Incrémente `used` en une seule requête, si la limite le permet
+        
+        UPDATE quotas SET used = used + :amount WHERE id = :id AND used + :amount <= :limit RETURNING used
+        
+        Returns:
+            La nouvelle valeur de `used`, ou None si la limite serait dépassée
+        """
+        statement = update(Quota).where(Quota.id == quota_id)
+        if limit is not None:
+            statement = statement.where(Quota.used + amount <= limit)
+        statement = statement.values(
+            used=Quota.used + amount,
+            updated_at=datetime.utcnow()
+        ).returning(Quota.used).execution_options(synchronize_session=False)
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+    
+    async def decrement_used(self, quota_id: int, amount: int) -> None:
+        """Décrémente `used` en une seule requête (sans descendre sous 0)"""
+        statement = update(Quota).where(Quota.id == quota_id).values(
+            used=case((Quota.used > amount, Quota.used - amount), else_=0),
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+        await self.session.execute(statement)
+    
+    async def apply_delta(self, quota_id: int, delta: int) -> None:
+        """Reporte un delta de consommation accumulé hors base (compteurs Redis)"""
+        statement = update(Quota).where(Quota.id == quota_id).values(
+            used=Quota.used + delta,
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+        await self.session.execute(statement)
+    
+    async def get_used(self, quota_id: int) -> Optional[int]:
+        """Lit la valeur courante de `used` en base (None si le quota n'existe pas)"""
+        result = await self.session.execute(select(Quota.used).where(Quota.id == quota_id))
+        return result.scalar_one_or_none()
+    
+    async def reserve(
+        self,
+        subscription_id: int,
+        company_id: int,
+        quota_type: str,
+        amount: int,
+        limit: Optional[int],
+        ttl_seconds: int,
+    ) -> Tuple[Optional[QuotaReservation], int]:
+        """
+        Vérifie et consomme un quota de façon atomique, et enregistre la réservation
+        
+        La vérification de limite et l'incrément sont faits en une opération par
+        le moteur de compteurs (voir quota_counter.py).
+        
+        Returns:
+            (réservation, utilisé) ; réservation vaut None si la limite serait dépassée
+        """
+        from app.infrastructure.quota_counter import quota_counter
+        
+        allowed, used, quota_id = await quota_counter.consume(self, subscription_id, quota_type, amount, limit)
+        if not allowed:
+            await self.session.commit()
+            return None, used
+        
+        now = datetime.utcnow()
+        reservation = QuotaReservation(
+            id=uuid.uuid4().hex,
+            quota_id=quota_id,
+            company_id=company_id,
+            amount=amount,
+            expires_at=now + timedelta(seconds=ttl_seconds),
+        )
+        self.session.add(reservation)
+        await self.session.commit()
+        return reservation, used
+    
+    async def get_reservation(self, reservation_id: str) -> Optional[QuotaReservation]:
+        """Récupère une réservation par ID"""
+        return await self.session.get(QuotaReservation, reservation_id)
+    
+    async def commit_reservation(self, reservation: QuotaReservation) -> QuotaReservation:
+        """Confirme une réservation (la consommation devient définitive)"""
+        if reservation.status == QuotaReservationStatus.RESERVED:
+            reservation.status = QuotaReservationStatus.COMMITTED
+            reservation.updated_at = datetime.utcnow()
+            self.session.add(reservation)
+            await self.session.commit()
+            await self.session.refresh(reservation)
+        return reservation
+    
+    async def release_reservation(self, reservation_id: str) -> Optional[QuotaReservation]:
+        """
+        Annule une réservation et rembourse le quota consommé
+        
+        Sans effet si la réservation est déjà confirmée, annulée ou expirée.
+        """
+        statement = select(QuotaReservation).where(
+            QuotaReservation.id == reservation_id
+        ).with_for_update()
+        result = await self.session.execute(statement)
+        reservation = result.scalar_one_or_none()
+        if not reservation:
+            return None
+        
+        now = datetime.utcnow()
+        if reservation.status != QuotaReservationStatus.RESERVED or reservation.expires_at <= now:
+            await self.session.commit()
+            return reservation
+        
+        from app.infrastructure.quota_counter import quota_counter
+        
+        quota = await self.session.get(Quota, reservation.quota_id)
+        if quota:
+            await quota_counter.refund(self, quota, reservation.amount)
+        
+        reservation.status = QuotaReservationStatus.RELEASED
+        reservation.updated_at = now
+        await self.session.commit()
+        await self.session.refresh(reservation)
+        return reservation
 
 
 class InvoiceRepository:
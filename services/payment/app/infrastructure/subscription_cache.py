@@ -0,0 +1,155 @@
+"""
+Cache en mémoire des plans et des abonnements par entreprise
+
+Les vérifications de quota et d'abonnement relisent l'abonnement puis le plan à
+chaque requête. Les plans ne changent presque jamais (seed au démarrage) : ils
+sont gardés PLAN_CACHE_TTL_SECONDS. Les abonnements sont gardés
+SUBSCRIPTION_CACHE_TTL_SECONDS et invalidés par les webhooks Stripe
+(checkout terminé, abonnement modifié ou supprimé, facture payée).
+
+Le cache est propre au process : sur une autre instance du service, une
+modification est visible au plus tard à l'expiration du TTL.
+
+Les objets retournés sont des copies détachées de toute session : ils ne
+doivent pas être modifiés ni ajoutés à une session.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.domain.models import Plan, Subscription, SubscriptionStatus
+
+# Statuts retenus selon le type de lookup
+ACTIVE_STATUSES = (SubscriptionStatus.ACTIVE,)
+ACTIVE_OR_TRIALING_STATUSES = (SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIALING)
+
+
+def _detached_copy(instance):
+    """Copie d'un modèle SQLModel, sans lien avec la session d'origine"""
+    return type(instance)(**instance.model_dump())
+
+
+class PlanCache:
+    """Cache des plans par ID"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._plans: Dict[int, Tuple[Optional[Plan], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, session: AsyncSession, plan_id: int) -> Optional[Plan]:
+        """Retourne le plan (chargé depuis la base au premier accès)"""
+        entry = self._plans.get(plan_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        plan = await session.get(Plan, plan_id)
+        plan = _detached_copy(plan) if plan else None
+        self._plans[plan_id] = (plan, time.monotonic() + self.ttl_seconds)
+        return plan
+
+    def invalidate(self, plan_id: Optional[int] = None) -> None:
+        """Oublie un plan (tous si plan_id est None)"""
+        if plan_id is None:
+            self._plans.clear()
+        else:
+            self._plans.pop(plan_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._plans), "hits": self.hits, "misses": self.misses}
+
+
+class SubscriptionCache:
+    """Cache LRU borné des abonnements par entreprise, avec TTL court"""
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        # (company_id, statuts) -> (abonnement ou None, expire_at)
+        self._entries: "OrderedDict[Tuple[int, tuple], Tuple[Optional[Subscription], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_by_company_id(
+        self,
+        session: AsyncSession,
+        company_id: int,
+        statuses: tuple = ACTIVE_STATUSES
+    ) -> Optional[Subscription]:
+        """
+        Retourne l'abonnement le plus récent de l'entreprise dans l'un des statuts donnés
+
+        L'absence d'abonnement est aussi mise en cache (jusqu'au TTL ou à l'invalidation).
+        """
+        key = (company_id, statuses)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        statement = select(Subscription).where(
+            Subscription.company_id == company_id,
+            Subscription.status.in_(statuses)
+        ).order_by(Subscription.created_at.desc())
+        result = await session.execute(statement)
+        subscription = result.scalars().first()
+        subscription = _detached_copy(subscription) if subscription else None
+
+        if self.ttl_seconds > 0 and self.max_size > 0:
+            self._entries[key] = (subscription, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return subscription
+
+    def invalidate(self, company_id: int) -> None:
+        """Oublie les abonnements d'une entreprise"""
+        for key in [key for key in self._entries if key[0] == company_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Instances globales
+plan_cache = PlanCache(ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS)
+subscription_cache = SubscriptionCache(
+    ttl_seconds=settings.SUBSCRIPTION_CACHE_TTL_SECONDS,
+    max_size=settings.SUBSCRIPTION_CACHE_MAX_SIZE,
+)
+
+
+async def get_subscription_with_plan(
+    session: AsyncSession,
+    company_id: int,
+    statuses: tuple = ACTIVE_STATUSES
+) -> Tuple[Optional[Subscription], Optional[Plan]]:
+    """Abonnement de l'entreprise et son plan, depuis le cache (zéro requête si à jour)"""
+    subscription = await subscription_cache.get_by_company_id(session, company_id, statuses)
+    if subscription is None:
+        return None, None
+    return subscription, await plan_cache.get(session, subscription.plan_id)
+
+
+def invalidate_company_subscription(company_id: Optional[int]) -> None:
+    """À appeler après toute création ou modification d'abonnement"""
+    if company_id is not None:
+        subscription_cache.invalidate(company_id)
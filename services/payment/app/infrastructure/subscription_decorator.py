@@ -8,7 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models import PlanType, SubscriptionStatus
 from app.infrastructure.database import get_session
-from app.infrastructure.repositories import SubscriptionRepository, PlanRepository
+from app.infrastructure.subscription_cache import (
+    ACTIVE_OR_TRIALING_STATUSES,
+    plan_cache,
+    subscription_cache,
+)
 
 
 def require_subscription(plan: Optional[PlanType] = None):
@@ -68,8 +72,9 @@ def require_subscription(plan: Optional[PlanType] = None):
             
             try:
                 # Récupérer l'abonnement actif de l'entreprise
-                subscription_repo = SubscriptionRepository(session)
-                subscription = await subscription_repo.get_active_by_company_id(company_id)
+                subscription = await subscription_cache.get_by_company_id(
+                    session, company_id, ACTIVE_OR_TRIALING_STATUSES
+                )
                 
                 if not subscription:
                     raise HTTPException(
@@ -86,8 +91,7 @@ def require_subscription(plan: Optional[PlanType] = None):
                 
                 # Si un plan minimum est requis, vérifier le plan
                 if plan is not None:
-                    plan_repo = PlanRepository(session)
-                    current_plan = await plan_repo.get_by_id(subscription.plan_id)
+                    current_plan = await plan_cache.get(session, subscription.plan_id)
                     
                     if not current_plan:
                         raise HTTPException(
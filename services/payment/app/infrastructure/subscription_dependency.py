@@ -7,7 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models import PlanType, SubscriptionStatus
 from app.infrastructure.database import get_session
-from app.infrastructure.repositories import SubscriptionRepository, PlanRepository
+from app.infrastructure.subscription_cache import (
+    ACTIVE_OR_TRIALING_STATUSES,
+    plan_cache,
+    subscription_cache,
+)
 
 
 async def require_subscription(
@@ -38,8 +42,9 @@ async def require_subscription(
             ...
     """
     # Récupérer l'abonnement actif de l'entreprise
-    subscription_repo = SubscriptionRepository(session)
-    subscription = await subscription_repo.get_active_by_company_id(company_id)
+    subscription = await subscription_cache.get_by_company_id(
+        session, company_id, ACTIVE_OR_TRIALING_STATUSES
+    )
     
     if not subscription:
         raise HTTPException(
@@ -56,8 +61,7 @@ async def require_subscription(
     
     # Si un plan minimum est requis, vérifier le plan
     if plan is not None:
-        plan_repo = PlanRepository(session)
-        current_plan = await plan_repo.get_by_id(subscription.plan_id)
+        current_plan = await plan_cache.get(session, subscription.plan_id)
         
         if not current_plan:
             raise HTTPException(
@@ -7,7 +7,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import payments, subscriptions, plans, webhooks, quotas, invoices, stats
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
-from app.infrastructure.database import init_db
+from app.infrastructure.http_client import close_http_clients, http_client_metrics
+from app.infrastructure.database import init_db, AsyncSessionLocal
+from app.infrastructure.quota_counter import quota_counter
+from app.infrastructure.subscription_cache import plan_cache, subscription_cache
 
 app = FastAPI(
     title="Payment Service",
@@ -46,6 +49,15 @@ async def startup_event():
     # Créer les plans par défaut s'ils n'existent pas
     from app.infrastructure.seed import seed_default_plans
     await seed_default_plans()
+    # Report périodique des compteurs de quota Redis vers la table quotas
+    await quota_counter.start(AsyncSessionLocal, settings.QUOTA_RECONCILE_INTERVAL_SECONDS)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre : report des compteurs de quota, fermeture des pools HTTP inter-services"""
+    await quota_counter.stop(AsyncSessionLocal)
+    await close_http_clients()
 
 
 @app.get("/health", tags=["Health"])
@@ -58,6 +70,21 @@ async def health_check():
     }
 
 
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
+@app.get("/health/caches", tags=["Health"])
+async def caches_metrics():
+    """Statistiques des caches de plans et d'abonnements"""
+    return {
+        "plans": plan_cache.stats(),
+        "subscriptions": subscription_cache.stats(),
+    }
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
@@ -4,15 +4,23 @@ Endpoints pour l'indexation et la consultation des candidats
 from fastapi import APIRouter, HTTPException, status, Request, Depends
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
+import asyncio
 import httpx
 import logging
 
 from app.infrastructure.candidate_indexer import index_candidate_async, bulk_index_candidates
 from app.infrastructure.elasticsearch import es_client
-from app.infrastructure.quota_middleware import require_quota_and_log, use_quota, log_access, get_service_token_header
+from app.infrastructure.search_cache import search_cache
+from app.infrastructure.quota_middleware import (
+    require_quota_and_log,
+    run_with_quota_reservation,
+    schedule_access_log,
+    get_service_token_header,
+)
 from app.infrastructure.auth import get_current_user, TokenData
 from app.infrastructure.internal_auth import verify_internal_token
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +78,22 @@ class BulkIndexRequest(BaseModel):
     candidates: List[CandidateIndexRequest] = Field(description="Liste des candidats à indexer")
 
 
+class CandidatePartialUpdate(BaseModel):
+    """Champs modifiables sans réindexer le document complet (admin : évaluation, statut)"""
+    admin_score: Optional[float] = Field(default=None, description="Score admin /5")
+    admin_report: Optional[Dict[str, Any]] = Field(default=None, description="Rapport d'évaluation admin")
+    status: Optional[str] = Field(default=None, description="Statut du candidat")
+    is_verified: Optional[bool] = Field(default=None, description="Statut de vérification")
+    availability: Optional[str] = Field(default=None, description="Disponibilité du candidat")
+    photo_url: Optional[str] = Field(default=None, description="URL de la photo de profil")
+
+
+class BulkPartialUpdateRequest(BaseModel):
+    """Schéma pour appliquer les mêmes valeurs de champs à plusieurs candidats"""
+    candidate_ids: List[int] = Field(min_length=1, max_length=10000, description="IDs des candidats")
+    fields: CandidatePartialUpdate
+
+
 @router.post("/index", status_code=status.HTTP_201_CREATED)
 async def index_candidate_endpoint(
     request: CandidateIndexRequest,
@@ -137,6 +161,56 @@ async def bulk_index_candidates_endpoint(
         )
 
 
+@router.patch("/index/{candidate_id}", status_code=status.HTTP_200_OK)
+async def update_candidate_in_index(
+    candidate_id: int,
+    request: CandidatePartialUpdate,
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Met à jour quelques champs d'un candidat indexé (_update avec doc partiel)
+
+    Seuls les champs présents dans le corps sont modifiés. 404 si le candidat
+    n'est pas indexé : l'appelant l'indexe alors en entier.
+
+    Endpoint interne - nécessite un token de service.
+    """
+    fields = request.model_dump(exclude_unset=True)
+    if not fields:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No field to update")
+    await es_client.update_document(str(candidate_id), fields)
+    await search_cache.invalidate()
+    return {
+        "message": "Candidate updated in index",
+        "candidate_id": candidate_id,
+        "updated_fields": sorted(fields),
+    }
+
+
+@router.post("/index/update-by-query", status_code=status.HTTP_200_OK)
+async def bulk_update_candidates_in_index(
+    request: BulkPartialUpdateRequest,
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Applique les mêmes valeurs de champs à plusieurs candidats (_update_by_query)
+
+    Endpoint interne - nécessite un token de service.
+    """
+    fields = request.fields.model_dump(exclude_unset=True)
+    if not fields:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No field to update")
+    updated = await es_client.update_by_query([str(candidate_id) for candidate_id in request.candidate_ids], fields)
+    if updated:
+        await search_cache.invalidate()
+    return {
+        "message": "Candidates updated in index",
+        "updated": updated,
+        "total": len(request.candidate_ids),
+        "updated_fields": sorted(fields),
+    }
+
+
 @router.delete("/index/{candidate_id}", status_code=status.HTTP_200_OK)
 async def delete_candidate_from_index(
     candidate_id: int,
@@ -149,6 +223,7 @@ async def delete_candidate_from_index(
     """
     try:
         await es_client.delete_document(str(candidate_id))
+        await search_cache.invalidate()
         return {
             "message": "Candidate removed from index",
             "candidate_id": candidate_id
@@ -182,6 +257,69 @@ async def get_candidate_from_index(candidate_id: int):
         )
 
 
+async def _fetch_candidate_profile(candidate_id: int, service_headers: dict) -> dict:
+    """Récupère le profil depuis Candidate Service avec un token de service interne"""
+    candidate_url = f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}"
+    logger.info(f"Calling candidate service: {candidate_url} with service token for candidate_id={candidate_id}")
+    
+    async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=10.0) as client:
+        response = await client.get(
+            candidate_url,
+            headers=service_headers  # Utiliser le token de service interne
+        )
+    
+    logger.info(f"Candidate service response status: {response.status_code} for candidate_id={candidate_id}")
+    if response.status_code == 200:
+        return response.json()
+    
+    logger.error(f"Candidate service error response: {response.text}")
+    if response.status_code == 404:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate profile not found"
+        )
+    elif response.status_code == 403:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this profile"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Error fetching candidate profile: {response.text}"
+    )
+
+
+async def _fetch_search_metadata(candidate_id: int) -> dict:
+    """Récupère les métadonnées de l'index ElasticSearch (jamais bloquant)"""
+    try:
+        await es_client.connect()
+        es_result = await es_client.client.get(
+            index=settings.ELASTICSEARCH_INDEX_NAME,
+            id=str(candidate_id)
+        )
+        es_data = es_result.get("_source", {})
+        
+        # Ajouter le score de pertinence et autres métadonnées
+        return {
+            "is_indexed": True,
+            "admin_score": es_data.get("admin_score"),
+            "is_verified": es_data.get("is_verified", False)
+        }
+    except Exception:
+        # Si pas dans l'index, ce n'est pas grave
+        return {"is_indexed": False}
+
+
+async def _fetch_enriched_profile(candidate_id: int, service_headers: dict) -> dict:
+    """Récupère le profil et les métadonnées de l'index en parallèle"""
+    profile_data, search_metadata = await asyncio.gather(
+        _fetch_candidate_profile(candidate_id, service_headers),
+        _fetch_search_metadata(candidate_id)
+    )
+    profile_data["search_metadata"] = search_metadata
+    return profile_data
+
+
 @router.get("/{candidate_id}", status_code=status.HTTP_200_OK)
 async def get_candidate_profile(
     candidate_id: int,
@@ -191,16 +329,13 @@ async def get_candidate_profile(
     """
     Récupère le profil complet d'un candidat (consultation sécurisée)
     
-    Flux de consultation sécurisé :
-    1. Vérifie le quota via Payment Service (POST /quotas/check)
-    2. Si OK, récupère le profil depuis Candidate Service
-    3. Enregistre l'accès via Audit Service
-    4. Décrémente le quota via Payment Service (POST /quotas/use)
+    Flux de consultation sécurisé (appels indépendants exécutés en parallèle) :
+    1. Récupère le profil depuis Candidate Service et les métadonnées ElasticSearch
+    2. Réserve le quota via Payment Service (POST /quotas/reserve, vérification et
+       consommation en un appel) ; la réservation est annulée si le profil n'est pas servi
+    3. Enregistre l'accès via Audit Service en tâche de fond (hors du chemin de la requête)
     
-    Le décorateur @require_quota_and_log gère automatiquement :
-    - La vérification du quota
-    - L'enregistrement de l'accès
-    - La décrémentation du quota
+    La latence est celle de la dépendance la plus lente, et non leur somme.
     """
     try:
         # Valider que candidate_id est valide
@@ -214,12 +349,9 @@ async def get_candidate_profile(
         # Récupérer company_id depuis current_user
         company_id = getattr(current_user, 'company_id', None)
         
-        # Récupérer le profil depuis Candidate Service avec un token de service interne
         # Le service candidate nécessite un token de service pour autoriser l'accès aux recruteurs
         try:
             service_headers = get_service_token_header("search-service")
-            logger.info(f"Generated service token headers for search-service. Keys: {list(service_headers.keys())}")
-            logger.info(f"X-Service-Token present: {'X-Service-Token' in service_headers}, X-Service-Name: {service_headers.get('X-Service-Name')}")
         except Exception as e:
             # Si la génération du token échoue, logger l'erreur et lever une exception
             logger.error(f"Failed to generate service token: {str(e)}", exc_info=True)
@@ -228,104 +360,26 @@ async def get_candidate_profile(
                 detail=f"Failed to generate service token: {str(e)}"
             )
         
-        # Logger l'appel au service candidate
-        candidate_url = f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/{candidate_id}"
-        logger.info(f"Calling candidate service: {candidate_url} with service token for candidate_id={candidate_id}")
-        logger.info(f"Sending headers: {list(service_headers.keys())}")
+        if not company_id:
+            return await _fetch_enriched_profile(candidate_id, service_headers)
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                candidate_url,
-                headers=service_headers  # Utiliser le token de service interne
-            )
-            
-            # Logger la réponse pour débogage
-            logger.info(f"Candidate service response status: {response.status_code} for candidate_id={candidate_id}")
-            if response.status_code != 200:
-                logger.error(f"Candidate service error response: {response.text}")
-                logger.error(f"Response headers: {dict(response.headers)}")
-            
-            if response.status_code == 200:
-                profile_data = response.json()
-                
-                # Enrichir avec les données de l'index ElasticSearch si disponible
-                try:
-                    await es_client.connect()
-                    es_result = await es_client.client.get(
-                        index=settings.ELASTICSEARCH_INDEX_NAME,
-                        id=str(candidate_id)
-                    )
-                    es_data = es_result.get("_source", {})
-                    
-                    # Ajouter le score de pertinence et autres métadonnées
-                    profile_data["search_metadata"] = {
-                        "is_indexed": True,
-                        "admin_score": es_data.get("admin_score"),
-                        "is_verified": es_data.get("is_verified", False)
-                    }
-                except Exception:
-                    # Si pas dans l'index, ce n'est pas grave
-                    profile_data["search_metadata"] = {
-                        "is_indexed": False
-                    }
-                
-                # Enregistrer l'accès (non-bloquant) - seulement si company_id est disponible
-                if company_id:
-                    candidate_email = profile_data.get("email")
-                    first_name = profile_data.get("first_name", "")
-                    last_name = profile_data.get("last_name", "")
-                    candidate_name = f"{first_name} {last_name}".strip() if first_name or last_name else None
-                    
-                    # Récupérer le nom de l'entreprise
-                    company_name = None
-                    try:
-                        async with httpx.AsyncClient(timeout=3.0) as client2:
-                            response2 = await client2.get(
-                                f"{settings.COMPANY_SERVICE_URL}/api/v1/companies/{company_id}",
-                                headers={"Authorization": request.headers.get("Authorization", "")}
-                            )
-                            if response2.status_code == 200:
-                                company_data = response2.json()
-                                company_name = company_data.get("name")
-                    except Exception:
-                        pass  # Non-bloquant
-                    
-                    ip_address = request.client.host if request.client else None
-                    user_agent = request.headers.get("user-agent")
-                    
-                    await log_access(
-                        recruiter_id=current_user.user_id,
-                        recruiter_email=getattr(current_user, 'email', ''),
-                        recruiter_name=None,
-                        company_id=company_id,
-                        company_name=company_name,
-                        candidate_id=candidate_id,
-                        candidate_email=candidate_email,
-                        candidate_name=candidate_name,
-                        access_type="profile_view",
-                        ip_address=ip_address,
-                        user_agent=user_agent
-                    )
-                    
-                    # Décrémenter le quota
-                    await use_quota(company_id, "profile_views", amount=1)
-                
-                return profile_data
-            elif response.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Candidate profile not found"
-                )
-            elif response.status_code == 403:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not authorized to view this profile"
-                )
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error fetching candidate profile: {response.text}"
-                )
+        profile_data = await run_with_quota_reservation(
+            company_id,
+            _fetch_enriched_profile(candidate_id, service_headers),
+            "profile_views"
+        )
+        
+        # Enregistrer l'accès (non-bloquant, en tâche de fond)
+        schedule_access_log(
+            request,
+            current_user,
+            company_id=company_id,
+            candidate_id=candidate_id,
+            profile=profile_data,
+            access_type="profile_view"
+        )
+        
+        return profile_data
     except httpx.TimeoutException:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -1,9 +1,14 @@
 """
 Endpoints d'indexation
 """
-from fastapi import APIRouter, HTTPException, status
-from app.domain.schemas import IndexRequest, CandidateDocument
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.domain.schemas import IndexRequest, CandidateDocument, ReindexRequest, IndexSwapRequest, SynonymSetRequest
 from app.infrastructure.elasticsearch import es_client
+from app.infrastructure.index_versions import index_version_manager
+from app.infrastructure.internal_auth import verify_internal_token
+from app.infrastructure.reindex import reindex_manager
+from app.infrastructure.search_cache import search_cache
+from app.infrastructure.synonyms import synonym_manager
 from datetime import datetime
 
 router = APIRouter()
@@ -16,7 +21,7 @@ async def index_candidate(request: IndexRequest):
     
     Cet endpoint peut être appelé :
     - Directement par l'admin-service après validation
-    - Par un consommateur RabbitMQ (à implémenter)
+    - Sinon, l'indexation passe par le stream d'événements (app/infrastructure/indexing_consumer.py)
     """
     try:
         profile_data = request.profile_data
@@ -98,6 +103,7 @@ async def index_candidate(request: IndexRequest):
             document=document,
             document_id=str(request.candidate_id)
         )
+        await search_cache.invalidate()
         
         return {
             "message": "Candidate profile indexed successfully",
@@ -117,6 +123,7 @@ async def remove_candidate_from_index(candidate_id: int):
     """
     try:
         await es_client.delete_document(str(candidate_id))
+        await search_cache.invalidate()
         return {
             "message": "Candidate profile removed from index",
             "candidate_id": candidate_id,
@@ -127,3 +134,128 @@ async def remove_candidate_from_index(candidate_id: int):
             detail=f"Failed to remove candidate from index: {str(e)}"
         )
 
+
+@router.post("/reindex", status_code=status.HTTP_202_ACCEPTED)
+async def start_reindex(
+    request: ReindexRequest,
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Lance la réindexation complète des profils validés depuis le Candidate Service
+
+    La réindexation tourne en tâche de fond ; suivre sa progression avec
+    GET /reindex. Avec resume=true, elle reprend au dernier checkpoint.
+
+    Endpoint interne - nécessite un token de service.
+    """
+    try:
+        state = reindex_manager.start(target_index=request.target_index, resume=request.resume)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return state
+
+
+@router.get("/reindex")
+async def get_reindex_status(service_info: dict = Depends(verify_internal_token)):
+    """Progression de la dernière réindexation (documents indexés, docs/s, checkpoint)"""
+    state = reindex_manager.status()
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No reindex job has been started")
+    return state
+
+
+@router.post("/reindex/cancel")
+async def cancel_reindex(service_info: dict = Depends(verify_internal_token)):
+    """Interrompt la réindexation en cours (reprise possible depuis le checkpoint)"""
+    if not await reindex_manager.cancel():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="No reindex job is running")
+    return reindex_manager.status()
+
+
+@router.get("/versions")
+async def get_index_versions(service_info: dict = Depends(verify_internal_token)):
+    """Versions de l'index, version servie et migration en cours"""
+    return await index_version_manager.status()
+
+
+@router.post("/versions/migrate", status_code=status.HTTP_202_ACCEPTED)
+async def start_index_migration(
+    request: ReindexRequest,
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Crée la version suivante de l'index et la remplit en tâche de fond
+
+    Les indexations sont écrites dans les deux versions jusqu'à la bascule ; la
+    recherche reste servie par la version courante. Une version créée par cet
+    appel est remplie depuis le début ; resume ne s'applique qu'à la reprise
+    d'une version déjà en construction (réindexation arrêtée).
+
+    Endpoint interne - nécessite un token de service.
+    """
+    try:
+        return await index_version_manager.start_migration(resume=request.resume)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/versions/swap")
+async def swap_index_version(
+    request: IndexSwapRequest,
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Bascule atomiquement la lecture et l'écriture sur la nouvelle version
+
+    409 si la réindexation a des documents en échec, sauf avec force=true.
+    """
+    try:
+        return await index_version_manager.swap(delete_old=request.delete_old, force=request.force)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/versions/abort")
+async def abort_index_migration(service_info: dict = Depends(verify_internal_token)):
+    """Abandonne la version en construction et arrête la double écriture"""
+    try:
+        return await index_version_manager.abort_migration()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.get("/synonyms")
+async def list_synonym_sets(service_info: dict = Depends(verify_internal_token)):
+    """Jeux de synonymes appliqués à la recherche"""
+    return await synonym_manager.list_sets()
+
+
+@router.get("/synonyms/{set_id}")
+async def get_synonym_set(set_id: str, service_info: dict = Depends(verify_internal_token)):
+    """Règles d'un jeu de synonymes"""
+    try:
+        return await synonym_manager.get_set(set_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+
+
+@router.put("/synonyms/{set_id}")
+async def update_synonym_set(
+    set_id: str,
+    request: SynonymSetRequest,
+    service_info: dict = Depends(verify_internal_token)
+):
+    """
+    Remplace les règles d'un jeu de synonymes, sans réindexation
+
+    Les search analyzers de l'index sont rechargés et le cache de recherche est
+    invalidé : les recherches suivantes utilisent les nouvelles règles.
+
+    Endpoint interne - nécessite un token de service.
+    """
+    try:
+        return await synonym_manager.put_set(set_id, request.rules)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
@@ -2,19 +2,26 @@
 Endpoints de recherche
 """
 import logging
+import time
 from typing import List
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, Query, Depends, HTTPException, status
 from app.domain.schemas import (
     SearchRequest, 
     SearchResponse, 
     SearchResult,
     PostSearchRequest,
     PostSearchResponse,
-    PostSearchResult
+    PostSearchResult,
+    SuggestResponse
 )
+from app.core.config import settings
 from app.infrastructure.elasticsearch import es_client
 from app.infrastructure.search_builder import SearchQueryBuilder
 from app.infrastructure.post_search_builder import PostSearchQueryBuilder
+from app.infrastructure.search_cache import search_cache
+from app.infrastructure.facets import facet_engine
+from app.infrastructure.search_cursor import apply_cursor, decode_cursor, encode_cursor
+from app.infrastructure.suggest import SUGGEST_FIELDS, suggest_engine
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -33,6 +40,7 @@ async def search_candidates(
     locations: str = Query(None, description="Localisations (séparés par des virgules)"),
     page: int = Query(1, ge=1, description="Numéro de page"),
     size: int = Query(20, ge=1, le=100, description="Taille de la page"),
+    include_facets: bool = Query(True, description="Inclure les facettes"),
 ):
     """
     Recherche de candidats avec filtres avancés
@@ -49,6 +57,7 @@ async def search_candidates(
     - **contract_types**: Filtre par types de contrat
     - **locations**: Filtre par localisations
     - **page / size**: Pagination
+    - **include_facets**: Facettes calculées une fois par jeu de filtres puis servies depuis le cache
     
     Exemple de recherche par compétence avec niveau:
     GET /api/v1/search?skills=Python:Expert,React:Advanced
@@ -72,13 +81,25 @@ async def search_candidates(
         locations=locations.split(",") if locations else None,
         page=page,
         size=size,
+        include_facets=include_facets,
     )
     
+    # Réponse déjà calculée pour ces filtres et cette génération de l'index
+    cache_key = await search_cache.key_for("get", search_request)
+    cached = await search_cache.get(cache_key)
+    if cached is not None:
+        return SearchResponse.model_validate(cached)
+    
+    # Facettes déjà calculées pour ces filtres : seuls les résultats sont demandés
+    facets_key, facets = (await facet_engine.lookup(search_request)) if include_facets else (None, None)
+    
     # Construire la requête ElasticSearch
-    es_query = SearchQueryBuilder.build_query(search_request)
+    es_query = SearchQueryBuilder.build_query(search_request, include_facets=include_facets and facets is None)
     
     # Exécuter la recherche
+    started = time.perf_counter()
     result = await es_client.search(es_query)
+    es_ms = (time.perf_counter() - started) * 1000
     
     # Extraire les résultats
     hits = result.get("hits", {})
@@ -101,42 +122,43 @@ async def search_candidates(
             score=hit.get("_score"),
         ))
     
-    # Extraire les facettes (agrégations)
-    aggregations = result.get("aggregations", {})
-    facets = {
-        "sectors": [
-            {"value": bucket["key"], "count": bucket["doc_count"]}
-            for bucket in aggregations.get("sectors", {}).get("buckets", [])
-        ],
-        "main_jobs": [
-            {"value": bucket["key"], "count": bucket["doc_count"]}
-            for bucket in aggregations.get("main_jobs", {}).get("buckets", [])
-        ],
-        "contract_types": [
-            {"value": bucket["key"], "count": bucket["doc_count"]}
-            for bucket in aggregations.get("contract_types", {}).get("buckets", [])
-        ],
-        "locations": [
-            {"value": bucket["key"], "count": bucket["doc_count"]}
-            for bucket in aggregations.get("locations", {}).get("buckets", [])
-        ],
-        "experience_ranges": [
-            {"from": bucket.get("from"), "to": bucket.get("to"), "count": bucket["doc_count"]}
-            for bucket in aggregations.get("experience_ranges", {}).get("buckets", [])
-        ],
-        "admin_score_ranges": [
-            {"from": bucket.get("from"), "to": bucket.get("to"), "count": bucket["doc_count"]}
-            for bucket in aggregations.get("admin_score_ranges", {}).get("buckets", [])
-        ],
-    }
+    # Facettes : celles du cache, sinon celles calculées avec cette page
+    if facets is None and include_facets:
+        facets = await facet_engine.store(facets_key, result.get("aggregations", {}), search_request)
     
-    return SearchResponse(
+    response = SearchResponse(
         total=total,
         page=page,
         size=size,
         results=results,
-        facets=facets,
+        facets=facets or {},
     )
+    await search_cache.set(cache_key, response.model_dump(mode="json"), es_ms)
+    return response
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=2, max_length=50, description="Saisie en cours (préfixe)"),
+    fields: str = Query(",".join(SUGGEST_FIELDS), description="Types de suggestions (séparés par des virgules)"),
+    size: int = Query(5, ge=1, le=10, description="Suggestions par type"),
+):
+    """
+    Suggestions de saisie : titres, métiers, compétences et localisations
+
+    Réponse minimale (valeur + nombre de profils) pour l'autocomplétion, à la
+    place d'une recherche complète à chaque frappe. Les préfixes fréquents sont
+    servis depuis un cache local.
+    """
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in SUGGEST_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown suggestion fields: {', '.join(unknown)}. Allowed: {', '.join(SUGGEST_FIELDS)}",
+        )
+    suggestions = await suggest_engine.suggest(q, requested, size)
+    return SuggestResponse(prefix=q, suggestions=suggestions)
 
 
 @router.post("/search", response_model=PostSearchResponse)
@@ -148,18 +170,42 @@ async def post_search_candidates(request: PostSearchRequest):
     - **min_experience**: Filtre par expérience minimum (filter, plus performant)
     - **skills**: Filtre par compétences (filter, nested query)
     - **location**: Filtre par localisation (filter, exact match)
+    - **projection**: full (défaut) ou card (vignette sans rapport admin ni résumé complet)
     
     Utilise une requête bool avec :
     - **must**: pour le texte libre (recherche floue/fuzzy)
     - **filter**: pour l'expérience et la localisation (plus performant)
     
     Retourne les résultats avec highlight sur les termes recherchés dans le résumé.
+    Les facettes sont calculées une fois par jeu de filtres ; avec
+    include_facets=false, les récupérer via POST /search/facets.
+    
+    Pagination profonde : cursor_pagination=true sur la première page, puis
+    renvoyer next_cursor dans `cursor` pour chaque page suivante (page ignorée).
     """
+    # Mode curseur : point-in-time + search_after (pas de mise en cache, vue propre au client)
+    cursor = decode_cursor(request.cursor, request) if request.cursor else None
+    cursor_mode = cursor is not None or request.cursor_pagination
+    
+    # Réponse déjà calculée pour ces filtres et cette génération de l'index
+    cache_key = None if cursor_mode else await search_cache.key_for("post", request)
+    cached = await search_cache.get(cache_key)
+    if cached is not None:
+        return PostSearchResponse.model_validate(cached)
+    
+    # Facettes déjà calculées pour ces filtres : seuls les résultats sont demandés
+    facets_key, facets = (await facet_engine.lookup(request)) if request.include_facets else (None, None)
+    
     # Construire la requête ElasticSearch avec bool query
-    es_query = PostSearchQueryBuilder.build_query(request)
+    es_query = PostSearchQueryBuilder.build_query(request, include_facets=request.include_facets and facets is None)
+    if cursor_mode:
+        pit_id = cursor["pit"] if cursor else await es_client.open_point_in_time(settings.SEARCH_PIT_KEEP_ALIVE)
+        es_query = apply_cursor(es_query, pit_id, cursor["after"] if cursor else None, settings.SEARCH_PIT_KEEP_ALIVE)
     
     # Exécuter la recherche
+    started = time.perf_counter()
     result = await es_client.search(es_query)
+    es_ms = (time.perf_counter() - started) * 1000
     
     # Extraire les résultats avec highlight amélioré
     hits = result.get("hits", {})
@@ -228,35 +274,40 @@ async def post_search_candidates(request: PostSearchRequest):
             score=hit.get("_score"),
         ))
 
-    # Extraire les agrégations/facettes pour les filtres dynamiques
-    aggregations = result.get("aggregations", {})
-    facets = None
-    if aggregations:
-        facets = {
-            "availability": [
-                {"key": bucket["key"], "count": bucket["doc_count"]}
-                for bucket in aggregations.get("availability_counts", {}).get("buckets", [])
-            ],
-            "contract_types": [
-                {"key": bucket["key"], "count": bucket["doc_count"]}
-                for bucket in aggregations.get("contract_type_counts", {}).get("buckets", [])
-            ],
-            "sectors": [
-                {"key": bucket["key"], "count": bucket["doc_count"]}
-                for bucket in aggregations.get("sector_counts", {}).get("buckets", [])
-            ],
-            "experience_ranges": [
-                {"key": bucket["key"], "from": bucket.get("from"), "to": bucket.get("to"), "count": bucket["doc_count"]}
-                for bucket in aggregations.get("experience_ranges", {}).get("buckets", [])
-            ],
-            "avg_admin_score": aggregations.get("avg_admin_score", {}).get("value"),
-        }
+    # Facettes : celles du cache, sinon celles calculées avec cette page
+    if facets is None and request.include_facets:
+        facets = await facet_engine.store(facets_key, result.get("aggregations", {}), request)
 
-    return PostSearchResponse(
+    # Curseur de la page suivante (le PIT id peut changer d'une réponse à l'autre)
+    page = request.page
+    next_cursor = None
+    if cursor_mode:
+        page = cursor["page"] + 1 if cursor else 1
+        pit_id = result.get("pit_id", pit_id)
+        page_hits = hits.get("hits", [])
+        if len(page_hits) == request.size:
+            next_cursor = encode_cursor(pit_id, page_hits[-1]["sort"], request, page)
+        else:
+            await es_client.close_point_in_time(pit_id)
+
+    response = PostSearchResponse(
         total=total,
-        page=request.page,
+        page=page,
         size=request.size,
         results=results,
         facets=facets,
+        next_cursor=next_cursor,
     )
+    await search_cache.set(cache_key, response.model_dump(mode="json"), es_ms)
+    return response
 
+
+@router.post("/search/facets")
+async def post_search_facets(request: PostSearchRequest):
+    """
+    Facettes seules d'une recherche POST /search/search (page et taille ignorées)
+
+    Permet à l'UI d'afficher les résultats d'abord puis de charger les filtres
+    dynamiques en différé.
+    """
+    return {"facets": await facet_engine.get_facets(request)}
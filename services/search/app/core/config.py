@@ -37,10 +37,89 @@ class Settings(BaseSettings):
     AUDIT_SERVICE_URL: str = Field(default="http://localhost:8008", description="Audit service URL")
     COMPANY_SERVICE_URL: str = Field(default="http://localhost:8005", description="Company service URL")
     AUTH_SERVICE_URL: str = Field(default="http://localhost:8001", description="Auth service URL")
+
+    # Pools HTTP inter-services (voir shared/http_client.py)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=100, description="Max connections per upstream service")
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=50, description="Max idle keep-alive connections per upstream service")
     
     # JWT Validation
     JWT_SECRET_KEY: str = Field(default="", description="JWT secret key for token validation")
     JWT_ALGORITHM: str = Field(default="HS256", description="JWT algorithm")
+    AUTH_VERIFICATION_MODE: str = Field(
+        default="local",
+        description="local: vérification JWT locale + cache ; remote: appel à auth-service /validate à chaque requête"
+    )
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = Field(default=60, description="TTL of validated token claims cache")
+    AUTH_TOKEN_CACHE_MAX_SIZE: int = Field(default=10000, description="Max number of cached validated tokens")
+    AUTH_REVOCATION_CHANNEL: str = Field(default="auth:revocations", description="Redis pub/sub channel for token revocations")
+
+    # Redis (optionnel : révocations de tokens, caches partagés)
+    REDIS_URL: str = Field(default="", description="Redis URL (empty = disabled)")
+
+    # Cache des résultats de recherche (voir app/infrastructure/search_cache.py)
+    SEARCH_CACHE_ENABLED: bool = Field(default=True, description="Cache GET /search and POST /search/search responses")
+    SEARCH_CACHE_TTL_SECONDS: int = Field(default=300, description="TTL of cached search responses")
+    SEARCH_CACHE_LOCAL_MAX_SIZE: int = Field(default=1000, description="Max responses kept in the in-process LRU tier")
+    SEARCH_CACHE_REFRESH_DELAY_SECONDS: float = Field(
+        default=2.0,
+        description="Second invalidation after a write, once Elasticsearch has refreshed (index refresh_interval: 1s); 0 = disabled",
+    )
+
+    # Scripts de boost du function_score enregistrés comme stored scripts (voir post_search_builder.py)
+    SEARCH_USE_STORED_SCRIPTS: bool = Field(default=True, description="Reference stored painless scripts instead of sending them inline")
+
+    # Synonymes (jeux gérés par l'API synonyms d'Elasticsearch, voir app/infrastructure/synonyms.py)
+    SEARCH_PYTHON_SYNONYM_EXPANSION: bool = Field(default=False, description="Append job-title synonyms to the query text (fallback for indices created without managed synonym sets)")
+
+    # Suggestions de saisie (voir app/infrastructure/suggest.py)
+    SUGGEST_CACHE_TTL_SECONDS: float = Field(default=30.0, description="How long suggestions for a prefix are served from the in-process cache")
+    SUGGEST_CACHE_MAX_SIZE: int = Field(default=5000, description="Max prefixes kept in the in-process suggestion cache")
+
+    # Pagination par curseur (point-in-time + search_after, voir app/infrastructure/search_cursor.py)
+    SEARCH_PIT_KEEP_ALIVE: str = Field(default="2m", description="How long a search cursor stays valid between two pages")
+
+    # Réindexation complète depuis le Candidate Service (voir app/infrastructure/reindex.py)
+    REINDEX_PAGE_SIZE: int = Field(default=200, description="Profiles fetched per page from candidate-service")
+    REINDEX_BULK_CHUNK_SIZE: int = Field(default=500, description="Max documents per bulk request")
+    REINDEX_BULK_MAX_CHUNK_BYTES: int = Field(default=10 * 1024 * 1024, description="Max bytes per bulk request")
+    REINDEX_CONCURRENCY: int = Field(default=2, description="Concurrent bulk workers")
+    REINDEX_MAX_PENDING_PAGES: int = Field(default=4, description="Pages fetched ahead of the bulk workers (backpressure)")
+    REINDEX_CHECKPOINT_FILE: str = Field(
+        default="/tmp/search-reindex-checkpoint.json",
+        description="Checkpoint file used when Redis is not configured"
+    )
+
+    # Mode chargement massif (voir app/infrastructure/bulk_indexing.py)
+    BULK_MODE_ENABLED: bool = Field(default=True, description="Disable refresh and replicas during large loads")
+    BULK_MODE_MIN_DOCS: int = Field(default=1000, description="Bulk index requests from this size use the bulk load mode")
+    BULK_REFRESH_INTERVAL: str = Field(default="-1", description="refresh_interval applied during a bulk load")
+    BULK_REPLICAS: int = Field(default=0, description="number_of_replicas applied during a bulk load")
+    BULK_CHUNK_SIZE: int = Field(default=500, description="Max documents per bulk request")
+    BULK_MAX_CHUNK_BYTES: int = Field(default=10 * 1024 * 1024, description="Max bytes per bulk request")
+    BULK_WORKERS: int = Field(default=4, description="Concurrent bulk requests of POST /candidates/index/bulk")
+
+    # Indexation par événements (voir app/infrastructure/indexing_consumer.py)
+    INDEXING_CONSUMER_ENABLED: bool = Field(default=True, description="Consume profile-changed events (requires REDIS_URL)")
+    INDEXING_STREAM_NAME: str = Field(default="search:indexing-events", description="Redis stream of profile-changed events")
+    INDEXING_DLQ_STREAM_NAME: str = Field(default="search:indexing-events:dlq", description="Redis stream of events that kept failing")
+    INDEXING_CONSUMER_GROUP: str = Field(default="search-indexer", description="Consumer group of the indexing consumer")
+    INDEXING_CONSUMER_NAME: str = Field(default="", description="Consumer name (default: hostname)")
+    INDEXING_BATCH_SIZE: int = Field(default=500, description="Max events read per batch")
+    INDEXING_BLOCK_MS: int = Field(default=1000, description="Max wait for new events")
+    INDEXING_COALESCE_MS: int = Field(default=200, description="Extra wait to merge a burst of events into one batch")
+    INDEXING_CLAIM_IDLE_MS: int = Field(default=30000, description="Pending events retried after this idle time")
+    INDEXING_MAX_DELIVERIES: int = Field(default=5, description="Deliveries before an event goes to the dead-letter stream")
+
+    # Logs d'accès vers le service Audit (voir app/infrastructure/audit_publisher.py)
+    AUDIT_INGESTION_MODE: str = Field(
+        default="stream",
+        description="stream: Redis Stream consommé par lots par l'Audit ; batch: file locale vidée sur /audit/batch ; direct: un POST par accès"
+    )
+    AUDIT_STREAM_NAME: str = Field(default="audit:access-logs", description="Redis stream of access log events")
+    AUDIT_STREAM_MAXLEN: int = Field(default=1000000, description="Approximate max length of the audit stream")
+    AUDIT_BATCH_SIZE: int = Field(default=100, description="Max events per POST /audit/batch")
+    AUDIT_BATCH_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0, description="Max delay before the local audit buffer is flushed")
+    AUDIT_BUFFER_MAX_SIZE: int = Field(default=10000, description="Max events kept in the local audit buffer")
 
     # CORS
     CORS_ORIGINS: List[str] = Field(
@@ -28,6 +28,24 @@ class ElasticsearchError(SearchError):
         super().__init__(message, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DocumentNotFoundError(SearchError):
+    """Document absent de l'index (mise à jour partielle impossible)"""
+    def __init__(self, message: str = "Document not found in index"):
+        super().__init__(message, status.HTTP_404_NOT_FOUND)
+
+
+class InvalidCursorError(SearchError):
+    """Curseur de pagination illisible ou utilisé avec d'autres filtres"""
+    def __init__(self, message: str = "Invalid search cursor"):
+        super().__init__(message, status.HTTP_400_BAD_REQUEST)
+
+
+class CursorExpiredError(SearchError):
+    """Point-in-time du curseur expiré : relancer la recherche depuis le début"""
+    def __init__(self, message: str = "Search cursor expired"):
+        super().__init__(message, status.HTTP_410_GONE)
+
+
 async def search_error_handler(request: Request, exc: SearchError):
     """Handler pour les erreurs de recherche"""
     return JSONResponse(
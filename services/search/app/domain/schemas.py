@@ -1,7 +1,7 @@
 """
 Schémas Pydantic pour la validation des données
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
 
 
@@ -58,6 +58,7 @@ class SearchRequest(BaseModel):
     locations: Optional[List[str]] = Field(None, description="Filtre par localisations")
     page: int = Field(1, ge=1, description="Numéro de page")
     size: int = Field(20, ge=1, le=100, description="Taille de la page")
+    include_facets: bool = Field(True, description="Inclure les facettes (sinon les récupérer via /facets)")
 
 
 class ExperienceRange(BaseModel):
@@ -87,6 +88,13 @@ class PostSearchRequest(BaseModel):
     sector: Optional[str] = Field(None, description="Secteur d'activité")
     page: int = Field(1, ge=1, description="Numéro de page")
     size: int = Field(20, ge=1, le=100, description="Taille de la page")
+    include_facets: bool = Field(True, description="Inclure les facettes (sinon les récupérer via POST /search/facets)")
+    cursor_pagination: bool = Field(False, description="Paginer par curseur (point-in-time + search_after) au lieu de page")
+    cursor: Optional[str] = Field(None, description="Curseur de la page suivante (next_cursor de la réponse précédente)")
+    projection: Literal["full", "card"] = Field(
+        "full",
+        description="full: résultat complet (rapport admin inclus) ; card: vignette compacte pour les listes"
+    )
 
 
 class SearchResult(BaseModel):
@@ -139,6 +147,7 @@ class PostSearchResponse(BaseModel):
     size: int
     results: List[PostSearchResult]
     facets: Optional[Dict[str, Any]] = None  # Agrégations pour les filtres dynamiques
+    next_cursor: Optional[str] = None  # Mode curseur : None quand il n'y a plus de résultats
 
 
 class SearchResponse(BaseModel):
@@ -150,7 +159,36 @@ class SearchResponse(BaseModel):
     facets: Dict[str, Any] = {}
 
 
+class Suggestion(BaseModel):
+    """Valeur suggérée et nombre de profils validés qui la portent"""
+    value: str
+    count: int
+
+
+class SuggestResponse(BaseModel):
+    """Schéma de réponse des suggestions de saisie"""
+    prefix: str
+    suggestions: Dict[str, List[Suggestion]]
+
+
 class IndexRequest(BaseModel):
     """Schéma de requête d'indexation"""
     candidate_id: int
     profile_data: Dict[str, Any]
+
+
+class ReindexRequest(BaseModel):
+    """Schéma de requête de réindexation complète"""
+    target_index: Optional[str] = Field(default=None, description="Index cible (défaut: index configuré)")
+    resume: bool = Field(default=True, description="Reprendre depuis le dernier checkpoint")
+
+
+class IndexSwapRequest(BaseModel):
+    """Schéma de requête de bascule vers la nouvelle version de l'index"""
+    delete_old: bool = Field(default=False, description="Supprimer l'ancienne version après la bascule")
+    force: bool = Field(default=False, description="Basculer malgré des documents en échec dans la réindexation")
+
+
+class SynonymSetRequest(BaseModel):
+    """Schéma de mise à jour d'un jeu de synonymes (règles au format Solr)"""
+    rules: List[str] = Field(..., min_length=1, description='Règles "a, b, c" ou "a, b => c"')
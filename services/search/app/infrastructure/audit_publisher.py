@@ -0,0 +1,205 @@
+"""
+Publication des logs d'accès vers le service Audit, hors du chemin de la requête
+
+Modes (AUDIT_INGESTION_MODE) :
+- stream (défaut) : XADD dans le Redis Stream consommé par lots par le service
+  Audit ; sans Redis (ou s'il est injoignable), repli sur le mode batch ;
+- batch : file locale vidée par lots sur POST /api/v1/audit/batch, toutes les
+  AUDIT_BATCH_FLUSH_INTERVAL_SECONDS ou dès AUDIT_BATCH_SIZE événements ;
+- direct : un POST /api/v1/audit par accès (comportement historique).
+
+La file locale est bornée (AUDIT_BUFFER_MAX_SIZE) : au-delà, les événements les
+plus anciens sont abandonnés et comptés (dropped). Elle est vidée à l'arrêt du
+service.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.infrastructure.http_client import service_client
+from app.infrastructure.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "search-service"
+
+
+def _service_headers() -> dict:
+    # Import différé : le chargement du module shared se fait dans quota_middleware
+    from app.infrastructure.quota_middleware import get_service_token_header
+
+    return get_service_token_header(SERVICE_NAME)
+
+
+class AuditPublisher:
+    """Envoi des événements d'accès selon le mode configuré"""
+
+    def __init__(
+        self,
+        mode: str = "stream",
+        stream: str = "audit:access-logs",
+        stream_maxlen: int = 1000000,
+        batch_size: int = 100,
+        flush_interval_seconds: float = 1.0,
+        max_buffer_size: int = 10000,
+    ):
+        self.mode = mode
+        self.stream = stream
+        self.stream_maxlen = stream_maxlen
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffer_size = max_buffer_size
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Métriques
+        self.streamed = 0
+        self.batches_sent = 0
+        self.events_sent = 0
+        self.direct_sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Publie un événement d'accès (ne lève pas d'exception)"""
+        event.setdefault("accessed_at", datetime.utcnow().isoformat())
+
+        if self.mode == "stream":
+            client = get_redis()
+            if client is not None:
+                try:
+                    await client.xadd(
+                        self.stream,
+                        {"event": json.dumps(event)},
+                        maxlen=self.stream_maxlen,
+                        approximate=True,
+                    )
+                    self.streamed += 1
+                    return
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Failed to publish audit event to Redis, buffering locally: {str(e)}")
+
+        if self.mode in ("stream", "batch"):
+            self._enqueue(event)
+            return
+
+        await self._post_direct(event)
+
+    def _enqueue(self, event: Dict[str, Any]) -> None:
+        if len(self._buffer) >= self.max_buffer_size:
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append(event)
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Envoie la file locale par lots
+
+        Un lot refusé est remis en tête de file pour le prochain passage.
+
+        Returns:
+            int: Nombre d'événements envoyés
+        """
+        sent = 0
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not await self._post_batch(batch):
+                self._buffer.extendleft(reversed(batch))
+                while len(self._buffer) > self.max_buffer_size:
+                    self._buffer.pop()
+                    self.dropped += 1
+                break
+            sent += len(batch)
+        return sent
+
+    async def _post_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            async with service_client(settings.AUDIT_SERVICE_URL, timeout=10.0) as client:
+                response = await client.post(
+                    f"{settings.AUDIT_SERVICE_URL}/api/v1/audit/batch",
+                    json={"items": batch},
+                    headers=_service_headers(),
+                )
+            if response.status_code == 201:
+                self.batches_sent += 1
+                self.events_sent += len(batch)
+                return True
+            logger.warning(f"Failed to send audit batch: {response.status_code} - {response.text}")
+        except Exception as e:
+            logger.warning(f"Failed to send audit batch: {str(e)}")
+        self.errors += 1
+        return False
+
+    async def _post_direct(self, event: Dict[str, Any]) -> None:
+        try:
+            async with service_client(settings.AUDIT_SERVICE_URL, timeout=5.0) as client:
+                response = await client.post(
+                    f"{settings.AUDIT_SERVICE_URL}/api/v1/audit",
+                    json=event,
+                    headers=_service_headers(),
+                )
+            if response.status_code == 201:
+                self.direct_sent += 1
+                return
+            logger.warning(f"Failed to log access: {response.status_code} - {response.text}")
+        except Exception as e:
+            logger.warning(f"Failed to log access: {str(e)}")
+        self.errors += 1
+
+    async def stop(self) -> None:
+        """Arrête l'envoi périodique et vide la file locale"""
+        if self._task is not None:
+            # Pas d'annulation : la boucle termine son envoi en cours puis s'arrête
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        if self._buffer:
+            await self.flush()
+        if self._buffer:
+            logger.warning(f"{len(self._buffer)} audit events could not be sent before shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "streamed": self.streamed,
+            "buffered": len(self._buffer),
+            "batches_sent": self.batches_sent,
+            "events_sent": self.events_sent,
+            "direct_sent": self.direct_sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+# Instance globale
+audit_publisher = AuditPublisher(
+    mode=settings.AUDIT_INGESTION_MODE,
+    stream=settings.AUDIT_STREAM_NAME,
+    stream_maxlen=settings.AUDIT_STREAM_MAXLEN,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval_seconds=settings.AUDIT_BATCH_FLUSH_INTERVAL_SECONDS,
+    max_buffer_size=settings.AUDIT_BUFFER_MAX_SIZE,
+)
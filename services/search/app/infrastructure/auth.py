@@ -1,6 +1,7 @@
 """
 Authentification JWT pour le service Search
 """
+import logging
 from typing import Optional
 import httpx
 from fastapi import HTTPException, status, Depends
@@ -8,6 +9,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
+from app.infrastructure.token_cache import token_cache, is_token_revoked
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
@@ -26,19 +31,61 @@ async def get_current_user(
 ) -> TokenData:
     """
     Valide le token JWT et retourne les données de l'utilisateur
-    
-    Le token est validé via le service Auth
+
+    En mode local (AUTH_VERIFICATION_MODE=local avec JWT_SECRET_KEY), le token est
+    vérifié dans le service et mis en cache ; sinon il est validé via le service Auth.
     """
     token = credentials.credentials
-    
+
+    if settings.AUTH_VERIFICATION_MODE == "local" and settings.JWT_SECRET_KEY:
+        return await _verify_token_locally(token)
+
+    return await _validate_token_remotely(token)
+
+
+async def _verify_token_locally(token: str) -> TokenData:
+    """Vérifie signature et expiration localement, avec cache des claims validés"""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    payload = _decode_token(token)
+
+    # Les refresh tokens ne donnent pas accès aux API
+    if payload.get("type") == "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    try:
+        revoked = await is_token_revoked(payload)
+    except Exception as e:
+        # Liste de révocation injoignable : on ne peut pas trancher localement
+        logger.warning(f"Token revocation check failed, falling back to auth service: {str(e)}")
+        return await _validate_token_remotely(token)
+
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+
+    token_data = _token_data_from_payload(payload)
+    token_cache.set(token, token_data, payload)
+    return token_data
+
+
+async def _validate_token_remotely(token: str) -> TokenData:
+    """Valide le token via le service Auth (repli sur un décodage local si indisponible)"""
     try:
         # Appeler le service Auth pour valider le token
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with service_client(settings.AUTH_SERVICE_URL, timeout=5.0) as client:
             response = await client.get(
                 f"{settings.AUTH_SERVICE_URL}/api/v1/auth/validate",
                 headers={"Authorization": f"Bearer {token}"}
             )
-            
+
             if response.status_code == 200:
                 user_data = response.json()
                 return TokenData(
@@ -54,33 +101,51 @@ async def get_current_user(
                 )
     except httpx.RequestError:
         # Fallback: décoder le token localement si le service Auth n'est pas disponible
-        try:
-            if not settings.JWT_SECRET_KEY:
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail="Auth service unavailable and no JWT_SECRET_KEY configured"
-                )
-            
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET_KEY,
-                algorithms=[settings.JWT_ALGORITHM]
-            )
-            user_id: int = payload.get("sub")
-            email: str = payload.get("email", "")
-            roles: list = payload.get("roles", [])
-            company_id: Optional[int] = payload.get("company_id")
-            
-            if user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token"
-                )
-            
-            return TokenData(user_id=user_id, email=email, roles=roles, company_id=company_id)
-        except JWTError:
+        if not settings.JWT_SECRET_KEY:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Auth service unavailable and no JWT_SECRET_KEY configured"
             )
 
+        return _token_data_from_payload(_decode_token(token))
+
+
+def _decode_token(token: str) -> dict:
+    """Décode le token et vérifie sa signature et son expiration"""
+    try:
+        return jwt.decode(
+            token,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+
+def _token_data_from_payload(payload: dict) -> TokenData:
+    """Construit TokenData à partir des claims du token"""
+    sub = payload.get("sub")
+    if sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    # sub est une chaîne (exigence de python-jose), on la convertit en int
+    try:
+        user_id = int(sub)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    return TokenData(
+        user_id=user_id,
+        email=payload.get("email", ""),
+        roles=payload.get("roles", []),
+        company_id=payload.get("company_id")
+    )
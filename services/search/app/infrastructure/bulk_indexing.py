@@ -0,0 +1,171 @@
+"""
+Mode chargement massif de l'index des candidats
+
+Pendant un gros chargement (bulk d'import, remplissage d'une nouvelle version
+par la réindexation), deux réglages de l'index coûtent cher sans rien apporter :
+- refresh_interval (1s par défaut) : un refresh par seconde crée un segment et
+  déclenche des merges ; désactivé (-1), un seul refresh est fait à la fin ;
+- number_of_replicas : chaque document est indexé une seconde fois sur la
+  réplique ; à 0, la réplique est reconstruite en une copie de segments à la fin.
+
+bulk_load_mode les applique le temps du chargement puis restaure les valeurs
+d'origine (une valeur non définie revient au défaut du cluster). Les
+chargements concurrents sur un même index sont comptés : seul le dernier à
+finir restaure les réglages.
+
+parallel_bulk découpe les actions par nombre de documents et par taille, les
+envoie avec plusieurs workers et rend un rapport : documents par seconde et
+erreurs document par document.
+"""
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from elasticsearch.helpers import async_streaming_bulk
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BULK_SETTINGS = ("refresh_interval", "number_of_replicas")
+
+# index -> nombre de chargements en cours
+_active_loads: Dict[str, int] = {}
+# index -> réglages à restaurer (None : non définis, défaut du cluster)
+_original_settings: Dict[str, Dict[str, Optional[str]]] = {}
+_settings_lock = asyncio.Lock()
+
+
+async def _read_settings(client, index: str) -> Dict[str, Optional[str]]:
+    response = await client.indices.get_settings(index=index, name=[f"index.{name}" for name in BULK_SETTINGS])
+    index_settings = next(iter(response.values()), {}).get("settings", {}).get("index", {})
+    return {name: index_settings.get(name) for name in BULK_SETTINGS}
+
+
+@asynccontextmanager
+async def bulk_load_mode(client, indices: List[str]) -> AsyncIterator[None]:
+    """Désactive le refresh et les répliques des index le temps d'un chargement"""
+    entered: List[str] = []
+    async with _settings_lock:
+        for index in indices:
+            if _active_loads.get(index):
+                _active_loads[index] += 1
+                entered.append(index)
+                continue
+            try:
+                _original_settings[index] = await _read_settings(client, index)
+                await client.indices.put_settings(
+                    index=index,
+                    settings={"index": {
+                        "refresh_interval": settings.BULK_REFRESH_INTERVAL,
+                        "number_of_replicas": settings.BULK_REPLICAS,
+                    }},
+                )
+            except Exception as e:
+                # Chargement toujours possible, seulement plus lent
+                logger.warning(f"Failed to enable bulk mode on {index}: {str(e)}")
+                continue
+            _active_loads[index] = 1
+            entered.append(index)
+    try:
+        yield
+    finally:
+        async with _settings_lock:
+            for index in entered:
+                _active_loads[index] -= 1
+                if _active_loads[index]:
+                    continue
+                del _active_loads[index]
+                original = _original_settings.pop(index)
+                try:
+                    await client.indices.put_settings(index=index, settings={"index": original})
+                    await client.indices.refresh(index=index)
+                except Exception as e:
+                    logger.error(f"Failed to restore index settings of {index} ({original}): {str(e)}")
+
+
+def chunk_actions(actions: List[Dict[str, Any]], chunk_size: int, max_chunk_bytes: int) -> List[List[Dict[str, Any]]]:
+    """Découpe les actions en requêtes bulk d'au plus chunk_size documents et max_chunk_bytes octets"""
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_bytes = 0
+    for action in actions:
+        # Ligne d'action + document, au format NDJSON
+        size = len(json.dumps(action.get("_source", {}), default=str).encode()) + 100
+        if current and (len(current) >= chunk_size or current_bytes + size > max_chunk_bytes):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(action)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _item_error(result: Dict[str, Any]) -> Dict[str, Any]:
+    (op_type, item), = result.items()
+    return {
+        "id": item.get("_id"),
+        "index": item.get("_index"),
+        "op_type": op_type,
+        "status": item.get("status"),
+        "error": item.get("error") or item.get("exception"),
+    }
+
+
+async def parallel_bulk(
+    client,
+    actions: List[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+    max_chunk_bytes: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Envoie les actions en requêtes bulk parallèles
+
+    Returns:
+        indexed, failed, errors (une entrée par document en échec), chunks,
+        elapsed_seconds et docs_per_second
+    """
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    max_chunk_bytes = max_chunk_bytes or settings.BULK_MAX_CHUNK_BYTES
+    workers = max(workers or settings.BULK_WORKERS, 1)
+
+    chunks = chunk_actions(actions, chunk_size, max_chunk_bytes)
+    queue: asyncio.Queue = asyncio.Queue()
+    for chunk in chunks:
+        queue.put_nowait(chunk)
+    report: Dict[str, Any] = {"indexed": 0, "failed": 0, "errors": []}
+
+    async def worker() -> None:
+        while not queue.empty():
+            chunk = queue.get_nowait()
+            # Le découpage est déjà fait : une requête bulk par chunk
+            async for ok, result in async_streaming_bulk(
+                client,
+                chunk,
+                chunk_size=len(chunk),
+                max_chunk_bytes=max_chunk_bytes * 2,
+                raise_on_error=False,
+                raise_on_exception=False,
+                max_retries=3,
+                initial_backoff=1,
+            ):
+                if ok:
+                    report["indexed"] += 1
+                else:
+                    report["failed"] += 1
+                    report["errors"].append(_item_error(result))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(workers, len(chunks)))))
+    elapsed = time.perf_counter() - started
+    report.update({
+        "chunks": len(chunks),
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_second": round(report["indexed"] / elapsed, 1) if elapsed > 0 else 0.0,
+    })
+    return report
@@ -4,7 +4,10 @@ Service d'indexation des candidats dans ElasticSearch
 Convertit les données candidat au format ElasticSearch selon le mapping défini.
 """
 from typing import Dict, Any, List, Optional
+from app.core.config import settings
+from app.infrastructure.bulk_indexing import bulk_load_mode, parallel_bulk
 from app.infrastructure.elasticsearch import es_client
+from app.infrastructure.search_cache import search_cache
 
 
 def index_candidate(candidate_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -138,6 +141,78 @@ def index_candidate(candidate_data: Dict[str, Any]) -> Dict[str, Any]:
     return document
 
 
+KNOWN_LANGUAGES = [
+    "français", "anglais", "espagnol", "allemand", "italien",
+    "portugais", "chinois", "arabe", "russe", "mandarin", "japonais",
+]
+
+
+def candidate_data_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertit un profil du Candidate Service (format ProfileDetailResponse) en données candidat
+
+    Même correspondance que l'indexation faite par l'admin à la validation
+    (admin/app/infrastructure/search_client.py), pour que la réindexation produise
+    les mêmes documents.
+    """
+    skills_list = profile.get("skills") or []
+    skills = [
+        {"name": skill.get("name", ""), "level": (skill.get("level") or "").upper()}
+        for skill in skills_list
+        if isinstance(skill, dict)
+    ]
+    educations = [
+        {
+            "diploma": education.get("diploma", ""),
+            "institution": education.get("institution", ""),
+            "level": education.get("level", ""),
+            "graduation_year": education.get("graduation_year"),
+        }
+        for education in profile.get("educations") or []
+        if isinstance(education, dict)
+    ]
+    # Les langues sont stockées comme compétences
+    languages = [
+        {"name": skill.get("name", ""), "level": (skill.get("level") or "").upper() or "INTERMEDIATE"}
+        for skill in skills_list
+        if isinstance(skill, dict)
+        and any(language in (skill.get("name") or "").lower() for language in KNOWN_LANGUAGES)
+    ]
+
+    job_preferences = profile.get("job_preferences")
+    availability = job_preferences.get("availability") if isinstance(job_preferences, dict) else None
+
+    admin_score = profile.get("admin_score")
+    admin_report = profile.get("admin_report")
+    if admin_score is None and isinstance(admin_report, dict):
+        admin_score = admin_report.get("overall_score")
+
+    first_name = profile.get("first_name") or ""
+    last_name = profile.get("last_name") or ""
+    location = f"{profile.get('city') or ''}, {profile.get('country') or ''}".strip(", ")
+
+    return {
+        "candidate_id": profile.get("id"),
+        "full_name": f"{first_name} {last_name}".strip(),
+        "title": profile.get("profile_title") or "",
+        "skills": skills,
+        "educations": educations,
+        "languages": languages,
+        "years_of_experience": profile.get("total_experience") or 0,
+        "location": location,
+        "is_verified": True,
+        "summary": profile.get("professional_summary") or "",
+        "status": "VALIDATED",
+        "main_job": profile.get("main_job") or "",
+        "sector": profile.get("sector") or "",
+        "admin_score": admin_score,
+        "admin_report": admin_report,
+        "photo_url": profile.get("photo_url"),
+        "availability": availability,
+        "validated_at": profile.get("validated_at"),
+    }
+
+
 async def index_candidate_async(candidate_data: Dict[str, Any]) -> bool:
     """
     Indexe un candidat dans ElasticSearch de manière asynchrone
@@ -160,19 +235,21 @@ async def index_candidate_async(candidate_data: Dict[str, Any]) -> bool:
         # Générer un ID basé sur le nom si pas d'ID
         document_id = candidate_data.get("full_name", "").lower().replace(" ", "_")
     
-    # Indexer le document dans l'index configuré (certified_candidates par défaut)
+    # Indexer le document dans chaque version en écriture (alias d'écriture)
     await es_client.connect()
     
     try:
-        await es_client.client.index(
-            index=es_client.index_name,  # Utiliser le nom d'index configuré au lieu de "candidates" en dur
-            id=document_id,
-            document=document
-        )
+        for index in await es_client.write_targets():
+            await es_client.client.index(
+                index=index,
+                id=document_id,
+                document=document
+            )
     except Exception as e:
         from app.core.exceptions import ElasticsearchError
         raise ElasticsearchError(f"Failed to index document: {str(e)}")
     
+    await search_cache.invalidate()
     return True
 
 
@@ -180,13 +257,19 @@ async def bulk_index_candidates(candidates_data: List[Dict[str, Any]]) -> Dict[s
     """
     Indexe plusieurs candidats en une seule opération (bulk)
     
+    Requêtes bulk parallèles (BULK_WORKERS) découpées par nombre et par taille ;
+    à partir de BULK_MODE_MIN_DOCS documents, le refresh et les répliques sont
+    coupés pendant le chargement (voir bulk_indexing.py).
+    
     Args:
         candidates_data: Liste de dictionnaires contenant les données des candidats
     
     Returns:
-        Dict avec le nombre de documents indexés et les erreurs éventuelles
+        Dict avec le nombre de documents indexés, les erreurs document par
+        document et le débit (docs_per_second)
     """
     await es_client.connect()
+    write_targets = await es_client.write_targets()
     
     actions = []
     for candidate_data in candidates_data:
@@ -195,35 +278,29 @@ async def bulk_index_candidates(candidates_data: List[Dict[str, Any]]) -> Dict[s
         if not document_id:
             document_id = candidate_data.get("full_name", "").lower().replace(" ", "_")
         
-        action = {
-            "_index": es_client.index_name,  # Utiliser le nom d'index configuré au lieu de "candidates" en dur
-            "_id": document_id,
-            "_source": document
-        }
-        actions.append(action)
-    
-    # Exécuter le bulk index
-    from elasticsearch.helpers import async_bulk
+        # Une action par version en écriture (double écriture pendant une migration)
+        for index in write_targets:
+            actions.append({
+                "_index": index,
+                "_id": document_id,
+                "_source": document
+            })
     
     try:
-        success_count = 0
-        errors = []
-        
-        async for ok, result in async_bulk(
-            es_client.client,
-            actions,
-            raise_on_error=False
-        ):
-            if ok:
-                success_count += 1
-            else:
-                errors.append(result)
+        if settings.BULK_MODE_ENABLED and len(candidates_data) >= settings.BULK_MODE_MIN_DOCS:
+            async with bulk_load_mode(es_client.client, write_targets):
+                report = await parallel_bulk(es_client.client, actions)
+        else:
+            report = await parallel_bulk(es_client.client, actions)
         
+        if report["indexed"]:
+            await search_cache.invalidate()
         return {
-            "indexed": success_count,
-            "errors": errors if errors else [],
-            "total": len(candidates_data)
+            "indexed": report["indexed"],
+            "errors": report["errors"],
+            "total": len(candidates_data),
+            "docs_per_second": report["docs_per_second"],
+            "elapsed_seconds": report["elapsed_seconds"],
         }
     except Exception as e:
         raise Exception(f"Bulk index failed: {str(e)}")
-
@@ -1,11 +1,326 @@
 """
 Configuration et gestion d'ElasticSearch
+
+L'index des candidats est versionné : les index physiques
+`{ELASTICSEARCH_INDEX_NAME}_v{n}` sont servis derrière deux alias :
+- ELASTICSEARCH_INDEX_NAME (lecture) : la version servie aux recherches ;
+- ELASTICSEARCH_INDEX_NAME + "_write" (écriture) : la ou les versions qui
+  reçoivent les écritures. Pendant une migration il pointe sur l'ancienne et la
+  nouvelle version (double écriture, voir index_versions.py).
+
+Chaque instance garde la liste des index d'écriture en mémoire. Un changement
+d'alias fait par l'API (migration, bascule, abandon) incrémente un compteur
+Redis relu avant chaque écriture : les autres instances relisent alors l'alias
+au lieu d'écrire dans une version retirée ou supprimée.
 """
-from elasticsearch import AsyncElasticsearch
-from typing import Optional, Dict, Any
+import logging
+import time
+from elasticsearch import AsyncElasticsearch, NotFoundError
+from typing import List, Optional, Dict, Any
 
 from app.core.config import settings
-from app.core.exceptions import ElasticsearchError
+from app.core.exceptions import CursorExpiredError, DocumentNotFoundError, ElasticsearchError
+from app.infrastructure.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Durée maximale pendant laquelle la liste des index d'écriture est réutilisée sans
+# relire l'alias (changements d'alias faits hors de l'API, ou sans Redis)
+WRITE_TARGETS_TTL_SECONDS = 5.0
+
+# Compteur des changements d'alias d'écriture, partagé entre les instances
+WRITE_TARGETS_GENERATION_KEY = "search:index:write-targets:generation"
+
+# Jeux de synonymes gérés par l'API synonyms d'Elasticsearch (voir synonyms.py)
+SYNONYM_SET_IDS: Dict[str, str] = {
+    "job_titles": "candidate-job-titles",
+    "skills": "candidate-skills",
+    "education_levels": "candidate-education-levels",
+}
+
+# Contenu initial des jeux de synonymes (créés s'ils n'existent pas encore)
+DEFAULT_SYNONYMS: Dict[str, List[str]] = {
+    "job_titles": [
+        "dev, développeur, developer, programmeur, ingénieur logiciel",
+        "fullstack, full-stack, full stack",
+        "frontend, front-end, front end",
+        "backend, back-end, back end",
+        "devops, dev ops, sre, site reliability",
+        "data scientist, data analyst, ml engineer, machine learning",
+        "chef de projet, project manager, pm, responsable projet",
+        "product manager, product owner, po, chef de produit",
+        "rh, ressources humaines, hr, human resources",
+        "commercial, sales, business developer, account manager",
+    ],
+    "skills": [
+        "js, javascript",
+        "ts, typescript",
+        "py, python",
+        "react, reactjs, react.js",
+        "vue, vuejs, vue.js",
+        "angular, angularjs",
+        "node, nodejs, node.js",
+        "c#, csharp, c sharp",
+        "cpp, c++",
+        "devops, dev ops",
+        "ml, machine learning",
+        "ai, artificial intelligence, ia, intelligence artificielle",
+        "sql, mysql, postgresql, postgres",
+        "aws, amazon web services",
+        "gcp, google cloud platform, google cloud",
+    ],
+    "education_levels": [
+        "bac, baccalaureat, baccalauréat",
+        "bts, bac+2, bac plus 2",
+        "licence, bac+3, bac plus 3, bachelor",
+        "master, bac+5, bac plus 5, ingenieur, ingénieur",
+        "doctorat, phd, docteur",
+    ],
+}
+
+
+# Script stocké de _update_by_query : copie params.fields dans le document
+PARTIAL_UPDATE_SCRIPT_ID = "candidate-set-fields"
+PARTIAL_UPDATE_SCRIPT = "for (entry in params.fields.entrySet()) { ctx._source[entry.getKey()] = entry.getValue(); }"
+
+
+def synonym_rules(rules: List[str]) -> List[Dict[str, str]]:
+    """Règles au format Solr -> corps de l'API synonyms (un ID stable par règle)"""
+    return [{"id": f"rule-{position}", "synonyms": rule} for position, rule in enumerate(rules)]
+
+
+def candidate_index_body() -> Dict[str, Any]:
+    """
+    Mapping et analyzers de l'index des candidats
+
+    Toute modification du mapping ou des analyzers s'applique en créant une
+    nouvelle version de l'index puis en basculant les alias (voir index_versions.py).
+    Les synonymes, appliqués à la recherche, se modifient sans réindexation
+    (voir synonyms.py) ; leurs jeux doivent exister avant la création de l'index.
+    """
+
+    return {
+        "mappings": {
+            "properties": {
+                "candidate_id": {"type": "integer"},
+                "full_name": {
+                    "type": "text",
+                    "analyzer": "french_custom",
+                    "fields": {"keyword": {"type": "keyword"}}
+                },
+                "title": {
+                    "type": "text",
+                    "analyzer": "french_custom",
+                    "search_analyzer": "job_title_search_analyzer",
+                    "fields": {
+                        "keyword": {"type": "keyword"},
+                        "autocomplete": {
+                            "type": "text",
+                            "analyzer": "autocomplete_analyzer",
+                            "search_analyzer": "standard"
+                        }
+                    }
+                },
+                "summary": {
+                    "type": "text",
+                    "analyzer": "french_custom"
+                },
+                "location": {
+                    "type": "text",
+                    "analyzer": "location_analyzer",
+                    "fields": {
+                        "keyword": {"type": "keyword"}
+                    }
+                },
+                "years_of_experience": {"type": "integer"},
+                "is_verified": {"type": "boolean"},
+                # Champs de compatibilité (anciens noms)
+                "profile_title": {
+                    "type": "text",
+                    "analyzer": "french_custom",
+                    "search_analyzer": "job_title_search_analyzer",
+                    "fields": {
+                        "keyword": {"type": "keyword"}
+                    }
+                },
+                "professional_summary": {
+                    "type": "text",
+                    "analyzer": "french_custom"
+                },
+                "first_name": {"type": "keyword"},
+                "last_name": {"type": "keyword"},
+                "email": {"type": "keyword"},
+                "photo_url": {"type": "keyword"},
+                "sector": {
+                    "type": "text",
+                    "analyzer": "french_custom",
+                    "fields": {"keyword": {"type": "keyword"}}
+                },
+                "main_job": {
+                    "type": "text",
+                    "analyzer": "french_custom",
+                    "search_analyzer": "job_title_search_analyzer",
+                    "fields": {
+                        "keyword": {"type": "keyword"},
+                        "autocomplete": {
+                            "type": "text",
+                            "analyzer": "autocomplete_analyzer",
+                            "search_analyzer": "standard"
+                        }
+                    }
+                },
+                "total_experience": {"type": "integer"},
+                "admin_score": {"type": "float"},
+                "skills": {
+                    "type": "nested",
+                    "properties": {
+                        "name": {
+                            "type": "text",
+                            "analyzer": "skill_analyzer",
+                            "search_analyzer": "skill_search_analyzer",
+                            "fields": {
+                                "keyword": {"type": "keyword"}
+                            }
+                        },
+                        "level": {"type": "keyword"},
+                        "years_of_practice": {"type": "integer"}
+                    }
+                },
+                "experiences": {
+                    "type": "nested",
+                    "properties": {
+                        "position": {
+                            "type": "text",
+                            "analyzer": "french_custom",
+                            "search_analyzer": "job_title_search_analyzer"
+                        },
+                        "company_name": {
+                            "type": "text",
+                            "fields": {"keyword": {"type": "keyword"}}
+                        },
+                        "start_date": {"type": "date"},
+                        "end_date": {"type": "date"},
+                        "is_current": {"type": "boolean"}
+                    }
+                },
+                "educations": {
+                    "type": "nested",
+                    "properties": {
+                        "diploma": {"type": "text", "analyzer": "french_custom"},
+                        "institution": {
+                            "type": "text",
+                            "fields": {"keyword": {"type": "keyword"}}
+                        },
+                        "level": {
+                            "type": "text",
+                            "analyzer": "education_level_analyzer",
+                            "search_analyzer": "education_level_search_analyzer",
+                            "fields": {"keyword": {"type": "keyword"}}
+                        },
+                        "graduation_year": {"type": "integer"}
+                    }
+                },
+                "languages": {
+                    "type": "nested",
+                    "properties": {
+                        "name": {"type": "keyword"},
+                        "level": {"type": "keyword"}
+                    }
+                },
+                "desired_positions": {
+                    "type": "text",
+                    "analyzer": "french_custom",
+                    "fields": {"keyword": {"type": "keyword"}}
+                },
+                "contract_type": {"type": "keyword"},
+                "desired_location": {
+                    "type": "text",
+                    "analyzer": "location_analyzer",
+                    "fields": {"keyword": {"type": "keyword"}}
+                },
+                "availability": {"type": "keyword"},
+                "salary_expectations": {"type": "integer"},
+                "status": {"type": "keyword"},
+                "created_at": {"type": "date"},
+                "validated_at": {"type": "date"}
+            }
+        },
+        "settings": {
+            "analysis": {
+                "filter": {
+                    "french_elision": {
+                        "type": "elision",
+                        "articles_case": True,
+                        "articles": ["l", "m", "t", "qu", "n", "s", "j", "d", "c", "jusqu", "quoiqu", "lorsqu", "puisqu"]
+                    },
+                    "french_stop": {
+                        "type": "stop",
+                        "stopwords": "_french_"
+                    },
+                    "french_stemmer": {
+                        "type": "stemmer",
+                        "language": "light_french"
+                    },
+                    "autocomplete_filter": {
+                        "type": "edge_ngram",
+                        "min_gram": 2,
+                        "max_gram": 20
+                    },
+                    # Synonymes gérés (API synonyms d'Elasticsearch) : appliqués à la
+                    # recherche uniquement, modifiables sans réindexation (voir synonyms.py)
+                    "job_title_synonym": {
+                        "type": "synonym_graph",
+                        "synonyms_set": SYNONYM_SET_IDS["job_titles"],
+                        "updateable": True
+                    },
+                    "skill_synonym": {
+                        "type": "synonym_graph",
+                        "synonyms_set": SYNONYM_SET_IDS["skills"],
+                        "updateable": True
+                    },
+                    "education_synonym": {
+                        "type": "synonym_graph",
+                        "synonyms_set": SYNONYM_SET_IDS["education_levels"],
+                        "updateable": True
+                    }
+                },
+                "analyzer": {
+                    "french_custom": {
+                        "tokenizer": "standard",
+                        "filter": ["french_elision", "lowercase", "french_stop", "french_stemmer", "asciifolding"]
+                    },
+                    "autocomplete_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "autocomplete_filter", "asciifolding"]
+                    },
+                    "location_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "asciifolding"]
+                    },
+                    "job_title_search_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["french_elision", "lowercase", "job_title_synonym", "french_stop", "french_stemmer", "asciifolding"]
+                    },
+                    "skill_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "asciifolding"]
+                    },
+                    "skill_search_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "skill_synonym", "asciifolding"]
+                    },
+                    "education_level_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "asciifolding"]
+                    },
+                    "education_level_search_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase", "education_synonym", "asciifolding"]
+                    }
+                }
+            }
+        }
+    }
 
 
 class ElasticsearchClient:
@@ -13,7 +328,12 @@ class ElasticsearchClient:
     
     def __init__(self):
         self.client: Optional[AsyncElasticsearch] = None
+        # Alias de lecture (nom historique de l'index) et alias d'écriture
         self.index_name = settings.ELASTICSEARCH_INDEX_NAME
+        self.write_alias = f"{settings.ELASTICSEARCH_INDEX_NAME}_write"
+        self._write_targets: Optional[List[str]] = None
+        self._write_targets_expire_at = 0.0
+        self._write_targets_generation: Optional[int] = None
     
     def _create_client(self) -> AsyncElasticsearch:
         """Crée le client ElasticSearch"""
@@ -56,270 +376,213 @@ class ElasticsearchClient:
             await self.client.close()
             self.client = None
     
+    def version_index_name(self, version: int) -> str:
+        """Nom de l'index physique d'une version"""
+        return f"{self.index_name}_v{version}"
+    
     async def create_index_if_not_exists(self):
-        """Crée l'index s'il n'existe pas"""
+        """
+        Crée la première version de l'index et ses alias s'ils n'existent pas
+
+        Un index historique non versionné portant déjà le nom de l'alias de lecture
+        est conservé tel quel : il est remplacé lors de la première migration.
+        """
         try:
             await self.connect()
             
-            # Vérifier si l'index existe
+            # L'alias (ou un index historique du même nom) existe-t-il ?
             exists = await self.client.indices.exists(index=self.index_name)
-        except Exception as e:
-            raise ElasticsearchError(f"Failed to check Elasticsearch index: {str(e)}")
-        
-        if not exists:
-            # Mapping pour l'index
-            mapping = {
-                "mappings": {
-                    "properties": {
-                        "candidate_id": {"type": "integer"},
-                        "full_name": {
-                            "type": "text",
-                            "analyzer": "french_custom",
-                            "fields": {"keyword": {"type": "keyword"}}
-                        },
-                        "title": {
-                            "type": "text",
-                            "analyzer": "french_custom",
-                            "fields": {
-                                "keyword": {"type": "keyword"},
-                                "autocomplete": {
-                                    "type": "text",
-                                    "analyzer": "autocomplete_analyzer",
-                                    "search_analyzer": "standard"
-                                }
-                            }
-                        },
-                        "summary": {
-                            "type": "text",
-                            "analyzer": "french_custom"
-                        },
-                        "location": {
-                            "type": "text",
-                            "analyzer": "location_analyzer",
-                            "fields": {
-                                "keyword": {"type": "keyword"}
-                            }
-                        },
-                        "years_of_experience": {"type": "integer"},
-                        "is_verified": {"type": "boolean"},
-                        # Champs de compatibilité (anciens noms)
-                        "profile_title": {
-                            "type": "text",
-                            "analyzer": "french_custom",
-                            "fields": {
-                                "keyword": {"type": "keyword"}
-                            }
-                        },
-                        "professional_summary": {
-                            "type": "text",
-                            "analyzer": "french_custom"
-                        },
-                        "first_name": {"type": "keyword"},
-                        "last_name": {"type": "keyword"},
-                        "email": {"type": "keyword"},
-                        "photo_url": {"type": "keyword"},
-                        "sector": {
-                            "type": "text",
-                            "analyzer": "french_custom",
-                            "fields": {"keyword": {"type": "keyword"}}
-                        },
-                        "main_job": {
-                            "type": "text",
-                            "analyzer": "french_custom",
-                            "fields": {
-                                "keyword": {"type": "keyword"},
-                                "autocomplete": {
-                                    "type": "text",
-                                    "analyzer": "autocomplete_analyzer",
-                                    "search_analyzer": "standard"
-                                }
-                            }
-                        },
-                        "total_experience": {"type": "integer"},
-                        "admin_score": {"type": "float"},
-                        "skills": {
-                            "type": "nested",
-                            "properties": {
-                                "name": {
-                                    "type": "text",
-                                    "analyzer": "skill_analyzer",
-                                    "fields": {
-                                        "keyword": {"type": "keyword"}
-                                    }
-                                },
-                                "level": {"type": "keyword"},
-                                "years_of_practice": {"type": "integer"}
-                            }
-                        },
-                        "experiences": {
-                            "type": "nested",
-                            "properties": {
-                                "position": {
-                                    "type": "text",
-                                    "analyzer": "french_custom"
-                                },
-                                "company_name": {
-                                    "type": "text",
-                                    "fields": {"keyword": {"type": "keyword"}}
-                                },
-                                "start_date": {"type": "date"},
-                                "end_date": {"type": "date"},
-                                "is_current": {"type": "boolean"}
-                            }
-                        },
-                        "educations": {
-                            "type": "nested",
-                            "properties": {
-                                "diploma": {"type": "text", "analyzer": "french_custom"},
-                                "institution": {
-                                    "type": "text",
-                                    "fields": {"keyword": {"type": "keyword"}}
-                                },
-                                "level": {
-                                    "type": "text",
-                                    "analyzer": "education_level_analyzer",
-                                    "fields": {"keyword": {"type": "keyword"}}
-                                },
-                                "graduation_year": {"type": "integer"}
-                            }
-                        },
-                        "languages": {
-                            "type": "nested",
-                            "properties": {
-                                "name": {"type": "keyword"},
-                                "level": {"type": "keyword"}
-                            }
-                        },
-                        "desired_positions": {
-                            "type": "text",
-                            "analyzer": "french_custom",
-                            "fields": {"keyword": {"type": "keyword"}}
-                        },
-                        "contract_type": {"type": "keyword"},
-                        "desired_location": {
-                            "type": "text",
-                            "analyzer": "location_analyzer",
-                            "fields": {"keyword": {"type": "keyword"}}
-                        },
-                        "availability": {"type": "keyword"},
-                        "salary_expectations": {"type": "integer"},
-                        "status": {"type": "keyword"},
-                        "created_at": {"type": "date"},
-                        "validated_at": {"type": "date"}
-                    }
-                },
-                "settings": {
-                    "analysis": {
-                        "filter": {
-                            "french_elision": {
-                                "type": "elision",
-                                "articles_case": True,
-                                "articles": ["l", "m", "t", "qu", "n", "s", "j", "d", "c", "jusqu", "quoiqu", "lorsqu", "puisqu"]
-                            },
-                            "french_stop": {
-                                "type": "stop",
-                                "stopwords": "_french_"
-                            },
-                            "french_stemmer": {
-                                "type": "stemmer",
-                                "language": "light_french"
-                            },
-                            "autocomplete_filter": {
-                                "type": "edge_ngram",
-                                "min_gram": 2,
-                                "max_gram": 20
-                            },
-                            "education_synonym": {
-                                "type": "synonym",
-                                "synonyms": [
-                                    "bac, baccalaureat, baccalauréat",
-                                    "bts, bac+2, bac plus 2",
-                                    "licence, bac+3, bac plus 3, bachelor",
-                                    "master, bac+5, bac plus 5, ingenieur, ingénieur",
-                                    "doctorat, phd, docteur"
-                                ]
-                            },
-                            "skill_synonym": {
-                                "type": "synonym",
-                                "synonyms": [
-                                    "js, javascript",
-                                    "ts, typescript",
-                                    "py, python",
-                                    "react, reactjs, react.js",
-                                    "vue, vuejs, vue.js",
-                                    "angular, angularjs",
-                                    "node, nodejs, node.js",
-                                    "c#, csharp, c sharp",
-                                    "cpp, c++",
-                                    "devops, dev ops",
-                                    "ml, machine learning",
-                                    "ai, artificial intelligence, ia, intelligence artificielle",
-                                    "sql, mysql, postgresql, postgres",
-                                    "aws, amazon web services",
-                                    "gcp, google cloud platform, google cloud"
-                                ]
-                            }
-                        },
-                        "analyzer": {
-                            "french_custom": {
-                                "tokenizer": "standard",
-                                "filter": ["french_elision", "lowercase", "french_stop", "french_stemmer", "asciifolding"]
-                            },
-                            "autocomplete_analyzer": {
-                                "tokenizer": "standard",
-                                "filter": ["lowercase", "autocomplete_filter", "asciifolding"]
-                            },
-                            "location_analyzer": {
-                                "tokenizer": "standard",
-                                "filter": ["lowercase", "asciifolding"]
-                            },
-                            "skill_analyzer": {
-                                "tokenizer": "standard",
-                                "filter": ["lowercase", "skill_synonym", "asciifolding"]
-                            },
-                            "education_level_analyzer": {
-                                "tokenizer": "standard",
-                                "filter": ["lowercase", "education_synonym", "asciifolding"]
-                            }
-                        }
-                    }
-                }
-            }
+            if exists:
+                if await self.client.indices.exists_alias(name=self.index_name):
+                    await self._ensure_write_alias()
+                return
             
-            # Pour ElasticSearch 8.x, on passe directement les paramètres
+            await self.ensure_synonym_sets()
             await self.client.indices.create(
-                index=self.index_name,
-                mappings=mapping["mappings"],
-                settings=mapping["settings"]
+                index=self.version_index_name(1),
+                aliases={
+                    self.index_name: {},
+                    self.write_alias: {"is_write_index": True},
+                },
+                **candidate_index_body()
+            )
+        except Exception as e:
+            raise ElasticsearchError(f"Failed to create Elasticsearch index: {str(e)}")
+        finally:
+            await self.publish_write_targets_change()
+    
+    async def ensure_synonym_sets(self):
+        """Crée les jeux de synonymes manquants avec leur contenu par défaut"""
+        await self.connect()
+        for name, set_id in SYNONYM_SET_IDS.items():
+            try:
+                await self.client.synonyms.get_synonym(id=set_id, size=1)
+            except NotFoundError:
+                await self.client.synonyms.put_synonym(
+                    id=set_id, synonyms_set=synonym_rules(DEFAULT_SYNONYMS[name])
+                )
+    
+    async def _ensure_write_alias(self):
+        """Ajoute l'alias d'écriture sur la version servie s'il manque"""
+        if await self.client.indices.exists_alias(name=self.write_alias):
+            return
+        served = await self.alias_indices(self.index_name)
+        if served:
+            await self.client.indices.put_alias(
+                index=served[0], name=self.write_alias, is_write_index=True
             )
     
+    async def alias_indices(self, alias: str) -> List[str]:
+        """Index physiques derrière un alias (liste vide si l'alias n'existe pas)"""
+        await self.connect()
+        try:
+            response = await self.client.indices.get_alias(name=alias)
+        except NotFoundError:
+            return []
+        return sorted(response.body.keys() if hasattr(response, "body") else response.keys())
+    
+    async def write_targets(self) -> List[str]:
+        """
+        Index physiques qui reçoivent les écritures (plusieurs pendant une migration)
+
+        Sans alias d'écriture (index historique non versionné), on écrit dans l'index
+        de lecture.
+        """
+        generation = await self._read_write_targets_generation()
+        if (
+            self._write_targets is not None
+            and self._write_targets_expire_at > time.monotonic()
+            and self._write_targets_generation == generation
+        ):
+            return self._write_targets
+        targets = await self.alias_indices(self.write_alias) or [self.index_name]
+        self._write_targets = targets
+        self._write_targets_expire_at = time.monotonic() + WRITE_TARGETS_TTL_SECONDS
+        self._write_targets_generation = generation
+        return targets
+    
+    async def _read_write_targets_generation(self) -> Optional[int]:
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            return int(await client.get(WRITE_TARGETS_GENERATION_KEY) or 0)
+        except Exception as e:
+            # Sans compteur, la liste en mémoire expire après WRITE_TARGETS_TTL_SECONDS
+            logger.warning(f"Failed to read write targets generation: {str(e)}")
+            return None
+    
+    def invalidate_write_targets(self):
+        """Force la relecture de l'alias d'écriture par cette instance"""
+        self._write_targets = None
+    
+    async def publish_write_targets_change(self):
+        """Force la relecture de l'alias d'écriture par toutes les instances (après un changement d'alias)"""
+        self.invalidate_write_targets()
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            await client.incr(WRITE_TARGETS_GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to publish write targets change: {str(e)}")
+    
     async def index_document(self, document: Dict[str, Any], document_id: Optional[str] = None) -> bool:
-        """Indexe un document"""
+        """Indexe un document (dans chaque version en écriture)"""
         await self.connect()
         
         try:
-            await self.client.index(
-                index=self.index_name,
-                id=document_id or str(document.get("candidate_id")),
-                document=document
-            )
+            for index in await self.write_targets():
+                await self.client.index(
+                    index=index,
+                    id=document_id or str(document.get("candidate_id")),
+                    document=document
+                )
             return True
         except Exception as e:
             raise ElasticsearchError(f"Failed to index document: {str(e)}")
     
     async def delete_document(self, document_id: str) -> bool:
-        """Supprime un document de l'index"""
+        """Supprime un document de l'index (de chaque version en écriture)"""
         await self.connect()
         
+        targets = await self.write_targets()
         try:
-            await self.client.delete(
-                index=self.index_name,
-                id=document_id
-            )
+            for position, index in enumerate(targets):
+                try:
+                    await self.client.delete(index=index, id=document_id)
+                except NotFoundError:
+                    # Absent d'une version en cours de construction : rien à supprimer
+                    if position == 0 and len(targets) == 1:
+                        raise
             return True
         except Exception as e:
             raise ElasticsearchError(f"Failed to delete document: {str(e)}")
     
+    async def update_document(self, document_id: str, fields: Dict[str, Any]) -> int:
+        """
+        Met à jour quelques champs d'un document (_update avec doc partiel)
+
+        Le document n'est pas renvoyé par le client : ni profil à relire, ni
+        compétences et expériences nested à retransmettre.
+
+        Returns:
+            Nombre de versions en écriture mises à jour
+
+        Raises:
+            DocumentNotFoundError: Document absent de toutes les versions en écriture
+        """
+        await self.connect()
+
+        updated = 0
+        try:
+            for index in await self.write_targets():
+                try:
+                    await self.client.update(index=index, id=document_id, doc=fields, retry_on_conflict=3)
+                    updated += 1
+                except NotFoundError:
+                    # Absent d'une version en cours de construction : la réindexation l'apportera
+                    continue
+        except Exception as e:
+            raise ElasticsearchError(f"Failed to update document: {str(e)}")
+        if not updated:
+            raise DocumentNotFoundError(f"Document {document_id} not found in index")
+        return updated
+    
+    async def update_by_query(self, document_ids: List[str], fields: Dict[str, Any]) -> int:
+        """
+        Applique les mêmes valeurs de champs à plusieurs documents (_update_by_query)
+
+        Returns:
+            Nombre de documents mis à jour (version servie)
+        """
+        await self.connect()
+
+        updated = 0
+        try:
+            for position, index in enumerate(await self.write_targets()):
+                response = await self.client.update_by_query(
+                    index=index,
+                    query={"ids": {"values": document_ids}},
+                    script={"id": PARTIAL_UPDATE_SCRIPT_ID, "params": {"fields": fields}},
+                    conflicts="proceed",
+                    refresh=True,
+                )
+                if position == 0:
+                    updated = response["updated"]
+        except Exception as e:
+            raise ElasticsearchError(f"Failed to update documents: {str(e)}")
+        return updated
+    
+    async def put_stored_scripts(self, scripts: Dict[str, str]):
+        """Enregistre (ou met à jour) des scripts painless référencés par ID dans les requêtes"""
+        await self.connect()
+        try:
+            for script_id, source in scripts.items():
+                await self.client.put_script(id=script_id, script={"lang": "painless", "source": source})
+        except Exception as e:
+            raise ElasticsearchError(f"Failed to store search scripts: {str(e)}")
+    
     async def search(self, query: Dict[str, Any]) -> Dict[str, Any]:
         """Effectue une recherche avec support highlight et aggregations"""
         await self.connect()
@@ -335,12 +598,20 @@ class ElasticsearchClient:
 
             # Construire les paramètres de recherche
             search_params = {
-                "index": self.index_name,
                 "query": es_query,
-                "from_": from_param,
                 "size": size,
             }
 
+            # Pagination par curseur : le point-in-time fixe l'index interrogé
+            pit = query.get("pit")
+            if pit:
+                search_params["pit"] = pit
+                if query.get("search_after"):
+                    search_params["search_after"] = query["search_after"]
+            else:
+                search_params["index"] = self.index_name
+                search_params["from_"] = from_param
+
             if aggs:
                 search_params["aggs"] = aggs
 
@@ -350,11 +621,38 @@ class ElasticsearchClient:
             if sort:
                 search_params["sort"] = sort
 
+            if "track_total_hits" in query:
+                search_params["track_total_hits"] = query["track_total_hits"]
+
+            # Filtrage de _source : seuls les champs utilisés par l'endpoint transitent
+            if query.get("_source") is not None:
+                search_params["source"] = query["_source"]
+
             result = await self.client.search(**search_params)
             return result
+        except NotFoundError as e:
+            if query.get("pit"):
+                raise CursorExpiredError()
+            raise ElasticsearchError(f"Search failed: {str(e)}")
         except Exception as e:
             raise ElasticsearchError(f"Search failed: {str(e)}")
 
+    async def open_point_in_time(self, keep_alive: str) -> str:
+        """Ouvre un point-in-time sur l'index de lecture (vue figée pour la pagination par curseur)"""
+        await self.connect()
+        try:
+            response = await self.client.open_point_in_time(index=self.index_name, keep_alive=keep_alive)
+            return response["id"]
+        except Exception as e:
+            raise ElasticsearchError(f"Failed to open point in time: {str(e)}")
+
+    async def close_point_in_time(self, pit_id: str) -> None:
+        """Libère un point-in-time (fin de liste) ; il expire de toute façon après keep_alive"""
+        try:
+            await self.client.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.warning(f"Failed to close point in time: {str(e)}")
+
 
 # Instance globale
 es_client = ElasticsearchClient()
@@ -373,6 +671,10 @@ async def init_elasticsearch():
         try:
             logger.info(f"Attempting to initialize Elasticsearch (attempt {attempt + 1}/{max_retries})...")
             await es_client.create_index_if_not_exists()
+            await es_client.put_stored_scripts({PARTIAL_UPDATE_SCRIPT_ID: PARTIAL_UPDATE_SCRIPT})
+            if settings.SEARCH_USE_STORED_SCRIPTS:
+                from app.infrastructure.post_search_builder import STORED_SCRIPTS
+                await es_client.put_stored_scripts(STORED_SCRIPTS)
             logger.info("Elasticsearch initialized successfully")
             return
         except Exception as e:
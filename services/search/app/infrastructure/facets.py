@@ -0,0 +1,153 @@
+"""
+Facettes de recherche, calculées une fois par jeu de filtres
+
+Les facettes (agrégations terms/range/avg) ne dépendent que des filtres, pas de
+la page demandée. Elles sont rangées dans le cache de recherche (même
+invalidation par génération d'index) sous une clé qui ignore page et size :
+- la première page d'une recherche les calcule avec les résultats et les range ;
+- les pages suivantes ne demandent plus que les résultats à Elasticsearch et
+  reprennent les facettes du cache ;
+- POST /search/facets les sert seules, pour un affichage différé côté UI
+  (recherche lancée avec include_facets=false).
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.domain.schemas import PostSearchRequest, SearchRequest
+from app.infrastructure.elasticsearch import es_client
+from app.infrastructure.post_search_builder import PostSearchQueryBuilder
+from app.infrastructure.search_builder import SearchQueryBuilder
+from app.infrastructure.search_cache import SearchResultCache, search_cache
+
+# Champs de la requête sans effet sur les facettes
+NON_FACET_FIELDS = {"page", "size", "include_facets", "cursor_pagination", "cursor", "projection"}
+
+
+def parse_get_facets(aggregations: Dict[str, Any]) -> Dict[str, Any]:
+    """Facettes de GET /search à partir des agrégations Elasticsearch"""
+    return {
+        "sectors": [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("sectors", {}).get("buckets", [])
+        ],
+        "main_jobs": [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("main_jobs", {}).get("buckets", [])
+        ],
+        "contract_types": [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("contract_types", {}).get("buckets", [])
+        ],
+        "locations": [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("locations", {}).get("buckets", [])
+        ],
+        "experience_ranges": [
+            {"from": bucket.get("from"), "to": bucket.get("to"), "count": bucket["doc_count"]}
+            for bucket in aggregations.get("experience_ranges", {}).get("buckets", [])
+        ],
+        "admin_score_ranges": [
+            {"from": bucket.get("from"), "to": bucket.get("to"), "count": bucket["doc_count"]}
+            for bucket in aggregations.get("admin_score_ranges", {}).get("buckets", [])
+        ],
+    }
+
+
+def parse_post_facets(aggregations: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Facettes de POST /search/search à partir des agrégations Elasticsearch"""
+    if not aggregations:
+        return None
+    return {
+        "availability": [
+            {"key": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("availability_counts", {}).get("buckets", [])
+        ],
+        "contract_types": [
+            {"key": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("contract_type_counts", {}).get("buckets", [])
+        ],
+        "sectors": [
+            {"key": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get("sector_counts", {}).get("buckets", [])
+        ],
+        "experience_ranges": [
+            {"key": bucket["key"], "from": bucket.get("from"), "to": bucket.get("to"), "count": bucket["doc_count"]}
+            for bucket in aggregations.get("experience_ranges", {}).get("buckets", [])
+        ],
+        "avg_admin_score": aggregations.get("avg_admin_score", {}).get("value"),
+    }
+
+
+# Par type de requête : (namespace du cache, builder, parseur)
+_FACET_SOURCES = {
+    SearchRequest: ("facets:get", SearchQueryBuilder, parse_get_facets),
+    PostSearchRequest: ("facets:post", PostSearchQueryBuilder, parse_post_facets),
+}
+
+
+class FacetEngine:
+    """Calcul et mise en cache des facettes par jeu de filtres"""
+
+    def __init__(self, cache: SearchResultCache):
+        self.cache = cache
+        # Métriques
+        self.computed = 0
+        self.served_from_cache = 0
+
+    async def lookup(self, request: BaseModel) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Facettes en cache pour les filtres de la requête
+
+        Returns:
+            (clé à passer à store, facettes ou None si à calculer)
+        """
+        namespace = _FACET_SOURCES[type(request)][0]
+        key = await self.cache.key_for(namespace, request, exclude=NON_FACET_FIELDS)
+        facets = await self.cache.get(key)
+        if facets is not None:
+            self.served_from_cache += 1
+        return key, facets
+
+    async def store(
+        self,
+        key: Optional[str],
+        aggregations: Dict[str, Any],
+        request: BaseModel,
+        es_ms: float = 0.0,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Convertit les agrégations et les range
+
+        es_ms : durée de la requête des seules facettes. Calculées avec une page de
+        résultats, leur part de la requête n'est pas mesurable : 0 (le temps
+        économisé affiché reste une borne basse).
+        """
+        facets = _FACET_SOURCES[type(request)][2](aggregations)
+        self.computed += 1
+        if facets is not None:
+            await self.cache.set(key, facets, es_ms)
+        return facets
+
+    async def get_facets(self, request: BaseModel) -> Optional[Dict[str, Any]]:
+        """Facettes seules (cache, sinon requête size=0 sans résultats ni highlight)"""
+        key, facets = await self.lookup(request)
+        if facets is not None:
+            return facets
+
+        builder = _FACET_SOURCES[type(request)][1]
+        started = time.perf_counter()
+        result = await es_client.search(builder.build_facets_query(request))
+        es_ms = (time.perf_counter() - started) * 1000
+        return await self.store(key, result.get("aggregations", {}), request, es_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "computed": self.computed,
+            "served_from_cache": self.served_from_cache,
+        }
+
+
+# Instance globale
+facet_engine = FacetEngine(search_cache)
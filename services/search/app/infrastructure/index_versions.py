@@ -0,0 +1,169 @@
+"""
+Versions de l'index des candidats et bascule sans interruption
+
+Déroulement d'une migration (changement de mapping, d'analyzers...) :
+1. start_migration crée `{index}_v{n+1}` avec candidate_index_body() et l'ajoute
+   à l'alias d'écriture : chaque indexation écrit désormais dans les deux
+   versions (double écriture), la recherche continue sur l'ancienne ;
+2. la réindexation complète remplit la nouvelle version en op_type "create"
+   (les documents déjà reçus par double écriture ne sont pas écrasés) ;
+3. swap bascule l'alias de lecture et l'alias d'écriture sur la nouvelle version
+   en une seule requête _aliases (atomique), puis supprime éventuellement
+   l'ancienne version ;
+4. abort_migration abandonne la nouvelle version sans toucher à la lecture.
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from app.infrastructure.elasticsearch import candidate_index_body, es_client
+from app.infrastructure.reindex import reindex_manager
+from app.infrastructure.search_cache import search_cache
+
+logger = logging.getLogger(__name__)
+
+
+class IndexVersionManager:
+    """Création, bascule et abandon des versions de l'index des candidats"""
+
+    def __init__(self, client=None):
+        self.es = client or es_client
+
+    def _version_of(self, index: str) -> Optional[int]:
+        match = re.fullmatch(rf"{re.escape(self.es.index_name)}_v(\d+)", index)
+        return int(match.group(1)) if match else None
+
+    async def list_versions(self) -> List[str]:
+        """Index physiques versionnés existants, du plus ancien au plus récent"""
+        await self.es.connect()
+        response = await self.es.client.indices.get(index=f"{self.es.index_name}_v*")
+        indices = response.body.keys() if hasattr(response, "body") else response.keys()
+        return sorted(
+            (index for index in indices if self._version_of(index) is not None),
+            key=self._version_of,
+        )
+
+    async def status(self) -> Dict[str, Any]:
+        """Versions existantes, version servie, versions en écriture et réindexation"""
+        read_indices = await self.es.alias_indices(self.es.index_name)
+        write_indices = await self.es.alias_indices(self.es.write_alias)
+        served = read_indices[0] if read_indices else self.es.index_name
+        building = [index for index in write_indices if index != served]
+        return {
+            "read_alias": self.es.index_name,
+            "write_alias": self.es.write_alias,
+            "versions": await self.list_versions(),
+            # Sans alias de lecture, l'index historique non versionné est servi
+            "serving": served,
+            "legacy_index": not read_indices,
+            "writing": write_indices or [served],
+            "migrating_to": building[0] if building else None,
+            "reindex": reindex_manager.status(),
+        }
+
+    async def start_migration(self, resume: bool = True) -> Dict[str, Any]:
+        """
+        Crée la version suivante, active la double écriture et lance son remplissage
+
+        Une version déjà en construction dont la réindexation ne tourne plus (redémarrage
+        du service) est reprise : depuis son checkpoint si resume, sinon depuis le début.
+        Une version tout juste créée est toujours remplie depuis le début : un checkpoint
+        laissé sous le même nom par une migration abandonnée ne la concerne pas.
+
+        Raises:
+            ValueError: Migration ou réindexation déjà en cours
+        """
+        if reindex_manager.running:
+            raise ValueError("A reindex job is already running")
+        current = await self.status()
+        new_index = current["migrating_to"]
+        if new_index:
+            logger.info(f"Index migration to {new_index} resumed")
+            reindex_manager.start(target_index=new_index, resume=resume, op_type="create")
+            return await self.status()
+
+        versions = [self._version_of(index) for index in current["versions"]]
+        new_index = self.es.version_index_name(max(versions, default=0) + 1)
+
+        await self.es.ensure_synonym_sets()
+        await self.es.client.indices.create(index=new_index, **candidate_index_body())
+
+        actions = [{"add": {"index": new_index, "alias": self.es.write_alias, "is_write_index": False}}]
+        if current["legacy_index"]:
+            # L'index historique rejoint l'alias d'écriture le temps de la migration
+            actions.append({"add": {"index": current["serving"], "alias": self.es.write_alias, "is_write_index": True}})
+        await self.es.client.indices.update_aliases(actions=actions)
+        await self.es.publish_write_targets_change()
+
+        logger.info(f"Index migration started: {current['serving']} -> {new_index}")
+        reindex_manager.start(target_index=new_index, resume=False, op_type="create")
+        return await self.status()
+
+    async def swap(self, delete_old: bool = False, force: bool = False) -> Dict[str, Any]:
+        """
+        Sert la nouvelle version (lecture et écriture) en une opération atomique
+
+        Une réindexation terminée avec des documents en échec a laissé la nouvelle
+        version incomplète : la bascule est refusée sauf avec force.
+
+        Raises:
+            ValueError: Aucune migration en cours, réindexation non terminée ou
+                documents en échec
+        """
+        current = await self.status()
+        new_index = current["migrating_to"]
+        if not new_index:
+            raise ValueError("No migration in progress")
+        reindex = current["reindex"]
+        if reindex_manager.running or not reindex or reindex["target_index"] != new_index or reindex["status"] != "completed":
+            raise ValueError(f"The reindex into {new_index} has not completed")
+        if reindex.get("failed") and not force:
+            raise ValueError(
+                f"The reindex into {new_index} failed for {reindex['failed']} documents (use force to swap anyway)"
+            )
+
+        old_index = current["serving"]
+        await self.es.client.indices.refresh(index=new_index)
+        if current["legacy_index"]:
+            # L'alias de lecture prend le nom de l'index historique : il doit disparaître dans la même opération
+            actions: List[Dict[str, Any]] = [{"remove_index": {"index": old_index}}]
+        else:
+            actions = [
+                {"remove": {"index": old_index, "alias": self.es.write_alias}},
+                {"remove": {"index": old_index, "alias": self.es.index_name}},
+            ]
+        actions += [
+            {"add": {"index": new_index, "alias": self.es.write_alias, "is_write_index": True}},
+            {"add": {"index": new_index, "alias": self.es.index_name}},
+        ]
+        await self.es.client.indices.update_aliases(actions=actions)
+        await self.es.publish_write_targets_change()
+        await search_cache.invalidate()
+
+        if delete_old and not current["legacy_index"]:
+            await self.es.client.indices.delete(index=old_index)
+        logger.info(f"Index swapped: {old_index} -> {new_index}")
+        return await self.status()
+
+    async def abort_migration(self) -> Dict[str, Any]:
+        """Abandonne la version en construction (la version servie n'est pas modifiée)"""
+        current = await self.status()
+        new_index = current["migrating_to"]
+        if not new_index:
+            raise ValueError("No migration in progress")
+
+        await reindex_manager.cancel()
+        actions = [{"remove": {"index": new_index, "alias": self.es.write_alias}}]
+        if current["legacy_index"]:
+            actions.append({"remove": {"index": current["serving"], "alias": self.es.write_alias}})
+        await self.es.client.indices.update_aliases(actions=actions)
+        await self.es.publish_write_targets_change()
+        await self.es.client.indices.delete(index=new_index)
+        # La prochaine migration réutilise ce nom : elle ne doit pas reprendre ce remplissage
+        await reindex_manager.clear_checkpoint(new_index)
+        logger.info(f"Index migration to {new_index} aborted")
+        return await self.status()
+
+
+# Instance globale
+index_version_manager = IndexVersionManager()
@@ -0,0 +1,374 @@
+"""
+Indexation par événements depuis un Redis Stream
+
+Les services Candidate et Admin publient un événement "profil modifié" dans le
+stream INDEXING_STREAM_NAME (XADD, champ "event" = JSON
+{"candidate_id", "source", "reason", "occurred_at"}) au lieu d'appeler les
+endpoints d'indexation en HTTP. L'événement ne porte pas le document : le
+consommateur relit l'état courant des profils dans le Candidate Service.
+
+Traitement d'un lot (consumer group, un consommateur par process) :
+- coalescence : après un premier message, le consommateur attend
+  INDEXING_COALESCE_MS pour absorber la rafale ; les événements d'un même
+  candidat ne donnent qu'une indexation ;
+- une seule requête au Candidate Service pour les profils encore validés du
+  lot, puis un bulk : indexation des profils validés, suppression des autres
+  (refusés, archivés, supprimés) dans chaque version en écriture ;
+- les messages d'un candidat en échec ne sont pas acquittés : repris après
+  INDEXING_CLAIM_IDLE_MS (XAUTOCLAIM), puis envoyés dans le stream de lettres
+  mortes INDEXING_DLQ_STREAM_NAME après INDEXING_MAX_DELIVERIES livraisons ;
+- un message illisible part directement en lettres mortes.
+
+Sans REDIS_URL, le consommateur ne démarre pas : les endpoints HTTP
+d'indexation restent la seule voie.
+"""
+import asyncio
+import json
+import logging
+import socket
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.infrastructure.bulk_indexing import parallel_bulk
+from app.infrastructure.candidate_indexer import candidate_data_from_profile, index_candidate
+from app.infrastructure.elasticsearch import es_client
+from app.infrastructure.redis_client import get_redis
+from app.infrastructure.reindex import fetch_validated_profiles_by_ids
+from app.infrastructure.search_cache import search_cache
+
+logger = logging.getLogger(__name__)
+
+# Pause après une erreur (Redis, Candidate Service ou Elasticsearch indisponible)
+RETRY_DELAY_SECONDS = 2.0
+
+# (IDs des candidats) -> profils encore validés
+FetchProfiles = Callable[[List[int]], Awaitable[List[Dict[str, Any]]]]
+
+
+def parse_indexing_events(
+    messages: List[Tuple[str, Dict[str, str]]]
+) -> Tuple[Dict[int, List[Tuple[str, Dict[str, Any]]]], List[Tuple[str, Dict[str, str]]]]:
+    """
+    Regroupe les messages par candidat
+
+    Returns:
+        ({candidate_id: [(message_id, événement)]}, messages illisibles)
+    """
+    by_candidate: Dict[int, List[Tuple[str, Dict[str, Any]]]] = {}
+    rejected = []
+    for message_id, fields in messages:
+        try:
+            event = json.loads(fields["event"])
+            candidate_id = int(event["candidate_id"])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Rejected indexing event {message_id}: {str(e)}")
+            rejected.append((message_id, fields))
+            continue
+        by_candidate.setdefault(candidate_id, []).append((message_id, event))
+    return by_candidate, rejected
+
+
+class IndexingStreamConsumer:
+    """Consommateur du stream des profils modifiés (un par process du Search Service)"""
+
+    def __init__(
+        self,
+        stream: str,
+        dlq_stream: str,
+        group: str,
+        consumer: str = "",
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        coalesce_ms: int = 200,
+        claim_idle_ms: int = 30000,
+        max_deliveries: int = 5,
+        fetch_profiles: FetchProfiles = fetch_validated_profiles_by_ids,
+    ):
+        self.stream = stream
+        self.dlq_stream = dlq_stream
+        self.group = group
+        self.consumer = consumer or socket.gethostname()
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.coalesce_ms = coalesce_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max(max_deliveries, 1)
+        self.fetch_profiles = fetch_profiles
+        self._task: Optional[asyncio.Task] = None
+        self._group_ready = False
+        # Métriques
+        self.batches = 0
+        self.events = 0
+        self.coalesced = 0
+        self.indexed = 0
+        self.deleted = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+        self.last_event_delay_ms: Optional[float] = None
+        self.last_flush_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.INDEXING_CONSUMER_ENABLED and get_redis() is not None
+
+    async def ensure_group(self) -> None:
+        """Crée le consumer group (et le stream) s'il n'existe pas"""
+        from redis.exceptions import ResponseError
+
+        try:
+            await get_redis().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _read_batch(self) -> Tuple[List[Tuple[str, Dict[str, str]]], bool]:
+        """
+        Messages abandonnés (échecs, consommateur arrêté) en priorité, puis les nouveaux
+
+        Returns:
+            (messages, True s'il s'agit de messages repris)
+        """
+        client = get_redis()
+        claimed = await client.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size,
+        )
+        # redis-py retourne [next_id, messages] (+ IDs supprimés depuis Redis 7)
+        if claimed[1]:
+            return [message for message in claimed[1] if message[1]], True
+
+        response = await client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=self.batch_size, block=self.block_ms,
+        )
+        if not response:
+            return [], False
+        messages = response[0][1]
+        if len(messages) < self.batch_size and self.coalesce_ms > 0:
+            # Laisser arriver la fin de la rafale (plusieurs étapes d'un même profil)
+            await asyncio.sleep(self.coalesce_ms / 1000)
+            more = await client.xreadgroup(
+                self.group, self.consumer, {self.stream: ">"},
+                count=self.batch_size - len(messages),
+            )
+            if more:
+                messages += more[0][1]
+        return messages, False
+
+    async def _ack(self, message_ids: List[str]) -> None:
+        if not message_ids:
+            return
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.xack(self.stream, self.group, *message_ids)
+            # Les messages acquittés ne servent plus : le stream ne garde que l'attente
+            pipe.xdel(self.stream, *message_ids)
+            await pipe.execute()
+
+    async def _dead_letter(self, messages: List[Tuple[str, Dict[str, Any]]], error: str) -> None:
+        """Copie les messages dans le stream de lettres mortes puis les acquitte"""
+        if not messages:
+            return
+        client = get_redis()
+        for message_id, fields in messages:
+            await client.xadd(self.dlq_stream, {
+                "message_id": message_id,
+                "event": fields["event"] if "event" in fields else json.dumps(fields),
+                "error": error[:1000],
+                "failed_at": datetime.utcnow().isoformat(),
+            })
+        await self._ack([message_id for message_id, _ in messages])
+        self.dead_lettered += len(messages)
+
+    async def _deliveries(self, message_ids: List[str]) -> Dict[str, int]:
+        """Nombre de livraisons de messages en attente (XPENDING)"""
+        client = get_redis()
+        deliveries = {}
+        for message_id in message_ids:
+            pending = await client.xpending_range(self.stream, self.group, min=message_id, max=message_id, count=1)
+            if pending:
+                deliveries[message_id] = pending[0]["times_delivered"]
+        return deliveries
+
+    async def _exhausted(self, message_ids: List[str]) -> List[str]:
+        deliveries = await self._deliveries(message_ids)
+        return [message_id for message_id in message_ids if deliveries.get(message_id, 0) >= self.max_deliveries]
+
+    async def process_batch(self, messages: List[Tuple[str, Dict[str, str]]], retried: bool = False) -> int:
+        """
+        Indexe (ou retire de l'index) les candidats d'un lot puis acquitte les messages
+
+        Returns:
+            int: Nombre de candidats traités avec succès
+        """
+        if not messages:
+            return 0
+        started = time.perf_counter()
+
+        by_candidate, rejected = parse_indexing_events(messages)
+        await self._dead_letter(rejected, "unreadable event")
+
+        if retried:
+            # Échecs répétés du lot entier (Candidate Service, Elasticsearch...) : lettres mortes
+            exhausted = set(await self._exhausted([mid for events in by_candidate.values() for mid, _ in events]))
+            for candidate_id in list(by_candidate):
+                dead = [(mid, {"event": json.dumps(event)}) for mid, event in by_candidate[candidate_id] if mid in exhausted]
+                if dead:
+                    await self._dead_letter(dead, "max deliveries reached")
+                    del by_candidate[candidate_id]
+        if not by_candidate:
+            return 0
+
+        candidate_ids = sorted(by_candidate)
+        profiles = await self.fetch_profiles(candidate_ids)
+        validated = {int(profile["id"]): profile for profile in profiles}
+
+        write_targets = await es_client.write_targets()
+        actions = []
+        for candidate_id in candidate_ids:
+            for index in write_targets:
+                if candidate_id in validated:
+                    actions.append({
+                        "_index": index,
+                        "_id": str(candidate_id),
+                        "_source": index_candidate(candidate_data_from_profile(validated[candidate_id])),
+                    })
+                else:
+                    actions.append({"_op_type": "delete", "_index": index, "_id": str(candidate_id)})
+        await es_client.connect()
+        report = await parallel_bulk(es_client.client, actions)
+
+        # Suppression d'un document déjà absent : rien à faire
+        failures: Dict[int, str] = {}
+        for error in report["errors"]:
+            if error["op_type"] == "delete" and error["status"] == 404:
+                continue
+            failures[int(error["id"])] = json.dumps(error["error"], default=str)
+
+        succeeded = [candidate_id for candidate_id in candidate_ids if candidate_id not in failures]
+        await self._ack([mid for candidate_id in succeeded for mid, _ in by_candidate[candidate_id]])
+
+        # Échecs par candidat : nouvelle tentative après claim_idle_ms, puis lettres mortes
+        failed_ids = [mid for candidate_id in failures for mid, _ in by_candidate[candidate_id]]
+        exhausted = set(await self._exhausted(failed_ids))
+        for candidate_id, error in failures.items():
+            dead = [(mid, {"event": json.dumps(event)}) for mid, event in by_candidate[candidate_id] if mid in exhausted]
+            await self._dead_letter(dead, error)
+
+        if succeeded:
+            await search_cache.invalidate()
+
+        self.batches += 1
+        self.events += len(messages)
+        self.coalesced += len(messages) - len(rejected) - len(candidate_ids)
+        self.indexed += len([candidate_id for candidate_id in succeeded if candidate_id in validated])
+        self.deleted += len([candidate_id for candidate_id in succeeded if candidate_id not in validated])
+        self.failed += len(failures)
+        self.last_batch_size = len(candidate_ids)
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.last_flush_at = time.time()
+        occurred = [
+            event.get("occurred_at") for candidate_id in succeeded for _, event in by_candidate[candidate_id]
+        ]
+        occurred = [value for value in occurred if value]
+        if occurred:
+            try:
+                delay = datetime.utcnow() - datetime.fromisoformat(min(occurred))
+                self.last_event_delay_ms = round(delay.total_seconds() * 1000, 1)
+            except ValueError:
+                pass
+        return len(succeeded)
+
+    async def run_once(self) -> int:
+        """Lit et traite un lot (attend au plus block_ms s'il n'y a rien)"""
+        if not self._group_ready:
+            await self.ensure_group()
+            self._group_ready = True
+        messages, retried = await self._read_batch()
+        return await self.process_batch(messages, retried)
+
+    async def start(self) -> None:
+        """Démarre la consommation en tâche de fond (sans effet sans Redis)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la consommation (les messages non acquittés seront relus)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self._group_ready = False
+                logger.warning(f"Indexing stream consumption failed: {str(e)}")
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Débit, coalescence, lettres mortes et retard du consumer group (lag, messages en attente)"""
+        metrics: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "stream": self.stream,
+            "group": self.group,
+            "consumer": self.consumer,
+            "batches": self.batches,
+            "events": self.events,
+            "coalesced": self.coalesced,
+            "indexed": self.indexed,
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered,
+            "errors": self.errors,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": self.last_batch_ms,
+            # Délai entre la publication de l'événement et son indexation
+            "last_event_delay_ms": self.last_event_delay_ms,
+            "seconds_since_last_flush": (
+                round(time.time() - self.last_flush_at, 1) if self.last_flush_at else None
+            ),
+        }
+        if not self.enabled:
+            return metrics
+
+        try:
+            client = get_redis()
+            metrics["stream_length"] = await client.xlen(self.stream)
+            metrics["dlq_length"] = await client.xlen(self.dlq_stream)
+            for group in await client.xinfo_groups(self.stream):
+                if group.get("name") == self.group:
+                    # lag : messages pas encore lus par le groupe (Redis >= 7)
+                    metrics["lag"] = group.get("lag")
+                    metrics["pending"] = group.get("pending")
+                    break
+        except Exception as e:
+            metrics["redis_error"] = str(e)
+        return metrics
+
+
+# Instance globale
+indexing_consumer = IndexingStreamConsumer(
+    stream=settings.INDEXING_STREAM_NAME,
+    dlq_stream=settings.INDEXING_DLQ_STREAM_NAME,
+    group=settings.INDEXING_CONSUMER_GROUP,
+    consumer=settings.INDEXING_CONSUMER_NAME,
+    batch_size=settings.INDEXING_BATCH_SIZE,
+    block_ms=settings.INDEXING_BLOCK_MS,
+    coalesce_ms=settings.INDEXING_COALESCE_MS,
+    claim_idle_ms=settings.INDEXING_CLAIM_IDLE_MS,
+    max_deliveries=settings.INDEXING_MAX_DELIVERIES,
+)
@@ -10,9 +10,162 @@ Améliorations:
 - Synonymes pour les titres de postes courants
 - Filtres optimisés pour la performance
 """
+import re
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
+from app.core.config import settings
 from app.domain.schemas import PostSearchRequest
 
+# Champs de _source renvoyés par Elasticsearch selon la projection demandée.
+# "card" : vignette de liste de résultats, sans le rapport admin ni le résumé complet
+# (le highlight du résumé reste calculé côté Elasticsearch).
+RESULT_SOURCE_FIELDS: Dict[str, List[str]] = {
+    "full": [
+        "candidate_id", "full_name", "title", "main_job", "summary", "years_of_experience",
+        "location", "availability", "skills.name", "skills.level", "is_verified", "status",
+        "photo_url", "admin_score", "admin_report",
+    ],
+    "card": [
+        "candidate_id", "full_name", "title", "main_job", "years_of_experience",
+        "location", "availability", "skills.name", "skills.level", "is_verified", "status",
+        "photo_url", "admin_score",
+    ],
+}
+
+# Facettes de POST /search/search (calculées une fois par jeu de filtres, voir facets.py)
+FACET_AGGREGATIONS: Dict[str, Any] = {
+    "availability_counts": {
+        "terms": {"field": "availability", "size": 10}
+    },
+    "contract_type_counts": {
+        "terms": {"field": "contract_type", "size": 10}
+    },
+    "sector_counts": {
+        "terms": {"field": "sector", "size": 15}
+    },
+    "experience_ranges": {
+        "range": {
+            "field": "years_of_experience",
+            "ranges": [
+                {"key": "0-2", "from": 0, "to": 3},
+                {"key": "3-5", "from": 3, "to": 6},
+                {"key": "6-10", "from": 6, "to": 11},
+                {"key": "10+", "from": 10}
+            ]
+        }
+    },
+    "avg_admin_score": {
+        "avg": {"field": "admin_score"}
+    }
+}
+
+
+# ============================================
+# PARTIES STATIQUES DE LA REQUÊTE
+# ============================================
+# Construites une fois au chargement du module et partagées entre les requêtes
+# (ne pas les modifier : les requêtes construites les référencent).
+
+# Seuls les profils validés (ou anciens documents sans statut) sont recherchables
+VALIDATED_STATUS_FILTER: Dict[str, Any] = {
+    "bool": {
+        "should": [
+            {"term": {"status": "VALIDATED"}},
+            {"bool": {"must_not": {"exists": {"field": "status"}}}}
+        ],
+        "minimum_should_match": 1
+    }
+}
+
+# Scripts painless du function_score, enregistrés comme stored scripts au
+# démarrage (voir init_elasticsearch) : la requête ne transporte plus que leur ID
+# et Elasticsearch ne les recompile pas.
+STORED_SCRIPTS: Dict[str, str] = {
+    # Boost basé sur le score admin (1.0 à 2.0x)
+    "candidate-admin-score-boost": """
+        if (doc['admin_score'].size() > 0 && doc['admin_score'].value != null) {
+            return 1.0 + (doc['admin_score'].value / 5.0);
+        }
+        return 1.0;
+    """,
+    # Léger boost pour les profils avec plus d'expérience
+    "candidate-experience-boost": """
+        if (doc['years_of_experience'].size() > 0) {
+            double exp = doc['years_of_experience'].value;
+            return 1.0 + Math.min(exp / 20.0, 0.3);
+        }
+        return 1.0;
+    """,
+}
+
+
+def _score_functions(stored_scripts: bool) -> List[Dict[str, Any]]:
+    """
+    Fonctions de boost : haut score admin, profil vérifié, expérience, fraîcheur
+    de la validation
+    """
+    def script(script_id: str) -> Dict[str, Any]:
+        return {"id": script_id} if stored_scripts else {"source": STORED_SCRIPTS[script_id]}
+
+    return [
+        {"script_score": {"script": script("candidate-admin-score-boost")}, "weight": 1.5},
+        # Boost pour les profils vérifiés
+        {"filter": {"term": {"is_verified": True}}, "weight": 1.2},
+        {"script_score": {"script": script("candidate-experience-boost")}, "weight": 0.5},
+        # Boost pour les profils récemment validés (decay)
+        {
+            "gauss": {
+                "validated_at": {
+                    "origin": "now",
+                    "scale": "90d",
+                    "offset": "7d",
+                    "decay": 0.5
+                }
+            },
+            "weight": 0.3
+        },
+    ]
+
+
+# Fonctions de boost selon SEARCH_USE_STORED_SCRIPTS (True : stored scripts, False : inline)
+SCORE_FUNCTIONS: Dict[bool, List[Dict[str, Any]]] = {
+    True: _score_functions(True),
+    False: _score_functions(False),
+}
+
+
+def _highlight_field(fragment_size: int, number_of_fragments: int, unified: bool = True) -> Dict[str, Any]:
+    field = {
+        "fragment_size": fragment_size,
+        "number_of_fragments": number_of_fragments,
+        "pre_tags": ["<mark class='highlight'>"],
+        "post_tags": ["</mark>"],
+    }
+    if unified:
+        field["type"] = "unified"
+    return field
+
+
+HIGHLIGHT: Dict[str, Any] = {
+    "fields": {
+        "title": _highlight_field(100, 1),
+        "main_job": _highlight_field(100, 1),
+        "summary": _highlight_field(200, 2),
+        "skills.name": _highlight_field(50, 3, unified=False),
+        "location": _highlight_field(50, 1, unified=False),
+    },
+    "require_field_match": False,
+    "boundary_scanner": "word"
+}
+
+SORT: List[Dict[str, Any]] = [
+    {"_score": {"order": "desc"}},
+    {"admin_score": {"order": "desc", "missing": "_last"}},
+    {"years_of_experience": {"order": "desc"}},
+    # Départage stable (requis par la pagination search_after)
+    {"candidate_id": {"order": "asc"}}
+]
+
 
 class PostSearchQueryBuilder:
     """Builder pour construire les requêtes de recherche POST avec relevance scoring avancé"""
@@ -42,7 +195,8 @@ class PostSearchQueryBuilder:
         "DOCTORAT": ["DOCTORAT", "Doctorat", "PhD", "Docteur", "DOCTEUR"],
     }
 
-    # Synonymes pour les titres de postes courants
+    # Synonymes pour les titres de postes courants (expansion côté Python, seulement
+    # avec SEARCH_PYTHON_SYNONYM_EXPANSION : l'index applique le jeu "candidate-job-titles")
     JOB_TITLE_SYNONYMS = {
         "dev": ["développeur", "developer", "programmeur"],
         "développeur": ["dev", "developer", "programmeur", "ingénieur logiciel"],
@@ -57,43 +211,55 @@ class PostSearchQueryBuilder:
         "commercial": ["sales", "business developer", "account manager"],
     }
 
-    @staticmethod
-    def get_levels_minimum(min_level: str) -> List[str]:
-        """Retourne la liste des niveaux >= au niveau minimum"""
-        min_level_upper = min_level.upper()
-        min_value = PostSearchQueryBuilder.SKILL_LEVEL_HIERARCHY.get(min_level_upper, 0)
+    # Tranches salariales prédéfinies : (minimum inclus, maximum exclu)
+    SALARY_RANGES = {
+        "0-500k": (0, 500000),
+        "500k-1m": (500000, 1000000),
+        "1m-2m": (1000000, 2000000),
+        "2m-3m": (2000000, 3000000),
+        "3m-5m": (3000000, 5000000),
+        "5m+": (5000000, None),
+    }
 
-        levels = []
-        for level, value in PostSearchQueryBuilder.SKILL_LEVEL_HIERARCHY.items():
-            if value >= min_value:
-                levels.append(level)
+    # Niveau de langue demandé -> niveaux acceptés
+    LANGUAGE_LEVELS = {
+        "notions": ["BEGINNER", "INTERMEDIATE", "ADVANCED", "EXPERT"],
+        "courant": ["INTERMEDIATE", "ADVANCED", "EXPERT"],
+        "professionnel": ["ADVANCED", "EXPERT"],
+        "natif": ["EXPERT"],
+    }
 
-        return levels
+    @staticmethod
+    def get_levels_minimum(min_level: str) -> List[str]:
+        """Retourne la liste des niveaux >= au niveau minimum (table précalculée, ne pas modifier)"""
+        return _SKILL_LEVELS_AT_LEAST.get(min_level.upper(), _ALL_SKILL_LEVELS)
 
     @staticmethod
     def get_education_variants(level: str) -> List[str]:
-        """Retourne toutes les variantes d'un niveau d'éducation"""
-        level_upper = level.upper().replace(" ", "_").replace("+", "_PLUS_")
-        return PostSearchQueryBuilder.EDUCATION_LEVEL_MAPPING.get(level_upper, [level])
+        """Retourne toutes les variantes d'un niveau d'éducation (ne pas modifier la liste)"""
+        return _education_variants(level)
 
     @staticmethod
     def expand_job_title_synonyms(query: str) -> str:
-        """Étend la requête avec les synonymes de titres de postes"""
-        query_lower = query.lower()
-        for term, synonyms in PostSearchQueryBuilder.JOB_TITLE_SYNONYMS.items():
-            if term in query_lower:
-                # Ajouter les synonymes à la requête
-                return f"{query} {' '.join(synonyms)}"
-        return query
+        """
+        Étend la requête avec les synonymes de titres de postes
+
+        Le premier terme de JOB_TITLE_SYNONYMS (dans l'ordre du dictionnaire)
+        contenu dans la requête ajoute ses synonymes.
+        """
+        return _expand_job_title_synonyms(query)
 
     @staticmethod
-    def build_query(search_request: PostSearchRequest) -> Dict[str, Any]:
+    def build_query(search_request: PostSearchRequest, include_facets: bool = True) -> Dict[str, Any]:
         """
         Construit une requête ElasticSearch optimisée pour les recruteurs avec:
         - function_score pour booster les meilleurs profils
         - Recherche multi-champs intelligente
         - Filtres performants
         - Tri par pertinence puis qualité du profil
+
+        Avec include_facets=False, seuls les résultats de la page sont demandés
+        (facettes déjà en cache pour ces filtres).
         """
         must_clauses = []
         should_clauses = []  # Pour booster certains résultats sans les exclure
@@ -103,7 +269,11 @@ class PostSearchQueryBuilder:
         # RECHERCHE TEXTE LIBRE (query)
         # ============================================
         if search_request.query:
-            expanded_query = PostSearchQueryBuilder.expand_job_title_synonyms(search_request.query)
+            # Synonymes appliqués par le search analyzer de l'index (fuzziness sur les seuls termes saisis)
+            expanded_query = (
+                PostSearchQueryBuilder.expand_job_title_synonyms(search_request.query)
+                if settings.SEARCH_PYTHON_SYNONYM_EXPANSION else search_request.query
+            )
 
             must_clauses.append({
                 "bool": {
@@ -175,7 +345,10 @@ class PostSearchQueryBuilder:
         # FILTRE TITRE DE POSTE (job_title)
         # ============================================
         if search_request.job_title:
-            expanded_title = PostSearchQueryBuilder.expand_job_title_synonyms(search_request.job_title)
+            expanded_title = (
+                PostSearchQueryBuilder.expand_job_title_synonyms(search_request.job_title)
+                if settings.SEARCH_PYTHON_SYNONYM_EXPANSION else search_request.job_title
+            )
 
             filter_clauses.append({
                 "bool": {
@@ -430,18 +603,10 @@ class PostSearchQueryBuilder:
         # Support pour salary_ranges (tranches prédéfinies)
         if search_request.salary_ranges:
             salary_filters = []
-            salary_mapping = {
-                "0-500k": (0, 500000),
-                "500k-1m": (500000, 1000000),
-                "1m-2m": (1000000, 2000000),
-                "2m-3m": (2000000, 3000000),
-                "3m-5m": (3000000, 5000000),
-                "5m+": (5000000, None),
-            }
 
             for salary_range in search_request.salary_ranges:
-                if salary_range in salary_mapping:
-                    min_sal, max_sal = salary_mapping[salary_range]
+                if salary_range in PostSearchQueryBuilder.SALARY_RANGES:
+                    min_sal, max_sal = PostSearchQueryBuilder.SALARY_RANGES[salary_range]
                     range_q = {"salary_expectations": {"gte": min_sal}}
                     if max_sal:
                         range_q["salary_expectations"]["lt"] = max_sal
@@ -457,15 +622,8 @@ class PostSearchQueryBuilder:
         # ============================================
         if search_request.languages:
             language_filters = []
-            level_mapping = {
-                "notions": ["BEGINNER", "INTERMEDIATE", "ADVANCED", "EXPERT"],
-                "courant": ["INTERMEDIATE", "ADVANCED", "EXPERT"],
-                "professionnel": ["ADVANCED", "EXPERT"],
-                "natif": ["EXPERT"],
-            }
-
             for lang_name, lang_level in search_request.languages.items():
-                min_levels = level_mapping.get(lang_level.lower(), [lang_level.upper()])
+                min_levels = PostSearchQueryBuilder.LANGUAGE_LEVELS.get(lang_level.lower(), [lang_level.upper()])
                 language_filters.append({
                     "bool": {
                         "must": [{"term": {"languages.name": lang_name}}],
@@ -515,15 +673,7 @@ class PostSearchQueryBuilder:
         # ============================================
         # FILTRE STATUT VALIDÉ (obligatoire)
         # ============================================
-        filter_clauses.append({
-            "bool": {
-                "should": [
-                    {"term": {"status": "VALIDATED"}},
-                    {"bool": {"must_not": {"exists": {"field": "status"}}}}
-                ],
-                "minimum_should_match": 1
-            }
-        })
+        filter_clauses.append(VALIDATED_STATUS_FILTER)
 
         # ============================================
         # CONSTRUCTION DE LA REQUÊTE PRINCIPALE
@@ -542,62 +692,11 @@ class PostSearchQueryBuilder:
         # ============================================
         # FUNCTION SCORE pour améliorer la pertinence
         # ============================================
-        # Booster les profils avec:
-        # - Haut score admin (qualité validée par l'équipe)
-        # - Profils récemment validés (fraîcheur)
-        # - Profils vérifiés
-
+        # Fonctions de boost précalculées (voir SCORE_FUNCTIONS)
         function_score_query = {
             "function_score": {
                 "query": {"bool": bool_query},
-                "functions": [
-                    # Boost basé sur le score admin (1.0 à 2.0x)
-                    {
-                        "script_score": {
-                            "script": {
-                                "source": """
-                                    if (doc['admin_score'].size() > 0 && doc['admin_score'].value != null) {
-                                        return 1.0 + (doc['admin_score'].value / 5.0);
-                                    }
-                                    return 1.0;
-                                """
-                            }
-                        },
-                        "weight": 1.5
-                    },
-                    # Boost pour les profils vérifiés
-                    {
-                        "filter": {"term": {"is_verified": True}},
-                        "weight": 1.2
-                    },
-                    # Léger boost pour les profils avec plus d'expérience
-                    {
-                        "script_score": {
-                            "script": {
-                                "source": """
-                                    if (doc['years_of_experience'].size() > 0) {
-                                        double exp = doc['years_of_experience'].value;
-                                        return 1.0 + Math.min(exp / 20.0, 0.3);
-                                    }
-                                    return 1.0;
-                                """
-                            }
-                        },
-                        "weight": 0.5
-                    },
-                    # Boost pour les profils récemment validés (decay)
-                    {
-                        "gauss": {
-                            "validated_at": {
-                                "origin": "now",
-                                "scale": "90d",
-                                "offset": "7d",
-                                "decay": 0.5
-                            }
-                        },
-                        "weight": 0.3
-                    }
-                ],
+                "functions": SCORE_FUNCTIONS[settings.SEARCH_USE_STORED_SCRIPTS],
                 "score_mode": "multiply",
                 "boost_mode": "multiply",
                 "max_boost": 5.0
@@ -609,78 +708,61 @@ class PostSearchQueryBuilder:
         # ============================================
         query = {
             "query": function_score_query,
-            "highlight": {
-                "fields": {
-                    "title": {
-                        "fragment_size": 100,
-                        "number_of_fragments": 1,
-                        "pre_tags": ["<mark class='highlight'>"],
-                        "post_tags": ["</mark>"],
-                        "type": "unified"
-                    },
-                    "main_job": {
-                        "fragment_size": 100,
-                        "number_of_fragments": 1,
-                        "pre_tags": ["<mark class='highlight'>"],
-                        "post_tags": ["</mark>"],
-                        "type": "unified"
-                    },
-                    "summary": {
-                        "fragment_size": 200,
-                        "number_of_fragments": 2,
-                        "pre_tags": ["<mark class='highlight'>"],
-                        "post_tags": ["</mark>"],
-                        "type": "unified"
-                    },
-                    "skills.name": {
-                        "fragment_size": 50,
-                        "number_of_fragments": 3,
-                        "pre_tags": ["<mark class='highlight'>"],
-                        "post_tags": ["</mark>"]
-                    },
-                    "location": {
-                        "fragment_size": 50,
-                        "number_of_fragments": 1,
-                        "pre_tags": ["<mark class='highlight'>"],
-                        "post_tags": ["</mark>"]
-                    }
-                },
-                "require_field_match": False,
-                "boundary_scanner": "word"
-            },
+            "highlight": HIGHLIGHT,
             "from": (search_request.page - 1) * search_request.size,
             "size": search_request.size,
-            "sort": [
-                {"_score": {"order": "desc"}},
-                {"admin_score": {"order": "desc", "missing": "_last"}},
-                {"years_of_experience": {"order": "desc"}}
-            ],
-            # Agrégations pour les facettes (optionnel mais utile)
-            "aggs": {
-                "availability_counts": {
-                    "terms": {"field": "availability", "size": 10}
-                },
-                "contract_type_counts": {
-                    "terms": {"field": "contract_type", "size": 10}
-                },
-                "sector_counts": {
-                    "terms": {"field": "sector", "size": 15}
-                },
-                "experience_ranges": {
-                    "range": {
-                        "field": "years_of_experience",
-                        "ranges": [
-                            {"key": "0-2", "from": 0, "to": 3},
-                            {"key": "3-5", "from": 3, "to": 6},
-                            {"key": "6-10", "from": 6, "to": 11},
-                            {"key": "10+", "from": 10}
-                        ]
-                    }
-                },
-                "avg_admin_score": {
-                    "avg": {"field": "admin_score"}
-                }
-            }
+            "sort": SORT,
         }
 
+        # Seuls les champs affichés transitent (pas d'expériences, formations...)
+        query["_source"] = {"includes": RESULT_SOURCE_FIELDS[search_request.projection]}
+
+        if include_facets:
+            query["aggs"] = FACET_AGGREGATIONS
+
+        return query
+
+    @staticmethod
+    def build_facets_query(search_request: PostSearchRequest) -> Dict[str, Any]:
+        """Requête des seules facettes (aucun résultat, ni highlight) pour les filtres de la requête"""
+        query = PostSearchQueryBuilder.build_query(search_request, include_facets=True)
+        return {"query": query["query"], "aggs": query["aggs"], "size": 0}
+
+
+# ============================================
+# TABLES PRÉCALCULÉES AU CHARGEMENT DU MODULE
+# ============================================
+
+# Niveau minimum -> niveaux acceptés ; un niveau inconnu accepte tous les niveaux
+_ALL_SKILL_LEVELS: List[str] = list(PostSearchQueryBuilder.SKILL_LEVEL_HIERARCHY)
+_SKILL_LEVELS_AT_LEAST: Dict[str, List[str]] = {
+    level: [
+        other for other, other_value in PostSearchQueryBuilder.SKILL_LEVEL_HIERARCHY.items()
+        if other_value >= value
+    ]
+    for level, value in PostSearchQueryBuilder.SKILL_LEVEL_HIERARCHY.items()
+}
+
+# Termes de synonymes trouvés en une passe : à chaque position, le lookahead
+# retient le premier terme (ordre du dictionnaire) qui y commence ; le terme
+# retenu est celui de plus haute priorité parmi toutes les positions.
+_JOB_TITLE_TERMS: List[str] = list(PostSearchQueryBuilder.JOB_TITLE_SYNONYMS)
+_JOB_TITLE_PRIORITY: Dict[str, int] = {term: index for index, term in enumerate(_JOB_TITLE_TERMS)}
+_JOB_TITLE_EXPANSIONS: List[str] = [
+    " ".join(PostSearchQueryBuilder.JOB_TITLE_SYNONYMS[term]) for term in _JOB_TITLE_TERMS
+]
+_JOB_TITLE_PATTERN = re.compile("(?=(" + "|".join(re.escape(term) for term in _JOB_TITLE_TERMS) + "))")
+
+
+@lru_cache(maxsize=1024)
+def _expand_job_title_synonyms(query: str) -> str:
+    priorities = [_JOB_TITLE_PRIORITY[match.group(1)] for match in _JOB_TITLE_PATTERN.finditer(query.lower())]
+    if not priorities:
         return query
+    return f"{query} {_JOB_TITLE_EXPANSIONS[min(priorities)]}"
+
+
+@lru_cache(maxsize=256)
+def _education_variants(level: str) -> List[str]:
+    level_key = level.upper().replace(" ", "_").replace("+", "_PLUS_")
+    return PostSearchQueryBuilder.EDUCATION_LEVEL_MAPPING.get(level_key, [level])
@@ -2,13 +2,15 @@
 Middleware/Décorateur pour la consultation sécurisée des profils candidats
 
 Flux :
-1. Vérifier le quota (POST /quotas/check)
-2. Si OK, afficher le profil
-3. Enregistrer l'accès (Audit Service)
-4. Décrémenter le quota (POST /quotas/use)
+1. Réserver le quota (POST /quotas/reserve, vérification et consommation en un appel),
+   en parallèle de la récupération du profil
+2. Si le profil ne peut pas être affiché, annuler la réservation (release)
+3. Enregistrer l'accès (Audit Service) hors du chemin de la requête
 """
+import asyncio
+import logging
 import httpx
-from typing import Callable, Optional
+from typing import Any, Callable, Coroutine, Optional, Set
 from functools import wraps
 from fastapi import HTTPException, status, Request, Depends
 import sys
@@ -42,6 +44,32 @@ else:
     print(f"⚠️ Warning: Shared module not found at {internal_auth_path}. Using dummy function.")
 
 from app.core.config import settings
+from app.infrastructure.http_client import service_client
+from app.infrastructure.audit_publisher import audit_publisher
+
+logger = logging.getLogger(__name__)
+
+# Tâches lancées hors du chemin de la requête (audit, annulation de réservation)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """
+    Exécute une coroutine sans que la requête en attende le résultat
+
+    Une référence est conservée jusqu'à la fin de la tâche pour éviter qu'elle
+    soit collectée en cours d'exécution.
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def drain_background_tasks(timeout: float = 5.0) -> None:
+    """Attend la fin des tâches de fond en cours (à appeler au shutdown)"""
+    if _background_tasks:
+        await asyncio.wait(list(_background_tasks), timeout=timeout)
 
 
 async def check_quota(company_id: int, quota_type: str = "profile_views") -> dict:
@@ -62,7 +90,7 @@ async def check_quota(company_id: int, quota_type: str = "profile_views") -> dic
         # Générer les headers avec le token de service
         headers = get_service_token_header("search-service")
         
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with service_client(settings.PAYMENT_SERVICE_URL, timeout=5.0) as client:
             response = await client.post(
                 f"{settings.PAYMENT_SERVICE_URL}/api/v1/quotas/check",
                 json={
@@ -121,7 +149,7 @@ async def use_quota(company_id: int, quota_type: str = "profile_views", amount:
         # Générer les headers avec le token de service
         headers = get_service_token_header("search-service")
         
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with service_client(settings.PAYMENT_SERVICE_URL, timeout=5.0) as client:
             response = await client.post(
                 f"{settings.PAYMENT_SERVICE_URL}/api/v1/quotas/use",
                 json={
@@ -156,6 +184,99 @@ async def use_quota(company_id: int, quota_type: str = "profile_views", amount:
         )
 
 
+async def reserve_quota(company_id: int, quota_type: str = "profile_views", amount: int = 1) -> dict:
+    """
+    Vérifie et consomme le quota d'une entreprise en un seul appel
+
+    Args:
+        company_id: ID de l'entreprise
+        quota_type: Type de quota (défaut: profile_views)
+        amount: Quantité à réserver (défaut: 1)
+
+    Returns:
+        Dict avec reservation_id, used, limit, remaining, expires_at
+
+    Raises:
+        HTTPException si le quota est dépassé ou erreur de service
+    """
+    try:
+        headers = get_service_token_header("search-service")
+
+        async with service_client(settings.PAYMENT_SERVICE_URL, timeout=5.0) as client:
+            response = await client.post(
+                f"{settings.PAYMENT_SERVICE_URL}/api/v1/quotas/reserve",
+                json={
+                    "company_id": company_id,
+                    "quota_type": quota_type,
+                    "amount": amount
+                },
+                headers=headers
+            )
+
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 403:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=response.json().get("message", "Quota exceeded")
+                )
+            elif response.status_code == 404:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Subscription not found"
+                )
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error reserving quota: {response.text}"
+                )
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment service timeout"
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Payment service unavailable: {str(e)}"
+        )
+
+
+async def release_quota(reservation_id: str) -> None:
+    """
+    Annule une réservation de quota (l'accès n'a finalement pas eu lieu)
+
+    Non-bloquant : une erreur est seulement loggée, la réservation reste alors consommée.
+    """
+    try:
+        headers = get_service_token_header("search-service")
+
+        async with service_client(settings.PAYMENT_SERVICE_URL, timeout=5.0) as client:
+            response = await client.post(
+                f"{settings.PAYMENT_SERVICE_URL}/api/v1/quotas/reservations/{reservation_id}/release",
+                headers=headers
+            )
+            if response.status_code != 200:
+                logger.warning(f"Failed to release quota reservation {reservation_id}: {response.text}")
+    except Exception as e:
+        logger.warning(f"Failed to release quota reservation {reservation_id}: {str(e)}")
+
+
+async def get_company_name(company_id: int, authorization: str = "") -> Optional[str]:
+    """Récupère le nom d'une entreprise (None si indisponible)"""
+    try:
+        async with service_client(settings.COMPANY_SERVICE_URL, timeout=3.0) as client:
+            response = await client.get(
+                f"{settings.COMPANY_SERVICE_URL}/api/v1/companies/{company_id}",
+                headers={"Authorization": authorization}
+            )
+            if response.status_code == 200:
+                return response.json().get("name")
+    except Exception:
+        pass  # Non-bloquant
+    return None
+
+
 async def log_access(
     recruiter_id: int,
     recruiter_email: str,
@@ -168,9 +289,9 @@ async def log_access(
     access_type: str = "profile_view",
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
-) -> dict:
+) -> None:
     """
-    Enregistre un accès dans le service Audit
+    Enregistre un accès dans le service Audit (selon AUDIT_INGESTION_MODE, voir audit_publisher)
     
     Args:
         recruiter_id: ID du recruteur
@@ -184,46 +305,103 @@ async def log_access(
         access_type: Type d'accès (défaut: profile_view)
         ip_address: Adresse IP
         user_agent: User Agent
-    
+    """
+    await audit_publisher.publish({
+        "recruiter_id": recruiter_id,
+        "recruiter_email": recruiter_email,
+        "recruiter_name": recruiter_name,
+        "company_id": company_id,
+        "company_name": company_name,
+        "candidate_id": candidate_id,
+        "candidate_email": candidate_email,
+        "candidate_name": candidate_name,
+        "access_type": access_type,
+        "ip_address": ip_address,
+        "user_agent": user_agent
+    })
+
+
+async def _log_profile_access(
+    authorization: str,
+    company_id: int,
+    company_name: Optional[str],
+    **log_kwargs
+) -> None:
+    """Complète le nom de l'entreprise puis enregistre l'accès dans l'Audit Service"""
+    if company_name is None:
+        company_name = await get_company_name(company_id, authorization)
+    await log_access(company_id=company_id, company_name=company_name, **log_kwargs)
+
+
+def schedule_access_log(
+    request: Request,
+    current_user,
+    company_id: int,
+    candidate_id: int,
+    profile: Optional[dict],
+    access_type: str = "profile_view",
+    company_name: Optional[str] = None
+) -> asyncio.Task:
+    """
+    Enregistre un accès à un profil sans bloquer la réponse
+
+    Le nom de l'entreprise (si non fourni) et l'écriture dans l'Audit Service
+    sont exécutés en tâche de fond.
+    """
+    candidate_email = None
+    candidate_name = None
+    if isinstance(profile, dict):
+        candidate_email = profile.get("email")
+        first_name = profile.get("first_name", "")
+        last_name = profile.get("last_name", "")
+        candidate_name = f"{first_name} {last_name}".strip() if first_name or last_name else None
+
+    return run_in_background(_log_profile_access(
+        authorization=request.headers.get("Authorization", ""),
+        company_id=company_id,
+        company_name=company_name,
+        recruiter_id=current_user.user_id,
+        recruiter_email=getattr(current_user, 'email', ''),
+        recruiter_name=None,  # Peut être récupéré depuis Auth Service si nécessaire
+        candidate_id=candidate_id,
+        candidate_email=candidate_email,
+        candidate_name=candidate_name,
+        access_type=access_type,
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent")
+    ))
+
+
+async def run_with_quota_reservation(
+    company_id: int,
+    operation: Coroutine[Any, Any, Any],
+    quota_type: str = "profile_views"
+) -> Any:
+    """
+    Exécute une opération en parallèle de la réservation de son quota
+
+    - si l'opération échoue, la réservation est annulée (hors chemin de la requête) ;
+    - si la réservation est refusée, l'erreur de quota est levée et le résultat
+      de l'opération n'est pas retourné.
+
     Returns:
-        Dict avec les données du log créé
-    
-    Raises:
-        HTTPException en cas d'erreur
+        Le résultat de l'opération
     """
-    try:
-        # Générer les headers avec le token de service
-        headers = get_service_token_header("search-service")
-        
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(
-                f"{settings.AUDIT_SERVICE_URL}/api/v1/audit",
-                json={
-                    "recruiter_id": recruiter_id,
-                    "recruiter_email": recruiter_email,
-                    "recruiter_name": recruiter_name,
-                    "company_id": company_id,
-                    "company_name": company_name,
-                    "candidate_id": candidate_id,
-                    "candidate_email": candidate_email,
-                    "candidate_name": candidate_name,
-                    "access_type": access_type,
-                    "ip_address": ip_address,
-                    "user_agent": user_agent
-                },
-                headers=headers
-            )
-            
-            if response.status_code == 201:
-                return response.json()
-            else:
-                # Ne pas bloquer si l'audit échoue, juste logger
-                print(f"Warning: Failed to log access: {response.text}")
-                return {}
-    except Exception as e:
-        # Ne pas bloquer si l'audit échoue, juste logger
-        print(f"Warning: Failed to log access: {str(e)}")
-        return {}
+    result, reservation = await asyncio.gather(
+        operation,
+        reserve_quota(company_id, quota_type, amount=1),
+        return_exceptions=True
+    )
+
+    if isinstance(result, BaseException):
+        if isinstance(reservation, dict) and reservation.get("reservation_id"):
+            run_in_background(release_quota(reservation["reservation_id"]))
+        raise result
+
+    if isinstance(reservation, BaseException):
+        raise reservation
+
+    return result
 
 
 async def require_quota_and_log_dependency(
@@ -263,10 +441,9 @@ def require_quota_and_log(
             ...
     
     Le décorateur :
-    1. Vérifie le quota via Payment Service
-    2. Exécute la fonction
-    3. Enregistre l'accès via Audit Service
-    4. Décrémente le quota via Payment Service
+    1. Réserve le quota via Payment Service, en parallèle de l'exécution de la fonction
+    2. Annule la réservation si la fonction échoue
+    3. Enregistre l'accès via Audit Service, en tâche de fond
     """
     def decorator(func: Callable):
         @wraps(func)
@@ -287,7 +464,7 @@ def require_quota_and_log(
                 # via le user_id (pour les recruteurs)
                 if hasattr(current_user, 'user_id'):
                     try:
-                        async with httpx.AsyncClient(timeout=5.0) as client:
+                        async with service_client(settings.COMPANY_SERVICE_URL, timeout=5.0) as client:
                             # Récupérer l'entreprise du recruteur
                             response = await client.get(
                                 f"{settings.COMPANY_SERVICE_URL}/api/v1/recruiters/me",
@@ -318,60 +495,24 @@ def require_quota_and_log(
                     detail="candidate_id is required"
                 )
             
-            # 1. Vérifier le quota
-            quota_data = await check_quota(company_id, quota_type)
-            
-            # 2. Exécuter la fonction (afficher le profil)
-            try:
-                result = await func(*args, request=request, current_user=current_user, **kwargs)
-            except Exception as e:
-                # Si erreur, ne pas décrémenter le quota
-                raise
-            
-            # 3. Enregistrer l'accès (non-bloquant)
-            # Récupérer les informations du candidat depuis le résultat
-            candidate_email = None
-            candidate_name = None
-            if isinstance(result, dict):
-                candidate_email = result.get("email")
-                first_name = result.get("first_name", "")
-                last_name = result.get("last_name", "")
-                candidate_name = f"{first_name} {last_name}".strip() if first_name or last_name else None
-            
-            # Récupérer le nom de l'entreprise si possible
-            company_name = None
-            try:
-                async with httpx.AsyncClient(timeout=3.0) as client:
-                    response = await client.get(
-                        f"{settings.COMPANY_SERVICE_URL}/api/v1/companies/{company_id}",
-                        headers={"Authorization": request.headers.get("Authorization", "")}
-                    )
-                    if response.status_code == 200:
-                        company_data = response.json()
-                        company_name = company_data.get("name")
-            except Exception:
-                pass  # Non-bloquant
-            
-            ip_address = request.client.host if request.client else None
-            user_agent = request.headers.get("user-agent")
+            # 1-2. Réserver le quota et exécuter la fonction (afficher le profil) en parallèle
+            #      La réservation est annulée si la fonction échoue
+            result = await run_with_quota_reservation(
+                company_id,
+                func(*args, request=request, current_user=current_user, **kwargs),
+                quota_type
+            )
             
-            await log_access(
-                recruiter_id=current_user.user_id,
-                recruiter_email=getattr(current_user, 'email', ''),
-                recruiter_name=None,  # Peut être récupéré depuis Auth Service si nécessaire
+            # 3. Enregistrer l'accès (hors du chemin de la requête)
+            schedule_access_log(
+                request,
+                current_user,
                 company_id=company_id,
-                company_name=company_name,
                 candidate_id=candidate_id,
-                candidate_email=candidate_email,
-                candidate_name=candidate_name,
-                access_type=access_type,
-                ip_address=ip_address,
-                user_agent=user_agent
+                profile=result,
+                access_type=access_type
             )
             
-            # 4. Décrémenter le quota
-            await use_quota(company_id, quota_type, amount=1)
-            
             return result
         
         return wrapper
@@ -0,0 +1,39 @@
+"""
+Configuration et gestion de Redis (optionnel)
+
+Redis sert de canal partagé entre services (révocation des tokens, caches).
+Si REDIS_URL n'est pas configuré, get_client() retourne None et les
+fonctionnalités qui en dépendent se dégradent en mode local.
+"""
+from typing import Optional
+
+from app.core.config import settings
+
+
+class RedisClient:
+    """Client Redis asynchrone créé à la demande"""
+
+    def __init__(self):
+        self.client = None
+
+    def get_client(self):
+        """Retourne le client Redis, ou None si Redis n'est pas configuré"""
+        if self.client is None and settings.REDIS_URL:
+            import redis.asyncio as redis
+            self.client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self.client
+
+    async def disconnect(self):
+        """Ferme le pool de connexions"""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+
+# Instance globale
+redis_client = RedisClient()
+
+
+def get_redis() -> Optional[object]:
+    """Raccourci vers le client Redis global (None si non configuré)"""
+    return redis_client.get_client()
@@ -0,0 +1,371 @@
+"""
+Réindexation complète des candidats validés depuis le Candidate Service
+
+Pipeline :
+1. un producteur lit les profils validés page par page
+   (GET /api/v1/profiles/internal/validated, pagination keyset sur l'ID) et les
+   convertit avec candidate_indexer.index_candidate ;
+2. les pages passent par une file bornée (REINDEX_MAX_PENDING_PAGES) : le
+   producteur attend quand Elasticsearch n'absorbe pas (backpressure) et la
+   mémoire reste bornée quelle que soit la taille du corpus ;
+3. REINDEX_CONCURRENCY workers envoient les pages avec async_streaming_bulk
+   (découpage par nombre de documents et par taille, retries sur 429).
+
+Le checkpoint (dernier ID dont tous les profils précédents sont indexés) est
+enregistré après chaque page, dans Redis si configuré, sinon dans
+REINDEX_CHECKPOINT_FILE : une réindexation interrompue reprend là où elle
+s'était arrêtée.
+
+Une nouvelle version d'index (bulk_mode) est remplie sans refresh ni réplique,
+réglages restaurés à la fin du job (voir bulk_indexing.py).
+
+Vers une nouvelle version d'index alimentée en double écriture (voir
+index_versions.py), les documents sont envoyés en op_type "create" : un
+document déjà écrit par le flux d'indexation courant est plus récent que le
+profil lu par la réindexation et n'est pas écrasé (conflit 409 compté en
+skipped).
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from elasticsearch.helpers import async_streaming_bulk
+
+from app.core.config import settings
+from app.infrastructure.bulk_indexing import bulk_load_mode
+from app.infrastructure.candidate_indexer import candidate_data_from_profile, index_candidate
+from app.infrastructure.elasticsearch import es_client
+from app.infrastructure.http_client import service_client
+from app.infrastructure.redis_client import get_redis
+from app.infrastructure.search_cache import search_cache
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'erreurs de documents conservées dans l'état du job
+MAX_KEPT_ERRORS = 20
+
+# IDs par appel de fetch_validated_profiles_by_ids : l'endpoint plafonne limit à
+# 1000, et les IDs passent dans l'URL (?ids=...&ids=...)
+MAX_IDS_PER_REQUEST = 500
+
+# (after_id) -> (profils de la page, after_id de la page suivante ou None)
+FetchPage = Callable[[int], Awaitable[Tuple[List[Dict[str, Any]], Optional[int]]]]
+
+
+async def fetch_validated_profiles(after_id: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Page de profils validés du Candidate Service après after_id"""
+    from app.infrastructure.quota_middleware import get_service_token_header
+
+    async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=60.0) as client:
+        response = await client.get(
+            f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/internal/validated",
+            params={"after_id": after_id, "limit": limit or settings.REINDEX_PAGE_SIZE},
+            headers=get_service_token_header("search-service"),
+        )
+        response.raise_for_status()
+        page = response.json()
+    return page["items"], page.get("next_after_id")
+
+
+async def fetch_validated_profiles_by_ids(ids: List[int]) -> List[Dict[str, Any]]:
+    """Profils encore validés parmi ids (les autres ne doivent plus être indexés)"""
+    from app.infrastructure.quota_middleware import get_service_token_header
+
+    profiles: List[Dict[str, Any]] = []
+    async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=60.0) as client:
+        # Par paquets : INDEXING_BATCH_SIZE peut dépasser la limite de l'endpoint
+        for start in range(0, len(ids), MAX_IDS_PER_REQUEST):
+            chunk = ids[start:start + MAX_IDS_PER_REQUEST]
+            response = await client.get(
+                f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/internal/validated",
+                params={"ids": chunk, "limit": len(chunk)},
+                headers=get_service_token_header("search-service"),
+            )
+            response.raise_for_status()
+            profiles.extend(response.json()["items"])
+    return profiles
+
+
+class CheckpointStore:
+    """Checkpoint de réindexation par index cible (Redis si configuré, sinon fichier)"""
+
+    def __init__(self, file_path: str, key_prefix: str = "search:reindex:checkpoint:"):
+        self.file_path = file_path
+        self.key_prefix = key_prefix
+
+    async def load(self, target_index: str) -> Optional[Dict[str, Any]]:
+        client = get_redis()
+        if client is not None:
+            raw = await client.get(f"{self.key_prefix}{target_index}")
+            return json.loads(raw) if raw else None
+        return self._read_file().get(target_index)
+
+    async def save(self, target_index: str, checkpoint: Dict[str, Any]) -> None:
+        client = get_redis()
+        if client is not None:
+            await client.set(f"{self.key_prefix}{target_index}", json.dumps(checkpoint))
+            return
+        checkpoints = self._read_file()
+        checkpoints[target_index] = checkpoint
+        self._write_file(checkpoints)
+
+    async def delete(self, target_index: str) -> None:
+        client = get_redis()
+        if client is not None:
+            await client.delete(f"{self.key_prefix}{target_index}")
+            return
+        checkpoints = self._read_file()
+        if checkpoints.pop(target_index, None) is None:
+            return
+        self._write_file(checkpoints)
+
+    def _write_file(self, checkpoints: Dict[str, Any]) -> None:
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoints, f)
+        os.replace(tmp_path, self.file_path)
+
+    def _read_file(self) -> Dict[str, Any]:
+        try:
+            with open(self.file_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+
+class ReindexJob:
+    """Une exécution de la réindexation vers un index cible"""
+
+    def __init__(
+        self,
+        target_index: str,
+        checkpoint_store: CheckpointStore,
+        fetch_page: FetchPage = fetch_validated_profiles,
+        client=None,
+        chunk_size: int = 500,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        concurrency: int = 2,
+        max_pending_pages: int = 4,
+        op_type: str = "index",
+        bulk_mode: bool = False,
+    ):
+        self.target_index = target_index
+        self.checkpoint_store = checkpoint_store
+        self.fetch_page = fetch_page
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.concurrency = max(concurrency, 1)
+        self.max_pending_pages = max(max_pending_pages, 1)
+        self.op_type = op_type
+        self.bulk_mode = bulk_mode
+        # Pages terminées hors ordre (numéro -> dernier ID), en attente du checkpoint
+        self._done_pages: Dict[int, int] = {}
+        self._next_page_to_checkpoint = 0
+        self.state: Dict[str, Any] = {
+            "target_index": target_index,
+            "status": "pending",
+            "after_id": 0,
+            "started_after_id": 0,
+            "pages": 0,
+            "indexed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "errors": [],
+            "started_at": None,
+            "finished_at": None,
+            "docs_per_second": 0.0,
+        }
+        self._started = 0.0
+
+    async def run(self, resume: bool = True) -> Dict[str, Any]:
+        """Exécute la réindexation jusqu'au bout (ou jusqu'à une erreur/annulation)"""
+        checkpoint = await self.checkpoint_store.load(self.target_index) if resume else None
+        if checkpoint and checkpoint.get("status") != "completed":
+            self.state["after_id"] = checkpoint.get("after_id", 0)
+        self.state.update({
+            "status": "running",
+            "started_after_id": self.state["after_id"],
+            "started_at": datetime.utcnow().isoformat(),
+        })
+        self._started = time.perf_counter()
+
+        if self.client is None:
+            await es_client.connect()
+            self.client = es_client.client
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_pages)
+        tasks: List[asyncio.Task] = []
+        try:
+            async with bulk_load_mode(self.client, [self.target_index] if self.bulk_mode else []):
+                tasks.append(asyncio.create_task(self._produce(queue)))
+                tasks += [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+                # Une erreur du producteur ou d'un worker arrête tout le job
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+            self.state["status"] = "completed"
+            if self.state["indexed"]:
+                await search_cache.invalidate()
+        except asyncio.CancelledError:
+            self.state["status"] = "cancelled"
+            raise
+        except Exception as e:
+            self.state["status"] = "failed"
+            self.state["error"] = str(e)
+            logger.error(f"Reindex into {self.target_index} failed: {str(e)}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.state["finished_at"] = datetime.utcnow().isoformat()
+            self._update_rate()
+            await self._save_checkpoint()
+        return self.state
+
+    async def _produce(self, queue: asyncio.Queue) -> None:
+        after_id = self.state["after_id"]
+        page_number = 0
+        while True:
+            profiles, next_after_id = await self.fetch_page(after_id)
+            if profiles:
+                # put attend si les workers ont déjà REINDEX_MAX_PENDING_PAGES pages de retard
+                await queue.put((page_number, self._actions(profiles), profiles[-1]["id"]))
+                page_number += 1
+            if not profiles or not next_after_id:
+                break
+            after_id = next_after_id
+        # Fin du corpus : un signal d'arrêt par worker
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    def _actions(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "_op_type": self.op_type,
+                "_index": self.target_index,
+                "_id": str(profile["id"]),
+                "_source": index_candidate(candidate_data_from_profile(profile)),
+            }
+            for profile in profiles
+        ]
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            page_number, actions, last_id = item
+            await self._bulk(actions)
+            await self._page_done(page_number, last_id)
+
+    async def _bulk(self, actions: List[Dict[str, Any]]) -> None:
+        async for ok, result in async_streaming_bulk(
+            self.client,
+            actions,
+            chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes,
+            raise_on_error=False,
+            raise_on_exception=False,
+            max_retries=3,
+            initial_backoff=1,
+        ):
+            if ok:
+                self.state["indexed"] += 1
+            elif self.op_type == "create" and result.get("create", {}).get("status") == 409:
+                # Déjà indexé par la double écriture : version plus récente
+                self.state["skipped"] += 1
+            else:
+                self.state["failed"] += 1
+                if len(self.state["errors"]) < MAX_KEPT_ERRORS:
+                    self.state["errors"].append(result)
+
+    async def _page_done(self, page_number: int, last_id: int) -> None:
+        """Avance le checkpoint sur la plus longue suite de pages terminées"""
+        self.state["pages"] += 1
+        self._done_pages[page_number] = last_id
+        advanced = False
+        while self._next_page_to_checkpoint in self._done_pages:
+            self.state["after_id"] = self._done_pages.pop(self._next_page_to_checkpoint)
+            self._next_page_to_checkpoint += 1
+            advanced = True
+        self._update_rate()
+        if advanced:
+            await self._save_checkpoint()
+
+    def _update_rate(self) -> None:
+        elapsed = time.perf_counter() - self._started
+        if elapsed > 0:
+            self.state["docs_per_second"] = round(self.state["indexed"] / elapsed, 1)
+
+    async def _save_checkpoint(self) -> None:
+        try:
+            await self.checkpoint_store.save(self.target_index, {
+                "after_id": self.state["after_id"],
+                "status": self.state["status"],
+                "indexed": self.state["indexed"],
+                "updated_at": datetime.utcnow().isoformat(),
+            })
+        except Exception as e:
+            logger.warning(f"Failed to save reindex checkpoint: {str(e)}")
+
+
+class ReindexManager:
+    """Lance au plus une réindexation à la fois en tâche de fond"""
+
+    def __init__(self):
+        self.job: Optional[ReindexJob] = None
+        self._task: Optional[asyncio.Task] = None
+        self.checkpoint_store = CheckpointStore(settings.REINDEX_CHECKPOINT_FILE)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, target_index: Optional[str] = None, resume: bool = True, op_type: str = "index") -> Dict[str, Any]:
+        """Démarre une réindexation (ValueError si une réindexation est déjà en cours)"""
+        if self.running:
+            raise ValueError("A reindex job is already running")
+        self.job = ReindexJob(
+            target_index=target_index or es_client.index_name,
+            checkpoint_store=self.checkpoint_store,
+            chunk_size=settings.REINDEX_BULK_CHUNK_SIZE,
+            max_chunk_bytes=settings.REINDEX_BULK_MAX_CHUNK_BYTES,
+            concurrency=settings.REINDEX_CONCURRENCY,
+            max_pending_pages=settings.REINDEX_MAX_PENDING_PAGES,
+            op_type=op_type,
+            # Version en construction (pas encore servie) : chargement massif
+            bulk_mode=settings.BULK_MODE_ENABLED and op_type == "create",
+        )
+        self._task = asyncio.create_task(self.job.run(resume=resume))
+        return self.job.state
+
+    def status(self) -> Optional[Dict[str, Any]]:
+        return self.job.state if self.job else None
+
+    async def cancel(self) -> bool:
+        """Annule la réindexation en cours (le checkpoint permet de la reprendre)"""
+        if not self.running:
+            return False
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def clear_checkpoint(self, target_index: str) -> None:
+        """Oublie le checkpoint d'un index (supprimé ou à remplir depuis le début)"""
+        try:
+            await self.checkpoint_store.delete(target_index)
+        except Exception as e:
+            logger.warning(f"Failed to delete reindex checkpoint: {str(e)}")
+
+
+# Instance globale
+reindex_manager = ReindexManager()
@@ -4,13 +4,94 @@ Builder pour construire les requêtes ElasticSearch
 from typing import Optional, List, Dict, Any
 from app.domain.schemas import SearchRequest
 
+# Facettes de GET /search (calculées une fois par jeu de filtres, voir facets.py)
+FACET_AGGREGATIONS: Dict[str, Any] = {
+    "sectors": {
+        "terms": {
+            "field": "sector",
+            "size": 20
+        }
+    },
+    "main_jobs": {
+        "terms": {
+            "field": "main_job.keyword",
+            "size": 20
+        }
+    },
+    "contract_types": {
+        "terms": {
+            "field": "contract_type",
+            "size": 10
+        }
+    },
+    "locations": {
+        "terms": {
+            "field": "desired_location",
+            "size": 20
+        }
+    },
+    "experience_ranges": {
+        "range": {
+            "field": "total_experience",
+            "ranges": [
+                {"to": 2},
+                {"from": 2, "to": 5},
+                {"from": 5, "to": 10},
+                {"from": 10}
+            ]
+        }
+    },
+    "admin_score_ranges": {
+        "range": {
+            "field": "admin_score",
+            "ranges": [
+                {"to": 3.0},
+                {"from": 3.0, "to": 4.0},
+                {"from": 4.0, "to": 4.5},
+                {"from": 4.5}
+            ]
+        }
+    }
+}
+
+# Champs de _source lus pour construire un SearchResult
+RESULT_SOURCE_FIELDS: List[str] = [
+    "candidate_id", "profile_title", "professional_summary", "first_name", "last_name",
+    "sector", "main_job", "total_experience", "admin_score", "skills",
+]
+
+# Parties statiques de la requête, partagées entre les requêtes (ne pas modifier)
+# Seuls les candidats validés (ou anciens documents sans champ status) apparaissent
+VALIDATED_STATUS_FILTER: Dict[str, Any] = {
+    "bool": {
+        "should": [
+            {"term": {"status": "VALIDATED"}},
+            {"bool": {"must_not": {"exists": {"field": "status"}}}}
+        ],
+        "minimum_should_match": 1
+    }
+}
+
+SORT: List[Dict[str, Any]] = [
+    {"_score": {"order": "desc"}},
+    {"admin_score": {"order": "desc", "missing": "_last"}},
+    {"validated_at": {"order": "desc"}},
+    # Départage stable entre documents de même score
+    {"candidate_id": {"order": "asc"}}
+]
+
 
 class SearchQueryBuilder:
     """Builder pour construire les requêtes de recherche ElasticSearch"""
     
     @staticmethod
-    def build_query(search_request: SearchRequest) -> Dict[str, Any]:
-        """Construit une requête ElasticSearch à partir d'une SearchRequest"""
+    def build_query(search_request: SearchRequest, include_facets: bool = True) -> Dict[str, Any]:
+        """
+        Construit une requête ElasticSearch à partir d'une SearchRequest
+
+        Avec include_facets=False, seuls les résultats de la page sont demandés
+        (facettes déjà en cache pour ces filtres).
+        """
         must_clauses = []
         filter_clauses = []
         
@@ -36,15 +117,7 @@ class SearchQueryBuilder:
         # FILTER : Statut VALIDATED (seuls les candidats validés doivent apparaître)
         # Utiliser bool should pour gérer les documents sans champ status (anciens documents)
         # Si pas de champ status, on considère qu'ils sont validés (car dans l'index)
-        filter_clauses.append({
-            "bool": {
-                "should": [
-                    {"term": {"status": "VALIDATED"}},
-                    {"bool": {"must_not": {"exists": {"field": "status"}}}}
-                ],
-                "minimum_should_match": 1
-            }
-        })
+        filter_clauses.append(VALIDATED_STATUS_FILTER)
         
         # Filtres par facettes
         if search_request.sectors:
@@ -165,67 +238,25 @@ class SearchQueryBuilder:
         if filter_clauses:
             bool_query["filter"] = filter_clauses
         
-        # Requête complète avec aggrégations (facettes)
+        # Requête complète (les facettes sont ajoutées si demandées)
         query = {
             "query": {
                 "bool": bool_query
             },
-            "aggs": {
-                "sectors": {
-                    "terms": {
-                        "field": "sector",
-                        "size": 20
-                    }
-                },
-                "main_jobs": {
-                    "terms": {
-                        "field": "main_job.keyword",
-                        "size": 20
-                    }
-                },
-                "contract_types": {
-                    "terms": {
-                        "field": "contract_type",
-                        "size": 10
-                    }
-                },
-                "locations": {
-                    "terms": {
-                        "field": "desired_location",
-                        "size": 20
-                    }
-                },
-                "experience_ranges": {
-                    "range": {
-                        "field": "total_experience",
-                        "ranges": [
-                            {"to": 2},
-                            {"from": 2, "to": 5},
-                            {"from": 5, "to": 10},
-                            {"from": 10}
-                        ]
-                    }
-                },
-                "admin_score_ranges": {
-                    "range": {
-                        "field": "admin_score",
-                        "ranges": [
-                            {"to": 3.0},
-                            {"from": 3.0, "to": 4.0},
-                            {"from": 4.0, "to": 4.5},
-                            {"from": 4.5}
-                        ]
-                    }
-                }
-            },
             "from": (search_request.page - 1) * search_request.size,
             "size": search_request.size,
-            "sort": [
-                {"_score": {"order": "desc"}},
-                {"admin_score": {"order": "desc", "missing": "_last"}},
-                {"validated_at": {"order": "desc"}}
-            ]
+            "sort": SORT,
+            "_source": {"includes": RESULT_SOURCE_FIELDS}
         }
         
+        if include_facets:
+            query["aggs"] = FACET_AGGREGATIONS
+        
         return query
 
+    @staticmethod
+    def build_facets_query(search_request: SearchRequest) -> Dict[str, Any]:
+        """Requête des seules facettes (aucun résultat) pour les filtres de la requête"""
+        query = SearchQueryBuilder.build_query(search_request, include_facets=True)
+        return {"query": query["query"], "aggs": query["aggs"], "size": 0}
+
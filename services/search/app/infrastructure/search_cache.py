@@ -0,0 +1,236 @@
+"""
+Cache des résultats de recherche
+
+Les recruteurs rejouent souvent les mêmes combinaisons de filtres : la réponse
+de GET /search et POST /search/search est mise en cache, clé = requête
+normalisée (listes triées, valeurs vides retirées).
+
+Deux niveaux :
+- un LRU local borné (SEARCH_CACHE_LOCAL_MAX_SIZE), sans aller-retour réseau ;
+- Redis (si configuré), partagé entre les instances du service.
+
+Invalidation par génération : chaque indexation ou suppression de document
+incrémente le compteur search:cache:generation, qui fait partie de la clé. Les
+entrées des générations précédentes ne sont plus jamais lues et expirent avec
+leur TTL. Sans Redis, la génération est locale au process (une seule instance).
+
+Les écritures ne forcent pas de refresh : pendant l'intervalle de refresh
+d'Elasticsearch, une recherche ne voit pas encore la modification et rangerait
+un résultat périmé sous la nouvelle génération. La génération est donc
+incrémentée une seconde fois SEARCH_CACHE_REFRESH_DELAY_SECONDS après la
+dernière écriture, une fois le refresh passé.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.infrastructure.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "search:cache:generation"
+ENTRY_KEY_PREFIX = "search:cache:result:"
+
+
+def normalize_request(request: BaseModel, exclude: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Forme canonique d'une requête : deux requêtes équivalentes donnent la même clé"""
+
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items() if v not in (None, "", [], {})}
+        if isinstance(value, list):
+            # Les filtres sont combinés sans ordre : l'ordre des valeurs est ignoré
+            items = [normalize(v) for v in value if v not in (None, "")]
+            return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+        return value
+
+    return normalize(request.model_dump(mode="json", exclude=exclude))
+
+
+class SearchResultCache:
+    """Cache LRU local + Redis des réponses de recherche, invalidé par génération d'index"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl_seconds: int = 300,
+        local_max_size: int = 1000,
+        refresh_delay_seconds: float = 2.0,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.local_max_size = local_max_size
+        self.refresh_delay_seconds = refresh_delay_seconds
+        # Seconde invalidation en attente du refresh, et écritures arrivées depuis son lancement
+        self._refresh_bump: Optional[asyncio.Task] = None
+        self._written_since_refresh_bump = False
+        # clé -> (entrée, expire_at)
+        self._local: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._local_generation = 0
+        # Métriques
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+        self.saved_es_ms = 0.0
+        self.es_ms = 0.0
+
+    async def _generation(self) -> Optional[int]:
+        client = get_redis()
+        if client is None:
+            return self._local_generation
+        try:
+            return int(await client.get(GENERATION_KEY) or 0)
+        except Exception as e:
+            # Génération inconnue : ne pas risquer de servir un résultat périmé
+            self.errors += 1
+            logger.warning(f"Failed to read search cache generation: {str(e)}")
+            return None
+
+    async def key_for(self, namespace: str, request: BaseModel, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        Clé de cache de la requête pour la génération courante de l'index
+
+        exclude : champs sans effet sur la valeur mise en cache (page, size pour les
+        facettes).
+
+        À calculer avant d'interroger Elasticsearch : un résultat calculé pendant une
+        indexation est rangé sous l'ancienne génération et ne sera pas relu.
+
+        Returns:
+            La clé, ou None si le cache est désactivé ou la génération illisible
+        """
+        if not self.enabled:
+            return None
+        generation = await self._generation()
+        if generation is None:
+            return None
+        digest = hashlib.sha1(
+            json.dumps(normalize_request(request, exclude), sort_keys=True).encode()
+        ).hexdigest()
+        return f"{ENTRY_KEY_PREFIX}{namespace}:{generation}:{digest}"
+
+    async def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Réponse en cache (LRU local puis Redis), ou None"""
+        if key is None:
+            return None
+
+        entry = self._local.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                self.saved_es_ms += entry[0]["es_ms"]
+                return entry[0]["value"]
+            del self._local[key]
+
+        client = get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Failed to read search cache entry: {str(e)}")
+                raw = None
+            if raw:
+                cached = json.loads(raw)
+                self._set_local(key, cached)
+                self.redis_hits += 1
+                self.saved_es_ms += cached["es_ms"]
+                return cached["value"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: Optional[str], value: Dict[str, Any], es_ms: float) -> None:
+        """Range une réponse (es_ms : durée de l'appel Elasticsearch évité par un hit)"""
+        self.es_ms += es_ms
+        if key is None:
+            return
+        cached = {"value": value, "es_ms": round(es_ms, 2)}
+        self._set_local(key, cached)
+        client = get_redis()
+        if client is not None:
+            try:
+                await client.set(key, json.dumps(cached), ex=self.ttl_seconds)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Failed to store search cache entry: {str(e)}")
+
+    def _set_local(self, key: str, cached: Dict[str, Any]) -> None:
+        if self.local_max_size <= 0:
+            return
+        self._local[key] = (cached, time.monotonic() + self.ttl_seconds)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    async def invalidate(self) -> None:
+        """Passe à la génération suivante (après toute écriture dans l'index)"""
+        self.invalidations += 1
+        await self._next_generation()
+        self._schedule_refresh_bump()
+
+    async def _next_generation(self) -> None:
+        self._local_generation += 1
+        self._local.clear()
+        client = get_redis()
+        if client is not None:
+            try:
+                await client.incr(GENERATION_KEY)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Failed to bump search cache generation: {str(e)}")
+
+    def _schedule_refresh_bump(self) -> None:
+        if self.refresh_delay_seconds <= 0:
+            return
+        if self._refresh_bump is not None and not self._refresh_bump.done():
+            # Une seule tâche en attente : elle repart pour les écritures arrivées entre-temps
+            self._written_since_refresh_bump = True
+            return
+        self._refresh_bump = asyncio.create_task(self._bump_after_refresh())
+
+    async def _bump_after_refresh(self) -> None:
+        """Écarte les résultats rangés entre l'écriture et le refresh d'Elasticsearch"""
+        while True:
+            self._written_since_refresh_bump = False
+            await asyncio.sleep(self.refresh_delay_seconds)
+            await self._next_generation()
+            if not self._written_since_refresh_bump:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_es_ms": round(self.saved_es_ms, 1),
+            "es_ms": round(self.es_ms, 1),
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+# Instance globale
+search_cache = SearchResultCache(
+    enabled=settings.SEARCH_CACHE_ENABLED,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    local_max_size=settings.SEARCH_CACHE_LOCAL_MAX_SIZE,
+    refresh_delay_seconds=settings.SEARCH_CACHE_REFRESH_DELAY_SECONDS,
+)
@@ -0,0 +1,67 @@
+"""
+Pagination par curseur de POST /search/search (point-in-time + search_after)
+
+`from = (page - 1) * size` coûte de plus en plus cher en profondeur et est
+plafonné par index.max_result_window. En mode curseur :
+- la première page ouvre un point-in-time (vue figée de l'index, valable
+  SEARCH_PIT_KEEP_ALIVE entre deux pages) ;
+- chaque page reprend après les valeurs de tri du dernier résultat
+  (search_after) ; candidate_id sert de départage stable ;
+- le curseur renvoyé au client est opaque (base64 du PIT, des valeurs de tri, du
+  numéro de page et d'une empreinte des filtres).
+
+Le mode page/size reste disponible tant qu'aucun curseur n'est demandé.
+"""
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List
+
+from app.core.exceptions import InvalidCursorError
+from app.domain.schemas import PostSearchRequest
+from app.infrastructure.search_cache import normalize_request
+
+# Champs qui peuvent changer d'une page à l'autre sans invalider le curseur
+NON_FILTER_FIELDS = {"page", "size", "cursor", "cursor_pagination", "include_facets", "projection"}
+
+
+def _filters_fingerprint(request: PostSearchRequest) -> str:
+    payload = json.dumps(normalize_request(request, NON_FILTER_FIELDS), sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def encode_cursor(pit_id: str, search_after: List[Any], request: PostSearchRequest, page: int) -> str:
+    """Curseur opaque de la page suivante"""
+    payload = {
+        "pit": pit_id,
+        "after": search_after,
+        "page": page,
+        "filters": _filters_fingerprint(request),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, request: PostSearchRequest) -> Dict[str, Any]:
+    """
+    Décode un curseur reçu du client
+
+    Raises:
+        InvalidCursorError: Curseur illisible ou émis pour d'autres filtres
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        pit_id, search_after, page = payload["pit"], payload["after"], int(payload["page"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError()
+    if payload.get("filters") != _filters_fingerprint(request):
+        raise InvalidCursorError("Search cursor does not match the request filters")
+    return {"pit": pit_id, "after": search_after, "page": page}
+
+
+def apply_cursor(query: Dict[str, Any], pit_id: str, search_after: List[Any], keep_alive: str) -> Dict[str, Any]:
+    """Remplace la pagination from/size d'une requête construite par le builder"""
+    query = {key: value for key, value in query.items() if key != "from"}
+    query["pit"] = {"id": pit_id, "keep_alive": keep_alive}
+    if search_after:
+        query["search_after"] = search_after
+    return query
@@ -0,0 +1,140 @@
+"""
+Suggestions de saisie (GET /search/suggest)
+
+Appelé à chaque frappe : une seule requête Elasticsearch size=0 (aucun
+document, éligible au request cache des shards), une agrégation par type de
+suggestion :
+- title / main_job : match sur les sous-champs edge-ngram `*.autocomplete`
+  (préfixes indexés, pas d'expansion de préfixe à la recherche) ;
+- skills / location : match_bool_prefix (dernier terme en préfixe), sans
+  changement de mapping ;
+puis terms sur le sous-champ keyword : les valeurs distinctes les plus
+fréquentes parmi les profils validés.
+
+Les préfixes courts reviennent sans cesse ("de", "dév", "dévo"...) : les
+réponses sont gardées dans un LRU local à TTL court (préfixes chauds), sans
+aller-retour Redis. Les suggestions tolèrent quelques secondes de retard sur
+l'index : le TTL suffit, pas d'invalidation par génération.
+"""
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.infrastructure.elasticsearch import es_client
+
+# Analyseur de la saisie : mêmes normalisations (minuscules, accents) que l'index edge-ngram
+_PREFIX_ANALYZER = "location_analyzer"
+
+# type de suggestion -> (chemin nested ou None, requête de préfixe, champ keyword agrégé)
+SUGGEST_FIELDS: Dict[str, Tuple[Optional[str], str, str]] = {
+    "title": (None, "title.autocomplete", "title.keyword"),
+    "main_job": (None, "main_job.autocomplete", "main_job.keyword"),
+    "skills": ("skills", "skills.name", "skills.name.keyword"),
+    "location": (None, "location", "location.keyword"),
+}
+
+VALIDATED_STATUS_FILTER = {"term": {"status": "VALIDATED"}}
+
+
+def normalize_prefix(prefix: str) -> str:
+    """Forme canonique de la saisie (clé du cache des préfixes)"""
+    folded = unicodedata.normalize("NFKD", prefix.lower())
+    return " ".join("".join(char for char in folded if not unicodedata.combining(char)).split())
+
+
+def _prefix_query(field: str, prefix: str) -> Dict[str, Any]:
+    if field.endswith(".autocomplete"):
+        return {"match": {field: {"query": prefix, "operator": "and", "analyzer": _PREFIX_ANALYZER}}}
+    return {"match_bool_prefix": {field: {"query": prefix, "operator": "and"}}}
+
+
+def build_suggest_query(prefix: str, fields: List[str], size: int) -> Dict[str, Any]:
+    """Requête size=0 : une agrégation filtrée par type de suggestion"""
+    aggs: Dict[str, Any] = {}
+    for name in fields:
+        nested_path, prefix_field, keyword_field = SUGGEST_FIELDS[name]
+        suggestions = {
+            "filter": _prefix_query(prefix_field, prefix),
+            "aggs": {"values": {"terms": {"field": keyword_field, "size": size}}},
+        }
+        if nested_path:
+            # Seules les compétences qui correspondent au préfixe, pas toutes celles du profil
+            suggestions = {"nested": {"path": nested_path}, "aggs": {"matching": suggestions}}
+        aggs[name] = suggestions
+    return {
+        "query": {"bool": {"filter": [VALIDATED_STATUS_FILTER]}},
+        "size": 0,
+        "track_total_hits": False,
+        "aggs": aggs,
+    }
+
+
+def parse_suggestions(aggregations: Dict[str, Any], fields: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """{type: [{value, count}]} à partir des agrégations"""
+    parsed = {}
+    for name in fields:
+        aggregation = aggregations.get(name, {})
+        if SUGGEST_FIELDS[name][0]:
+            aggregation = aggregation.get("matching", {})
+        parsed[name] = [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregation.get("values", {}).get("buckets", [])
+        ]
+    return parsed
+
+
+class SuggestEngine:
+    """Suggestions par préfixe avec cache local des préfixes chauds"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_size: int = 5000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        # (préfixe normalisé, types, taille) -> (suggestions, expire_at)
+        self._cache: "OrderedDict[Tuple[str, Tuple[str, ...], int], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # Métriques
+        self.hits = 0
+        self.misses = 0
+        self.es_ms = 0.0
+
+    async def suggest(self, prefix: str, fields: List[str], size: int) -> Dict[str, List[Dict[str, Any]]]:
+        normalized = normalize_prefix(prefix)
+        key = (normalized, tuple(sorted(set(fields))), size)
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._cache[key]
+        self.misses += 1
+
+        started = time.perf_counter()
+        result = await es_client.search(build_suggest_query(normalized, list(key[1]), size))
+        self.es_ms += (time.perf_counter() - started) * 1000
+        suggestions = parse_suggestions(result.get("aggregations", {}), list(key[1]))
+
+        if self.max_size > 0:
+            self._cache[key] = (suggestions, time.monotonic() + self.ttl_seconds)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return suggestions
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cached_prefixes": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_es_ms": round(self.es_ms / self.misses, 2) if self.misses else 0.0,
+        }
+
+
+# Instance globale
+suggest_engine = SuggestEngine(
+    ttl_seconds=settings.SUGGEST_CACHE_TTL_SECONDS,
+    max_size=settings.SUGGEST_CACHE_MAX_SIZE,
+)
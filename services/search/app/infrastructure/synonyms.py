@@ -0,0 +1,112 @@
+"""
+Jeux de synonymes gérés (API synonyms d'Elasticsearch)
+
+Les synonymes ne sont plus ajoutés au texte de la requête en Python : les
+search analyzers de l'index (job_title_search_analyzer, skill_search_analyzer,
+education_level_search_analyzer) appliquent un filtre synonym_graph
+"updateable" qui lit un jeu de synonymes stocké dans le cluster :
+- la modification d'un jeu ne demande pas de réindexation (les synonymes ne
+  sont appliqués qu'à la recherche) ;
+- après l'écriture, les search analyzers de l'index sont rechargés et le cache
+  de recherche est invalidé ;
+- la fuzziness des requêtes ne s'applique qu'aux termes saisis : Elasticsearch
+  ne fait pas d'expansion floue des termes issus d'un synonyme.
+
+Les règles suivent le format Solr : "a, b, c" (équivalence) ou "a, b => c".
+"""
+import logging
+from typing import Any, Dict, List
+
+from elasticsearch import NotFoundError
+
+from app.infrastructure.elasticsearch import SYNONYM_SET_IDS, es_client, synonym_rules
+from app.infrastructure.search_cache import search_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SynonymSetManager:
+    """Lecture, mise à jour et rechargement des jeux de synonymes de l'index des candidats"""
+
+    def __init__(self, client=None):
+        self.es = client or es_client
+
+    @staticmethod
+    def _check_set_id(set_id: str) -> None:
+        if set_id not in SYNONYM_SET_IDS.values():
+            raise KeyError(f"Unknown synonym set: {set_id}")
+
+    @staticmethod
+    def _check_rules(rules: List[str]) -> List[str]:
+        cleaned = [" ".join(rule.split()) for rule in rules]
+        for rule in cleaned:
+            terms = [term.strip() for term in rule.replace("=>", ",").split(",")]
+            if rule.count("=>") > 1 or len([term for term in terms if term]) < 2 or not all(terms):
+                raise ValueError(f"Invalid synonym rule: {rule!r}")
+        return cleaned
+
+    async def list_sets(self) -> List[Dict[str, Any]]:
+        """Jeux utilisés par l'index, avec leur nombre de règles"""
+        await self.es.connect()
+        sets = []
+        for name, set_id in SYNONYM_SET_IDS.items():
+            try:
+                response = await self.es.client.synonyms.get_synonym(id=set_id, size=1)
+                count = response["count"]
+            except NotFoundError:
+                count = None
+            sets.append({"name": name, "id": set_id, "count": count})
+        return sets
+
+    async def get_set(self, set_id: str) -> Dict[str, Any]:
+        """
+        Règles d'un jeu
+
+        Raises:
+            KeyError: Jeu inconnu ou absent du cluster
+        """
+        self._check_set_id(set_id)
+        await self.es.connect()
+        try:
+            response = await self.es.client.synonyms.get_synonym(id=set_id, size=10000)
+        except NotFoundError:
+            raise KeyError(f"Synonym set {set_id} does not exist yet")
+        return {
+            "id": set_id,
+            "count": response["count"],
+            "rules": [rule["synonyms"] for rule in response["synonyms_set"]],
+        }
+
+    async def put_set(self, set_id: str, rules: List[str]) -> Dict[str, Any]:
+        """
+        Remplace les règles d'un jeu puis recharge les search analyzers
+
+        Raises:
+            KeyError: Jeu inconnu
+            ValueError: Règle mal formée
+        """
+        self._check_set_id(set_id)
+        rules = self._check_rules(rules)
+        await self.es.connect()
+        await self.es.client.synonyms.put_synonym(id=set_id, synonyms_set=synonym_rules(rules))
+        reloaded = await self.reload_analyzers()
+        await search_cache.invalidate()
+        logger.info(f"Synonym set {set_id} updated ({len(rules)} rules)")
+        return {"id": set_id, "count": len(rules), "reloaded_indices": reloaded}
+
+    async def reload_analyzers(self) -> List[str]:
+        """Recharge les search analyzers des versions lues et écrites de l'index"""
+        await self.es.connect()
+        indices = sorted(
+            set(await self.es.alias_indices(self.es.index_name))
+            | set(await self.es.alias_indices(self.es.write_alias))
+        ) or [self.es.index_name]
+        response = await self.es.client.indices.reload_search_analyzers(index=",".join(indices))
+        return sorted({
+            detail["index"] for detail in response.get("reload_details", [])
+            if detail.get("reloaded_analyzers")
+        })
+
+
+# Instance globale
+synonym_manager = SynonymSetManager()
@@ -0,0 +1,213 @@
+"""
+Cache des tokens JWT validés localement et écoute des révocations
+
+En mode de vérification locale (AUTH_VERIFICATION_MODE=local), la signature et
+l'expiration du token sont vérifiées dans le service, sans appel à
+auth-service. Les claims validés sont gardés dans un cache LRU borné avec TTL.
+
+Les révocations sont publiées par auth-service dans Redis
+(voir auth-service/app/infrastructure/token_revocation.py) :
+- clé auth:revoked:jti:{jti} pour un token précis (logout) ;
+- clé auth:revoked:user:{user_id} contenant un timestamp "not before"
+  (changement de mot de passe, de rôles, anonymisation) ;
+- message pub/sub sur AUTH_REVOCATION_CHANNEL pour purger le cache.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.infrastructure.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Doivent rester identiques aux préfixes utilisés par auth-service
+REVOKED_JTI_KEY_PREFIX = "auth:revoked:jti:"
+REVOKED_USER_KEY_PREFIX = "auth:revoked:user:"
+
+
+class TokenClaimsCache:
+    """
+    Cache LRU borné des tokens déjà validés
+
+    Chaque entrée expire au plus tôt entre le TTL du cache et l'expiration du token.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # token -> (valeur, expire_at, payload)
+        self._entries: "OrderedDict[str, Tuple[Any, float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        """Retourne la valeur en cache pour ce token, ou None"""
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expire_at, _ = entry
+        if expire_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return value
+
+    def set(self, token: str, value: Any, payload: Dict[str, Any]) -> None:
+        """Ajoute un token validé dans le cache"""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        expire_at = time.time() + self.ttl_seconds
+        token_exp = payload.get("exp")
+        if token_exp:
+            expire_at = min(expire_at, float(token_exp))
+
+        self._entries[token] = (value, expire_at, payload)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_jti(self, jti: str) -> int:
+        """Supprime le token portant ce JTI"""
+        return self._invalidate(lambda payload: payload.get("jti") == jti)
+
+    def invalidate_user(self, user_id: int, not_before: Optional[int] = None) -> int:
+        """Supprime les tokens d'un utilisateur émis avant not_before (tous si None)"""
+        user_id = str(user_id)
+
+        def matches(payload: Dict[str, Any]) -> bool:
+            if str(payload.get("sub")) != user_id:
+                return False
+            return not_before is None or int(payload.get("iat") or 0) < not_before
+
+        return self._invalidate(matches)
+
+    def clear(self) -> None:
+        """Vide le cache"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du cache"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _invalidate(self, predicate) -> int:
+        tokens = [token for token, (_, _, payload) in self._entries.items() if predicate(payload)]
+        for token in tokens:
+            del self._entries[token]
+        return len(tokens)
+
+
+async def is_token_revoked(payload: Dict[str, Any]) -> bool:
+    """
+    Vérifie dans Redis si un token a été révoqué (un seul aller-retour)
+
+    Returns:
+        bool: False si Redis n'est pas configuré
+
+    Raises:
+        Exception: Si Redis est configuré mais injoignable
+    """
+    client = get_redis()
+    if client is None:
+        return False
+
+    jti = payload.get("jti")
+    async with client.pipeline(transaction=False) as pipe:
+        if jti:
+            pipe.exists(f"{REVOKED_JTI_KEY_PREFIX}{jti}")
+        pipe.get(f"{REVOKED_USER_KEY_PREFIX}{payload.get('sub')}")
+        results = await pipe.execute()
+
+    if jti and results[0]:
+        return True
+
+    not_before = results[-1]
+    if not_before is not None and int(payload.get("iat") or 0) < int(not_before):
+        return True
+
+    return False
+
+
+class RevocationListener:
+    """Abonnement pub/sub aux révocations publiées par auth-service"""
+
+    def __init__(self, cache: TokenClaimsCache, channel: str):
+        self.cache = cache
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Démarre l'écoute en tâche de fond (sans effet si Redis n'est pas configuré)"""
+        if self._task is None and get_redis() is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Arrête l'écoute"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def handle_message(self, data: str) -> None:
+        """Applique un message de révocation au cache"""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed revocation message: {data!r}")
+            return
+
+        if message.get("type") == "jti" and message.get("jti"):
+            self.cache.invalidate_jti(message["jti"])
+        elif message.get("type") == "user" and message.get("user_id") is not None:
+            self.cache.invalidate_user(message["user_id"], message.get("not_before"))
+
+    async def _run(self):
+        retry_delay = 1
+        while True:
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(self.channel)
+                # Des révocations ont pu être manquées pendant la déconnexion
+                self.cache.clear()
+                retry_delay = 1
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.handle_message(message.get("data"))
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation listener disconnected: {str(e)}. Retrying in {retry_delay}s")
+                self.cache.clear()
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+
+
+# Instances globales
+token_cache = TokenClaimsCache(
+    max_size=settings.AUTH_TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+revocation_listener = RevocationListener(token_cache, settings.AUTH_REVOCATION_CHANNEL)
@@ -7,7 +7,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import search, indexing, candidates, stats
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
+from app.infrastructure.http_client import close_http_clients, configure_upstream, http_client_metrics
 from app.infrastructure.elasticsearch import init_elasticsearch
+from app.infrastructure.redis_client import redis_client
+from app.infrastructure.quota_middleware import drain_background_tasks
+from app.infrastructure.audit_publisher import audit_publisher
+from app.infrastructure.reindex import reindex_manager
+from app.infrastructure.search_cache import search_cache
+from app.infrastructure.facets import facet_engine
+from app.infrastructure.indexing_consumer import indexing_consumer
+from app.infrastructure.suggest import suggest_engine
+from app.infrastructure.token_cache import revocation_listener
 
 app = FastAPI(
     title="Search Service",
@@ -41,6 +51,21 @@ async def startup_event():
     """Initialisation au démarrage"""
     import logging
     logger = logging.getLogger(__name__)
+
+    # Pools HTTP des services appelés sur le chemin de recherche / consultation de profil
+    for upstream_url in (
+        settings.AUTH_SERVICE_URL,
+        settings.PAYMENT_SERVICE_URL,
+        settings.AUDIT_SERVICE_URL,
+        settings.COMPANY_SERVICE_URL,
+        settings.CANDIDATE_SERVICE_URL,
+    ):
+        configure_upstream(
+            upstream_url,
+            timeout=5.0,
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+        )
     
     try:
         await init_elasticsearch()
@@ -49,6 +74,24 @@ async def startup_event():
         logger.warning("Service will start but Elasticsearch operations may fail. Will retry on first use.")
         # Ne pas bloquer le démarrage du service, on réessayera lors de la première utilisation
 
+    # Écoute des révocations de tokens (sans effet si REDIS_URL n'est pas configuré)
+    await revocation_listener.start()
+
+    # Indexation par événements (sans effet si REDIS_URL n'est pas configuré)
+    await indexing_consumer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre des tâches de fond"""
+    await reindex_manager.cancel()
+    await indexing_consumer.stop()
+    await revocation_listener.stop()
+    await drain_background_tasks()
+    await audit_publisher.stop()
+    await redis_client.disconnect()
+    await close_http_clients()
+
 
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -60,6 +103,36 @@ async def health_check():
     }
 
 
+@app.get("/health/http-clients", tags=["Health"])
+async def http_clients_metrics():
+    """Métriques des pools HTTP inter-services (requêtes, attente de connexion)"""
+    return http_client_metrics()
+
+
+@app.get("/health/audit-publisher", tags=["Health"])
+async def audit_publisher_metrics():
+    """Logs d'accès publiés (stream, lots, direct), en attente et abandonnés"""
+    return audit_publisher.stats()
+
+
+@app.get("/health/search-cache", tags=["Health"])
+async def search_cache_metrics():
+    """Taux de hit du cache de recherche et temps Elasticsearch économisé"""
+    return {**search_cache.stats(), "facets": facet_engine.stats()}
+
+
+@app.get("/health/suggest", tags=["Health"])
+async def suggest_metrics():
+    """Taux de hit du cache des préfixes et latence Elasticsearch des suggestions"""
+    return suggest_engine.stats()
+
+
+@app.get("/health/indexing-consumer", tags=["Health"])
+async def indexing_consumer_metrics():
+    """Retard du consommateur d'événements d'indexation, coalescence et lettres mortes"""
+    return await indexing_consumer.metrics()
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark de la construction des requêtes de recherche (sans Elasticsearch)
+
+Mesure le débit de PostSearchQueryBuilder.build_query et
+SearchQueryBuilder.build_query sur des requêtes représentatives (texte libre
+avec synonymes, compétences avec niveau, filtres multiples).
+
+Usage (depuis services/search) :
+    python scripts/bench_build_query.py
+    python scripts/bench_build_query.py --iterations 50000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from app.domain.schemas import PostSearchRequest, SearchRequest  # noqa: E402
+from app.infrastructure.post_search_builder import PostSearchQueryBuilder  # noqa: E402
+from app.infrastructure.search_builder import SearchQueryBuilder  # noqa: E402
+
+POST_REQUESTS = {
+    "match_all": PostSearchRequest(),
+    "text_synonyms": PostSearchRequest(query="développeur fullstack python", job_title="chef de projet"),
+    "skills_levels": PostSearchRequest(
+        skills=["Python:Advanced", "React:Intermediate", "Docker"],
+        skills_with_level=[{"name": "SQL", "level": "Expert"}],
+        languages={"Français": "courant", "Anglais": "professionnel"},
+    ),
+    "many_filters": PostSearchRequest(
+        query="data scientist",
+        min_experience=3,
+        experience_ranges=[{"min": 3, "max": 5}, {"min": 10}],
+        location="Dakar",
+        availability=["IMMEDIATE"],
+        education_levels=["BAC+5", "Doctorat"],
+        salary_ranges=["1m-2m", "2m-3m"],
+        contract_types=["CDI", "FREELANCE"],
+        sector="IT",
+        min_admin_score=3.5,
+        page=3,
+    ),
+}
+
+GET_REQUESTS = {
+    "get_filters": SearchRequest(
+        query="comptable", sectors=["Finance"], skills=["Excel:Expert", "Sage"], min_experience=2, page=2,
+    ),
+}
+
+
+def bench(name: str, build, request, iterations: int) -> None:
+    build(request)  # échauffement
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build(request)
+    elapsed = time.perf_counter() - started
+    payload_bytes = len(json.dumps(build(request), ensure_ascii=False).encode())
+    print(
+        f"{name:<16} {iterations / elapsed:>12,.0f} builds/s "
+        f"{elapsed / iterations * 1e6:>8.1f} µs/build {payload_bytes:>8} bytes"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    for name, request in POST_REQUESTS.items():
+        bench(name, PostSearchQueryBuilder.build_query, request, args.iterations)
+    for name, request in GET_REQUESTS.items():
+        bench(name, SearchQueryBuilder.build_query, request, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
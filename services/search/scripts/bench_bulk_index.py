@@ -0,0 +1,227 @@
+"""
+Benchmark du chargement massif (bulk_indexing.py) contre l'envoi bulk historique
+
+Compare, sur un corpus synthétique de documents candidats :
+- baseline : un seul flux async_streaming_bulk (500 documents par requête),
+  index avec refresh toutes les secondes et une réplique ;
+- parallel : parallel_bulk (découpage par nombre et par taille, BULK_WORKERS
+  requêtes simultanées), réglages de l'index inchangés ;
+- bulk_mode : parallel_bulk sous bulk_load_mode (refresh et répliques coupés,
+  restaurés à la fin).
+
+Sans --es-url, le benchmark tourne contre un Elasticsearch simulé local (serveur
+aiohttp) : coût fixe par requête, coût par document doublé par la réplique, pool
+d'écriture de --write-threads requêtes, refresh périodique qui bloque le pool.
+Ces paramètres sont affichés : seul le gain relatif entre les modes a un sens.
+Avec --es-url, un index jetable est créé sur le cluster puis supprimé.
+
+Usage (depuis services/search) :
+    python scripts/bench_bulk_index.py
+    python scripts/bench_bulk_index.py --docs 50000 --workers 8
+    python scripts/bench_bulk_index.py --es-url http://localhost:9200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from aiohttp import web  # noqa: E402
+from elasticsearch import AsyncElasticsearch  # noqa: E402
+from elasticsearch.helpers import async_streaming_bulk  # noqa: E402
+
+from app.infrastructure.bulk_indexing import bulk_load_mode, parallel_bulk  # noqa: E402
+from app.infrastructure.candidate_indexer import index_candidate  # noqa: E402
+
+BENCH_INDEX = "bench-candidates"
+SKILLS = ["Python", "Java", "React", "SQL", "Docker", "Excel", "Sage", "Figma", "AWS", "Node.js"]
+TITLES = ["Développeur Python", "Comptable", "Chef de projet", "Data scientist", "Commercial", "Designer UX"]
+
+
+def synthetic_actions(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    actions = []
+    for candidate_id in range(1, count + 1):
+        document = index_candidate({
+            "candidate_id": candidate_id,
+            "full_name": f"Candidat {candidate_id}",
+            "title": rng.choice(TITLES),
+            "summary": " ".join(rng.choice(TITLES) for _ in range(30)),
+            "skills": [{"name": name, "level": "ADVANCED"} for name in rng.sample(SKILLS, 4)],
+            "years_of_experience": rng.randint(0, 20),
+            "location": rng.choice(["Dakar, Sénégal", "Thiès, Sénégal", "Abidjan, Côte d'Ivoire"]),
+            "is_verified": True,
+            "status": "VALIDATED",
+        })
+        actions.append({"_index": BENCH_INDEX, "_id": str(candidate_id), "_source": document})
+    return actions
+
+
+class StandInElasticsearch:
+    """Nœud Elasticsearch simulé : _bulk, _settings et _refresh"""
+
+    def __init__(self, request_ms: float, doc_us: float, write_threads: int, refresh_ms: float):
+        self.request_ms = request_ms
+        self.doc_us = doc_us
+        self.refresh_ms = refresh_ms
+        self.write_pool = asyncio.Semaphore(write_threads)
+        self.write_threads = write_threads
+        self.settings = {"refresh_interval": "1s", "number_of_replicas": "1"}
+        self.refreshes = 0
+        self._refresher = None
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._product_header], client_max_size=200 * 1024 * 1024)
+        app.router.add_get("/", self._info)
+        app.router.add_route("*", "/_bulk", self._bulk)
+        app.router.add_get("/{index}/_settings/{names}", self._get_settings)
+        app.router.add_put("/{index}/_settings", self._put_settings)
+        app.router.add_route("*", "/{index}/_refresh", self._refresh_endpoint)
+        app.on_startup.append(self._start_refresher)
+        app.on_cleanup.append(self._stop_refresher)
+        return app
+
+    @web.middleware
+    async def _product_header(self, request, handler):
+        response = await handler(request)
+        response.headers["X-Elastic-Product"] = "Elasticsearch"
+        return response
+
+    async def _info(self, request):
+        return web.json_response({"version": {"number": "8.11.0"}, "tagline": "You Know, for Search"})
+
+    async def _bulk(self, request):
+        lines = (await request.read()).splitlines()
+        headers = [json.loads(line) for line in lines[0::2]]
+        await asyncio.sleep(self.request_ms / 1000)  # réseau, parsing
+        copies = 1 + int(self.settings["number_of_replicas"])
+        async with self.write_pool:
+            await asyncio.sleep(len(headers) * self.doc_us * copies / 1e6)
+        items = [
+            {op: {"_index": spec.get("_index", BENCH_INDEX), "_id": spec.get("_id"), "status": 201, "result": "created"}}
+            for header in headers for op, spec in header.items()
+        ]
+        return web.json_response({"took": 1, "errors": False, "items": items})
+
+    async def _get_settings(self, request):
+        return web.json_response({request.match_info["index"]: {"settings": {"index": dict(self.settings)}}})
+
+    async def _put_settings(self, request):
+        for name, value in (await request.json())["index"].items():
+            self.settings[name] = {"refresh_interval": "1s", "number_of_replicas": "1"}[name] if value is None else str(value)
+        return web.json_response({"acknowledged": True})
+
+    async def _refresh_endpoint(self, request):
+        await self._refresh()
+        return web.json_response({"_shards": {"total": 1, "successful": 1, "failed": 0}})
+
+    async def _refresh(self):
+        # Le refresh occupe tout le pool d'écriture
+        for _ in range(self.write_threads):
+            await self.write_pool.acquire()
+        try:
+            await asyncio.sleep(self.refresh_ms / 1000)
+            self.refreshes += 1
+        finally:
+            for _ in range(self.write_threads):
+                self.write_pool.release()
+
+    async def _refresh_loop(self):
+        while True:
+            interval = self.settings["refresh_interval"]
+            await asyncio.sleep(1.0 if interval == "-1" else float(interval.rstrip("s")))
+            if self.settings["refresh_interval"] != "-1":
+                await self._refresh()
+
+    async def _start_refresher(self, app):
+        self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _stop_refresher(self, app):
+        self._refresher.cancel()
+
+
+async def run_baseline(client, actions) -> dict:
+    indexed, started = 0, time.perf_counter()
+    async for ok, _ in async_streaming_bulk(client, actions, chunk_size=500, raise_on_error=False):
+        indexed += ok
+    elapsed = time.perf_counter() - started
+    return {"indexed": indexed, "elapsed_seconds": round(elapsed, 3), "docs_per_second": round(indexed / elapsed, 1)}
+
+
+async def run_parallel(client, actions, workers: int) -> dict:
+    return await parallel_bulk(client, actions, workers=workers)
+
+
+async def run_bulk_mode(client, actions, workers: int) -> dict:
+    # Mesure complète : réglages, chargement, restauration et refresh final
+    started = time.perf_counter()
+    async with bulk_load_mode(client, [BENCH_INDEX]):
+        report = await parallel_bulk(client, actions, workers=workers)
+    elapsed = time.perf_counter() - started
+    return {**report, "elapsed_seconds": round(elapsed, 3), "docs_per_second": round(report["indexed"] / elapsed, 1)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--es-url", default=None, help="Cluster réel (sinon Elasticsearch simulé)")
+    parser.add_argument("--request-ms", type=float, default=3.0, help="Simulé : coût fixe par requête bulk")
+    parser.add_argument("--doc-us", type=float, default=40.0, help="Simulé : coût d'indexation par document et par copie")
+    parser.add_argument("--write-threads", type=int, default=2, help="Simulé : requêtes bulk traitées en parallèle")
+    parser.add_argument("--refresh-ms", type=float, default=150.0, help="Simulé : durée d'un refresh")
+    args = parser.parse_args()
+
+    actions = synthetic_actions(args.docs)
+    runner = None
+    if args.es_url:
+        client = AsyncElasticsearch(args.es_url, request_timeout=120)
+        print(f"cluster: {args.es_url}")
+    else:
+        stand_in = StandInElasticsearch(args.request_ms, args.doc_us, args.write_threads, args.refresh_ms)
+        runner = web.AppRunner(stand_in.app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        client = AsyncElasticsearch(f"http://127.0.0.1:{port}", request_timeout=120)
+        print(
+            f"stand-in: {args.request_ms}ms/request, {args.doc_us}µs/doc/copy, "
+            f"{args.write_threads} write threads, refresh {args.refresh_ms}ms every 1s, 1 replica"
+        )
+    print(f"{args.docs} documents, {args.workers} workers\n")
+
+    try:
+        results = {}
+        for name, run in (
+            ("baseline", lambda: run_baseline(client, actions)),
+            ("parallel", lambda: run_parallel(client, actions, args.workers)),
+            ("bulk_mode", lambda: run_bulk_mode(client, actions, args.workers)),
+        ):
+            if args.es_url:
+                await client.options(ignore_status=404).indices.delete(index=BENCH_INDEX)
+                await client.indices.create(index=BENCH_INDEX, settings={"number_of_replicas": 1})
+            results[name] = await run()
+            report = results[name]
+            gain = report["docs_per_second"] / results["baseline"]["docs_per_second"]
+            print(
+                f"{name:<10} {report['docs_per_second']:>10,.0f} docs/s "
+                f"{report['elapsed_seconds']:>8.2f} s  x{gain:.2f}"
+            )
+    finally:
+        if args.es_url:
+            await client.options(ignore_status=404).indices.delete(index=BENCH_INDEX)
+        await client.close()
+        if runner is not None:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,372 @@
+"""
+Benchmark de la recherche recruteur (POST /search) sur un corpus synthétique
+
+1. Génère N candidats au format CandidateIndexRequest (compétences, expériences,
+   formations, langues, textes en français) et les charge par
+   bulk_index_candidates dans un index dédié (ELASTICSEARCH_INDEX_NAME, par
+   défaut "bench_candidates", jamais l'index servi) ;
+2. rejoue un mélange de PostSearchRequest, généré ou enregistré (--queries,
+   JSONL : {"shape": ..., "request": {...}, "expect": [...]}) ;
+3. par forme de requête : latence p50/p95/p99 (construction + aller-retour
+   Elasticsearch), `took` d'Elasticsearch, taille de la requête et de la
+   réponse, nombre de résultats et précision des 10 premiers résultats (part
+   des résultats contenant un des termes "expect").
+
+--save enregistre le rapport en JSON ; --baseline compare le p95 à un rapport
+précédent et sort en erreur au-delà de --max-regression (modification de
+PostSearchQueryBuilder, des analyzers ou du mapping).
+
+Usage (depuis services/search, Elasticsearch local sur localhost:9200) :
+    python scripts/bench_search.py --docs 20000 --save bench-before.json
+    python scripts/bench_search.py --skip-load --baseline bench-before.json
+    python scripts/bench_search.py --skip-load --queries recorded.jsonl --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+os.environ.setdefault("ELASTICSEARCH_INDEX_NAME", "bench_candidates")
+
+from app.api.v1.candidates import CandidateIndexRequest  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.domain.schemas import PostSearchRequest  # noqa: E402
+from app.infrastructure.candidate_indexer import bulk_index_candidates  # noqa: E402
+from app.infrastructure.elasticsearch import PARTIAL_UPDATE_SCRIPT, PARTIAL_UPDATE_SCRIPT_ID, es_client  # noqa: E402
+from app.infrastructure.post_search_builder import STORED_SCRIPTS, PostSearchQueryBuilder  # noqa: E402
+
+SERVED_INDEX = "certified_candidates"
+
+FIRST_NAMES = ["Awa", "Moussa", "Fatou", "Ibrahima", "Aïssatou", "Cheikh", "Mariama", "Ousmane", "Kadiatou", "Koffi", "Adjoa", "Yao"]
+LAST_NAMES = ["Diop", "Ndiaye", "Fall", "Sow", "Ba", "Traoré", "Koné", "Kouassi", "Diallo", "Camara", "Mensah", "Faye"]
+CITIES = ["Dakar, Sénégal", "Thiès, Sénégal", "Saint-Louis, Sénégal", "Abidjan, Côte d'Ivoire", "Bouaké, Côte d'Ivoire", "Bamako, Mali"]
+COMPANIES = ["Sonatel", "Orange", "Wave", "Ecobank", "CBAO", "Total Energies", "Eiffage", "Jumia", "Expresso", "Bolloré"]
+INSTITUTIONS = ["UCAD", "ESP Dakar", "ISM", "Université Gaston Berger", "INP-HB", "Sup de Co Dakar"]
+EDUCATION_LEVELS = ["BAC", "BAC+2", "BTS", "LICENCE", "BAC+3", "MASTER", "BAC+5", "DOCTORAT"]
+AVAILABILITIES = ["IMMEDIATE", "WITHIN_1_MONTH", "WITHIN_3_MONTHS", "NOT_AVAILABLE"]
+CONTRACT_TYPES = ["CDI", "CDD", "FREELANCE", "STAGE"]
+LEVELS = ["BEGINNER", "INTERMEDIATE", "ADVANCED", "EXPERT"]
+LANGUAGES = ["Français", "Anglais", "Wolof", "Espagnol", "Arabe"]
+
+# Métier -> (secteur, compétences, termes des résumés)
+JOBS = {
+    "Développeur Python": ("IT", ["Python", "Django", "FastAPI", "SQL", "Docker", "Git"], ["API", "backend", "microservices"]),
+    "Développeur Full Stack": ("IT", ["JavaScript", "React", "Node.js", "TypeScript", "SQL", "Docker"], ["frontend", "backend", "applications web"]),
+    "Data scientist": ("IT", ["Python", "Pandas", "Machine Learning", "SQL", "TensorFlow"], ["modèles prédictifs", "données", "statistiques"]),
+    "Ingénieur DevOps": ("IT", ["Kubernetes", "Docker", "AWS", "Terraform", "Linux"], ["intégration continue", "infrastructure", "supervision"]),
+    "Comptable": ("Finance", ["Sage", "Excel", "SYSCOHADA", "Fiscalité", "Audit"], ["clôture des comptes", "déclarations fiscales", "rapprochements bancaires"]),
+    "Contrôleur de gestion": ("Finance", ["Excel", "Power BI", "SAP", "Budget"], ["tableaux de bord", "reporting", "prévisions budgétaires"]),
+    "Chef de projet": ("Conseil", ["Gestion de projet", "Scrum", "MS Project", "Jira"], ["pilotage", "planification", "coordination des équipes"]),
+    "Commercial": ("Commerce", ["Négociation", "Prospection", "CRM", "Salesforce"], ["portefeuille clients", "chiffre d'affaires", "prospection terrain"]),
+    "Chargé RH": ("Ressources humaines", ["Recrutement", "Paie", "Droit du travail", "SIRH"], ["recrutement", "formation", "gestion administrative du personnel"]),
+    "Designer UX": ("IT", ["Figma", "Adobe XD", "Prototypage", "Recherche utilisateur"], ["parcours utilisateur", "maquettes", "tests utilisateurs"]),
+}
+
+
+def _summary(rng: random.Random, job: str, terms: List[str], years: int) -> str:
+    sentences = [
+        f"{job} avec {years} ans d'expérience, spécialisé dans {rng.choice(terms)}.",
+        f"J'ai travaillé sur {rng.choice(terms)} et {rng.choice(terms)} pour des entreprises de la sous-région.",
+        "Rigoureux, autonome et à l'aise en équipe, je recherche un poste à responsabilités.",
+        f"Expérience confirmée en {rng.choice(terms)} et en accompagnement des équipes métier.",
+    ]
+    return " ".join(rng.sample(sentences, 3))
+
+
+def synthetic_candidates(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Candidats au format CandidateIndexRequest (+ expériences, lues par index_candidate)"""
+    rng = random.Random(seed)
+    candidates = []
+    for candidate_id in range(1, count + 1):
+        job = rng.choice(list(JOBS))
+        sector, skills, terms = JOBS[job]
+        years = rng.randint(0, 20)
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        experiences = []
+        start_year = date.today().year - years
+        for position in range(rng.randint(1, 4)):
+            start = start_year + position * max(years // 4, 1)
+            experiences.append({
+                "position": job if position else f"{job} junior",
+                "company_name": rng.choice(COMPANIES),
+                "start_date": f"{min(start, date.today().year)}-0{rng.randint(1, 9)}-01",
+                "end_date": None if position == 0 else f"{min(start + 2, date.today().year)}-12-31",
+                "is_current": position == 0,
+            })
+        candidate = CandidateIndexRequest(
+            candidate_id=candidate_id,
+            full_name=f"{first_name} {last_name}",
+            title=job,
+            skills=[{"name": name, "level": rng.choice(LEVELS)} for name in rng.sample(skills, rng.randint(2, len(skills)))],
+            educations=[{
+                "diploma": f"Diplôme en {sector.lower()}",
+                "institution": rng.choice(INSTITUTIONS),
+                "level": rng.choice(EDUCATION_LEVELS),
+                "graduation_year": start_year - rng.randint(0, 2),
+            }],
+            languages=[{"name": name, "level": rng.choice(LEVELS)} for name in rng.sample(LANGUAGES, 2)],
+            years_of_experience=years,
+            location=rng.choice(CITIES),
+            is_verified=True,
+            summary=_summary(rng, job, terms, years),
+            main_job=job,
+            sector=sector,
+            admin_score=round(rng.uniform(2.0, 5.0), 1),
+            availability=rng.choice(AVAILABILITIES),
+        ).model_dump()
+        candidate["experiences"] = experiences
+        candidate["contract_type"] = rng.choice(CONTRACT_TYPES)
+        candidate["salary_expectations"] = rng.randrange(300000, 6000000, 50000)
+        candidates.append(candidate)
+    return candidates
+
+
+def generated_queries(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Mélange de formes de requêtes recruteur : {"shape", "request", "expect"}"""
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(count):
+        job = rng.choice(list(JOBS))
+        sector, skills, terms = JOBS[job]
+        shape = rng.choice(["match_all", "free_text", "job_title", "skills_levels", "many_filters", "deep_page", "card_no_facets"])
+        if shape == "match_all":
+            request, expect = {}, []
+        elif shape == "free_text":
+            request, expect = {"query": f"{job.split()[0].lower()} {rng.choice(terms)}"}, [job.split()[0]]
+        elif shape == "job_title":
+            request, expect = {"job_title": job.lower(), "location": rng.choice(CITIES).split(",")[0]}, [job]
+        elif shape == "skills_levels":
+            request = {
+                "skills": [f"{rng.choice(skills)}:Intermediate"],
+                "skills_with_level": [{"name": rng.choice(skills), "level": "Advanced"}],
+                "languages": {"Français": "courant"},
+            }
+            expect = skills
+        elif shape == "many_filters":
+            request = {
+                "query": rng.choice(terms),
+                "min_experience": rng.randint(0, 5),
+                "experience_ranges": [{"min": 3, "max": 10}],
+                "availability": rng.sample(AVAILABILITIES, 2),
+                "education_levels": rng.sample(["BAC+3", "BAC+5", "MASTER", "LICENCE"], 2),
+                "salary_ranges": ["1m-2m", "2m-3m"],
+                "contract_types": ["CDI", "FREELANCE"],
+                "sector": sector,
+                "min_admin_score": 3.0,
+            }
+            expect = [sector]
+        elif shape == "deep_page":
+            request, expect = {"query": job.lower(), "page": rng.randint(20, 50)}, []
+        else:
+            request, expect = {"query": job.lower(), "include_facets": False, "projection": "card"}, [job.split()[0]]
+        shapes.append({"shape": shape, "request": request, "expect": expect})
+    return shapes
+
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    """Requêtes enregistrées (JSONL) : {"shape", "request", "expect"} ou un PostSearchRequest brut"""
+    queries = []
+    with open(path, encoding="utf-8") as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "request" not in entry:
+                entry = {"shape": "recorded", "request": entry}
+            queries.append({"shape": entry.get("shape", "recorded"), "request": entry["request"], "expect": entry.get("expect", [])})
+    return queries
+
+
+async def load_corpus(count: int, recreate: bool) -> Dict[str, Any]:
+    """Crée l'index de benchmark (mapping et analyzers du service) et y charge le corpus"""
+    await es_client.connect()
+    if recreate:
+        await es_client.client.options(ignore_status=404).indices.delete(index=f"{es_client.index_name}_v*")
+        es_client.invalidate_write_targets()
+    await es_client.create_index_if_not_exists()
+    await es_client.put_stored_scripts({PARTIAL_UPDATE_SCRIPT_ID: PARTIAL_UPDATE_SCRIPT})
+    if settings.SEARCH_USE_STORED_SCRIPTS:
+        await es_client.put_stored_scripts(STORED_SCRIPTS)
+
+    candidates = synthetic_candidates(count)
+    report = {"indexed": 0, "errors": [], "elapsed_seconds": 0.0}
+    for start in range(0, len(candidates), 10000):
+        batch = await bulk_index_candidates(candidates[start:start + 10000])
+        report["indexed"] += batch["indexed"]
+        report["errors"] += batch["errors"]
+        report["elapsed_seconds"] += batch["elapsed_seconds"]
+    await es_client.client.indices.refresh(index=es_client.index_name)
+    return report
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile au rang le plus proche"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _precision_at_10(result: Dict[str, Any], expect: List[str]) -> Optional[float]:
+    hits = result.get("hits", {}).get("hits", [])[:10]
+    if not expect or not hits:
+        return None
+    terms = [term.lower() for term in expect]
+    relevant = 0
+    for hit in hits:
+        source = hit.get("_source", {})
+        text = " ".join([
+            str(source.get("title", "")), str(source.get("main_job", "")), str(source.get("sector", "")),
+            " ".join(skill.get("name", "") for skill in source.get("skills") or []),
+        ]).lower()
+        relevant += any(term in text for term in terms)
+    return relevant / len(hits)
+
+
+async def run_queries(queries: List[Dict[str, Any]], iterations: int, warmup: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    """Rejoue les requêtes et agrège les mesures par forme"""
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(entry: Dict[str, Any], record: bool) -> None:
+        request = PostSearchRequest(**entry["request"])
+        async with semaphore:
+            started = time.perf_counter()
+            es_query = PostSearchQueryBuilder.build_query(request, include_facets=request.include_facets)
+            built = time.perf_counter()
+            result = await es_client.search(es_query)
+            finished = time.perf_counter()
+        if not record:
+            return
+        body = getattr(result, "body", result)
+        shape = samples.setdefault(entry["shape"], {
+            "latency_ms": [], "build_us": [], "took_ms": [], "request_bytes": [], "response_bytes": [], "hits": [], "precision_at_10": [],
+        })
+        shape["latency_ms"].append((finished - started) * 1000)
+        shape["build_us"].append((built - started) * 1e6)
+        shape["took_ms"].append(body.get("took", 0))
+        shape["request_bytes"].append(len(json.dumps(es_query, ensure_ascii=False).encode()))
+        shape["response_bytes"].append(len(json.dumps(body, ensure_ascii=False, default=str).encode()))
+        shape["hits"].append(body.get("hits", {}).get("total", {}).get("value", 0))
+        precision = _precision_at_10(body, entry.get("expect") or [])
+        if precision is not None:
+            shape["precision_at_10"].append(precision)
+
+    for _ in range(warmup):
+        await asyncio.gather(*(run_one(entry, False) for entry in queries))
+    for _ in range(iterations):
+        await asyncio.gather(*(run_one(entry, True) for entry in queries))
+
+    report = {}
+    for name, shape in sorted(samples.items()):
+        report[name] = {
+            "count": len(shape["latency_ms"]),
+            "p50_ms": round(percentile(shape["latency_ms"], 50), 2),
+            "p95_ms": round(percentile(shape["latency_ms"], 95), 2),
+            "p99_ms": round(percentile(shape["latency_ms"], 99), 2),
+            "build_p50_us": round(percentile(shape["build_us"], 50), 1),
+            "took_p50_ms": percentile(shape["took_ms"], 50),
+            "took_p95_ms": percentile(shape["took_ms"], 95),
+            "request_bytes": round(sum(shape["request_bytes"]) / len(shape["request_bytes"])),
+            "response_bytes": round(sum(shape["response_bytes"]) / len(shape["response_bytes"])),
+            "hits_p50": percentile(shape["hits"], 50),
+            "precision_at_10": (
+                round(sum(shape["precision_at_10"]) / len(shape["precision_at_10"]), 3)
+                if shape["precision_at_10"] else None
+            ),
+        }
+    return report
+
+
+def compare(report: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], max_regression: float) -> List[str]:
+    """Formes dont le p95 (ou la précision) s'est dégradé au-delà du seuil"""
+    regressions = []
+    for name, current in report.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression / 100):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if previous.get("precision_at_10") is not None and current.get("precision_at_10") is not None:
+            if current["precision_at_10"] < previous["precision_at_10"] - 0.05:
+                regressions.append(f"{name}: precision@10 {previous['precision_at_10']} -> {current['precision_at_10']}")
+    return regressions
+
+
+def print_report(report: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    print(
+        f"{'shape':<16}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'took50':>8}{'took95':>8}"
+        f"{'build µs':>10}{'req B':>8}{'resp B':>9}{'hits':>8}{'P@10':>7}"
+    )
+    for name, row in report.items():
+        delta = ""
+        if baseline and name in baseline and baseline[name]["p95_ms"]:
+            delta = f"  p95 {100 * (row['p95_ms'] / baseline[name]['p95_ms'] - 1):+.0f}%"
+        precision = "-" if row["precision_at_10"] is None else f"{row['precision_at_10']:.2f}"
+        print(
+            f"{name:<16}{row['count']:>6}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            f"{row['took_p50_ms']:>8}{row['took_p95_ms']:>8}{row['build_p50_us']:>10.0f}"
+            f"{row['request_bytes']:>8}{row['response_bytes']:>9}{row['hits_p50']:>8}{precision:>7}{delta}"
+        )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=10000, help="Taille du corpus synthétique")
+    parser.add_argument("--skip-load", action="store_true", help="Réutiliser l'index de benchmark déjà chargé")
+    parser.add_argument("--recreate", action="store_true", help="Supprimer puis recréer l'index de benchmark")
+    parser.add_argument("--queries", default=None, help="Requêtes enregistrées (JSONL) au lieu du mélange généré")
+    parser.add_argument("--query-count", type=int, default=200, help="Taille du mélange généré")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--save", default=None, help="Enregistrer le rapport (JSON)")
+    parser.add_argument("--baseline", default=None, help="Rapport de référence (JSON)")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Dégradation du p95 tolérée (%%)")
+    args = parser.parse_args()
+
+    if es_client.index_name == SERVED_INDEX:
+        print(f"Refus : ELASTICSEARCH_INDEX_NAME={SERVED_INDEX} est l'index servi")
+        return 2
+
+    try:
+        print(f"cluster: {settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}, index: {es_client.index_name}")
+        if not args.skip_load:
+            load = await load_corpus(args.docs, args.recreate)
+            print(f"loaded {load['indexed']} documents in {load['elapsed_seconds']:.1f}s ({len(load['errors'])} errors)")
+
+        queries = load_queries(args.queries) if args.queries else generated_queries(args.query_count)
+        print(f"{len(queries)} queries x {args.iterations} iterations, concurrency {args.concurrency}\n")
+        report = await run_queries(queries, args.iterations, args.warmup, args.concurrency)
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)["shapes"]
+        print_report(report, baseline)
+
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as output:
+                json.dump({"docs": args.docs, "concurrency": args.concurrency, "shapes": report}, output, indent=2)
+        if baseline:
+            regressions = compare(report, baseline, args.max_regression)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            return 1 if regressions else 0
+        return 0
+    finally:
+        await es_client.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -3,12 +3,14 @@ Module partagé pour les services Yemma
 """
 from .internal_auth import (
     generate_service_token,
+    get_cached_service_token,
     verify_service_token,
     get_service_token_header,
 )
 
 __all__ = [
     "generate_service_token",
+    "get_cached_service_token",
     "verify_service_token",
     "get_service_token_header",
 ]
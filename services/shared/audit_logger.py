@@ -3,11 +3,21 @@ Fonction utilitaire partagée pour enregistrer les accès dans le service Audit
 
 Cette fonction peut être appelée par n'importe quel service pour enregistrer
 un accès à un profil candidat.
+
+Pour sortir l'audit du chemin de la requête, un service peut aussi :
+- publier l'événement dans le Redis Stream consommé par lots par le service
+  Audit (publish_access_event) ;
+- bufferiser ses événements et les envoyer par lots (log_access_batch).
 """
-import httpx
-from typing import Optional
+import json
+from datetime import datetime
+from typing import List, Optional
 
 from .internal_auth import get_service_token_header
+from .http_client import service_client
+
+# Stream Redis consommé par le service Audit (AUDIT_STREAM_NAME)
+AUDIT_STREAM_NAME = "audit:access-logs"
 
 
 async def log_access(
@@ -74,7 +84,7 @@ async def log_access(
         # Générer les headers avec le token de service
         headers = get_service_token_header(service_name)
         
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with service_client(audit_service_url, timeout=5.0) as client:
             response = await client.post(
                 f"{audit_service_url}/api/v1/audit",
                 json={
@@ -106,3 +116,61 @@ async def log_access(
         print(f"⚠️ Warning: Failed to log access: {str(e)}")
         return {}
 
+
+async def publish_access_event(
+    redis_client,
+    event: dict,
+    stream: str = AUDIT_STREAM_NAME,
+    maxlen: int = 1000000
+) -> bool:
+    """
+    Publie un événement d'accès (mêmes champs que log_access) dans le stream d'audit
+
+    Args:
+        redis_client: Client redis.asyncio
+        event: Champs du log d'accès (recruiter_id, company_id, candidate_id, ...)
+        stream: Nom du stream
+        maxlen: Longueur maximale approximative du stream
+
+    Returns:
+        True si l'événement est publié, False sinon (à envoyer par HTTP)
+    """
+    try:
+        event.setdefault("accessed_at", datetime.utcnow().isoformat())
+        await redis_client.xadd(stream, {"event": json.dumps(event)}, maxlen=maxlen, approximate=True)
+        return True
+    except Exception as e:
+        print(f"⚠️ Warning: Failed to publish access event: {str(e)}")
+        return False
+
+
+async def log_access_batch(
+    service_name: str,
+    audit_service_url: str,
+    events: List[dict]
+) -> int:
+    """
+    Envoie un lot d'événements d'accès (POST /api/v1/audit/batch, une transaction)
+
+    Returns:
+        Nombre de logs enregistrés (0 en cas d'erreur)
+    """
+    if not events:
+        return 0
+    try:
+        headers = get_service_token_header(service_name)
+
+        async with service_client(audit_service_url, timeout=10.0) as client:
+            response = await client.post(
+                f"{audit_service_url}/api/v1/audit/batch",
+                json={"items": events},
+                headers=headers
+            )
+
+            if response.status_code == 201:
+                return response.json().get("inserted", 0)
+            print(f"⚠️ Warning: Failed to log access batch: {response.status_code} - {response.text}")
+            return 0
+    except Exception as e:
+        print(f"⚠️ Warning: Failed to log access batch: {str(e)}")
+        return 0
@@ -0,0 +1,87 @@
+"""
+Événements "documents du candidat modifiés" publiés par le Document Service
+
+Après chaque upload ou suppression, le Document Service publie l'état des
+documents du candidat (nombre de documents, nombre de CV, dernier CV) et non un
+delta : rejouer, dupliquer ou réordonner les événements ne fausse pas les
+compteurs dénormalisés du Candidate Service (le plus récent par occurred_at
+l'emporte).
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+DOCUMENT_EVENTS_STREAM_NAME = "documents:events"
+
+
+def empty_document_stats() -> Dict[str, Any]:
+    """État d'un candidat sans document"""
+    return {"document_count": 0, "cv_count": 0, "latest_cv_id": None}
+
+
+async def publish_documents_changed(
+    redis_client,
+    candidate_id: int,
+    action: str,
+    stats: Dict[str, Any],
+    document_id: Optional[int] = None,
+    document_type: Optional[str] = None,
+    source: str = "document-service",
+    stream: str = DOCUMENT_EVENTS_STREAM_NAME,
+    maxlen: int = 1000000,
+    occurred_at: Optional[datetime] = None
+) -> bool:
+    """
+    Publie l'état des documents d'un candidat dans le stream
+
+    Args:
+        redis_client: Client redis.asyncio
+        candidate_id: ID du candidat (profile_id)
+        action: Motif (uploaded, deleted...), pour le suivi
+        stats: {"document_count", "cv_count", "latest_cv_id"} après la modification
+        document_id: Document ajouté ou supprimé
+        document_type: Type du document (CV, ATTESTATION...)
+        source: Service émetteur
+        stream: Nom du stream
+        maxlen: Longueur maximale approximative du stream
+        occurred_at: Instant de lecture de stats (à prendre avant la requête :
+            un événement plus récent porte alors un état au moins aussi frais)
+
+    Returns:
+        True si l'événement est publié, False sinon (la réconciliation rattrapera)
+    """
+    try:
+        event = {
+            "candidate_id": candidate_id,
+            "action": action,
+            "document_id": document_id,
+            "document_type": document_type,
+            "document_count": int(stats.get("document_count") or 0),
+            "cv_count": int(stats.get("cv_count") or 0),
+            "latest_cv_id": stats.get("latest_cv_id"),
+            "source": source,
+            "occurred_at": (occurred_at or datetime.utcnow()).isoformat(),
+        }
+        await redis_client.xadd(stream, {"event": json.dumps(event)}, maxlen=maxlen, approximate=True)
+        return True
+    except Exception as e:
+        print(f"⚠️ Warning: Failed to publish document event: {str(e)}")
+        return False
+
+
+def parse_documents_changed(fields: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Décode un message du stream
+
+    Raises:
+        KeyError, TypeError, ValueError: message illisible
+    """
+    event = json.loads(fields["event"])
+    return {
+        "candidate_id": int(event["candidate_id"]),
+        "action": event.get("action"),
+        "document_count": int(event["document_count"]),
+        "cv_count": int(event["cv_count"]),
+        "latest_cv_id": int(event["latest_cv_id"]) if event.get("latest_cv_id") is not None else None,
+        "occurred_at": datetime.fromisoformat(event["occurred_at"]),
+    }
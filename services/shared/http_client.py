@@ -0,0 +1,274 @@
+"""
+Module partagé pour les appels HTTP inter-services
+
+Un httpx.AsyncClient par service amont (origine scheme://host:port), créé à la
+première utilisation et réutilisé pour toute la durée de vie du process :
+- connexions keep-alive (plus de handshake TCP/TLS par appel) ;
+- HTTP/2 si le paquet h2 est installé (négocié via TLS uniquement) ;
+- timeouts et limites de connexions configurables par amont ;
+- métriques par amont, dont le temps d'attente d'une connexion libre du pool.
+
+Usage:
+    async with service_client(settings.CANDIDATE_SERVICE_URL, timeout=5.0) as client:
+        response = await client.get(f"{settings.CANDIDATE_SERVICE_URL}/api/v1/profiles/1")
+
+    # Au shutdown du service
+    await close_http_clients()
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Valeurs par défaut pour un amont non configuré explicitement
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_CONNECTIONS = 50
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+@dataclass
+class UpstreamConfig:
+    """Paramètres du pool de connexions d'un service amont"""
+    timeout: float = DEFAULT_TIMEOUT
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY
+    http2: bool = HTTP2_AVAILABLE
+
+
+@dataclass
+class UpstreamMetrics:
+    """Compteurs d'utilisation du pool d'un service amont"""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    pool_waits: int = 0
+    pool_wait_seconds_total: float = 0.0
+    pool_wait_seconds_max: float = 0.0
+    _started_at: float = field(default_factory=time.time, repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "pool_waits": self.pool_waits,
+            "pool_wait_ms_total": round(self.pool_wait_seconds_total * 1000, 3),
+            "pool_wait_ms_avg": round(self.pool_wait_seconds_total * 1000 / self.requests, 3) if self.requests else 0.0,
+            "pool_wait_ms_max": round(self.pool_wait_seconds_max * 1000, 3),
+            "uptime_seconds": int(time.time() - self._started_at),
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Stream de réponse qui libère la place dans le pool à sa fermeture"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Transport httpx qui mesure l'attente d'une connexion libre
+
+    Le nombre de requêtes simultanées est borné par un sémaphore de la taille du
+    pool : le temps passé à l'acquérir correspond au temps d'attente du pool.
+    """
+
+    def __init__(self, config: UpstreamConfig, metrics: UpstreamMetrics):
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=config.http2,
+        )
+        self._slots = asyncio.Semaphore(config.max_connections)
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self._metrics
+        started = time.perf_counter()
+        await self._slots.acquire()
+        waited = time.perf_counter() - started
+
+        metrics.requests += 1
+        metrics.in_flight += 1
+        metrics.pool_wait_seconds_total += waited
+        metrics.pool_wait_seconds_max = max(metrics.pool_wait_seconds_max, waited)
+        if waited > 0.001:
+            metrics.pool_waits += 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                metrics.in_flight -= 1
+                self._slots.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            metrics.errors += 1
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _origin(url: str) -> str:
+    """Normalise une URL en origine scheme://host:port (clé du pool)"""
+    parts = urlsplit(url if "://" in url else f"http://{url}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+class ServiceHttpClients:
+    """Registre des clients HTTP mutualisés, un par service amont"""
+
+    def __init__(self):
+        self._configs: Dict[str, UpstreamConfig] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, UpstreamMetrics] = {}
+
+    def configure(self, upstream_url: str, **overrides: Any) -> UpstreamConfig:
+        """
+        Définit timeout/limites d'un amont (avant sa première utilisation)
+
+        Args:
+            upstream_url: URL de base du service amont
+            **overrides: Champs de UpstreamConfig à surcharger
+        """
+        origin = _origin(upstream_url)
+        config = UpstreamConfig(**overrides)
+        self._configs[origin] = config
+        return config
+
+    def get(self, upstream_url: str) -> httpx.AsyncClient:
+        """Retourne le client mutualisé de l'amont (créé à la première utilisation)"""
+        origin = _origin(upstream_url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            config = self._configs.get(origin) or UpstreamConfig()
+            metrics = self._metrics.setdefault(origin, UpstreamMetrics())
+            client = httpx.AsyncClient(
+                timeout=config.timeout,
+                transport=_MeteredTransport(config, metrics),
+            )
+            self._clients[origin] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Ferme tous les clients (à appeler au shutdown)"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Métriques par amont"""
+        return {origin: metrics.as_dict() for origin, metrics in self._metrics.items()}
+
+
+class _TimedClient:
+    """Vue sur un client mutualisé appliquant un timeout par défaut à chaque requête"""
+
+    def __init__(self, client: httpx.AsyncClient, timeout: Optional[float]):
+        self._client = client
+        self._timeout = timeout
+
+    def _with_timeout(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+        return kwargs
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._client.request(method, url, **self._with_timeout(kwargs))
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._client.get(url, **self._with_timeout(kwargs))
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._client.post(url, **self._with_timeout(kwargs))
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._client.put(url, **self._with_timeout(kwargs))
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._client.patch(url, **self._with_timeout(kwargs))
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._client.delete(url, **self._with_timeout(kwargs))
+
+
+# Instance globale (une par process)
+http_clients = ServiceHttpClients()
+
+
+def configure_upstream(upstream_url: str, **overrides: Any) -> UpstreamConfig:
+    """Définit timeout/limites d'un service amont"""
+    return http_clients.configure(upstream_url, **overrides)
+
+
+def get_http_client(upstream_url: str) -> httpx.AsyncClient:
+    """Retourne le client mutualisé d'un service amont"""
+    return http_clients.get(upstream_url)
+
+
+@asynccontextmanager
+async def service_client(upstream_url: str, timeout: Optional[float] = None):
+    """
+    Fournit le client mutualisé d'un amont, sans le fermer en sortie de bloc
+
+    Remplace `async with httpx.AsyncClient(timeout=...) as client:` pour les appels
+    inter-services.
+
+    Args:
+        upstream_url: URL de base du service amont
+        timeout: Timeout appliqué aux requêtes du bloc (défaut: celui de l'amont)
+    """
+    yield _TimedClient(http_clients.get(upstream_url), timeout)
+
+
+async def close_http_clients() -> None:
+    """Ferme tous les clients mutualisés"""
+    await http_clients.aclose()
+
+
+def http_client_metrics() -> Dict[str, Dict[str, Any]]:
+    """Métriques des pools par amont"""
+    return http_clients.metrics()
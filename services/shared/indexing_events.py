@@ -0,0 +1,48 @@
+"""
+Événements "profil modifié" consommés par l'indexation du Search Service
+
+Les services qui modifient un profil (Candidate, Admin) publient ici au lieu
+d'appeler les endpoints d'indexation : le consommateur du Search Service
+(search/app/infrastructure/indexing_consumer.py) relit le profil et l'indexe,
+ou le retire de l'index s'il n'est plus validé.
+"""
+import json
+from datetime import datetime
+
+INDEXING_STREAM_NAME = "search:indexing-events"
+
+
+async def publish_profile_changed(
+    redis_client,
+    candidate_id: int,
+    source: str,
+    reason: str = "updated",
+    stream: str = INDEXING_STREAM_NAME,
+    maxlen: int = 1000000
+) -> bool:
+    """
+    Publie un événement "profil modifié" dans le stream d'indexation
+
+    Args:
+        redis_client: Client redis.asyncio
+        candidate_id: ID du profil candidat
+        source: Service émetteur (ex: "candidate-service")
+        reason: Motif (updated, validated, rejected, archived, deleted...), pour le suivi
+        stream: Nom du stream
+        maxlen: Longueur maximale approximative du stream
+
+    Returns:
+        True si l'événement est publié, False sinon (à indexer par HTTP)
+    """
+    try:
+        event = {
+            "candidate_id": candidate_id,
+            "source": source,
+            "reason": reason,
+            "occurred_at": datetime.utcnow().isoformat(),
+        }
+        await redis_client.xadd(stream, {"event": json.dumps(event)}, maxlen=maxlen, approximate=True)
+        return True
+    except Exception as e:
+        print(f"⚠️ Warning: Failed to publish indexing event: {str(e)}")
+        return False
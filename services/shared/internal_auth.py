@@ -1,11 +1,18 @@
 """
 Module partagé pour l'authentification inter-services
 Génère et vérifie les tokens JWT pour les appels entre microservices
+
+Les tokens émis sont mis en cache par nom de service et renouvelés peu avant
+leur expiration ; les tokens vérifiés sont gardés dans un petit cache LRU pour
+éviter de recalculer la signature HMAC à chaque requête entrante.
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import jwt, JWTError
 import os
+import threading
+import time
 
 
 # Secret partagé pour signer les tokens de service
@@ -21,6 +28,19 @@ INTERNAL_SERVICE_TOKEN_ALGORITHM = "HS256"
 # Durée de vie du token (24 heures)
 INTERNAL_SERVICE_TOKEN_EXPIRE_HOURS = 24
 
+# Un token en cache est renouvelé quand il lui reste moins de cette durée
+INTERNAL_SERVICE_TOKEN_REFRESH_MARGIN_SECONDS = 3600
+
+# Nombre max de tokens vérifiés gardés en cache
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+
+# service_name -> (token, expiration en timestamp)
+_issued_tokens: Dict[str, Tuple[str, float]] = {}
+
+# token -> payload vérifié (ordre LRU)
+_verified_tokens: "OrderedDict[str, dict]" = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
 
 def generate_service_token(service_name: str) -> str:
     """
@@ -50,9 +70,35 @@ def generate_service_token(service_name: str) -> str:
     return token
 
 
+def get_cached_service_token(service_name: str) -> str:
+    """
+    Retourne un token de service valide, signé au plus une fois par période
+
+    Le token est renouvelé lorsqu'il lui reste moins de
+    INTERNAL_SERVICE_TOKEN_REFRESH_MARGIN_SECONDS avant expiration.
+
+    Args:
+        service_name: Nom du service qui fait l'appel
+
+    Returns:
+        str: Token JWT signé
+    """
+    cached = _issued_tokens.get(service_name)
+    now = time.time()
+    if cached and cached[1] - now > INTERNAL_SERVICE_TOKEN_REFRESH_MARGIN_SECONDS:
+        return cached[0]
+
+    token = generate_service_token(service_name)
+    _issued_tokens[service_name] = (token, now + INTERNAL_SERVICE_TOKEN_EXPIRE_HOURS * 3600)
+    return token
+
+
 def verify_service_token(token: str) -> Optional[dict]:
     """
     Vérifie et décode un token de service
+
+    Un token déjà vérifié et non expiré est servi depuis le cache LRU
+    (pas de nouveau calcul HMAC ni de parsing des claims).
     
     Args:
         token: Token JWT à vérifier
@@ -60,6 +106,14 @@ def verify_service_token(token: str) -> Optional[dict]:
     Returns:
         dict: Payload du token si valide, None sinon
     """
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(token)
+        if payload is not None:
+            if payload.get("exp", 0) > time.time():
+                _verified_tokens.move_to_end(token)
+                return dict(payload)
+            del _verified_tokens[token]
+
     try:
         payload = jwt.decode(
             token,
@@ -70,6 +124,12 @@ def verify_service_token(token: str) -> Optional[dict]:
         # Vérifier que c'est bien un token de service interne
         if payload.get("type") != "internal_service":
             return None
+
+        with _verified_tokens_lock:
+            _verified_tokens[token] = dict(payload)
+            _verified_tokens.move_to_end(token)
+            while len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+                _verified_tokens.popitem(last=False)
         
         return payload
     except JWTError:
@@ -86,7 +146,7 @@ def get_service_token_header(service_name: str) -> dict:
     Returns:
         dict: Headers avec le token de service
     """
-    token = generate_service_token(service_name)
+    token = get_cached_service_token(service_name)
     return {
         "X-Service-Token": token,
         "X-Service-Name": service_name,
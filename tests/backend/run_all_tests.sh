@@ -18,10 +18,34 @@ pytest tests/backend/test_validators.py -v
 VALIDATORS_EXIT=$?
 
 echo ""
-echo "3. Autres tests backend..."
+echo "3. Tests du service search..."
+pytest tests/backend/test_search_service.py -v
+SEARCH_EXIT=$?
+
+echo ""
+echo "4. Tests du service payment..."
+pytest tests/backend/test_payment_service.py -v
+PAYMENT_EXIT=$?
+
+echo ""
+echo "5. Tests du service audit..."
+pytest tests/backend/test_audit_service.py -v
+AUDIT_EXIT=$?
+
+echo ""
+echo "6. Tests du service candidate..."
+pytest tests/backend/test_candidate_infrastructure.py -v
+CANDIDATE_EXIT=$?
+
+echo ""
+echo "7. Autres tests backend..."
 pytest tests/backend/ \
     --ignore=tests/backend/test_validators.py \
     --ignore=tests/backend/test_completion.py \
+    --ignore=tests/backend/test_search_service.py \
+    --ignore=tests/backend/test_payment_service.py \
+    --ignore=tests/backend/test_audit_service.py \
+    --ignore=tests/backend/test_candidate_infrastructure.py \
     -v
 OTHER_EXIT=$?
 
@@ -31,10 +55,14 @@ echo "Résumé"
 echo "=========================================="
 echo "Tests completion: $([ $COMPLETION_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
 echo "Tests validateurs: $([ $VALIDATORS_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
+echo "Tests search: $([ $SEARCH_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
+echo "Tests payment: $([ $PAYMENT_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
+echo "Tests audit: $([ $AUDIT_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
+echo "Tests candidate: $([ $CANDIDATE_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
 echo "Autres tests: $([ $OTHER_EXIT -eq 0 ] && echo '✅ PASSED' || echo '❌ FAILED')"
 
 # Retourner un code d'erreur si un des tests a échoué
-if [ $COMPLETION_EXIT -ne 0 ] || [ $VALIDATORS_EXIT -ne 0 ] || [ $OTHER_EXIT -ne 0 ]; then
+if [ $COMPLETION_EXIT -ne 0 ] || [ $VALIDATORS_EXIT -ne 0 ] || [ $SEARCH_EXIT -ne 0 ] || [ $PAYMENT_EXIT -ne 0 ] || [ $AUDIT_EXIT -ne 0 ] || [ $CANDIDATE_EXIT -ne 0 ] || [ $OTHER_EXIT -ne 0 ]; then
     exit 1
 fi
 
@@ -0,0 +1,201 @@
+"""
+Tests unitaires pour le service Audit (ingestion des logs d'accès par lots)
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au PYTHONPATH
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Vider le cache des modules 'app.*' d'un autre service
+for module_name in list(sys.modules.keys()):
+    if module_name == 'app' or module_name.startswith('app.'):
+        del sys.modules[module_name]
+
+# Retirer les autres services du PYTHONPATH
+for service_name in ["candidate", "document", "auth-service", "company", "notification", "admin", "search", "payment"]:
+    service_path = str(project_root / "services" / service_name)
+    while service_path in sys.path:
+        sys.path.remove(service_path)
+
+# Ajouter le répertoire du service audit au PYTHONPATH EN PREMIER
+services_audit = project_root / "services" / "audit"
+sys.path.insert(0, str(services_audit))
+
+import json
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import SQLModel
+
+from app.domain.models import AccessLog
+from app.infrastructure.audit_ingestion import AuditStreamConsumer, parse_stream_events
+
+# Les fichiers de test suivants ne connaissent pas le service audit : ne pas leur
+# laisser le package 'app' d'audit en cache ni son répertoire dans le PYTHONPATH
+sys.path.remove(str(services_audit))
+for module_name in list(sys.modules.keys()):
+    if module_name == 'app' or module_name.startswith('app.'):
+        del sys.modules[module_name]
+
+
+def _event(candidate_id: int, **extra) -> dict:
+    return {
+        "recruiter_id": 1,
+        "recruiter_email": "recruiter@example.com",
+        "company_id": 2,
+        "candidate_id": candidate_id,
+        "metadata": {"source": "search"},
+        **extra,
+    }
+
+
+class _FakePipeline:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xack(self, stream, group, *ids):
+        self.calls.append(("xack", ids))
+
+    def xdel(self, stream, *ids):
+        self.calls.append(("xdel", ids))
+
+    async def execute(self):
+        return []
+
+
+class _FakeRedis:
+    def __init__(self, times_delivered=1):
+        self.calls = []
+        self.dead_letters = []
+        self.times_delivered = times_delivered
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self.calls)
+
+    async def xpending_range(self, stream, group, min, max, count):
+        return [{"message_id": min, "times_delivered": self.times_delivered}]
+
+    async def xadd(self, stream, fields):
+        self.dead_letters.append((stream, fields))
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Base SQLite fichier avec la table access_logs"""
+    try:
+        configure_mappers()
+    except InvalidRequestError:
+        pytest.skip("Modèles d'un autre service chargés partiellement : lancer ce fichier séparément (run_all_tests.sh)")
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'audit.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all, tables=[AccessLog.__table__])
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.unit
+def test_unreadable_stream_messages_are_rejected():
+    """Un message illisible est isolé sans bloquer le reste du lot"""
+    messages = [
+        ("1-0", {"event": json.dumps(_event(10))}),
+        ("2-0", {"event": "not json"}),
+        ("3-0", {"event": json.dumps({"candidate_id": 3})}),
+        ("4-0", {}),
+    ]
+
+    ids, events, rejected = parse_stream_events(messages)
+
+    assert ids == ["1-0"]
+    assert [event.candidate_id for event in events] == [10]
+    assert rejected == ["2-0", "3-0", "4-0"]
+
+
+@pytest.mark.unit
+async def test_stream_batch_is_inserted_in_one_transaction_then_acknowledged(session_factory):
+    """Un lot du stream devient des lignes access_logs puis est acquitté (y compris les rejets)"""
+    consumer = AuditStreamConsumer(redis_url="redis://unused", stream="audit:test", group="g")
+    consumer._client = _FakeRedis()
+    messages = [
+        (f"{i}-0", {"event": json.dumps(_event(i, accessed_at="2026-01-02T03:04:05"))})
+        for i in range(1, 4)
+    ] + [("9-0", {"event": "{}"})]
+
+    inserted = await consumer.process_batch(session_factory, messages)
+
+    assert inserted == 3
+    assert consumer._client.calls == [
+        ("xack", ("1-0", "2-0", "3-0", "9-0")),
+        ("xdel", ("1-0", "2-0", "3-0", "9-0")),
+    ]
+    metrics = await AuditStreamConsumer(redis_url="", stream="s", group="g").metrics()
+    assert metrics["enabled"] is False
+
+    async with session_factory() as session:
+        logs = (await session.execute(select(AccessLog).order_by(AccessLog.candidate_id))).scalars().all()
+    assert [log.candidate_id for log in logs] == [1, 2, 3]
+    assert logs[0].accessed_at.isoformat() == "2026-01-02T03:04:05"
+    assert json.loads(logs[0].extra_metadata) == {"source": "search"}
+    assert consumer.rejected == 1
+
+
+async def _reject_candidate(session_factory, candidate_id: int) -> None:
+    """Fait refuser par la base l'insertion des logs d'un candidat (contrainte violée)"""
+    async with session_factory() as session:
+        await session.execute(text(
+            f"CREATE TRIGGER reject_candidate BEFORE INSERT ON access_logs "
+            f"WHEN NEW.candidate_id = {candidate_id} BEGIN SELECT RAISE(ABORT, 'rejected row'); END"
+        ))
+        await session.commit()
+
+
+@pytest.mark.unit
+async def test_a_row_refused_by_the_database_does_not_block_the_batch(session_factory):
+    """INSERT du lot en échec : les autres logs sont insérés un par un et acquittés"""
+    await _reject_candidate(session_factory, 2)
+    consumer = AuditStreamConsumer(redis_url="redis://unused", stream="audit:test", group="g")
+    consumer._client = _FakeRedis(times_delivered=1)
+    messages = [(f"{i}-0", {"event": json.dumps(_event(i))}) for i in range(1, 4)]
+
+    inserted = await consumer.process_batch(session_factory, messages)
+
+    assert inserted == 2
+    # Le message refusé reste en attente (repris par XAUTOCLAIM), sans lettre morte
+    assert consumer._client.calls == [("xack", ("1-0", "3-0")), ("xdel", ("1-0", "3-0"))]
+    assert consumer._client.dead_letters == []
+    assert consumer.failed == 1
+    async with session_factory() as session:
+        logs = (await session.execute(select(AccessLog.candidate_id).order_by(AccessLog.candidate_id))).scalars().all()
+    assert logs == [1, 3]
+
+
+@pytest.mark.unit
+async def test_a_row_still_refused_after_max_deliveries_goes_to_the_dead_letter_stream(session_factory):
+    """Après max_deliveries livraisons, le message refusé part en lettres mortes et est acquitté"""
+    await _reject_candidate(session_factory, 2)
+    consumer = AuditStreamConsumer(redis_url="redis://unused", stream="audit:test", group="g", max_deliveries=3)
+    consumer._client = _FakeRedis(times_delivered=3)
+    messages = [("2-0", {"event": json.dumps(_event(2))})]
+
+    assert await consumer.process_batch(session_factory, messages) == 0
+
+    [(stream, fields)] = consumer._client.dead_letters
+    assert stream == "audit:test:dlq"
+    assert fields["message_id"] == "2-0"
+    assert json.loads(fields["event"])["candidate_id"] == 2
+    assert "rejected row" in fields["error"]
+    assert consumer._client.calls == [("xack", ("2-0",)), ("xdel", ("2-0",))]
+    assert consumer.dead_lettered == 1
@@ -0,0 +1,878 @@
+"""
+Tests unitaires pour le service Candidate (dépôts et infrastructure, SQLite en fichier temporaire)
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au PYTHONPATH
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Vider le cache des modules 'app.*' d'un autre service
+for module_name in list(sys.modules.keys()):
+    if module_name == 'app' or module_name.startswith('app.'):
+        del sys.modules[module_name]
+
+# Retirer les autres services du PYTHONPATH
+for service_name in ["document", "auth-service", "company", "notification", "admin", "search", "payment", "audit"]:
+    service_path = str(project_root / "services" / service_name)
+    while service_path in sys.path:
+        sys.path.remove(service_path)
+
+# Ajouter le répertoire du service candidate au PYTHONPATH EN PREMIER
+services_candidate = project_root / "services" / "candidate"
+sys.path.insert(0, str(services_candidate))
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import ARRAY, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import configure_mappers
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+from sqlmodel import SQLModel
+
+from app.api.v1.profiles import partial_update_my_profile
+from app.core.completion import SECTION_WEIGHTS, calculate_completion_percentage
+from app.core.config import settings
+from app.core.exceptions import InvalidCursorError
+from app.domain.models import (
+    Certification, Education, Experience, JobOffer, JobPreference, JobStatus, Profile, ProfileStatus, Skill,
+)
+from app.domain.onboarding_schemas import PartialProfileUpdateSchema, Step2ExperienceSchema
+from app.infrastructure import document_events, job_counters
+from app.infrastructure.auth import TokenData
+from app.infrastructure import profile_listing
+from app.infrastructure.document_events import DocumentEventsConsumer
+from app.infrastructure.job_counters import REGISTER_CLICK_COUNT, VIEW_COUNT, JobCounterBuffer
+from app.infrastructure.repositories import JobPreferenceRepository, ProfileRepository
+
+
+class _FakeStreamRedis:
+    """Redis en mémoire : un stream, un consumer group (XREADGROUP, XAUTOCLAIM, XACK) et SET NX"""
+
+    def __init__(self):
+        self.entries = []
+        self.pending = {}
+        self.values = {}
+        self.acked = []
+        self.now_ms = 0
+        self._last_read = 0
+        self._sequence = 0
+
+    def add_event(self, candidate_id: int, occurred_at: datetime, cv_count: int = 1, document_count: int = 1, latest_cv_id=None):
+        self._sequence += 1
+        message_id = f"{self._sequence}-0"
+        event = {
+            "candidate_id": candidate_id,
+            "action": "uploaded",
+            "document_count": document_count,
+            "cv_count": cv_count,
+            "latest_cv_id": latest_cv_id,
+            "occurred_at": occurred_at.isoformat(),
+        }
+        self.entries.append((message_id, {"event": json.dumps(event)}))
+        return message_id
+
+    async def xgroup_create(self, stream, group, id="0", mkstream=False):
+        pass
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        messages = self.entries[self._last_read:self._last_read + count]
+        self._last_read += len(messages)
+        for message_id, _ in messages:
+            self.pending[message_id] = (consumer, self.now_ms)
+        return [["stream", messages]] if messages else []
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=None):
+        entries = dict(self.entries)
+        claimed = []
+        for message_id, (_, delivered_at) in list(self.pending.items()):
+            if self.now_ms - delivered_at >= min_idle_time and len(claimed) < count:
+                self.pending[message_id] = (consumer, self.now_ms)
+                claimed.append((message_id, entries[message_id]))
+        return ["0-0", claimed, []]
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def xack(self, stream, group, *message_ids):
+        for message_id in message_ids:
+            self.redis.pending.pop(message_id, None)
+            self.redis.acked.append(message_id)
+
+    def xdel(self, stream, *message_ids):
+        pass
+
+    async def execute(self):
+        return []
+
+
+def _job_preferences_ddl() -> str:
+    """job_preferences sans colonnes ARRAY (non supportées par SQLite) : stockées en TEXT"""
+    table = JobPreference.__table__
+    dialect = sqlite.dialect()
+    columns = [
+        f"{column.name} {'TEXT' if isinstance(column.type, ARRAY) else column.type.compile(dialect=dialect)}"
+        + (" PRIMARY KEY" if column.primary_key else "")
+        for column in table.columns
+    ]
+    return f"CREATE TABLE {table.name} ({', '.join(columns)})"
+
+
+@pytest.fixture
+def mappers_configured():
+    """Modèles du service candidate utilisables (sinon : ignoré, comme le reste du fichier)"""
+    try:
+        configure_mappers()
+    except InvalidRequestError:
+        pytest.skip("Modèles d'un autre service chargés partiellement : lancer ce fichier séparément (run_all_tests.sh)")
+
+
+@pytest.fixture
+async def session_factory(tmp_path, mappers_configured):
+    """Base SQLite fichier avec un profil DRAFT (user_id=1, sans CV)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'candidate.db'}")
+    async with engine.begin() as conn:
+        # Uniquement les tables du service (metadata partagée avec les autres services chargés)
+        await conn.run_sync(
+            SQLModel.metadata.create_all,
+            tables=[
+                Profile.__table__,
+                Experience.__table__,
+                Education.__table__,
+                Certification.__table__,
+                Skill.__table__,
+                JobOffer.__table__,
+            ],
+        )
+        await conn.execute(text(_job_preferences_ddl()))
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Profile(id=1, user_id=1, email="awa.diop@example.com", first_name="Awa", has_cv=False))
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+def _experience(company_name: str, position: str = "Développeuse", **extra) -> dict:
+    """Élément de l'étape 2 tel que la route le transmet (model_dump du schéma)"""
+    return Step2ExperienceSchema(
+        company_name=company_name, position=position, start_date=datetime(2020, 1, 1), **extra
+    ).model_dump()
+
+
+async def _patch_me(session_factory, payload: dict):
+    """PATCH /profiles/me comme la route : session fermée (rollback) même en cas d'erreur"""
+    async with session_factory() as session:
+        return await partial_update_my_profile(
+            PartialProfileUpdateSchema(**payload),
+            session=session,
+            current_user=TokenData(user_id=1, email="awa.diop@example.com"),
+        )
+
+
+async def _rows(session_factory, model):
+    async with session_factory() as session:
+        return list((await session.execute(select(model).where(model.profile_id == 1).order_by(model.id))).scalars().all())
+
+
+@pytest.mark.unit
+async def test_patch_me_syncs_collections_by_natural_key(session_factory):
+    """Insertion, modification et suppression par clé naturelle ; les lignes inchangées gardent leur id"""
+    await _patch_me(session_factory, {
+        "step2": {"experiences": [_experience("Orange"), _experience("Wave", description="Paiements")]},
+        "step5": {"technical_skills": [{"name": "Python", "level": "EXPERT"}], "soft_skills": ["Rigueur"]},
+    })
+    experiences = await _rows(session_factory, Experience)
+    assert [exp.company_name for exp in experiences] == ["Orange", "Wave"]
+    ids = {exp.company_name: exp.id for exp in experiences}
+
+    # Orange modifiée (clé identique à la casse près), Wave retirée, Sonatel ajoutée
+    await _patch_me(session_factory, {
+        "step2": {"experiences": [_experience("ORANGE", description="Data"), _experience("Sonatel")]},
+    })
+    experiences = {exp.company_name: exp for exp in await _rows(session_factory, Experience)}
+    assert set(experiences) == {"ORANGE", "Sonatel"}
+    assert experiences["ORANGE"].id == ids["Orange"]
+    assert experiences["ORANGE"].description == "Data"
+    assert experiences["ORANGE"].updated_at is not None
+
+    # Étape absente de la requête : collection intacte
+    assert sorted(skill.name for skill in await _rows(session_factory, Skill)) == ["Python", "Rigueur"]
+
+    # Même liste renvoyée : rien à écrire
+    async with session_factory() as session:
+        counts = await ProfileRepository.sync_collections(session, 1, {
+            "experiences": [_experience("ORANGE", description="Data"), _experience("Sonatel")],
+        })
+    assert counts["experiences"] == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 2}
+
+    # Liste vide : tout supprimer
+    await _patch_me(session_factory, {"step2": {"experiences": []}})
+    assert await _rows(session_factory, Experience) == []
+
+
+@pytest.mark.unit
+async def test_patch_me_keeps_duplicate_keys_of_the_payload(session_factory):
+    """Deux éléments de même clé : deux lignes, appariées une à une au PATCH suivant"""
+    duplicated = {"title": "AWS Practitioner", "issuer": "Amazon", "year": 2023}
+    await _patch_me(session_factory, {"step4": {"certifications": [duplicated, duplicated]}})
+    assert len(await _rows(session_factory, Certification)) == 2
+
+    async with session_factory() as session:
+        counts = await ProfileRepository.sync_collections(session, 1, {"certifications": [duplicated, duplicated]})
+        assert counts["certifications"] == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 2}
+
+        # Un seul exemplaire renvoyé : le doublon en base est supprimé
+        counts = await ProfileRepository.sync_collections(session, 1, {"certifications": [duplicated]})
+        assert counts["certifications"] == {"inserted": 0, "updated": 0, "deleted": 1, "unchanged": 1}
+        await session.commit()
+    assert len(await _rows(session_factory, Certification)) == 1
+
+
+@pytest.mark.unit
+async def test_patch_me_failure_rolls_back_every_collection(session_factory, monkeypatch):
+    """Une erreur après la synchronisation (étape 7) annule toutes les collections du PATCH"""
+    await _patch_me(session_factory, {
+        "step2": {"experiences": [_experience("Orange")]},
+        "step3": {"educations": [{"diploma": "Master", "institution": "UCAD", "graduation_year": 2019, "level": "Bac+5"}]},
+    })
+
+    async def failing_create_or_update(*args, **kwargs):
+        raise RuntimeError("job_preferences indisponible")
+
+    monkeypatch.setattr(JobPreferenceRepository, "create_or_update", failing_create_or_update)
+    with pytest.raises(RuntimeError):
+        await _patch_me(session_factory, {
+            "step1": {"first_name": "Aminata"},
+            "step2": {"experiences": [_experience("Wave")]},
+            "step3": {"educations": []},
+            "step7": {
+                "contract_type": "CDI",
+                "desired_location": "Dakar",
+                "availability": "Immédiate",
+                "salary_expectations": 500000,
+            },
+        })
+
+    assert [exp.company_name for exp in await _rows(session_factory, Experience)] == ["Orange"]
+    assert [edu.diploma for edu in await _rows(session_factory, Education)] == ["Master"]
+    async with session_factory() as session:
+        profile = await session.get(Profile, 1)
+        assert profile.first_name == "Awa"
+
+
+async def _add_education_and_preferences(session_factory):
+    async with session_factory() as session:
+        session.add(Education(profile_id=1, diploma="Master", institution="UCAD", graduation_year=2019, level="Bac+5"))
+        await session.execute(text(
+            "INSERT INTO job_preferences (profile_id, contract_type, desired_location, availability, salary_expectations) "
+            "VALUES (1, 'CDI', 'Dakar', 'Immédiate', 500000)"
+        ))
+        await session.commit()
+
+
+@pytest.mark.unit
+async def test_refresh_completion_recomputes_only_changed_sections(session_factory):
+    """Les sections non demandées gardent leur sous-score en cache (sans relire leurs lignes)"""
+    await _add_education_and_preferences(session_factory)
+    cached = {"identity": 1.0, "experiences": 0.0, "educations": 0.0, "cv": 0.0, "preferences": 0.0}
+    async with session_factory() as session:
+        profile = await session.get(Profile, 1)
+        profile.completion_scores = dict(cached)
+        await ProfileRepository.refresh_completion(session, profile, ("educations",))
+
+    # Formation ajoutée : seule la section educations change
+    assert profile.completion_scores == {**cached, "educations": SECTION_WEIGHTS["educations"]}
+    assert profile.completion_percentage == 1.0 + SECTION_WEIGHTS["educations"]
+
+    # Aucune section demandée : rien à recalculer
+    async with session_factory() as session:
+        profile.completion_scores = dict(cached)
+        await ProfileRepository.refresh_completion(session, profile, ())
+    assert profile.completion_scores == cached
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("cached", [None, {}, {"identity": 20.0, "cv": 0.0}])
+async def test_refresh_completion_rebuilds_missing_cache(session_factory, cached):
+    """Cache absent ou incomplet (profil antérieur) : sections manquantes calculées, total = calcul complet"""
+    await _add_education_and_preferences(session_factory)
+    async with session_factory() as session:
+        profile = await session.get(Profile, 1)
+        profile.completion_scores = cached
+        await ProfileRepository.refresh_completion(session, profile, ("identity",))
+        await session.commit()
+
+    async with session_factory() as session:
+        loaded = await ProfileRepository.get_with_relations(session, 1)
+        expected = calculate_completion_percentage(loaded, has_cv=False)
+    assert set(profile.completion_scores) == set(SECTION_WEIGHTS)
+    assert profile.completion_scores["cv"] == 0.0
+    assert profile.completion_scores["educations"] == SECTION_WEIGHTS["educations"]
+    assert profile.completion_percentage == expected
+    assert loaded.completion_percentage == expected
+
+
+@pytest.mark.unit
+async def test_patch_me_cached_total_matches_full_calculation(session_factory):
+    """Après plusieurs PATCH partiels, le total en cache égale calculate_completion_percentage"""
+    await _patch_me(session_factory, {"step1": {"last_name": "Diop", "city": "Dakar", "country": "Sénégal"}})
+    await _patch_me(session_factory, {"step2": {"experiences": [_experience("Orange", is_current=True)]}})
+    await _patch_me(session_factory, {"step3": {"educations": [
+        {"diploma": "Master", "institution": "UCAD", "graduation_year": 2019, "level": "Bac+5"}
+    ]}})
+    response = await _patch_me(session_factory, {"step2": {"experiences": []}, "step1": {"phone": "+221770000000"}})
+
+    async with session_factory() as session:
+        loaded = await ProfileRepository.get_with_relations(session, 1)
+    assert response.completion_percentage == calculate_completion_percentage(loaded, has_cv=False)
+    assert loaded.completion_scores["experiences"] == 0.0
+
+
+@pytest.fixture
+def events_consumer(session_factory, monkeypatch):
+    """Consommateur du stream des documents branché sur la base de test et un Redis en mémoire"""
+    monkeypatch.setattr(document_events, "AsyncSessionLocal", session_factory)
+    consumer = DocumentEventsConsumer("documents:events", "candidate-service", consumer="web-1", claim_idle_ms=30000)
+    consumer._redis = _FakeStreamRedis()
+    return consumer
+
+
+async def _profile(session_factory) -> Profile:
+    async with session_factory() as session:
+        return await session.get(Profile, 1)
+
+
+@pytest.mark.unit
+async def test_document_events_update_cv_flag_counts_and_completion(session_factory, events_consumer):
+    """Upload puis suppression du CV : has_cv, compteurs, dernier CV et section CV de la complétion"""
+    redis = events_consumer._redis
+    uploaded_at = datetime(2026, 3, 1, 10, 0)
+    redis.add_event(1, uploaded_at, cv_count=1, document_count=3, latest_cv_id=42)
+    assert await events_consumer.run_once() == 1
+
+    profile = await _profile(session_factory)
+    assert (profile.has_cv, profile.document_count, profile.latest_cv_id) == (True, 3, 42)
+    assert profile.documents_synced_at == uploaded_at
+    assert profile.completion_scores["cv"] == SECTION_WEIGHTS["cv"]
+    assert redis.acked == ["1-0"] and not redis.pending
+
+    redis.add_event(1, uploaded_at + timedelta(minutes=5), cv_count=0, document_count=2)
+    await events_consumer.run_once()
+    profile = await _profile(session_factory)
+    assert (profile.has_cv, profile.document_count, profile.latest_cv_id) == (False, 2, None)
+    assert profile.completion_scores["cv"] == 0.0
+
+
+@pytest.mark.unit
+async def test_document_events_older_state_is_ignored(session_factory, events_consumer):
+    """Événements réordonnés : le plus récent (occurred_at) l'emporte, dans un lot comme entre deux lots"""
+    redis = events_consumer._redis
+    t0 = datetime(2026, 3, 1, 10, 0)
+    redis.add_event(1, t0 + timedelta(seconds=2), cv_count=1, document_count=2, latest_cv_id=7)
+    redis.add_event(1, t0 + timedelta(seconds=1), cv_count=0, document_count=1)
+    assert await events_consumer.run_once() == 1
+    profile = await _profile(session_factory)
+    assert (profile.has_cv, profile.document_count) == (True, 2)
+
+    # Lot suivant portant un état antérieur : acquitté sans effet
+    redis.add_event(1, t0, cv_count=0, document_count=0)
+    await events_consumer.run_once()
+    profile = await _profile(session_factory)
+    assert (profile.has_cv, profile.document_count, profile.latest_cv_id) == (True, 2, 7)
+    assert profile.documents_synced_at == t0 + timedelta(seconds=2)
+    assert redis.acked == ["1-0", "2-0", "3-0"]
+
+
+@pytest.mark.unit
+async def test_document_events_duplicate_delivery_is_idempotent(session_factory, events_consumer):
+    """Un même message appliqué deux fois (relivraison) donne le même état"""
+    redis = events_consumer._redis
+    redis.add_event(1, datetime(2026, 3, 1, 10, 0), cv_count=1, document_count=1, latest_cv_id=5)
+    messages = list(redis.entries)
+
+    await events_consumer.process_batch(messages)
+    first = await _profile(session_factory)
+    await events_consumer.process_batch(messages, retried=True)
+    second = await _profile(session_factory)
+
+    assert (second.has_cv, second.document_count, second.latest_cv_id) == (True, 1, 5)
+    assert second.completion_scores == first.completion_scores
+    assert second.documents_synced_at == first.documents_synced_at
+    assert events_consumer.failed == 0
+
+
+@pytest.mark.unit
+async def test_document_events_failed_batch_is_claimed_by_another_consumer(session_factory, events_consumer, monkeypatch):
+    """Lot en échec non acquitté : repris par XAUTOCLAIM (autre nom de consommateur après redéploiement)"""
+    redis = events_consumer._redis
+    redis.add_event(1, datetime(2026, 3, 1, 10, 0), cv_count=1, document_count=1)
+    original_apply = events_consumer._apply
+
+    async def failing_apply(events):
+        raise RuntimeError("base indisponible")
+
+    monkeypatch.setattr(events_consumer, "_apply", failing_apply)
+    with pytest.raises(RuntimeError):
+        await events_consumer.run_once()
+    assert "1-0" in redis.pending and not redis.acked
+
+    # Nouveau process (hostname différent) : rien avant claim_idle_ms, puis le message est repris
+    restarted = DocumentEventsConsumer("documents:events", "candidate-service", consumer="web-2", claim_idle_ms=30000)
+    restarted._redis = redis
+    assert await restarted.run_once() == 0
+    redis.now_ms += 30000
+    monkeypatch.setattr(events_consumer, "_apply", original_apply)
+    assert await restarted.run_once() == 1
+
+    profile = await _profile(session_factory)
+    assert profile.has_cv is True
+    assert redis.acked == ["1-0"] and not redis.pending
+
+
+@pytest.mark.unit
+async def test_direct_read_uses_document_service_clock(session_factory, monkeypatch):
+    """Lecture HTTP (repli, réconciliation) : datée par le Document Service, jamais par l'horloge locale"""
+    from app.infrastructure import document_client
+
+    event_time = datetime(2026, 3, 1, 10, 0)
+    async with session_factory() as session:
+        await ProfileRepository.apply_document_stats(
+            session, 1, {"cv_count": 1, "document_count": 1, "latest_cv_id": 3}, event_time
+        )
+        await session.commit()
+
+    def stats_observed_at(observed_at):
+        async def fetch(candidate_ids):
+            return {1: {"cv_count": 0, "document_count": 0, "latest_cv_id": None, "observed_at": observed_at}}
+        return fetch
+
+    # Lecture antérieure à l'événement déjà appliqué (sur l'horloge du Document Service) : ignorée
+    monkeypatch.setattr(document_client, "fetch_document_stats", stats_observed_at(event_time - timedelta(seconds=1)))
+    profile = await _profile(session_factory)
+    assert await ProfileRepository.fetch_document_stats(profile) is True
+    assert (profile.has_cv, profile.documents_synced_at) == (True, event_time)
+
+    # Sans date fournie : appliquée, sans avancer documents_synced_at
+    monkeypatch.setattr(document_client, "fetch_document_stats", stats_observed_at(None))
+    await ProfileRepository.fetch_document_stats(profile)
+    assert (profile.has_cv, profile.documents_synced_at) == (False, event_time)
+
+    # Un événement à peine postérieur reste appliqué (pas de décalage d'horloge)
+    later = event_time + timedelta(milliseconds=1)
+    assert ProfileRepository.set_document_stats(profile, {"cv_count": 1, "document_count": 1}, later) is True
+    assert profile.documents_synced_at == later
+
+
+@pytest.mark.unit
+async def test_reconciliation_runs_once_per_interval_across_processes(events_consumer, monkeypatch):
+    """Plusieurs process dus en même temps : un seul réconcilie (verrou Redis)"""
+    calls = []
+
+    async def fake_reconcile(page_size):
+        calls.append(page_size)
+        return {"checked": 0, "fixed": 0, "failed_pages": 0}
+
+    monkeypatch.setattr(document_events, "reconcile_document_stats", fake_reconcile)
+    other = DocumentEventsConsumer("documents:events", "candidate-service", consumer="web-2")
+    other._redis = events_consumer._redis
+    for consumer in (events_consumer, other):
+        # Échéance atteinte
+        consumer._next_reconcile_at = 0
+        await consumer.reconcile_if_due()
+
+    assert len(calls) == 1
+    assert events_consumer.last_reconcile is not None and other.last_reconcile is None
+
+
+async def _add_listing_profiles(session_factory, count: int = 120):
+    """Profils aux dates de tri souvent NULL ou égales (départage par id), certains supprimés"""
+    rng = random.Random(24)
+    t0 = datetime(2026, 1, 1)
+    async with session_factory() as session:
+        for profile_id in range(2, count + 2):
+            session.add(Profile(
+                id=profile_id,
+                user_id=profile_id,
+                email=f"candidat{profile_id}@example.com",
+                first_name=rng.choice(["Awa", "Moussa", "Fatou", None]),
+                last_name=rng.choice(["Diop", "Ndiaye_x", "Sow"]),
+                profile_title=rng.choice(["Data analyst", "Chef 100%", "UI/UX", None]),
+                status=rng.choice([ProfileStatus.DRAFT, ProfileStatus.SUBMITTED, ProfileStatus.VALIDATED]),
+                submitted_at=rng.choice([None, t0 + timedelta(days=rng.randint(0, 4))]),
+                created_at=rng.choice([None, t0 + timedelta(days=rng.randint(0, 2))]),
+                deleted_at=rng.choice([None] * 9 + [t0]),
+            ))
+        await session.commit()
+        return list((await session.execute(select(Profile))).scalars().all())
+
+
+def _listing_order(profile: Profile):
+    """Ordre de référence : submitted_at, created_at DESC NULLS FIRST, puis id DESC"""
+    def desc_nulls_first(value):
+        return (0, 0) if value is None else (1, -value.timestamp())
+    return desc_nulls_first(profile.submitted_at), desc_nulls_first(profile.created_at), -profile.id
+
+
+def _matches(profile: Profile, status, q) -> bool:
+    if profile.deleted_at is not None or (status and profile.status != status):
+        return False
+    document = " ".join([profile.first_name or "", profile.last_name or "", profile.email or "", profile.profile_title or ""])
+    return not q or q.lower() in document.lower()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("status, q", [
+    (None, None),
+    (ProfileStatus.SUBMITTED, None),
+    (None, "awa d"),
+    (None, "100%"),
+    (None, "e_x"),
+    (None, "ui/ux"),
+])
+async def test_keyset_pages_follow_listing_order(session_factory, status, q):
+    """Pages par curseur = ordre de référence (NULL en tête, égalités départagées par id) = pages OFFSET"""
+    profiles = await _add_listing_profiles(session_factory)
+    expected = [profile.id for profile in sorted(profiles, key=_listing_order) if _matches(profile, status, q)]
+    assert expected
+
+    by_cursor, by_offset, cursor = [], [], None
+    async with session_factory() as session:
+        while True:
+            page, cursor = await profile_listing.list_profiles_page(session, status, q, size=7, cursor=cursor)
+            by_cursor += [profile.id for profile in page]
+            if cursor is None:
+                break
+        for page_number in range(1, len(expected) // 7 + 2):
+            page, _ = await profile_listing.list_profiles_page(session, status, q, size=7, page=page_number)
+            by_offset += [profile.id for profile in page]
+
+    assert by_cursor == expected
+    assert by_offset == expected
+
+
+@pytest.mark.unit
+async def test_after_condition_with_null_sort_values(session_factory):
+    """Curseur sur submitted_at NULL : les NULL restants d'abord, puis toutes les valeurs non NULL"""
+    t0 = datetime(2026, 1, 1)
+    yesterday = t0 - timedelta(days=1)
+    async with session_factory() as session:
+        await session.execute(text("DELETE FROM profiles"))
+        # Ordre de la liste : 2, 1, 3, 4, 5, 6
+        for profile_id, submitted_at, created_at in [
+            (1, None, t0), (2, None, t0), (3, None, yesterday), (4, t0, t0), (5, t0, yesterday), (6, yesterday, t0),
+        ]:
+            session.add(Profile(id=profile_id, user_id=profile_id, email=f"c{profile_id}@example.com",
+                                submitted_at=submitted_at, created_at=created_at))
+        await session.commit()
+
+        async def after(values):
+            query = select(Profile.id).where(profile_listing.keyset_filter(values))
+            return sorted((await session.execute(query)).scalars().all())
+
+        assert await after((None, t0, 2)) == [1, 3, 4, 5, 6]
+        assert await after((None, yesterday, 3)) == [4, 5, 6]
+        assert await after((t0, t0, 4)) == [5, 6]
+        assert await after((t0, yesterday, 5)) == [6]
+        assert await after((yesterday, t0, 6)) == []
+
+
+@pytest.mark.unit
+async def test_cursor_round_trip_and_filters_check(session_factory):
+    """Le curseur restitue les valeurs de tri (NULL compris) et n'est valable que pour ses filtres"""
+    t0 = datetime(2026, 1, 1, 8, 30)
+    profile = Profile(id=9, user_id=9, email="c9@example.com", submitted_at=None, created_at=t0)
+
+    cursor = profile_listing.encode_cursor(profile, ProfileStatus.SUBMITTED, "diop")
+    assert profile_listing.decode_cursor(cursor, ProfileStatus.SUBMITTED, "diop") == (None, t0, 9)
+
+    for status, q in [(None, "diop"), (ProfileStatus.SUBMITTED, "sow"), (ProfileStatus.VALIDATED, "diop")]:
+        with pytest.raises(InvalidCursorError):
+            profile_listing.decode_cursor(cursor, status, q)
+    with pytest.raises(InvalidCursorError):
+        profile_listing.decode_cursor("pas-un-curseur", None, None)
+
+    # Curseur d'une autre recherche réutilisé : refusé par la route (400), pas une page vide
+    await _add_listing_profiles(session_factory, count=20)
+    async with session_factory() as session:
+        _, next_cursor = await profile_listing.list_profiles_page(session, None, None, size=3)
+        with pytest.raises(InvalidCursorError):
+            await profile_listing.list_profiles_page(session, ProfileStatus.DRAFT, None, size=3, cursor=next_cursor)
+
+
+@pytest.mark.unit
+async def test_count_is_exact_up_to_the_limit(session_factory, monkeypatch):
+    """Total exact sous PROFILE_LIST_EXACT_COUNT_LIMIT, et toujours exact hors PostgreSQL"""
+    profiles = await _add_listing_profiles(session_factory, count=30)
+    active = sum(1 for profile in profiles if profile.deleted_at is None)
+    condition = profile_listing.listing_filter(None, None)
+    async with session_factory() as session:
+        for limit in (0, 10, 1000):
+            monkeypatch.setattr(settings, "PROFILE_LIST_EXACT_COUNT_LIMIT", limit)
+            assert await profile_listing.count_profiles(session, condition) == (active, False)
+
+
+class _PostgresSession:
+    """Session factice (dialecte PostgreSQL) : résultats successifs, requêtes exécutées conservées"""
+
+    class _Result:
+        def __init__(self, value):
+            self.value = value
+
+        def scalar(self):
+            return self.value
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.statements = []
+        self.bind = type("Bind", (), {"dialect": asyncpg.dialect()})()
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self._Result(self.values.pop(0))
+
+
+@pytest.mark.unit
+async def test_count_switches_to_planner_estimate_with_bound_parameters(mappers_configured, monkeypatch):
+    """Au-delà de la limite (PostgreSQL) : estimation EXPLAIN, q passé en paramètre et non dans le SQL"""
+    monkeypatch.setattr(settings, "PROFILE_LIST_EXACT_COUNT_LIMIT", 100)
+    q = "o'hara'); DROP TABLE profiles; --"
+    condition = profile_listing.listing_filter(ProfileStatus.VALIDATED, q)
+
+    session = _PostgresSession(101, json.dumps([{"Plan": {"Plan Rows": 5000}}]))
+    assert await profile_listing.count_profiles(session, condition) == (5000, True)
+
+    explain = session.statements[1].compile(dialect=asyncpg.dialect())
+    sql = str(explain)
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT profiles.id")
+    assert "hara" not in sql and "VALIDATED" not in sql
+    assert explain.params["search_pattern"] == f"%{q}%"
+    assert explain.params["status_1"] == ProfileStatus.VALIDATED
+
+    # Estimation sous la limite : le total ne descend pas sous limit + 1
+    session = _PostgresSession(101, [{"Plan": {"Plan Rows": 3}}])
+    assert await profile_listing.count_profiles(session, condition) == (101, True)
+
+    # Sous la limite : pas d'EXPLAIN
+    session = _PostgresSession(42)
+    assert await profile_listing.count_profiles(session, condition) == (42, False)
+    assert len(session.statements) == 1
+
+
+class _FakeHashRedis:
+    """Redis en mémoire pour le tampon des compteurs (hash, SET NX, RENAME), avec panne simulable"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def check(self):
+        if self.down:
+            raise RedisConnectionError("Redis unavailable")
+
+    async def hincrby(self, key, field, amount):
+        self.check()
+        fields = self.data.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+        return fields[field]
+
+    async def set(self, key, value, nx=False, px=None):
+        self.check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def rename(self, source, destination):
+        if source not in self.data:
+            raise ResponseError("no such key")
+        self.data[destination] = self.data.pop(source)
+
+    async def hgetall(self, key):
+        return {field: str(value) for field, value in self.data.get(key, {}).items()}
+
+    async def hvals(self, key):
+        return [str(value) for value in self.data.get(key, {}).values()]
+
+    async def hlen(self, key):
+        return len(self.data.get(key, {}))
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, token):
+        # _RELEASE_LOCK_SCRIPT
+        if self.data.get(key) == token:
+            del self.data[key]
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+async def job_offers(session_factory, monkeypatch):
+    """Trois offres publiées (10 vues chacune), tampon vidé dans la base de test"""
+    monkeypatch.setattr(job_counters, "AsyncSessionLocal", session_factory)
+    async with session_factory() as session:
+        for job_id in (1, 2, 3):
+            session.add(JobOffer(
+                id=job_id, title="Data analyst", description="<p>Offre</p>", location="Dakar",
+                contract_type="CDI", status=JobStatus.PUBLISHED, view_count=10,
+            ))
+        await session.commit()
+
+    async def counts():
+        async with session_factory() as session:
+            rows = await session.execute(select(JobOffer.id, JobOffer.view_count, JobOffer.register_click_count).order_by(JobOffer.id))
+            return {job_id: (views, clicks) for job_id, views, clicks in rows.all()}
+
+    return counts
+
+
+def _redis_buffer() -> JobCounterBuffer:
+    buffer = JobCounterBuffer("redis", redis_key="job-counters:pending")
+    buffer._redis = _FakeHashRedis()
+    return buffer
+
+
+async def _failing_apply(increments):
+    raise RuntimeError("base indisponible")
+
+
+@pytest.mark.unit
+async def test_memory_buffer_applies_increments_in_one_flush(job_offers):
+    """Les vues et clics sont tamponnés puis appliqués ensemble ; le vidage final de stop() n'oublie rien"""
+    buffer = JobCounterBuffer("memory")
+    for _ in range(5):
+        await buffer.increment(1, VIEW_COUNT)
+    assert await buffer.increment(2, REGISTER_CLICK_COUNT) == 1
+    assert await job_offers() == {1: (10, 0), 2: (10, 0), 3: (10, 0)}
+    assert (await buffer.metrics())["pending_memory_increments"] == 6
+
+    assert await buffer.flush() == 2
+    assert await job_offers() == {1: (15, 0), 2: (10, 1), 3: (10, 0)}
+    assert await buffer.flush() == 0
+
+    await buffer.increment(3, VIEW_COUNT)
+    await buffer.stop()
+    assert (await job_offers())[3] == (11, 0)
+
+
+@pytest.mark.unit
+async def test_memory_flush_failure_merges_back_pending_increments(job_offers):
+    """Vidage en échec : les incréments retournent dans le tampon, avec ceux arrivés entre-temps"""
+    buffer = JobCounterBuffer("memory")
+    await buffer.increment(3, VIEW_COUNT)
+    await buffer.increment(3, VIEW_COUNT)
+    buffer._apply = _failing_apply
+    with pytest.raises(RuntimeError):
+        await buffer.flush()
+
+    await buffer.increment(3, VIEW_COUNT)
+    assert buffer._pending == {(3, VIEW_COUNT): 3}
+    del buffer._apply
+    assert await buffer.flush() == 1
+    assert (await job_offers())[3] == (13, 0)
+    assert buffer._pending == {}
+
+
+@pytest.mark.unit
+async def test_redis_flush_renames_the_hash_then_applies_it(job_offers):
+    """HINCRBY dans le hash partagé, vidage par RENAME sous verrou : appliqué une fois, verrou libéré"""
+    buffer = _redis_buffer()
+    redis = buffer._redis
+    for _ in range(3):
+        await buffer.increment(1, VIEW_COUNT)
+    assert await buffer.increment(2, REGISTER_CLICK_COUNT) == 1
+    assert redis.data["job-counters:pending"] == {"1:view_count": 3, "2:register_click_count": 1}
+    assert buffer._pending == {}
+
+    assert await buffer.flush() == 2
+    assert await job_offers() == {1: (13, 0), 2: (10, 1), 3: (10, 0)}
+    assert redis.data == {}
+
+    # Verrou tenu par un autre process : ce process passe son tour
+    await buffer.increment(1, VIEW_COUNT)
+    redis.data[buffer.lock_key] = "autre-process"
+    assert await buffer.flush() == 0
+    assert redis.data["job-counters:pending"] == {"1:view_count": 1}
+
+
+@pytest.mark.unit
+async def test_redis_interrupted_flush_is_resumed(job_offers):
+    """Hash renommé mais non appliqué (base indisponible) : repris tel quel, puis le hash suivant"""
+    buffer = _redis_buffer()
+    redis = buffer._redis
+    for _ in range(3):
+        await buffer.increment(1, VIEW_COUNT)
+    buffer._apply = _failing_apply
+    with pytest.raises(RuntimeError):
+        await buffer.flush()
+    assert redis.data[buffer.flushing_key] == {"1:view_count": 3}
+    assert buffer.lock_key not in redis.data
+
+    # Arrivé pendant l'interruption : attend le vidage suivant (pas de double application)
+    await buffer.increment(2, VIEW_COUNT)
+    del buffer._apply
+    assert await buffer.flush() == 1
+    assert await job_offers() == {1: (13, 0), 2: (10, 0), 3: (10, 0)}
+    assert await buffer.flush() == 1
+    assert (await job_offers())[2] == (11, 0)
+
+    metrics = await buffer.metrics()
+    assert metrics["backend"] == "redis"
+    assert metrics["flushed_increments"] == 4
+    assert metrics["pending_redis_increments"] == 0 and metrics["flushing_redis_increments"] == 0
+
+
+@pytest.mark.unit
+async def test_redis_unavailable_keeps_increments_in_memory(job_offers):
+    """Redis en panne : incréments gardés en mémoire et appliqués au vidage suivant"""
+    buffer = _redis_buffer()
+    buffer._redis.down = True
+    await buffer.increment(1, VIEW_COUNT)
+    await buffer.increment(1, VIEW_COUNT)
+    assert buffer.redis_fallbacks == 2
+
+    buffer._redis.down = False
+    await buffer.increment(1, VIEW_COUNT)
+    assert await buffer.flush() == 1
+    assert (await job_offers())[1] == (13, 0)
+
+
+@pytest.mark.unit
+def test_job_counters_default_to_redis():
+    """Backend par défaut partagé et durable (REDIS_URL toujours résolue par la configuration)"""
+    assert type(settings).model_fields["JOB_COUNTERS_BACKEND"].default == "redis"
+    assert settings.REDIS_URL
+    assert job_counters.JobCounterBuffer().uses_redis
@@ -48,9 +48,13 @@ if services_candidate.exists():
 
 import pytest
 from services.candidate.app.core.completion import (
+    COMPLETION_SECTIONS,
+    SECTION_WEIGHTS,
     can_submit_profile,
     calculate_completion_percentage,
-    check_cv_exists
+    calculate_section_scores,
+    check_cv_exists,
+    total_completion
 )
 
 @pytest.mark.unit
@@ -106,3 +110,38 @@ def test_calculate_completion_percentage(mock_complete_profile):
     
     assert 0 <= percentage <= 100
     assert percentage >= 80  # Un profil complet doit être >= 80%
+
+@pytest.mark.unit
+def test_section_scores_sum_to_completion_percentage(mock_complete_profile):
+    """Le total des sous-scores (cache completion_scores) égale le calcul complet"""
+    scores = calculate_section_scores(mock_complete_profile, has_cv=True)
+    
+    assert set(scores) == set(COMPLETION_SECTIONS)
+    for section, score in scores.items():
+        assert 0 <= score <= SECTION_WEIGHTS[section]
+    assert total_completion(scores) == calculate_completion_percentage(mock_complete_profile, has_cv=True)
+
+@pytest.mark.unit
+def test_section_scores_only_requested_sections(mock_complete_profile):
+    """Seules les sections demandées sont évaluées"""
+    mock_complete_profile.experiences = []
+    scores = calculate_section_scores(mock_complete_profile, has_cv=True, sections=("experiences", "cv"))
+    
+    assert scores == {"experiences": 0.0, "cv": SECTION_WEIGHTS["cv"]}
+
+@pytest.mark.unit
+def test_recomputing_changed_section_matches_full_calculation(mock_complete_profile):
+    """Cache + section modifiée recalculée = calcul complet après la modification"""
+    cached = calculate_section_scores(mock_complete_profile, has_cv=True)
+    
+    mock_complete_profile.educations = []
+    cached.update(calculate_section_scores(mock_complete_profile, has_cv=True, sections=("educations",)))
+    
+    assert cached["educations"] == 0.0
+    assert total_completion(cached) == calculate_completion_percentage(mock_complete_profile, has_cv=True)
+
+@pytest.mark.unit
+def test_total_completion_missing_sections_count_as_zero():
+    """Section absente du cache : comptée 0 (refresh_completion la calcule)"""
+    assert total_completion({}) == 0.0
+    assert total_completion({"identity": 20.0, "cv": 25.0}) == 45.0
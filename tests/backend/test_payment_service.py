@@ -0,0 +1,319 @@
+"""
+Tests unitaires pour le service Payment (compteurs de quota, SQLite en fichier temporaire)
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au PYTHONPATH
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Vider le cache des modules 'app.*' d'un autre service
+for module_name in list(sys.modules.keys()):
+    if module_name == 'app' or module_name.startswith('app.'):
+        del sys.modules[module_name]
+
+# Retirer les autres services du PYTHONPATH
+for service_name in ["candidate", "document", "auth-service", "company", "notification", "admin", "search", "audit"]:
+    service_path = str(project_root / "services" / service_name)
+    while service_path in sys.path:
+        sys.path.remove(service_path)
+
+# Ajouter le répertoire du service payment au PYTHONPATH EN PREMIER
+services_payment = project_root / "services" / "payment"
+sys.path.insert(0, str(services_payment))
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import configure_mappers
+from sqlmodel import SQLModel
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import delete, text
+
+from app.domain.models import Plan, PlanType, Quota, QuotaReservation, Subscription
+from app.infrastructure.database import migrate_add_quotas_unique_constraint
+from app.infrastructure.repositories import QuotaRepository, SubscriptionRepository
+from app.infrastructure.quota_counter import CONSUME_SCRIPT, QuotaCounter, quota_counter
+from app.infrastructure.subscription_cache import (
+    get_subscription_with_plan,
+    invalidate_company_subscription,
+    plan_cache,
+    subscription_cache,
+)
+
+
+class _FakeScript:
+    """Équivalent Python des scripts Lua de quota_counter.py"""
+
+    def __init__(self, redis, script):
+        self.redis = redis
+        self.script = script
+
+    async def __call__(self, keys, args=()):
+        self.redis.check()
+        hashes = self.redis.hashes
+        if self.script != CONSUME_SCRIPT:
+            # DRAIN_DELTAS_SCRIPT
+            deltas = hashes.pop(keys[0], {})
+            return [item for field, value in deltas.items() for item in (field, str(value))]
+        counter_key, deltas_key = keys
+        amount, limit, db_used, _ttl, quota_id = args
+        used = self.redis.values.get(counter_key)
+        if used is None:
+            if db_used == "":
+                return [-1, 0]
+            used = int(db_used) + hashes.get(deltas_key, {}).get(str(quota_id), 0)
+        if limit >= 0 and used + amount > limit:
+            self.redis.values[counter_key] = used
+            return [0, used]
+        self.redis.values[counter_key] = used + amount
+        deltas = hashes.setdefault(deltas_key, {})
+        deltas[str(quota_id)] = deltas.get(str(quota_id), 0) + amount
+        return [1, used + amount]
+
+
+class _FakeRedis:
+    """Redis en mémoire (compteurs et hash des deltas), avec panne simulable"""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.down = False
+
+    def check(self):
+        if self.down:
+            raise RedisConnectionError("Redis unavailable")
+
+    def register_script(self, script):
+        return _FakeScript(self, script)
+
+    async def get(self, key):
+        self.check()
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.check()
+        self.values.pop(key, None)
+
+    async def close(self):
+        pass
+
+
+def _redis_counter() -> QuotaCounter:
+    counter = QuotaCounter("redis://unused")
+    counter._client = _FakeRedis()
+    counter._consume = counter._client.register_script(CONSUME_SCRIPT)
+    counter._drain = counter._client.register_script("drain")
+    return counter
+
+
+async def _consume(session_factory, counter: QuotaCounter, limit: int = 3):
+    async with session_factory() as session:
+        subscription, _ = await get_subscription_with_plan(session, 1)
+        result = await counter.consume(QuotaRepository(session), subscription.id, "profile_views", 1, limit)
+        await session.commit()
+        return result
+
+
+async def _db_used(session_factory) -> int:
+    async with session_factory() as session:
+        subscription, _ = await get_subscription_with_plan(session, 1)
+        quota = await QuotaRepository(session).get_current_quota(subscription.id, "profile_views")
+        return quota.used
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Base SQLite fichier (plusieurs connexions concurrentes) avec un abonnement FREEMIUM"""
+    try:
+        configure_mappers()
+    except InvalidRequestError:
+        pytest.skip("Modèles d'un autre service chargés partiellement : lancer ce fichier séparément (run_all_tests.sh)")
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'payment.db'}",
+        connect_args={"timeout": 30},
+    )
+    async with engine.begin() as conn:
+        # Uniquement les tables du service (metadata partagée avec les autres services chargés)
+        await conn.run_sync(
+            SQLModel.metadata.create_all,
+            tables=[Plan.__table__, Subscription.__table__, Quota.__table__, QuotaReservation.__table__],
+        )
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    subscription_cache.clear()
+    plan_cache.invalidate()
+    quota_counter._quota_ids.clear()
+    async with factory() as session:
+        plan = Plan(name="Freemium", plan_type=PlanType.FREEMIUM, max_profile_views=10)
+        session.add(plan)
+        await session.flush()
+        session.add(Subscription(company_id=1, plan_id=plan.id))
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+@pytest.mark.unit
+async def test_concurrent_reservations_never_overrun_the_limit(session_factory):
+    """50 consultations simultanées d'une même entreprise : exactement 10 passent"""
+    assert not quota_counter.uses_redis
+
+    async def reserve_once():
+        async with session_factory() as session:
+            subscription, plan = await get_subscription_with_plan(session, 1)
+            reservation, _ = await QuotaRepository(session).reserve(
+                subscription_id=subscription.id,
+                company_id=1,
+                quota_type="profile_views",
+                amount=1,
+                limit=plan.max_profile_views,
+                ttl_seconds=300,
+            )
+            return reservation
+
+    reservations = await asyncio.gather(*(reserve_once() for _ in range(50)))
+
+    granted = [reservation for reservation in reservations if reservation is not None]
+    assert len(granted) == 10
+
+    async with session_factory() as session:
+        quota_repo = QuotaRepository(session)
+        subscription, _ = await get_subscription_with_plan(session, 1)
+        quota = await quota_repo.get_current_quota(subscription.id, "profile_views")
+        assert quota.used == 10
+
+        # L'annulation rembourse le quota et n'est appliquée qu'une fois
+        await quota_repo.release_reservation(granted[0].id)
+        await quota_repo.release_reservation(granted[0].id)
+        assert await quota_repo.get_used(quota.id) == 9
+
+
+@pytest.mark.unit
+async def test_concurrent_increments_are_not_lost(session_factory):
+    """create_or_update_quota n'écrase plus les incréments concurrents"""
+    async with session_factory() as session:
+        subscription, _ = await get_subscription_with_plan(session, 1)
+        subscription_id = subscription.id
+        await QuotaRepository(session).create_or_update_quota(subscription_id, "profile_views", amount=0)
+
+    async def increment():
+        async with session_factory() as session:
+            await QuotaRepository(session).create_or_update_quota(subscription_id, "profile_views", amount=1)
+
+    await asyncio.gather(*(increment() for _ in range(30)))
+
+    async with session_factory() as session:
+        quota = await QuotaRepository(session).get_current_quota(subscription_id, "profile_views")
+        assert quota.used == 30
+
+
+@pytest.mark.unit
+async def test_subscription_and_plan_are_served_from_cache(session_factory):
+    """Après le premier accès, l'abonnement et le plan ne sont plus relus en base"""
+    async with session_factory() as session:
+        subscription, plan = await get_subscription_with_plan(session, 1)
+        assert plan.max_profile_views == 10
+
+    hits = subscription_cache.hits
+    async with session_factory() as session:
+        cached_subscription, cached_plan = await get_subscription_with_plan(session, 1)
+        assert cached_subscription.id == subscription.id
+        assert cached_plan.id == plan.id
+        assert subscription_cache.hits == hits + 1
+
+        # Un webhook annule l'abonnement puis invalide le cache
+        db_subscription = await SubscriptionRepository(session).get_by_id(subscription.id)
+        db_subscription.status = "cancelled"
+        await SubscriptionRepository(session).update(db_subscription)
+        invalidate_company_subscription(1)
+
+        assert await get_subscription_with_plan(session, 1) == (None, None)
+
+
+@pytest.mark.unit
+async def test_redis_counter_enforces_the_limit_then_reconciles(session_factory):
+    """Mode Redis : la limite est tenue par le compteur, la base rattrapée par reconcile"""
+    counter = _redis_counter()
+
+    results = [await _consume(session_factory, counter) for _ in range(5)]
+
+    assert [allowed for allowed, _, _ in results] == [True, True, True, False, False]
+    assert results[-1][1] == 3
+    assert await _db_used(session_factory) == 0
+    assert await counter.reconcile(session_factory) == 1
+    assert await _db_used(session_factory) == 3
+
+
+@pytest.mark.unit
+async def test_redis_outage_falls_back_to_the_database(session_factory):
+    """Redis indisponible : consommation en base, puis compteur Redis repris depuis la base"""
+    counter = _redis_counter()
+    assert (await _consume(session_factory, counter))[0] is True
+
+    counter._client.down = True
+    allowed, used, quota_id = await _consume(session_factory, counter)
+    assert allowed is True
+    assert await _db_used(session_factory) == 1
+    assert quota_id in counter._degraded
+
+    # Retour de Redis : compteur = base (1) + delta Redis non reporté (1), puis +1
+    counter._client.down = False
+    allowed, used, _ = await _consume(session_factory, counter)
+    assert (allowed, used) == (True, 3)
+    assert not counter._degraded
+    await counter.reconcile(session_factory)
+    assert await _db_used(session_factory) == 3
+
+
+@pytest.mark.unit
+async def test_redis_mode_recovers_from_a_deleted_quota_row(session_factory):
+    """ID de quota en mémoire périmé (ligne supprimée) : la ligne est recréée, pas d'erreur"""
+    counter = _redis_counter()
+    _, _, quota_id = await _consume(session_factory, counter)
+    async with session_factory() as session:
+        await session.execute(delete(Quota).where(Quota.id == quota_id))
+        await session.commit()
+    counter._client.values.clear()
+    counter._client.hashes.clear()
+
+    allowed, used, new_quota_id = await _consume(session_factory, counter)
+
+    assert (allowed, used) == (True, 1)
+    async with session_factory() as session:
+        assert await QuotaRepository(session).get_used(new_quota_id) == 0
+
+
+@pytest.mark.unit
+async def test_init_db_merges_duplicate_quotas_before_adding_the_constraint(tmp_path):
+    """Base existante sans contrainte unique : doublons fusionnés, contrainte ajoutée"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE quotas (id INTEGER PRIMARY KEY, subscription_id INTEGER, quota_type VARCHAR(50), "
+            "used INTEGER, period_start DATETIME)"
+        ))
+        await conn.execute(text("CREATE TABLE quota_reservations (id VARCHAR(64) PRIMARY KEY, quota_id INTEGER)"))
+        await conn.execute(text(
+            "INSERT INTO quotas VALUES (1, 1, 'profile_views', 2, '2026-01-01'), "
+            "(2, 1, 'profile_views', 3, '2026-01-01'), (3, 2, 'profile_views', 1, '2026-01-01')"
+        ))
+        await conn.execute(text("INSERT INTO quota_reservations VALUES ('r1', 2)"))
+
+    async with engine.begin() as conn:
+        await migrate_add_quotas_unique_constraint(conn)
+
+    async with engine.begin() as conn:
+        rows = (await conn.execute(text("SELECT id, used FROM quotas ORDER BY id"))).all()
+        assert [tuple(row) for row in rows] == [(1, 5), (3, 1)]
+        assert (await conn.execute(text("SELECT quota_id FROM quota_reservations"))).scalar() == 1
+        with pytest.raises(Exception):
+            await conn.execute(text("INSERT INTO quotas VALUES (4, 1, 'profile_views', 0, '2026-01-01')"))
+    await engine.dispose()
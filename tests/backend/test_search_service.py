@@ -0,0 +1,1065 @@
+"""
+Tests unitaires pour le service Search (sans Elasticsearch ni Redis)
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au PYTHONPATH
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Vider le cache des modules 'app.*' d'un autre service
+for module_name in list(sys.modules.keys()):
+    if module_name == 'app' or module_name.startswith('app.'):
+        del sys.modules[module_name]
+
+# Retirer les autres services du PYTHONPATH
+for service_name in ["candidate", "document", "auth-service", "company", "notification", "admin", "payment", "audit"]:
+    service_path = str(project_root / "services" / service_name)
+    while service_path in sys.path:
+        sys.path.remove(service_path)
+
+# Ajouter le répertoire du service search au PYTHONPATH EN PREMIER
+services_search = project_root / "services" / "search"
+sys.path.insert(0, str(services_search))
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from app.core.config import settings
+from app.infrastructure import auth as search_auth
+from app.infrastructure.token_cache import TokenClaimsCache, RevocationListener
+
+
+JWT_SECRET = "test-secret"
+
+
+def _make_token(user_id: int = 1, jti: str = "jti-1", token_type: str = "access", expires_in: int = 300) -> str:
+    payload = {
+        "sub": str(user_id),
+        "email": f"user{user_id}@example.com",
+        "roles": ["ROLE_RECRUITER"],
+        "exp": datetime.utcnow() + timedelta(seconds=expires_in),
+        "iat": datetime.utcnow(),
+        "jti": jti,
+        "type": token_type,
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
+
+
+@pytest.fixture
+def local_auth(monkeypatch):
+    """Active la vérification locale avec un cache vide"""
+    monkeypatch.setattr(settings, "AUTH_VERIFICATION_MODE", "local")
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", JWT_SECRET)
+    monkeypatch.setattr(settings, "REDIS_URL", "")
+    cache = TokenClaimsCache(max_size=10, ttl_seconds=60)
+    monkeypatch.setattr(search_auth, "token_cache", cache)
+    return cache
+
+
+@pytest.mark.unit
+def test_token_cache_lru_eviction():
+    """Le cache reste borné et évince l'entrée la moins récemment utilisée"""
+    cache = TokenClaimsCache(max_size=2, ttl_seconds=60)
+    exp = time.time() + 300
+    cache.set("a", "A", {"exp": exp})
+    cache.set("b", "B", {"exp": exp})
+    assert cache.get("a") == "A"
+    cache.set("c", "C", {"exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+@pytest.mark.unit
+def test_token_cache_respects_token_expiry():
+    """Une entrée n'est jamais servie au-delà de l'expiration du token"""
+    cache = TokenClaimsCache(max_size=10, ttl_seconds=60)
+    cache.set("expired", "X", {"exp": time.time() - 1})
+    assert cache.get("expired") is None
+
+
+@pytest.mark.unit
+def test_revocation_messages_invalidate_cache():
+    """Les messages pub/sub de révocation purgent les entrées concernées"""
+    cache = TokenClaimsCache(max_size=10, ttl_seconds=60)
+    exp = time.time() + 300
+    cache.set("t1", "T1", {"exp": exp, "sub": "1", "jti": "j1", "iat": 100})
+    cache.set("t2", "T2", {"exp": exp, "sub": "1", "jti": "j2", "iat": 200})
+    cache.set("t3", "T3", {"exp": exp, "sub": "2", "jti": "j3", "iat": 100})
+    listener = RevocationListener(cache, "auth:revocations")
+
+    listener.handle_message('{"type": "jti", "jti": "j3", "user_id": 2}')
+    assert cache.get("t3") is None
+
+    listener.handle_message('{"type": "user", "user_id": 1, "not_before": 150}')
+    assert cache.get("t1") is None
+    assert cache.get("t2") == "T2"
+
+
+@pytest.mark.unit
+async def test_local_verification_caches_claims(local_auth):
+    """Un token valide est vérifié localement puis servi depuis le cache"""
+    token = _make_token(user_id=42)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    user = await search_auth.get_current_user(credentials)
+    assert user.user_id == 42
+    assert user.roles == ["ROLE_RECRUITER"]
+
+    again = await search_auth.get_current_user(credentials)
+    assert again is user
+    assert local_auth.hits == 1
+
+
+@pytest.mark.unit
+async def test_local_verification_rejects_refresh_and_expired_tokens(local_auth):
+    """Refresh tokens et tokens expirés sont refusés sans appel réseau"""
+    for token in (_make_token(token_type="refresh"), _make_token(expires_in=-10)):
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        with pytest.raises(HTTPException) as exc_info:
+            await search_auth.get_current_user(credentials)
+        assert exc_info.value.status_code == 401
+
+
+@pytest.mark.unit
+async def test_quota_reservation_runs_concurrently_with_operation(monkeypatch):
+    """La réservation du quota ne s'ajoute pas à la latence de l'opération"""
+    from app.infrastructure import quota_middleware
+
+    async def slow_reserve(company_id, quota_type="profile_views", amount=1):
+        await asyncio.sleep(0.1)
+        return {"reservation_id": "r1"}
+
+    async def slow_operation():
+        await asyncio.sleep(0.1)
+        return {"id": 7}
+
+    monkeypatch.setattr(quota_middleware, "reserve_quota", slow_reserve)
+
+    started = time.perf_counter()
+    result = await quota_middleware.run_with_quota_reservation(1, slow_operation())
+    elapsed = time.perf_counter() - started
+
+    assert result == {"id": 7}
+    assert elapsed < 0.18
+
+
+@pytest.mark.unit
+async def test_quota_reservation_is_released_when_operation_fails(monkeypatch):
+    """Si le profil n'est pas servi, la réservation est annulée en tâche de fond"""
+    from app.infrastructure import quota_middleware
+
+    released = []
+
+    async def reserve(company_id, quota_type="profile_views", amount=1):
+        return {"reservation_id": "r2"}
+
+    async def release(reservation_id):
+        released.append(reservation_id)
+
+    async def failing_operation():
+        raise HTTPException(status_code=404, detail="Candidate profile not found")
+
+    monkeypatch.setattr(quota_middleware, "reserve_quota", reserve)
+    monkeypatch.setattr(quota_middleware, "release_quota", release)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await quota_middleware.run_with_quota_reservation(1, failing_operation())
+    assert exc_info.value.status_code == 404
+
+    await quota_middleware.drain_background_tasks()
+    assert released == ["r2"]
+
+
+@pytest.mark.unit
+async def test_quota_exceeded_hides_operation_result(monkeypatch):
+    """Un quota refusé lève l'erreur de quota même si le profil a été récupéré"""
+    from app.infrastructure import quota_middleware
+
+    async def reserve(company_id, quota_type="profile_views", amount=1):
+        raise HTTPException(status_code=403, detail="Quota exceeded")
+
+    async def operation():
+        return {"id": 7}
+
+    monkeypatch.setattr(quota_middleware, "reserve_quota", reserve)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await quota_middleware.run_with_quota_reservation(1, operation())
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.unit
+async def test_audit_events_are_buffered_and_sent_in_batches(monkeypatch):
+    """Sans Redis, les accès sont regroupés en lots et la file est vidée à l'arrêt"""
+    from app.infrastructure import audit_publisher as publisher_module
+
+    monkeypatch.setattr(publisher_module, "get_redis", lambda: None)
+    publisher = publisher_module.AuditPublisher(mode="stream", batch_size=3, flush_interval_seconds=60)
+    batches = []
+
+    async def post_batch(batch):
+        batches.append(batch)
+        return True
+
+    monkeypatch.setattr(publisher, "_post_batch", post_batch)
+
+    for candidate_id in range(7):
+        await publisher.publish({"candidate_id": candidate_id})
+    await asyncio.sleep(0)
+    await publisher.stop()
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [event["candidate_id"] for batch in batches for event in batch] == list(range(7))
+    assert all("accessed_at" in event for batch in batches for event in batch)
+
+
+@pytest.mark.unit
+async def test_failed_audit_batch_is_kept_for_next_flush(monkeypatch):
+    """Un lot refusé par l'Audit reste en file, dans l'ordre"""
+    from app.infrastructure import audit_publisher as publisher_module
+
+    publisher = publisher_module.AuditPublisher(mode="batch", batch_size=2, max_buffer_size=3)
+    responses = [False, True, True]
+
+    async def post_batch(batch):
+        return responses.pop(0)
+
+    monkeypatch.setattr(publisher, "_post_batch", post_batch)
+    publisher._buffer.extend({"candidate_id": i} for i in range(3))
+
+    assert await publisher.flush() == 0
+    assert [event["candidate_id"] for event in publisher._buffer] == [0, 1, 2]
+    assert await publisher.flush() == 3
+    assert publisher.stats()["buffered"] == 0
+
+
+def _fake_profile_pages(total: int, page_size: int):
+    """Candidate Service simulé : profils validés 1..total, pagination keyset"""
+    profiles = [
+        {"id": i, "first_name": "Jane", "last_name": f"Doe{i}", "profile_title": "Dev",
+         "skills": [{"name": "Python", "level": "expert"}, {"name": "Anglais", "level": ""}]}
+        for i in range(1, total + 1)
+    ]
+    calls = []
+
+    async def fetch_page(after_id):
+        calls.append(after_id)
+        page = [p for p in profiles if p["id"] > after_id][:page_size]
+        return page, page[-1]["id"] if len(page) == page_size else None
+
+    return fetch_page, calls
+
+
+@pytest.mark.unit
+async def test_reindex_streams_all_pages_and_checkpoints(monkeypatch, tmp_path):
+    """Toutes les pages sont indexées via le bulk en streaming et le checkpoint suit"""
+    from app.infrastructure import reindex
+
+    monkeypatch.setattr(reindex, "get_redis", lambda: None)
+    indexed_ids = []
+
+    async def fake_streaming_bulk(client, actions, **kwargs):
+        await asyncio.sleep(0.001)
+        for action in actions:
+            indexed_ids.append(int(action["_id"]))
+            yield True, {"index": {"_id": action["_id"]}}
+
+    monkeypatch.setattr(reindex, "async_streaming_bulk", fake_streaming_bulk)
+    fetch_page, _ = _fake_profile_pages(total=23, page_size=5)
+    store = reindex.CheckpointStore(str(tmp_path / "checkpoint.json"))
+    job = reindex.ReindexJob("candidates_v2", store, fetch_page=fetch_page, client=object(), concurrency=3)
+
+    state = await job.run()
+
+    assert state["status"] == "completed"
+    assert sorted(indexed_ids) == list(range(1, 24))
+    assert state["indexed"] == 23 and state["pages"] == 5
+    checkpoint = await store.load("candidates_v2")
+    assert checkpoint["after_id"] == 23 and checkpoint["status"] == "completed"
+
+
+@pytest.mark.unit
+async def test_reindex_resumes_from_checkpoint(monkeypatch, tmp_path):
+    """Une réindexation interrompue reprend après le dernier ID checkpointé"""
+    from app.infrastructure import reindex
+
+    monkeypatch.setattr(reindex, "get_redis", lambda: None)
+    indexed_ids = []
+
+    async def fake_streaming_bulk(client, actions, **kwargs):
+        for action in actions:
+            indexed_ids.append(int(action["_id"]))
+            yield True, {}
+
+    monkeypatch.setattr(reindex, "async_streaming_bulk", fake_streaming_bulk)
+    fetch_page, calls = _fake_profile_pages(total=12, page_size=4)
+    store = reindex.CheckpointStore(str(tmp_path / "checkpoint.json"))
+    await store.save("candidates", {"after_id": 8, "status": "failed"})
+
+    state = await reindex.ReindexJob("candidates", store, fetch_page=fetch_page, client=object()).run()
+
+    assert calls[0] == 8
+    assert indexed_ids == [9, 10, 11, 12]
+    assert state["after_id"] == 12
+
+
+@pytest.mark.unit
+async def test_profiles_by_ids_are_fetched_in_chunks_within_the_endpoint_limit(monkeypatch):
+    """Un lot d'indexation plus grand que la limite de l'endpoint est découpé"""
+    from contextlib import asynccontextmanager
+
+    from app.infrastructure import quota_middleware, reindex
+
+    requests = []
+
+    class FakeResponse:
+        def __init__(self, ids):
+            self.ids = ids
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"items": [{"id": candidate_id} for candidate_id in self.ids]}
+
+    class FakeClient:
+        async def get(self, url, params, headers):
+            assert params["limit"] == len(params["ids"]) <= 1000
+            requests.append(params["ids"])
+            return FakeResponse(params["ids"])
+
+    @asynccontextmanager
+    async def fake_service_client(base_url, timeout):
+        yield FakeClient()
+
+    monkeypatch.setattr(reindex, "service_client", fake_service_client)
+    monkeypatch.setattr(quota_middleware, "get_service_token_header", lambda service: {})
+
+    profiles = await reindex.fetch_validated_profiles_by_ids(list(range(1, 2502)))
+
+    assert [len(chunk) for chunk in requests] == [500, 500, 500, 500, 500, 1]
+    assert [profile["id"] for profile in profiles] == list(range(1, 2502))
+
+
+@pytest.mark.unit
+def test_candidate_profile_is_mapped_like_admin_indexing():
+    """Le profil Candidate Service donne le même document que l'indexation admin"""
+    from app.infrastructure.candidate_indexer import candidate_data_from_profile, index_candidate
+
+    document = index_candidate(candidate_data_from_profile({
+        "id": 42, "first_name": "Jane", "last_name": "Doe", "profile_title": "Data Engineer",
+        "city": "Dakar", "country": "Sénégal", "total_experience": 6,
+        "skills": [{"name": "Python", "level": "expert"}, {"name": "Anglais courant", "level": None}],
+        "admin_report": {"overall_score": 4.5},
+        "job_preferences": {"availability": "IMMEDIATE"},
+    }))
+
+    assert document["candidate_id"] == 42
+    assert document["full_name"] == "Jane Doe"
+    assert document["location"] == "Dakar, Sénégal"
+    assert document["skills"][0] == {"name": "Python", "level": "EXPERT"}
+    assert document["languages"] == [{"name": "Anglais courant", "level": "INTERMEDIATE"}]
+    assert document["admin_score"] == 4.5
+    assert document["availability"] == "IMMEDIATE"
+    assert document["status"] == "VALIDATED"
+
+
+class _FakeIndices:
+    """API indices d'Elasticsearch simulée : index physiques et alias"""
+
+    def __init__(self):
+        self.aliases = {}  # index -> {alias: {"is_write_index": bool}}
+
+    def _alias_map(self, name):
+        return {index: {} for index, aliases in self.aliases.items() if name in aliases}
+
+    async def exists(self, index):
+        return index in self.aliases or bool(self._alias_map(index))
+
+    async def exists_alias(self, name):
+        return bool(self._alias_map(name))
+
+    async def get_alias(self, name):
+        from elasticsearch import NotFoundError
+
+        found = self._alias_map(name)
+        if not found:
+            raise NotFoundError("alias missing", meta=None, body={})
+        return found
+
+    async def get(self, index):
+        prefix = index.rstrip("*")
+        return {name: {} for name in self.aliases if name.startswith(prefix)}
+
+    async def create(self, index, aliases=None, mappings=None, settings=None):
+        assert mappings and settings
+        self.aliases[index] = dict(aliases or {})
+
+    async def update_aliases(self, actions):
+        for action in actions:
+            (kind, spec), = action.items()
+            if kind == "add":
+                self.aliases[spec["index"]][spec["alias"]] = {"is_write_index": spec.get("is_write_index")}
+            elif kind == "remove":
+                del self.aliases[spec["index"]][spec["alias"]]
+            else:
+                del self.aliases[spec["index"]]
+
+    async def refresh(self, index):
+        pass
+
+    async def delete(self, index):
+        del self.aliases[index]
+
+    async def reload_search_analyzers(self, index):
+        self.reloaded = index.split(",")
+        return {"reload_details": [{"index": name, "reloaded_analyzers": ["job_title_search_analyzer"]} for name in self.reloaded]}
+
+
+class _FakeSynonyms:
+    """API synonyms d'Elasticsearch simulée"""
+
+    def __init__(self):
+        self.sets = {}
+
+    async def get_synonym(self, id, size=10):
+        from elasticsearch import NotFoundError
+
+        if id not in self.sets:
+            raise NotFoundError("synonym set missing", meta=None, body={})
+        return {"count": len(self.sets[id]), "synonyms_set": self.sets[id][:size]}
+
+    async def put_synonym(self, id, synonyms_set):
+        self.sets[id] = synonyms_set
+
+
+class _FakeElasticsearch:
+    def __init__(self):
+        self.indices = _FakeIndices()
+        self.synonyms = _FakeSynonyms()
+        self.writes = []
+        self.updates = []
+
+    async def index(self, index, id, document):
+        self.writes.append((index, id))
+
+    async def update(self, index, id, doc, retry_on_conflict=0):
+        from elasticsearch import NotFoundError
+
+        if (index, id) not in self.writes:
+            raise NotFoundError("document missing", meta=None, body={})
+        self.updates.append((index, id, doc))
+
+
+class _FakeRedisKeys:
+    """Redis simulé : clés simples et compteurs partagés entre instances du service"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key) or 0) + 1)
+        return int(self.values[key])
+
+
+class _FakeReindexManager:
+    """ReindexManager simulé : enregistre les lancements, checkpoints dans un CheckpointStore réel"""
+
+    running = False
+    state = None
+
+    def __init__(self, checkpoint_store=None):
+        self.checkpoint_store = checkpoint_store
+        self.started = []
+        self.resumes = []
+
+    def start(self, target_index=None, resume=True, op_type="index"):
+        self.started.append((target_index, op_type))
+        self.resumes.append(resume)
+        self.state = {"target_index": target_index, "status": "running", "failed": 0}
+        return self.state
+
+    def status(self):
+        return self.state
+
+    async def cancel(self):
+        return False
+
+    async def clear_checkpoint(self, target_index):
+        if self.checkpoint_store is not None:
+            await self.checkpoint_store.delete(target_index)
+
+
+@pytest.mark.unit
+async def test_index_versions_dual_write_then_atomic_swap(monkeypatch):
+    """Migration v1 -> v2 : double écriture pendant la construction puis bascule des alias"""
+    from app.infrastructure import index_versions
+    from app.infrastructure.elasticsearch import ElasticsearchClient
+
+    reindex_stub = _FakeReindexManager()
+    started = reindex_stub.started
+    monkeypatch.setattr(index_versions, "reindex_manager", reindex_stub)
+    es = ElasticsearchClient()
+    es.index_name, es.write_alias = "candidates", "candidates_write"
+    es.client = _FakeElasticsearch()
+    manager = index_versions.IndexVersionManager(es)
+
+    await es.create_index_if_not_exists()
+    assert es.client.indices.aliases == {
+        "candidates_v1": {"candidates": {}, "candidates_write": {"is_write_index": True}}
+    }
+
+    state = await manager.start_migration()
+    assert started == [("candidates_v2", "create")]
+    assert state["serving"] == "candidates_v1" and state["migrating_to"] == "candidates_v2"
+    await es.index_document({"candidate_id": 7})
+    assert es.client.writes == [("candidates_v1", "7"), ("candidates_v2", "7")]
+
+    with pytest.raises(ValueError):
+        await manager.swap()
+    reindex_stub.state["status"] = "completed"
+
+    state = await manager.swap(delete_old=True)
+    assert state["serving"] == "candidates_v2" and state["migrating_to"] is None
+    assert es.client.indices.aliases == {
+        "candidates_v2": {"candidates_write": {"is_write_index": True}, "candidates": {"is_write_index": None}}
+    }
+    assert await es.write_targets() == ["candidates_v2"]
+
+
+@pytest.mark.unit
+async def test_swap_refuses_a_reindex_with_failed_documents(monkeypatch):
+    """Version incomplète (documents en échec) : pas de bascule sans force"""
+    from app.infrastructure import index_versions
+    from app.infrastructure.elasticsearch import ElasticsearchClient
+
+    reindex_stub = _FakeReindexManager()
+    monkeypatch.setattr(index_versions, "reindex_manager", reindex_stub)
+    es = ElasticsearchClient()
+    es.index_name, es.write_alias = "candidates", "candidates_write"
+    es.client = _FakeElasticsearch()
+    manager = index_versions.IndexVersionManager(es)
+    await es.create_index_if_not_exists()
+    await manager.start_migration()
+    reindex_stub.state.update({"status": "completed", "failed": 3})
+
+    with pytest.raises(ValueError, match="3 documents"):
+        await manager.swap()
+    assert (await manager.status())["serving"] == "candidates_v1"
+
+    state = await manager.swap(force=True)
+    assert state["serving"] == "candidates_v2"
+
+@pytest.mark.unit
+async def test_alias_changes_are_seen_by_other_instances_before_their_next_write(monkeypatch):
+    """Migration puis abandon sur une instance : l'autre relit l'alias d'écriture sans attendre le TTL"""
+    from app.infrastructure import elasticsearch as es_module
+    from app.infrastructure import index_versions
+
+    redis = _FakeRedisKeys()
+    monkeypatch.setattr(es_module, "get_redis", lambda: redis)
+    monkeypatch.setattr(index_versions, "reindex_manager", _FakeReindexManager())
+    cluster = _FakeElasticsearch()
+    admin, replica = es_module.ElasticsearchClient(), es_module.ElasticsearchClient()
+    for es in (admin, replica):
+        es.index_name, es.write_alias = "candidates", "candidates_write"
+        es.client = cluster
+    manager = index_versions.IndexVersionManager(admin)
+    await admin.create_index_if_not_exists()
+    assert await replica.write_targets() == ["candidates_v1"]
+
+    await manager.start_migration()
+    assert await replica.write_targets() == ["candidates_v1", "candidates_v2"]
+
+    await manager.abort_migration()
+    await replica.index_document({"candidate_id": 3})
+    assert cluster.writes == [("candidates_v1", "3")]
+
+@pytest.mark.unit
+async def test_migration_after_abort_refills_the_version_from_the_start(monkeypatch, tmp_path):
+    """Une migration abandonnée ne laisse pas son checkpoint à la suivante, qui réutilise le nom de version"""
+    from app.infrastructure import index_versions, reindex
+    from app.infrastructure.elasticsearch import ElasticsearchClient
+
+    monkeypatch.setattr(reindex, "get_redis", lambda: None)
+    store = reindex.CheckpointStore(str(tmp_path / "checkpoint.json"))
+    reindex_stub = _FakeReindexManager(store)
+    monkeypatch.setattr(index_versions, "reindex_manager", reindex_stub)
+    es = ElasticsearchClient()
+    es.index_name, es.write_alias = "candidates", "candidates_write"
+    es.client = _FakeElasticsearch()
+    manager = index_versions.IndexVersionManager(es)
+    await es.create_index_if_not_exists()
+
+    await manager.start_migration()
+    await store.save("candidates_v2", {"after_id": 500, "status": "cancelled"})
+    await manager.abort_migration()
+    assert await store.load("candidates_v2") is None
+    assert "candidates_v2" not in es.client.indices.aliases
+
+    # Version recréée sous le même nom : remplie depuis le début même avec resume=True
+    await manager.start_migration(resume=True)
+    assert reindex_stub.started == [("candidates_v2", "create"), ("candidates_v2", "create")]
+    assert reindex_stub.resumes == [False, False]
+
+    # Version existante dont le remplissage s'est arrêté (redémarrage) : reprise au checkpoint
+    state = await manager.start_migration(resume=True)
+    assert state["migrating_to"] == "candidates_v2"
+    assert reindex_stub.resumes == [False, False, True]
+
+
+@pytest.mark.unit
+async def test_search_results_are_cached_until_the_index_changes(monkeypatch):
+    """Même recherche (filtres dans un autre ordre) servie depuis le cache jusqu'à la prochaine indexation"""
+    from app.api.v1 import search as search_api
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure.search_cache import SearchResultCache
+
+    cache = SearchResultCache(ttl_seconds=60, local_max_size=10, refresh_delay_seconds=0)
+    monkeypatch.setattr(search_api, "search_cache", cache)
+    es_calls = []
+
+    async def fake_search(query):
+        es_calls.append(query)
+        return {"hits": {"total": {"value": 1}, "hits": [
+            {"_id": "7", "_score": 1.0, "_source": {"candidate_id": 7, "full_name": "Jane Doe", "title": "Dev"}}
+        ]}}
+
+    monkeypatch.setattr(search_api.es_client, "search", fake_search)
+
+    first = await search_api.post_search_candidates(PostSearchRequest(query="python", contract_types=["CDI", "CDD"]))
+    again = await search_api.post_search_candidates(PostSearchRequest(query=" python ", contract_types=["CDD", "CDI"]))
+    assert len(es_calls) == 1
+    assert again == first
+    assert cache.stats()["local_hits"] == 1 and cache.stats()["hit_rate"] == 0.5
+
+    await cache.invalidate()
+    await search_api.post_search_candidates(PostSearchRequest(query="python", contract_types=["CDI", "CDD"]))
+    assert len(es_calls) == 2
+
+
+@pytest.mark.unit
+async def test_search_between_write_and_refresh_is_not_cached_past_the_refresh(monkeypatch):
+    """Résultat périmé rangé avant le refresh d'Elasticsearch : écarté par la seconde invalidation"""
+    from app.api.v1 import search as search_api
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure.search_cache import SearchResultCache
+
+    cache = SearchResultCache(ttl_seconds=60, local_max_size=10, refresh_delay_seconds=0.05)
+    monkeypatch.setattr(search_api, "search_cache", cache)
+    visible = [7]
+    es_calls = []
+
+    async def fake_search(query):
+        es_calls.append(query)
+        return {"hits": {"total": {"value": len(visible)}, "hits": [
+            {"_id": str(i), "_score": 1.0, "_source": {"candidate_id": i, "full_name": "Jane Doe", "title": "Dev"}}
+            for i in visible
+        ]}}
+
+    monkeypatch.setattr(search_api.es_client, "search", fake_search)
+    request = PostSearchRequest(query="python")
+
+    # Candidat 8 indexé : génération incrémentée, mais pas encore visible (pas de refresh)
+    await cache.invalidate()
+    stale = await search_api.post_search_candidates(request)
+    visible.append(8)
+    assert await search_api.post_search_candidates(request) == stale
+    assert len(es_calls) == 1
+
+    await asyncio.sleep(0.1)
+    fresh = await search_api.post_search_candidates(request)
+    assert len(es_calls) == 2 and fresh != stale
+
+    # Plusieurs écritures rapprochées : une seule tâche, relancée jusqu'à la dernière
+    for _ in range(3):
+        await cache.invalidate()
+        await asyncio.sleep(0.03)
+    after_last_write = cache._local_generation
+    await asyncio.sleep(0.15)
+    assert cache._refresh_bump.done()
+    assert cache._local_generation > after_last_write
+
+
+@pytest.mark.unit
+async def test_facets_are_computed_once_per_filter_set(monkeypatch):
+    """Page 1 calcule les facettes, les pages suivantes et /facets les reprennent du cache"""
+    from app.api.v1 import search as search_api
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure.facets import FacetEngine
+    from app.infrastructure.search_cache import SearchResultCache
+
+    cache = SearchResultCache(ttl_seconds=60, local_max_size=10)
+    monkeypatch.setattr(search_api, "search_cache", cache)
+    monkeypatch.setattr(search_api, "facet_engine", FacetEngine(cache))
+    es_queries = []
+
+    async def fake_search(query):
+        es_queries.append(query)
+        result = {"hits": {"total": {"value": 0}, "hits": []}}
+        if "aggs" in query:
+            result["aggregations"] = {"sector_counts": {"buckets": [{"key": "IT", "doc_count": 3}]}}
+        return result
+
+    monkeypatch.setattr(search_api.es_client, "search", fake_search)
+
+    page1 = await search_api.post_search_candidates(PostSearchRequest(sector="IT", page=1))
+    page2 = await search_api.post_search_candidates(PostSearchRequest(sector="IT", page=2))
+    lazy = await search_api.post_search_facets(PostSearchRequest(sector="IT", page=3))
+
+    assert "aggs" in es_queries[0] and "aggs" not in es_queries[1]
+    assert len(es_queries) == 2
+    assert page1.facets["sectors"] == [{"key": "IT", "count": 3}]
+    assert page2.facets == page1.facets == lazy["facets"]
+
+
+@pytest.mark.unit
+async def test_cursor_pagination_walks_the_list_with_search_after(monkeypatch):
+    """Mode curseur : PIT ouvert une fois, search_after sur candidate_id, PIT fermé en fin de liste"""
+    from app.api.v1 import search as search_api
+    from app.core.exceptions import InvalidCursorError
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure.facets import FacetEngine
+    from app.infrastructure.search_cache import SearchResultCache
+
+    cache = SearchResultCache(ttl_seconds=60, local_max_size=10)
+    monkeypatch.setattr(search_api, "search_cache", cache)
+    monkeypatch.setattr(search_api, "facet_engine", FacetEngine(cache))
+    opened, closed, queries = [], [], []
+
+    async def fake_open(keep_alive):
+        opened.append(keep_alive)
+        return "pit-1"
+
+    async def fake_close(pit_id):
+        closed.append(pit_id)
+
+    async def fake_search(query):
+        queries.append(query)
+        assert "from" not in query and query["pit"]["id"] == "pit-1"
+        after = query.get("search_after", [0])[-1]
+        ids = [i for i in range(1, 6) if i > after][:query["size"]]
+        return {"pit_id": "pit-1", "hits": {"total": {"value": 5}, "hits": [
+            {"_id": str(i), "_score": 1.0, "sort": [1.0, i], "_source": {"candidate_id": i}} for i in ids
+        ]}}
+
+    monkeypatch.setattr(search_api.es_client, "open_point_in_time", fake_open)
+    monkeypatch.setattr(search_api.es_client, "close_point_in_time", fake_close)
+    monkeypatch.setattr(search_api.es_client, "search", fake_search)
+
+    seen, pages = [], []
+    response = await search_api.post_search_candidates(
+        PostSearchRequest(sector="IT", size=2, cursor_pagination=True, include_facets=False)
+    )
+    while True:
+        seen += [result.candidate_id for result in response.results]
+        pages.append(response.page)
+        if response.next_cursor is None:
+            break
+        response = await search_api.post_search_candidates(
+            PostSearchRequest(sector="IT", size=2, cursor=response.next_cursor, include_facets=False)
+        )
+
+    assert seen == [1, 2, 3, 4, 5]
+    assert pages == [1, 2, 3]
+    assert len(opened) == 1 and closed == ["pit-1"]
+    assert queries[1]["search_after"] == [1.0, 2]
+
+    first = await search_api.post_search_candidates(PostSearchRequest(sector="IT", size=2, cursor_pagination=True))
+    with pytest.raises(InvalidCursorError):
+        await search_api.post_search_candidates(PostSearchRequest(sector="Finance", size=2, cursor=first.next_cursor))
+
+
+@pytest.mark.unit
+async def test_card_projection_limits_source_fields(monkeypatch):
+    """La projection card ne demande ni le rapport admin ni le résumé à Elasticsearch"""
+    from app.api.v1 import search as search_api
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure.post_search_builder import PostSearchQueryBuilder
+    from app.infrastructure.search_builder import SearchQueryBuilder
+    from app.domain.schemas import SearchRequest
+
+    full = PostSearchQueryBuilder.build_query(PostSearchRequest())["_source"]["includes"]
+    card = PostSearchQueryBuilder.build_query(PostSearchRequest(projection="card"))["_source"]["includes"]
+    assert "admin_report" in full and "admin_report" not in card and "summary" not in card
+    assert "experiences" not in SearchQueryBuilder.build_query(SearchRequest())["_source"]["includes"]
+
+    async def fake_search(query):
+        return {"hits": {"total": {"value": 1}, "hits": [
+            {"_id": "3", "_score": 2.0, "_source": {"candidate_id": 3, "full_name": "Jane Doe", "title": "Dev"},
+             "highlight": {"summary": ["<mark class='highlight'>Python</mark>"]}}
+        ]}}
+
+    monkeypatch.setattr(search_api.es_client, "search", fake_search)
+    response = await search_api.post_search_candidates(
+        PostSearchRequest(query="Python", projection="card", include_facets=False)
+    )
+    assert response.results[0].admin_report is None
+    assert response.results[0].summary_highlight.startswith("<mark")
+
+
+@pytest.mark.unit
+def test_query_builder_precomputed_tables(monkeypatch):
+    """Synonymes, niveaux et scripts de boost viennent des tables précalculées"""
+    from app.core.config import settings
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure.post_search_builder import PostSearchQueryBuilder, STORED_SCRIPTS
+
+    # Premier terme du dictionnaire présent dans la requête, même s'il apparaît plus loin
+    assert PostSearchQueryBuilder.expand_job_title_synonyms("backend dev") == "backend dev développeur developer programmeur"
+    assert PostSearchQueryBuilder.expand_job_title_synonyms("comptable") == "comptable"
+    assert PostSearchQueryBuilder.get_levels_minimum("advanced") == ["ADVANCED", "AVANCE", "SENIOR", "EXPERT"]
+    assert len(PostSearchQueryBuilder.get_levels_minimum("inconnu")) == len(PostSearchQueryBuilder.SKILL_LEVEL_HIERARCHY)
+
+    monkeypatch.setattr(settings, "SEARCH_USE_STORED_SCRIPTS", True)
+    functions = PostSearchQueryBuilder.build_query(PostSearchRequest())["query"]["function_score"]["functions"]
+    assert [f["script_score"]["script"] for f in functions if "script_score" in f] == [{"id": key} for key in STORED_SCRIPTS]
+
+
+@pytest.mark.unit
+async def test_synonym_sets_are_managed_without_reindex(monkeypatch):
+    """Jeux de synonymes créés avec l'index, modifiables avec rechargement des analyzers"""
+    from app.core.config import settings
+    from app.domain.schemas import PostSearchRequest
+    from app.infrastructure import synonyms
+    from app.infrastructure.elasticsearch import ElasticsearchClient, candidate_index_body
+    from app.infrastructure.post_search_builder import PostSearchQueryBuilder
+
+    es = ElasticsearchClient()
+    es.index_name, es.write_alias = "candidates", "candidates_write"
+    es.client = _FakeElasticsearch()
+    await es.create_index_if_not_exists()
+    assert set(es.client.synonyms.sets) == {"candidate-job-titles", "candidate-skills", "candidate-education-levels"}
+
+    # Les synonymes ne sont appliqués qu'à la recherche
+    body = candidate_index_body()
+    assert body["mappings"]["properties"]["title"]["search_analyzer"] == "job_title_search_analyzer"
+    assert body["settings"]["analysis"]["filter"]["job_title_synonym"]["updateable"] is True
+    assert "skill_synonym" not in body["settings"]["analysis"]["analyzer"]["skill_analyzer"]["filter"]
+
+    invalidations = []
+
+    async def fake_invalidate():
+        invalidations.append(True)
+
+    monkeypatch.setattr(synonyms.search_cache, "invalidate", fake_invalidate)
+    manager = synonyms.SynonymSetManager(es)
+    result = await manager.put_set("candidate-skills", ["k8s,  kubernetes", "golang => go"])
+    assert result == {"id": "candidate-skills", "count": 2, "reloaded_indices": ["candidates_v1"]}
+    assert (await manager.get_set("candidate-skills"))["rules"] == ["k8s, kubernetes", "golang => go"]
+    assert invalidations == [True]
+
+    with pytest.raises(ValueError):
+        await manager.put_set("candidate-skills", ["kubernetes"])
+    with pytest.raises(KeyError):
+        await manager.put_set("unknown", ["a, b"])
+
+    # Fuzziness sur les seuls termes saisis : plus d'expansion dans le texte de la requête
+    monkeypatch.setattr(settings, "SEARCH_PYTHON_SYNONYM_EXPANSION", False)
+    query = PostSearchQueryBuilder.build_query(PostSearchRequest(query="dev python"))
+    cross_fields = query["query"]["function_score"]["query"]["bool"]["must"][0]["bool"]["should"][1]
+    assert cross_fields["multi_match"]["query"] == "dev python"
+
+
+@pytest.mark.unit
+async def test_suggest_serves_hot_prefixes_from_cache(monkeypatch):
+    """Une requête size=0 par préfixe, puis les préfixes déjà vus sont servis sans Elasticsearch"""
+    from app.api.v1 import search as search_api
+    from app.infrastructure import suggest
+
+    queries = []
+
+    async def fake_search(query):
+        queries.append(query)
+        return {"hits": {"hits": []}, "aggregations": {
+            "title": {"values": {"buckets": [{"key": "Développeur Python", "doc_count": 12}]}},
+            "skills": {"matching": {"values": {"buckets": [{"key": "Django", "doc_count": 4}]}}},
+        }}
+
+    monkeypatch.setattr(suggest.es_client, "search", fake_search)
+    monkeypatch.setattr(search_api, "suggest_engine", suggest.SuggestEngine(ttl_seconds=60))
+
+    response = await search_api.suggest(q="Dév", fields="title,skills", size=5)
+    assert response.suggestions["title"][0].value == "Développeur Python"
+    assert response.suggestions["skills"][0].count == 4
+    assert queries[0]["size"] == 0 and set(queries[0]["aggs"]) == {"skills", "title"}
+    assert queries[0]["aggs"]["skills"]["nested"] == {"path": "skills"}
+    assert queries[0]["aggs"]["title"]["filter"]["match"]["title.autocomplete"]["query"] == "dev"
+
+    # Même préfixe à la casse et aux accents près, types dans un autre ordre
+    await search_api.suggest(q="dev ", fields="skills,title", size=5)
+    assert len(queries) == 1
+    assert search_api.suggest_engine.stats()["hits"] == 1
+
+
+@pytest.mark.unit
+async def test_partial_update_only_sends_changed_fields(monkeypatch):
+    """Score admin modifié par _update partiel, dans chaque version en écriture qui a le document"""
+    from app.api.v1 import candidates as candidates_api
+    from app.core.exceptions import DocumentNotFoundError
+    from app.infrastructure.elasticsearch import ElasticsearchClient
+
+    es = ElasticsearchClient()
+    es.index_name, es.write_alias = "candidates", "candidates_write"
+    es.client = _FakeElasticsearch()
+    await es.create_index_if_not_exists()
+    await es.index_document({"candidate_id": 5})
+    # Nouvelle version en construction qui n'a pas encore reçu le document
+    es.client.indices.aliases["candidates_v2"] = {"candidates_write": {"is_write_index": False}}
+    es.invalidate_write_targets()
+
+    invalidations = []
+
+    async def fake_invalidate():
+        invalidations.append(True)
+
+    monkeypatch.setattr(candidates_api, "es_client", es)
+    monkeypatch.setattr(candidates_api.search_cache, "invalidate", fake_invalidate)
+
+    response = await candidates_api.update_candidate_in_index(
+        5, candidates_api.CandidatePartialUpdate(admin_score=4.5), service_info={}
+    )
+    assert response["updated_fields"] == ["admin_score"]
+    assert es.client.updates == [("candidates_v1", "5", {"admin_score": 4.5})]
+    assert invalidations == [True]
+
+    with pytest.raises(DocumentNotFoundError):
+        await es.update_document("6", {"status": "VALIDATED"})
+
+
+@pytest.mark.unit
+async def test_bulk_load_mode_restores_index_settings():
+    """Refresh et répliques coupés pendant le chargement, valeurs d'origine restaurées ensuite"""
+    from app.infrastructure.bulk_indexing import bulk_load_mode, chunk_actions
+
+    class FakeIndices:
+        def __init__(self):
+            self.settings = {"refresh_interval": "5s"}
+            self.calls = []
+
+        async def get_settings(self, index, name):
+            return {index: {"settings": {"index": dict(self.settings)}}}
+
+        async def put_settings(self, index, settings):
+            self.calls.append(settings["index"])
+            self.settings.update(settings["index"])
+
+        async def refresh(self, index):
+            self.calls.append("refresh")
+
+    client = type("FakeClient", (), {})()
+    client.indices = FakeIndices()
+
+    async with bulk_load_mode(client, ["candidates_v2"]):
+        # Chargement concurrent sur le même index : réglages lus et restaurés une seule fois
+        async with bulk_load_mode(client, ["candidates_v2"]):
+            assert client.indices.settings["refresh_interval"] == "-1"
+        assert client.indices.settings["number_of_replicas"] == 0
+    assert client.indices.calls[1:] == [{"refresh_interval": "5s", "number_of_replicas": None}, "refresh"]
+
+    actions = [{"_id": str(i), "_source": {"summary": "x" * 400}} for i in range(10)]
+    assert [len(chunk) for chunk in chunk_actions(actions, chunk_size=4, max_chunk_bytes=10**6)] == [4, 4, 2]
+    assert [len(chunk) for chunk in chunk_actions(actions, chunk_size=100, max_chunk_bytes=1600)] == [3, 3, 3, 1]
+
+
+@pytest.mark.unit
+async def test_indexing_consumer_coalesces_and_dead_letters(monkeypatch):
+    """Une indexation par candidat, suppression des profils non validés, lettres mortes après N livraisons"""
+    from app.infrastructure import indexing_consumer as consumer_module
+
+    class FakePipeline:
+        def __init__(self, redis):
+            self.redis = redis
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def xack(self, stream, group, *ids):
+            self.redis.acked += ids
+
+        def xdel(self, stream, *ids):
+            pass
+
+        async def execute(self):
+            return []
+
+    class FakeRedis:
+        def __init__(self):
+            self.acked = []
+            self.dlq = []
+            self.deliveries = {}
+
+        def pipeline(self, transaction=False):
+            return FakePipeline(self)
+
+        async def xadd(self, stream, fields):
+            self.dlq.append(fields)
+
+        async def xpending_range(self, stream, group, min, max, count):
+            return [{"message_id": min, "times_delivered": self.deliveries.get(min, 1)}]
+
+    redis = FakeRedis()
+    monkeypatch.setattr(consumer_module, "get_redis", lambda: redis)
+    monkeypatch.setattr(consumer_module.es_client, "write_targets", AsyncMock(return_value=["candidates"]))
+    monkeypatch.setattr(consumer_module.es_client, "connect", AsyncMock())
+    monkeypatch.setattr(consumer_module.search_cache, "invalidate", AsyncMock())
+
+    bulk_calls = []
+
+    async def fake_parallel_bulk(client, actions):
+        bulk_calls.append(actions)
+        errors = [
+            {"id": "3", "index": "candidates", "op_type": "delete", "status": 404, "error": None},
+            {"id": "4", "index": "candidates", "op_type": "index", "status": 400, "error": {"type": "mapper_parsing_exception"}},
+        ]
+        return {"indexed": len(actions) - 2, "failed": 2, "errors": errors}
+
+    monkeypatch.setattr(consumer_module, "parallel_bulk", fake_parallel_bulk)
+
+    async def fetch_profiles(ids):
+        return [{"id": candidate_id, "first_name": "Awa", "status": "VALIDATED"} for candidate_id in ids if candidate_id != 3]
+
+    consumer = consumer_module.IndexingStreamConsumer(
+        stream="events", dlq_stream="events:dlq", group="indexer", max_deliveries=3, fetch_profiles=fetch_profiles,
+    )
+
+    def message(message_id, candidate_id):
+        return message_id, {"event": json.dumps({"candidate_id": candidate_id, "source": "candidate-service"})}
+
+    messages = [message("1-0", 1), message("2-0", 1), message("3-0", 3), message("4-0", 4), ("5-0", {"event": "{"})]
+    assert await consumer.process_batch(messages) == 2
+
+    # Rafale du candidat 1 coalescée ; candidat 3 plus validé : supprimé (déjà absent, 404 ignoré)
+    ops = [(action.get("_op_type", "index"), action["_id"]) for action in bulk_calls[0]]
+    assert ops == [("index", "1"), ("delete", "3"), ("index", "4")]
+    assert sorted(redis.acked) == ["1-0", "2-0", "3-0", "5-0"]
+    assert consumer.coalesced == 1 and consumer.indexed == 1 and consumer.deleted == 1
+    # Message illisible en lettres mortes ; candidat 4 laissé en attente pour une nouvelle livraison
+    assert [entry["message_id"] for entry in redis.dlq] == ["5-0"]
+
+    redis.deliveries["4-0"] = 3
+    assert await consumer.process_batch([message("4-0", 4)], retried=True) == 0
+    assert redis.dlq[-1]["message_id"] == "4-0" and "4-0" in redis.acked
+    assert consumer.dead_lettered == 2
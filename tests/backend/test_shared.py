@@ -0,0 +1,148 @@
+"""
+Tests unitaires pour le module shared (client HTTP et tokens inter-services)
+"""
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import httpx
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+shared_dir = project_root / "services" / "shared"
+
+
+def _load_shared_module(name: str):
+    """Charge un module de services/shared comme le font les services (fichier isolé)"""
+    spec = importlib.util.spec_from_file_location(f"shared_test.{name}", shared_dir / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+http_client = _load_shared_module("http_client")
+internal_auth = _load_shared_module("internal_auth")
+
+
+class _SlowTransport(httpx.AsyncBaseTransport):
+    """Transport factice : répond 200 après un délai, compte les requêtes"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json={"ok": True})
+
+
+def _registry_with_fake_transport(max_connections: int, delay: float = 0.0):
+    registry = http_client.ServiceHttpClients()
+    registry.configure("http://payment:8000", max_connections=max_connections)
+    client = registry.get("http://payment:8000")
+    fake = _SlowTransport(delay)
+    client._transport._transport = fake
+    return registry, fake
+
+
+@pytest.mark.unit
+async def test_one_client_per_upstream_origin():
+    """Toutes les URLs d'une même origine partagent le même client"""
+    registry = http_client.ServiceHttpClients()
+    a = registry.get("http://payment:8000")
+    b = registry.get("http://payment:8000/api/v1/quotas")
+    c = registry.get("http://audit:8000")
+
+    assert a is b
+    assert a is not c
+    await registry.aclose()
+
+
+@pytest.mark.unit
+async def test_pool_wait_is_measured_when_pool_is_saturated():
+    """Avec un pool d'une connexion, la seconde requête attend et c'est mesuré"""
+    registry, fake = _registry_with_fake_transport(max_connections=1, delay=0.05)
+    client = registry.get("http://payment:8000")
+
+    responses = await asyncio.gather(
+        client.get("http://payment:8000/a"),
+        client.get("http://payment:8000/b"),
+    )
+
+    assert [r.status_code for r in responses] == [200, 200]
+    metrics = registry.metrics()["http://payment:8000"]
+    assert metrics["requests"] == 2
+    assert metrics["in_flight"] == 0
+    assert metrics["pool_waits"] == 1
+    assert metrics["pool_wait_ms_max"] >= 40
+    await registry.aclose()
+
+
+@pytest.mark.unit
+async def test_service_client_is_not_closed_after_block():
+    """Le bloc `async with service_client(...)` ne ferme pas le client mutualisé"""
+    registry, fake = _registry_with_fake_transport(max_connections=5)
+    original_registry = http_client.http_clients
+    http_client.http_clients = registry
+    try:
+        for _ in range(3):
+            async with http_client.service_client("http://payment:8000", timeout=1.0) as client:
+                response = await client.post("http://payment:8000/api/v1/quotas/use", json={})
+                assert response.status_code == 200
+        assert not registry.get("http://payment:8000").is_closed
+        assert fake.calls == 3
+    finally:
+        http_client.http_clients = original_registry
+        await registry.aclose()
+
+
+@pytest.mark.unit
+def test_service_token_is_signed_once_and_reused(monkeypatch):
+    """get_service_token_header ne re-signe pas un token encore valide"""
+    monkeypatch.setattr(internal_auth, "_issued_tokens", {})
+    calls = []
+    original = internal_auth.generate_service_token
+
+    def counting_generate(service_name):
+        calls.append(service_name)
+        return original(service_name)
+
+    monkeypatch.setattr(internal_auth, "generate_service_token", counting_generate)
+
+    first = internal_auth.get_service_token_header("search-service")
+    second = internal_auth.get_service_token_header("search-service")
+    internal_auth.get_service_token_header("admin-service")
+
+    assert first == second
+    assert calls == ["search-service", "admin-service"]
+
+
+@pytest.mark.unit
+def test_service_token_is_refreshed_before_expiry(monkeypatch):
+    """Un token proche de l'expiration est renouvelé"""
+    monkeypatch.setattr(internal_auth, "_issued_tokens", {"search-service": ("old-token", 0.0)})
+
+    token = internal_auth.get_cached_service_token("search-service")
+
+    assert token != "old-token"
+    assert internal_auth.verify_service_token(token)["service"] == "search-service"
+
+
+@pytest.mark.unit
+def test_verified_tokens_are_served_from_cache(monkeypatch):
+    """Un token déjà vérifié n'est pas redécodé et le cache renvoie une copie du payload"""
+    monkeypatch.setattr(internal_auth, "_verified_tokens", internal_auth.OrderedDict())
+    token = internal_auth.generate_service_token("candidate-service")
+
+    assert internal_auth.verify_service_token(token)["service"] == "candidate-service"
+
+    def failing_decode(*args, **kwargs):
+        raise AssertionError("jwt.decode should not be called for a cached token")
+
+    monkeypatch.setattr(internal_auth.jwt, "decode", failing_decode)
+    payload = internal_auth.verify_service_token(token)
+    assert payload["service"] == "candidate-service"
+
+    payload["service"] = "tampered"
+    assert internal_auth.verify_service_token(token)["service"] == "candidate-service"